@@ -0,0 +1,64 @@
+"""Event store: create domain_events and aggregate_snapshots tables.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create event store tables."""
+    # Append-only event log
+    op.create_table(
+        "domain_events",
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("event_id", sa.String(64), nullable=False),
+        sa.Column("event_type", sa.String(100), nullable=False),
+        sa.Column("aggregate_type", sa.String(100), nullable=False),
+        sa.Column("aggregate_id", sa.String(255), nullable=False),
+        sa.Column("sequence", sa.Integer(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("data", sa.Text(), nullable=True),
+        sa.Column("event_metadata", sa.Text(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.PrimaryKeyConstraint("position"),
+        sa.UniqueConstraint("event_id"),
+        sa.UniqueConstraint(
+            "aggregate_type", "aggregate_id", "sequence", name="uq_domain_events_stream"
+        ),
+    )
+    op.create_index("idx_domain_events_type", "domain_events", ["event_type", "position"])
+
+    # Periodic aggregate snapshots
+    op.create_table(
+        "aggregate_snapshots",
+        sa.Column("aggregate_type", sa.String(100), nullable=False),
+        sa.Column("aggregate_id", sa.String(255), nullable=False),
+        sa.Column("sequence", sa.Integer(), nullable=False),
+        sa.Column("max_timestamp", sa.DateTime(), nullable=False),
+        sa.Column("state", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+        sa.PrimaryKeyConstraint("aggregate_type", "aggregate_id", "sequence"),
+    )
+
+
+def downgrade() -> None:
+    """Drop event store tables."""
+    op.drop_table("aggregate_snapshots")
+
+    op.drop_index("idx_domain_events_type", "domain_events")
+    op.drop_table("domain_events")
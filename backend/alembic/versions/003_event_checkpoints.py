@@ -0,0 +1,35 @@
+"""Event store: create event_checkpoints table.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create subscription checkpoint table."""
+    op.create_table(
+        "event_checkpoints",
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Drop subscription checkpoint table."""
+    op.drop_table("event_checkpoints")
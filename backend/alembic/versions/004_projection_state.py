@@ -0,0 +1,27 @@
+"""Event store: store projection state with checkpoints.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add materialized projection state to checkpoints."""
+    op.add_column("event_checkpoints", sa.Column("state", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove projection state from checkpoints."""
+    op.drop_column("event_checkpoints", "state")
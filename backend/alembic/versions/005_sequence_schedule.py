@@ -0,0 +1,36 @@
+"""Sequences: create sequence_schedule table.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create sequence step schedule."""
+    op.create_table(
+        "sequence_schedule",
+        sa.Column("enrollment_id", sa.String(64), nullable=False),
+        sa.Column("due_at", sa.DateTime(), nullable=False),
+        sa.Column("lease_token", sa.String(64), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("enrollment_id"),
+    )
+    op.create_index("ix_sequence_schedule_due_at", "sequence_schedule", ["due_at"])
+
+
+def downgrade() -> None:
+    """Drop sequence step schedule."""
+    op.drop_index("ix_sequence_schedule_due_at", "sequence_schedule")
+    op.drop_table("sequence_schedule")
@@ -0,0 +1,49 @@
+"""Webhooks: create webhook_deliveries queue table.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create outbound webhook delivery queue."""
+    op.create_table(
+        "webhook_deliveries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("webhook_id", sa.Integer(), nullable=False),
+        sa.Column("event", sa.String(100), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("lease_token", sa.String(64), nullable=True),
+        sa.Column("last_error", sa.String(500), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "idx_webhook_deliveries_due",
+        "webhook_deliveries",
+        ["status", "webhook_id", "next_attempt_at"],
+    )
+
+
+def downgrade() -> None:
+    """Drop outbound webhook delivery queue."""
+    op.drop_index("idx_webhook_deliveries_due", "webhook_deliveries")
+    op.drop_table("webhook_deliveries")
@@ -0,0 +1,43 @@
+"""Sagas: create saga_journal table.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create saga write-ahead journal."""
+    op.create_table(
+        "saga_journal",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("saga_id", sa.String(64), nullable=False),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("step", sa.String(100), nullable=True),
+        sa.Column("data", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_saga_journal_saga", "saga_journal", ["saga_id", "id"])
+    op.create_index("idx_saga_journal_kind", "saga_journal", ["kind", "status"])
+
+
+def downgrade() -> None:
+    """Drop saga write-ahead journal."""
+    op.drop_index("idx_saga_journal_kind", "saga_journal")
+    op.drop_index("idx_saga_journal_saga", "saga_journal")
+    op.drop_table("saga_journal")
@@ -0,0 +1,29 @@
+"""Sequences: record the worker owning each scheduled enrollment.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add owner column to sequence_schedule."""
+    op.add_column("sequence_schedule", sa.Column("owner", sa.String(64), nullable=True))
+    op.create_index("ix_sequence_schedule_owner", "sequence_schedule", ["owner"])
+
+
+def downgrade() -> None:
+    """Drop owner column from sequence_schedule."""
+    op.drop_index("ix_sequence_schedule_owner", "sequence_schedule")
+    op.drop_column("sequence_schedule", "owner")
@@ -0,0 +1,35 @@
+"""Sagas: create saga_leases table.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create saga ownership leases."""
+    op.create_table(
+        "saga_leases",
+        sa.Column("saga_id", sa.String(64), nullable=False),
+        sa.Column("owner", sa.String(100), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("saga_id"),
+    )
+    op.create_index("ix_saga_leases_expires_at", "saga_leases", ["expires_at"])
+
+
+def downgrade() -> None:
+    """Drop saga ownership leases."""
+    op.drop_index("ix_saga_leases_expires_at", "saga_leases")
+    op.drop_table("saga_leases")
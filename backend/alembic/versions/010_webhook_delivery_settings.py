@@ -0,0 +1,57 @@
+"""Webhooks: per-endpoint delivery settings.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+# Column name and default, as on app.models.enhanced_models.Webhook
+COLUMNS = [
+    ("max_retries", 3),
+    ("timeout_seconds", 30),
+    ("batch_size", 1),
+    ("max_concurrency", 2),
+]
+
+
+def _existing_columns():
+    inspector = sa.inspect(op.get_bind())
+    if "webhooks" not in inspector.get_table_names():
+        return None
+    return {column["name"] for column in inspector.get_columns("webhooks")}
+
+
+def upgrade() -> None:
+    """Add retry, timeout, batching and concurrency settings to webhooks."""
+    # The webhooks table is created from the models, so it may not exist yet
+    existing = _existing_columns()
+    if existing is None:
+        return
+    for name, default in COLUMNS:
+        if name not in existing:
+            op.add_column(
+                "webhooks",
+                sa.Column(name, sa.Integer(), nullable=False, server_default=str(default)),
+            )
+
+
+def downgrade() -> None:
+    """Drop the per-endpoint delivery settings."""
+    existing = _existing_columns()
+    if existing is None:
+        return
+    with op.batch_alter_table("webhooks") as batch_op:
+        for name, _ in COLUMNS:
+            if name in existing:
+                batch_op.drop_column(name)
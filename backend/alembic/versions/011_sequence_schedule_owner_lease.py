@@ -0,0 +1,27 @@
+"""Sequences: expire the worker tag on scheduled enrollments.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add owner_expires_at column to sequence_schedule."""
+    op.add_column("sequence_schedule", sa.Column("owner_expires_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop owner_expires_at column from sequence_schedule."""
+    op.drop_column("sequence_schedule", "owner_expires_at")
@@ -34,6 +34,7 @@ async def login(payload: LoginRequest):
             "email": payload.username,
             "name": "Demo User",
             "role": UserRole.ADMIN.value,
+            "tier": "free",
             "is_active": True,
         }
 
@@ -59,6 +60,7 @@ async def refresh_token(payload: RefreshRequest):
         "email": token_data.get("email"),
         "name": token_data.get("name"),
         "role": token_data.get("role"),
+        "tier": token_data.get("tier", "free"),
         "is_active": token_data.get("is_active", True),
     }
 
@@ -18,10 +18,10 @@ async def export_user_data(
 ):
     """Export all user data for GDPR compliance."""
     try:
-        data_buffer = await compliance_service.export_user_data(current_user.id, db)
+        data_stream = await compliance_service.export_user_data(current_user.id, db)
 
         return StreamingResponse(
-            data_buffer,
+            data_stream,
             media_type="application/json",
             headers={
                 "Content-Disposition": f"attachment; filename=user_data_{current_user.id}.json"
@@ -120,5 +120,5 @@ async def enrichment_status():
             "hunter": bool(os.getenv("HUNTER_API_KEY")),
             "mock": True,  # Always available as fallback
         },
-        "cache_size": len(enrichment_service._cache),
+        "cache_size": enrichment_service.get_stats()["cache"]["size"],
     }
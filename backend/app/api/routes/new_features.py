@@ -4,12 +4,25 @@ import random
 from datetime import datetime, timedelta
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
+from app.core.celery_app import celery_app
 from app.core.db import get_session
+from app.core.export import (
+    EXPORT_FORMATS,
+    PYARROW_AVAILABLE,
+    arrow_schema,
+    export_content_type,
+    export_filename,
+    iter_export,
+    iter_query_batches,
+)
 from app.core.security import get_current_user
 from app.models.user import User
+from app.tasks.analytics_tasks import export_leads as export_leads_task
+from app.tasks.analytics_tasks import lead_export_query
 
 # Initialize routers
 multichannel_router = APIRouter(prefix="/api/multichannel", tags=["multichannel"])
@@ -207,13 +220,55 @@ def export_leads(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    """Export filtered leads to CSV"""
-    return {
-        "export_id": random.randint(10000, 99999),
-        "status": "processing",
-        "estimated_time": "2-3 minutes",
-        "download_url": None,
-    }
+    """
+    Export filtered leads to CSV, NDJSON or Parquet
+
+    Payload: format, filters (FilterBuilder syntax), compress (gzip) and
+    delivery: "download" streams the file in this response, "storage" runs
+    the export in the background and uploads it (poll /export/{export_id}).
+    """
+    export_format = payload.get("format", "csv")
+    compress = bool(payload.get("compress", False))
+    filters = payload.get("filters") or {}
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {export_format}")
+    if export_format == "parquet" and not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=400, detail="Parquet export is not available")
+
+    if payload.get("delivery") == "storage":
+        task = export_leads_task.delay(current_user.id, export_format, filters, compress)
+        return {"export_id": task.id, "status": "processing", "download_url": None}
+
+    query = lead_export_query(filters)
+
+    def batches():
+        # Own session: the response body is streamed after this handler returns
+        with get_session() as export_session:
+            yield from iter_query_batches(export_session, query)
+
+    filename = export_filename("leads_export", export_format, compress)
+    return StreamingResponse(
+        iter_export(batches(), export_format, compress, schema=arrow_schema(query)),
+        media_type=export_content_type(export_format, compress),
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@lead_db_router.get("/export/{export_id}")
+def get_export_status(export_id: str, current_user: User = Depends(get_current_user)):
+    """Progress or result of a background lead export"""
+    result = celery_app.AsyncResult(export_id)
+    info = result.info if isinstance(result.info, dict) else {}
+    if info.get("user_id") not in (None, current_user.id):
+        raise HTTPException(status_code=404, detail="Export not found")
+
+    if result.state == "PROGRESS":
+        return {"export_id": export_id, "status": "processing", **info}
+    if result.successful():
+        if "error" in info:
+            return {"export_id": export_id, "status": "failed", "error": info["error"]}
+        return {"export_id": export_id, "status": "completed", **info}
+    return {"export_id": export_id, "status": result.state.lower()}
 
 
 @lead_db_router.get("/filters/options")
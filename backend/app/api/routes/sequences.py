@@ -60,6 +60,13 @@ class BulkEnrollRequest(BaseModel):
     leads: List[EnrollLeadRequest]
 
 
+class CompleteStepRequest(BaseModel):
+    """Request to confirm a leased step"""
+
+    lease_token: str
+    status: StepStatus = StepStatus.SENT
+
+
 class UpdateSequenceRequest(BaseModel):
     """Request to update a sequence"""
 
@@ -315,3 +322,38 @@ async def get_pending_steps(limit: int = Query(100, le=500)):
             for p in pending
         ],
     }
+
+
+@router.post("/pending-steps/lease")
+async def lease_pending_steps(
+    limit: int = Query(100, le=500), lease_seconds: int = Query(300, ge=10, le=3600)
+):
+    """Reserve due steps for a worker; confirm each with /enrollments/{id}/complete"""
+    leased = sequence_service.lease_pending_steps(limit=limit, lease_seconds=lease_seconds)
+
+    return {
+        "count": len(leased),
+        "lease_seconds": lease_seconds,
+        "steps": [
+            {
+                "enrollment_id": p["enrollment"].id,
+                "lease_token": p["lease_token"],
+                "lead_email": p["enrollment"].lead_email,
+                "sequence_name": p["sequence"].name,
+                "step_number": p["step"].step_number,
+                "step_type": p["step"].step_type,
+                "subject": p["step"].subject_template,
+                "scheduled_for": p["enrollment"].next_step_at,
+            }
+            for p in leased
+        ],
+    }
+
+
+@router.post("/enrollments/{enrollment_id}/complete")
+async def complete_step(enrollment_id: str, request: CompleteStepRequest):
+    """Confirm a leased step was executed and advance the enrollment"""
+    enrollment = sequence_service.complete_step(enrollment_id, request.lease_token, request.status)
+    if not enrollment:
+        raise HTTPException(status_code=409, detail="Lease expired or enrollment not found")
+    return {"status": "completed", "enrollment": enrollment}
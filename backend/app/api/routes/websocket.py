@@ -22,7 +22,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str = None):
             await websocket.receive_json()
 
             # Echo back or process
-            await websocket.send_json({"type": "ack", "message": "Message received"})
+            manager.send_json(websocket, {"type": "ack", "message": "Message received"})
 
     except WebSocketDisconnect:
         manager.disconnect(websocket, user_id)
@@ -36,7 +36,7 @@ async def user_notifications(websocket: WebSocket, user_id: int):
     try:
         while True:
             data = await websocket.receive_text()
-            await websocket.send_text(f"Received: {data}")
+            manager.send_text(websocket, f"Received: {data}")
 
     except WebSocketDisconnect:
         manager.disconnect(websocket, user_id)
@@ -10,17 +10,24 @@ Combines all advanced AI frameworks into a cohesive system:
 Provides high-level orchestration for complex AI workflows.
 """
 
+import asyncio
 import json
+import logging
 from typing import Any, Dict, List, Optional
 
+from ..integrations.ai_orchestrator import OrchestrationContext, get_orchestrator
 from ..integrations.langchain_agent import LangChainOrchestrator
 from ..integrations.llamaindex_rag import LlamaIndexRAG
 from ..integrations.mem0_memory import Mem0MemoryManager
+from ..integrations.policies import UseCaseType
 from ..integrations.pydantic_agent import (
+    LeadScore,
     PydanticAIAgent,
     SalesContext,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class UnifiedAIOrchestrator:
     """
@@ -402,45 +409,105 @@ Please provide a helpful, context-aware response."""
         self,
         user_id: str,
         leads: List[Dict[str, Any]],
+        org_id: Optional[str] = None,
+        max_concurrency: int = 8,
     ) -> List[Dict[str, Any]]:
         """
         Analyze multiple leads in batch with intelligent prioritization
 
+        Workflow:
+        1. Add new leads to the user's similarity index (already indexed leads are skipped)
+        2. Gather memory and similar-lead context per lead, max_concurrency at a time
+        3. Score all leads through the policy orchestrator's execute_batch
+           (packed multi-lead prompts, one budget check)
+        4. Remember each scoring decision (Mem0)
+
         Args:
             user_id: User identifier
             leads: List of leads to analyze
+            org_id: Organization for budget accounting (defaults to the user)
+            max_concurrency: Context lookups and memory writes in flight
 
         Returns:
             Prioritized leads with scores and recommendations
         """
-        results = []
-
-        # First, ingest leads into RAG for similarity search
-        await self.rag.ingest_lead_database(leads, index_name=f"leads_{user_id}")
-
-        for lead in leads:
-            try:
-                score_result = await self.intelligent_lead_scoring(
-                    user_id=user_id,
-                    lead_data=lead,
+        index_name = f"leads_{user_id}"
+        await self.rag.ingest_lead_database(leads, index_name=index_name)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def lead_variables(lead: Dict[str, Any]) -> Dict[str, Any]:
+            company_name = lead.get("company", "Unknown")
+            async with semaphore:
+                past_interactions, similar_leads = await asyncio.gather(
+                    self.memory.recall_lead_history(
+                        user_id=user_id, lead_name=lead.get("name", ""), limit=5
+                    ),
+                    self.rag.find_similar_leads(
+                        lead_description=f"{company_name} in {lead.get('industry', 'Unknown')} industry",
+                        top_k=5,
+                        min_score=70,
+                        index_name=index_name,
+                    ),
+                    return_exceptions=True,
                 )
-                results.append(
-                    {
-                        "lead": lead,
-                        "score": score_result["lead_score"]["score"],
-                        "recommendation": score_result["lead_score"]["recommendation"],
-                        "confidence": score_result["lead_score"]["confidence"],
-                    }
-                )
-            except Exception as e:
-                results.append(
-                    {
-                        "lead": lead,
-                        "error": str(e),
-                        "score": 0,
-                    }
+            if isinstance(past_interactions, Exception):
+                past_interactions = []
+            if isinstance(similar_leads, Exception):
+                similar_leads = {}
+            return {
+                "company_name": company_name,
+                "industry": lead.get("industry", "Unknown"),
+                "company_size": lead.get("size", "Unknown"),
+                "engagement_summary": f"{lead.get('engagement', 'No data')} "
+                f"({len(past_interactions)} past interactions)",
+                "buying_signals": lead.get("buying_signals", lead.get("notes", "None recorded")),
+                "rag_context": similar_leads.get("answer", ""),
+            }
+
+        async def remember(lead: Dict[str, Any], lead_score: Dict[str, Any]) -> None:
+            async with semaphore:
+                await self.memory.add_memory(
+                    messages=f"Scored {lead.get('name')} at {lead.get('company', 'Unknown')}: {lead_score['score']}/100. Factors: {', '.join(lead_score.get('factors', []))}. Recommendation: {lead_score['recommendation']}",
+                    user_id=user_id,
+                    agent_id="ava",
+                    app_id="artisan",
+                    metadata={
+                        "category": "lead_scoring",
+                        "lead_name": lead.get("name"),
+                        "company": lead.get("company"),
+                        "score": lead_score["score"],
+                    },
                 )
 
+        items = await asyncio.gather(*(lead_variables(lead) for lead in leads))
+
+        results = []
+        memory_writes = []
+        async for item in get_orchestrator().execute_batch(
+            UseCaseType.LEAD_SCORING,
+            items,
+            OrchestrationContext(user_id=user_id, org_id=org_id or user_id),
+            response_model=LeadScore,
+        ):
+            lead = leads[item.index]
+            if item.error:
+                results.append({"lead": lead, "error": item.error, "score": 0})
+                continue
+            results.append(
+                {
+                    "lead": lead,
+                    "score": item.output["score"],
+                    "recommendation": item.output["recommendation"],
+                    "confidence": item.output["confidence"],
+                }
+            )
+            memory_writes.append(asyncio.create_task(remember(lead, item.output)))
+
+        for outcome in await asyncio.gather(*memory_writes, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Failed to remember lead score: {outcome}")
+
         # Sort by score descending
         results.sort(key=lambda x: x.get("score", 0), reverse=True)
 
@@ -528,6 +595,4 @@ async def example_usage():
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(example_usage())
@@ -10,8 +10,6 @@ from enum import Enum
 from functools import wraps
 from typing import Any, Callable, Dict, Optional
 
-import boto3
-
 logger = logging.getLogger(__name__)
 
 
@@ -41,22 +39,30 @@ class CircuitBreaker:
         """
         Execute function with circuit breaker protection.
         """
-        if self.state == CircuitState.OPEN:
-            if self._should_attempt_reset():
-                self.state = CircuitState.HALF_OPEN
-                logger.info("Circuit breaker entering HALF_OPEN state")
-            else:
-                raise Exception("Circuit breaker is OPEN - service unavailable")
+        if not self.allow_request():
+            raise Exception("Circuit breaker is OPEN - service unavailable")
 
         try:
             result = func(*args, **kwargs)
-            self._on_success()
+            self.record_success()
             return result
         except Exception:
-            self._on_failure()
+            self.record_failure()
             raise
 
-    def _on_success(self):
+    def allow_request(self) -> bool:
+        """
+        Whether a call may go ahead now; moves OPEN to HALF_OPEN once the
+        timeout has passed. For callers that make the call themselves.
+        """
+        if self.state == CircuitState.OPEN:
+            if not self._should_attempt_reset():
+                return False
+            self.state = CircuitState.HALF_OPEN
+            logger.info("Circuit breaker entering HALF_OPEN state")
+        return True
+
+    def record_success(self):
         """Handle successful call"""
         self.failure_count = 0
 
@@ -67,7 +73,7 @@ class CircuitBreaker:
                 self.success_count = 0
                 logger.info("Circuit breaker CLOSED - service recovered")
 
-    def _on_failure(self):
+    def record_failure(self):
         """Handle failed call"""
         self.failure_count += 1
         self.last_failure_time = datetime.now()
@@ -122,11 +128,21 @@ class RequestLogger:
 
     def __init__(self, bucket_name: str):
         self.bucket_name = bucket_name
-        try:
-            self.s3_client = boto3.client("s3")
-        except Exception as e:
-            logger.warning(f"S3 client not initialized: {e}")
-            self.s3_client = None
+        self._s3_client = None
+        self._s3_initialized = False
+
+    @property
+    def s3_client(self):
+        """Created on first use, so importing this module doesn't load boto3"""
+        if not self._s3_initialized:
+            self._s3_initialized = True
+            try:
+                import boto3
+
+                self._s3_client = boto3.client("s3")
+            except Exception as e:
+                logger.warning(f"S3 client not initialized: {e}")
+        return self._s3_client
 
     def log_request(
         self,
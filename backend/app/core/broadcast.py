@@ -0,0 +1,263 @@
+"""
+WebSocket Broadcast Engine
+Serialize-once fan-out with per-connection send queues and a cross-process bridge
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.core.pubsub import InProcessPubSubBus, PubSubBus, RedisPubSubBus
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# What to do when a connection's send queue is full
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+# "Try again later": the client fell too far behind and may reconnect
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Serialize a message to the JSON text frame sent to every recipient"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message, default=str).decode()
+    return json.dumps(message, default=str)
+
+
+class ConnectionSender:
+    """
+    Bounded outbound queue for one WebSocket, drained by its own writer task.
+
+    Publishers only enqueue, so a client on a slow link delays nothing but
+    its own frames. When the queue is full, ``policy`` decides whether the
+    oldest frame, the new frame, or the connection itself is dropped.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_error: Callable[[WebSocket], None],
+        max_queue: int = 256,
+        policy: str = "drop_oldest",
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.websocket = websocket
+        self.policy = policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self._on_error = on_error
+        self._writer = asyncio.create_task(self._run())
+
+    def offer(self, frame: str) -> bool:
+        """Enqueue a frame without waiting; False means the client must be dropped"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        self.dropped += 1
+        if self.policy == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(frame)
+            return True
+        if self.policy == "drop_newest":
+            return True
+        return False
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                frame = await self.queue.get()
+                await self.websocket.send_text(frame)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"WebSocket send failed, dropping connection: {e}")
+            self._on_error(self.websocket)
+
+    def close(self, code: Optional[int] = None) -> None:
+        """Stop the writer; with ``code`` also close the socket"""
+        if self.closed:
+            return
+        self.closed = True
+        self._writer.cancel()
+        if code is not None:
+            asyncio.create_task(self._close_socket(code))
+
+    async def _close_socket(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception as e:
+            logger.debug(f"WebSocket close failed: {e}")
+
+
+def create_broadcast_bus() -> PubSubBus:
+    """
+    Pick the bus matching ``settings.broadcast_backend`` ("memory" or "redis")
+
+    Hubs relay dicts with the sender's ``origin`` id, the hub ``namespace``,
+    ``channel``, the encoded ``frame`` and optional ``exclude``.
+    """
+    if settings.broadcast_backend == "redis":
+        return RedisPubSubBus(settings.redis_url, channel="ws:broadcast")
+    return InProcessPubSubBus(channel="ws:broadcast")
+
+
+class BroadcastHub:
+    """
+    Channel membership and fan-out for a set of WebSocket connections.
+
+    publish() encodes the message once and offers the same frame to every
+    member's ConnectionSender, then relays it over the bus so hubs with the
+    same ``namespace`` in other processes deliver it to their members too.
+    A channel exists only while it has members.
+
+    Every frame for a registered connection, replies included, goes through
+    its sender: the writer task is the only coroutine sending on the socket.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        bus: Optional[PubSubBus] = None,
+        max_queue: Optional[int] = None,
+        policy: Optional[str] = None,
+    ):
+        self.namespace = namespace
+        self.origin = uuid.uuid4().hex
+        self.bus = bus
+        self.max_queue = max_queue or settings.websocket_send_queue_size
+        self.policy = policy or settings.websocket_slow_consumer_policy
+        self.channels: Dict[str, Set[WebSocket]] = {}
+        self._senders: Dict[WebSocket, ConnectionSender] = {}
+        self.published = 0
+        self.evicted = 0
+        if bus is not None:
+            bus.subscribe(self._on_bus_message)
+
+    def is_registered(self, websocket: WebSocket) -> bool:
+        return websocket in self._senders
+
+    def register(self, websocket: WebSocket) -> ConnectionSender:
+        sender = self._senders.get(websocket)
+        if sender is None:
+            sender = ConnectionSender(websocket, self._evict, self.max_queue, self.policy)
+            self._senders[websocket] = sender
+        return sender
+
+    def join(self, websocket: WebSocket, channel: str) -> None:
+        self.register(websocket)
+        self.channels.setdefault(channel, set()).add(websocket)
+
+    def leave(self, websocket: WebSocket, channel: str) -> None:
+        members = self.channels.get(channel)
+        if members is not None:
+            members.discard(websocket)
+            if not members:
+                del self.channels[channel]
+
+    def memberships(self, websocket: WebSocket) -> List[str]:
+        return [name for name, members in self.channels.items() if websocket in members]
+
+    def remove(self, websocket: WebSocket, code: Optional[int] = None) -> None:
+        """Forget a connection entirely; with ``code`` also close its socket"""
+        for channel in self.memberships(websocket):
+            self.leave(websocket, channel)
+        sender = self._senders.pop(websocket, None)
+        if sender is not None:
+            sender.close(code)
+
+    def _evict(self, websocket: WebSocket, code: Optional[int] = None) -> None:
+        self.evicted += 1
+        self.remove(websocket, code)
+
+    def send(self, websocket: WebSocket, message: Dict[str, Any]) -> None:
+        """Queue a message for a single connection"""
+        self.send_text(websocket, encode_message(message))
+
+    def send_text(self, websocket: WebSocket, frame: str) -> None:
+        """Queue a raw text frame for a single connection"""
+        if not self.register(websocket).offer(frame):
+            self._evict(websocket, SLOW_CONSUMER_CLOSE_CODE)
+
+    def _deliver(self, channel: str, frame: str, exclude: Optional[str] = None) -> int:
+        members = self.channels.get(channel)
+        if not members:
+            return 0
+        skip = self.channels.get(exclude, set()) if exclude else set()
+        delivered = 0
+        for websocket in list(members):
+            if websocket in skip:
+                continue
+            sender = self._senders.get(websocket)
+            if sender is None:
+                continue
+            if sender.offer(frame):
+                delivered += 1
+            else:
+                logger.warning(f"Disconnecting slow WebSocket consumer on channel {channel}")
+                self._evict(websocket, SLOW_CONSUMER_CLOSE_CODE)
+        return delivered
+
+    async def publish(
+        self, channel: str, message: Dict[str, Any], exclude: Optional[str] = None
+    ) -> int:
+        """
+        Fan a message out to ``channel``, skipping members of ``exclude``.
+        Returns the number of local connections it was queued for.
+        """
+        frame = encode_message(message)
+        self.published += 1
+        delivered = self._deliver(channel, frame, exclude)
+        if self.bus is not None:
+            await self.bus.publish(
+                {
+                    "origin": self.origin,
+                    "namespace": self.namespace,
+                    "channel": channel,
+                    "frame": frame,
+                    "exclude": exclude,
+                }
+            )
+        return delivered
+
+    async def _on_bus_message(self, message: Dict[str, Any]) -> None:
+        if message.get("origin") == self.origin or message.get("namespace") != self.namespace:
+            return
+        self._deliver(message["channel"], message["frame"], message.get("exclude"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        senders = list(self._senders.values())
+        return {
+            "connections": len(senders),
+            "channels": {name: len(members) for name, members in self.channels.items()},
+            "published": self.published,
+            "queued": sum(s.queue.qsize() for s in senders),
+            "sent": sum(s.sent for s in senders),
+            "dropped": sum(s.dropped for s in senders),
+            "evicted": self.evicted,
+        }
+
+
+# Shared by every hub in this process; started with the app
+broadcast_bus = create_broadcast_bus()
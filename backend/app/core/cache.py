@@ -1,12 +1,48 @@
-"""Simple in-memory cache with TTL support."""
+"""
+Cache backends.
 
+``cache`` is a process-local, synchronous TTL cache. ``async_cache`` is the
+shared L2 backend: Redis (pooled, pipelined) when ``settings.cache_backend``
+is "redis", otherwise an async in-memory fake backed by ``cache``.
+"""
+
+import json
 import logging
+import pickle
 import time
+from abc import ABC, abstractmethod
+from fnmatch import fnmatchcase
 from threading import Lock
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Optional fast serializers / Redis client (graceful fallback if not installed)
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import redis.asyncio as aioredis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+Number = Union[int, float]
+
 
 class SimpleCache:
     """Thread-safe in-memory cache with TTL. For production, use Redis."""
@@ -37,6 +73,58 @@ class SimpleCache:
         with self._lock:
             self._cache.pop(key, None)
 
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Remove several keys; returns how many existed."""
+        with self._lock:
+            return sum(1 for k in keys if self._cache.pop(k, None) is not None)
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        """Return live keys matching a Redis-style glob pattern."""
+        now = time.time()
+        with self._lock:
+            return [
+                k
+                for k, (_, exp) in self._cache.items()
+                if (exp is None or now < exp) and fnmatchcase(k, pattern)
+            ]
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Remove all keys matching a Redis-style glob pattern."""
+        return self.delete_many(self.keys(pattern))
+
+    def incr(self, key: str, amount: Number = 1, ttl: Optional[int] = None) -> Number:
+        """
+        Atomically add ``amount`` to a numeric value (missing keys start at 0).
+        ``ttl`` only applies when the key is created, like Redis EXPIRE NX.
+        """
+        with self._lock:
+            now = time.time()
+            entry = self._cache.get(key)
+            if entry is not None and (entry[1] is None or now < entry[1]):
+                value = entry[0] + amount
+                expiry = entry[1]
+            else:
+                value = amount
+                expiry = None if ttl is None else now + ttl
+            self._cache[key] = (value, expiry)
+            return value
+
+    def sadd(self, key: str, *members: str, ttl: Optional[int] = None) -> None:
+        """Add members to a set stored at key (like Redis SADD + EXPIRE)."""
+        with self._lock:
+            entry = self._cache.get(key)
+            current: Set[str] = set()
+            if entry is not None and (entry[1] is None or time.time() < entry[1]):
+                current = entry[0]
+            current.update(members)
+            expiry = None if ttl is None else time.time() + ttl
+            self._cache[key] = (current, expiry)
+
+    def smembers(self, key: str) -> Set[str]:
+        """Return a copy of the set stored at key (empty if missing)."""
+        value = self.get(key)
+        return set(value) if value else set()
+
     def clear(self) -> None:
         """Clear all cached values."""
         with self._lock:
@@ -54,4 +142,364 @@ class SimpleCache:
             return len(expired)
 
 
+# ============================================================================
+# Serialization
+# ============================================================================
+
+
+class CacheSerializer(ABC):
+    """
+    Converts cached values to and from bytes for network backends.
+
+    The JSON-family serializers (json, orjson, msgpack) return JSON types:
+    datetimes and other unknown objects come back as strings and tuples as
+    lists. Only pickle preserves Python types.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value for storage."""
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """Decode a stored value."""
+
+
+class JSONSerializer(CacheSerializer):
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=str).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(CacheSerializer):
+    name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer(CacheSerializer):
+    name = "msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=str, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class PickleSerializer(CacheSerializer):
+    """Round-trips arbitrary Python objects. Only use with a trusted Redis."""
+
+    name = "pickle"
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+def get_serializer(name: str) -> CacheSerializer:
+    """Resolve a serializer by name, falling back to stdlib JSON."""
+    if name == "orjson" and ORJSON_AVAILABLE:
+        return OrjsonSerializer()
+    if name == "msgpack" and MSGPACK_AVAILABLE:
+        return MsgpackSerializer()
+    if name == "pickle":
+        return PickleSerializer()
+    if name not in ("json", "orjson", "msgpack"):
+        logger.warning(f"Unknown cache serializer '{name}', using json")
+    elif name != "json":
+        logger.warning(f"Cache serializer '{name}' not installed, using json")
+    return JSONSerializer()
+
+
+# ============================================================================
+# Async L2 backends
+# ============================================================================
+
+
+class AsyncCacheBackend(ABC):
+    """
+    Async cache interface shared by the Redis backend and the in-memory fake.
+
+    Counters written with ``incr``/``incr_many`` are stored as raw numbers and
+    must be read back with ``get_counters``.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Value stored under key, or None."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Store a value, expiring after ttl seconds if given."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a key."""
+
+    @abstractmethod
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Remove several keys; returns how many existed."""
+
+    @abstractmethod
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Values for several keys, None where missing."""
+
+    @abstractmethod
+    async def mset(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """Store several values with one ttl."""
+
+    @abstractmethod
+    async def incr(self, key: str, amount: Number = 1, ttl: Optional[int] = None) -> Number:
+        """Add to a counter and return its new value."""
+
+    @abstractmethod
+    async def incr_many(
+        self, increments: Dict[str, Number], ttl: Optional[int] = None
+    ) -> Dict[str, Number]:
+        """Add to several counters at once and return their new values."""
+
+    @abstractmethod
+    async def get_counters(self, keys: List[str]) -> List[Number]:
+        """Counter values, 0 where missing."""
+
+    @abstractmethod
+    async def keys(self, pattern: str = "*") -> List[str]:
+        """Keys matching a glob pattern."""
+
+    @abstractmethod
+    async def delete_pattern(self, pattern: str) -> int:
+        """Remove keys matching a glob pattern; returns how many."""
+
+    @abstractmethod
+    async def sadd(self, key: str, *members: str, ttl: Optional[int] = None) -> None:
+        """Add members to a set, extending its ttl if given."""
+
+    @abstractmethod
+    async def smembers(self, key: str) -> Set[str]:
+        """Members of a set."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every key."""
+
+    async def close(self) -> None:
+        """Release pooled connections."""
+
+
+class InMemoryAsyncCache(AsyncCacheBackend):
+    """
+    Async fake of the Redis backend over a SimpleCache.
+    Shares storage with the sync ``cache`` by default, so ``cache.clear()``
+    resets both in tests.
+    """
+
+    def __init__(self, store: Optional[SimpleCache] = None):
+        self._store = store if store is not None else cache
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._store.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self._store.set(key, value, ttl=ttl or None)
+
+    async def delete(self, key: str) -> None:
+        self._store.delete(key)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        return self._store.delete_many(keys)
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        return [self._store.get(k) for k in keys]
+
+    async def mset(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        for key, value in mapping.items():
+            self._store.set(key, value, ttl=ttl or None)
+
+    async def incr(self, key: str, amount: Number = 1, ttl: Optional[int] = None) -> Number:
+        return self._store.incr(key, amount, ttl=ttl or None)
+
+    async def incr_many(
+        self, increments: Dict[str, Number], ttl: Optional[int] = None
+    ) -> Dict[str, Number]:
+        return {k: self._store.incr(k, amount, ttl=ttl or None) for k, amount in increments.items()}
+
+    async def get_counters(self, keys: List[str]) -> List[Number]:
+        return [self._store.get(k) or 0 for k in keys]
+
+    async def keys(self, pattern: str = "*") -> List[str]:
+        return self._store.keys(pattern)
+
+    async def delete_pattern(self, pattern: str) -> int:
+        return self._store.delete_pattern(pattern)
+
+    async def sadd(self, key: str, *members: str, ttl: Optional[int] = None) -> None:
+        self._store.sadd(key, *members, ttl=ttl)
+
+    async def smembers(self, key: str) -> Set[str]:
+        return self._store.smembers(key)
+
+    async def clear(self) -> None:
+        self._store.clear()
+
+
+class RedisAsyncCache(AsyncCacheBackend):
+    """
+    Redis backend over a shared connection pool.
+    Batch operations (mget/mset/incr_many/delete_many) use one pipeline
+    round-trip instead of one per key.
+
+    Requires Redis 7 or newer: counter and set TTLs use ``EXPIRE`` with the
+    NX/GT options, which older servers reject.
+    """
+
+    SCAN_BATCH = 1000
+
+    def __init__(
+        self,
+        redis_url: str,
+        serializer: Optional[CacheSerializer] = None,
+        max_connections: int = 50,
+    ):
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis not available. Install with: pip install redis")
+
+        self.serializer = serializer or get_serializer("json")
+        self._pool = aioredis.ConnectionPool.from_url(redis_url, max_connections=max_connections)
+        self._client = aioredis.Redis(connection_pool=self._pool)
+
+    @property
+    def client(self):
+        """Underlying redis client, for callers that need raw commands."""
+        return self._client
+
+    def _loads(self, data: Optional[bytes]) -> Optional[Any]:
+        return None if data is None else self.serializer.loads(data)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._loads(await self._client.get(key))
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        await self._client.set(key, self.serializer.dumps(value), ex=ttl or None)
+
+    async def delete(self, key: str) -> None:
+        await self._client.unlink(key)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        return await self._client.unlink(*keys)
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys:
+            return []
+        return [self._loads(v) for v in await self._client.mget(keys)]
+
+    async def mset(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        if not mapping:
+            return
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, self.serializer.dumps(value), ex=ttl or None)
+            await pipe.execute()
+
+    async def incr(self, key: str, amount: Number = 1, ttl: Optional[int] = None) -> Number:
+        result = await self.incr_many({key: amount}, ttl=ttl)
+        return result[key]
+
+    async def incr_many(
+        self, increments: Dict[str, Number], ttl: Optional[int] = None
+    ) -> Dict[str, Number]:
+        """Apply several increments atomically in one MULTI/EXEC round-trip."""
+        if not increments:
+            return {}
+        async with self._client.pipeline(transaction=True) as pipe:
+            for key, amount in increments.items():
+                if isinstance(amount, float):
+                    pipe.incrbyfloat(key, amount)
+                else:
+                    pipe.incrby(key, amount)
+                if ttl:
+                    pipe.expire(key, ttl, nx=True)
+            results = await pipe.execute()
+
+        step = 2 if ttl else 1
+        return {key: _to_number(results[i * step]) for i, key in enumerate(increments.keys())}
+
+    async def get_counters(self, keys: List[str]) -> List[Number]:
+        if not keys:
+            return []
+        return [_to_number(v) if v is not None else 0 for v in await self._client.mget(keys)]
+
+    async def keys(self, pattern: str = "*") -> List[str]:
+        return [
+            k.decode() if isinstance(k, bytes) else k
+            async for k in self._client.scan_iter(match=pattern, count=self.SCAN_BATCH)
+        ]
+
+    async def delete_pattern(self, pattern: str) -> int:
+        deleted = 0
+        batch: List[str] = []
+        async for key in self._client.scan_iter(match=pattern, count=self.SCAN_BATCH):
+            batch.append(key)
+            if len(batch) >= self.SCAN_BATCH:
+                deleted += await self._client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await self._client.unlink(*batch)
+        return deleted
+
+    async def sadd(self, key: str, *members: str, ttl: Optional[int] = None) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.sadd(key, *members)
+            if ttl:
+                pipe.expire(key, ttl, gt=True)
+                pipe.expire(key, ttl, nx=True)
+            await pipe.execute()
+
+    async def smembers(self, key: str) -> Set[str]:
+        members = await self._client.smembers(key)
+        return {m.decode() if isinstance(m, bytes) else m for m in members}
+
+    async def clear(self) -> None:
+        await self._client.flushdb()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+        await self._pool.disconnect()
+
+
+def _to_number(raw: Any) -> Number:
+    """Parse a Redis counter reply (int, float or bytes) into a number."""
+    if isinstance(raw, (int, float)):
+        return raw
+    text = raw.decode() if isinstance(raw, bytes) else str(raw)
+    return float(text) if "." in text or "e" in text else int(text)
+
+
+def create_async_cache() -> AsyncCacheBackend:
+    """Build the L2 backend selected by ``settings.cache_backend``."""
+    if settings.cache_backend == "redis":
+        return RedisAsyncCache(
+            settings.redis_url,
+            serializer=get_serializer(settings.cache_serializer),
+            max_connections=settings.redis_max_connections,
+        )
+    return InMemoryAsyncCache()
+
+
 cache = SimpleCache()
+async_cache = create_async_cache()
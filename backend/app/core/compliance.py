@@ -2,17 +2,21 @@
 
 import json
 from datetime import datetime
-from io import BytesIO
-from typing import Any, Dict
+from itertools import islice
+from typing import Any, Dict, Iterator
 
 
 class ComplianceService:
     """Service for GDPR and compliance features."""
 
     @staticmethod
-    async def export_user_data(user_id: int, db_session) -> BytesIO:
-        """Export all user data for GDPR data portability."""
-        from app.models.audit import AuditLog
+    async def export_user_data(user_id: int, db_session) -> Iterator[bytes]:
+        """
+        Export all user data for GDPR data portability.
+
+        Returns the JSON document as a byte stream. Activity logs are encoded
+        in batches as the stream is consumed instead of into one buffer.
+        """
         from app.models.user import User
 
         user = db_session.query(User).filter(User.id == user_id).first()
@@ -33,38 +37,40 @@ class ComplianceService:
                 "oauth_provider": user.oauth_provider,
                 "is_verified": user.is_verified,
             },
-            "activity_logs": [],
-            "campaigns": [],
-            "leads": [],
         }
 
-        # Get audit logs
-        audit_logs = (
-            db_session.query(AuditLog)
-            .filter(AuditLog.user_id == user_id)
-            .order_by(AuditLog.timestamp.desc())
-            .limit(1000)
-            .all()
-        )
-
-        for log in audit_logs:
-            user_data["activity_logs"].append(
-                {
-                    "timestamp": log.timestamp.isoformat(),
-                    "action": log.action,
-                    "success": log.success,
-                    "ip_address": log.ip_address,
-                }
-            )
-
         # TODO: Add campaigns and leads data
 
-        # Convert to JSON
-        json_data = json.dumps(user_data, indent=2)
-        buffer = BytesIO(json_data.encode("utf-8"))
-        buffer.seek(0)
+        return ComplianceService._stream_user_data(user_id, user_data)
+
+    @staticmethod
+    def _stream_user_data(
+        user_id: int, user_data: Dict[str, Any], batch_size: int = 500
+    ) -> Iterator[bytes]:
+        from app.core.audit import audit_logs
+
+        # Open the document and its activity_logs array
+        yield (json.dumps(user_data, default=str)[:-1] + ', "activity_logs": [').encode("utf-8")
+
+        # Newest first; entries are appended in time order
+        logs = (log for log in reversed(audit_logs) if log.user_id == user_id)
+        first = True
+        while batch := list(islice(logs, batch_size)):
+            items = ",".join(
+                json.dumps(
+                    {
+                        "timestamp": log.timestamp.isoformat(),
+                        "action": log.action,
+                        "success": log.success,
+                        "ip_address": log.ip_address,
+                    }
+                )
+                for log in batch
+            )
+            yield (items if first else "," + items).encode("utf-8")
+            first = False
 
-        return buffer
+        yield b'], "campaigns": [], "leads": []}'
 
     @staticmethod
     async def delete_user_data(user_id: int, db_session) -> bool:
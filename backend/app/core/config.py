@@ -74,6 +74,23 @@ class Settings:
     # Redis
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     cache_ttl: int = 300
+    # "memory" keeps cache state in-process; "redis" uses redis_url
+    cache_backend: str = os.getenv("CACHE_BACKEND", "memory")
+    # json, orjson, msgpack (need the optional package) or pickle (trusted Redis only)
+    cache_serializer: str = os.getenv("CACHE_SERIALIZER", "json")
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+
+    # WebSocket fan-out: "memory" stays in-process; "redis" relays broadcasts between workers
+    broadcast_backend: str = os.getenv("BROADCAST_BACKEND", "memory")
+    websocket_send_queue_size: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+    # drop_oldest, drop_newest or disconnect
+    websocket_slow_consumer_policy: str = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+
+    # Outbound webhooks: "memory" keeps the delivery queue in-process; "database" makes it durable
+    webhook_queue_backend: str = os.getenv("WEBHOOK_QUEUE_BACKEND", "memory")
+
+    # Sequences: "memory" keeps the step schedule in-process; "database" shares it across workers
+    sequence_scheduler_backend: str = os.getenv("SEQUENCE_SCHEDULER_BACKEND", "memory")
 
     # JWT
     secret_key: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
@@ -148,6 +165,12 @@ class Settings:
     }
     # Cache TTL in seconds
     cache_ttl: int = int(os.getenv("CACHE_TTL", "300"))
+    # In-process L1 cache (see app.core.multi_tier_cache)
+    l1_cache_shards: int = int(os.getenv("L1_CACHE_SHARDS", "16"))
+    l1_cache_max_bytes: int = int(os.getenv("L1_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    l1_cache_max_entries: int = int(os.getenv("L1_CACHE_MAX_ENTRIES", "10000"))
+    # Memory-mapped lead vector indexes (see app.core.vector_index); empty keeps them in memory
+    vector_index_dir: str = os.getenv("VECTOR_INDEX_DIR", "")
     # Connection pool settings
     db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
     db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
@@ -3,7 +3,7 @@ from contextlib import asynccontextmanager, contextmanager
 from typing import AsyncIterator, Iterator
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlmodel import Session, SQLModel, create_engine, select
 
 from app.core.config import settings
@@ -30,6 +30,9 @@ if settings.database_url.startswith("sqlite"):
 
 engine = create_engine(settings.database_url, **_engine_kwargs)
 
+# Declarative base for the models not defined with SQLModel (e.g. webhooks)
+Base = declarative_base()
+
 # Async engine for future async operations
 if settings.database_url.startswith("sqlite"):
     async_db_url = settings.database_url.replace("sqlite:///", "sqlite+aiosqlite:///")
@@ -6,13 +6,22 @@ Ensures data consistency across microservices with compensation logic.
 import asyncio
 import json
 import logging
+import os
+import socket
 import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Awaitable, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
 
 from app.core.cache import cache
+from app.models.saga_journal import SagaJournalRecord, SagaLeaseRecord
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +63,8 @@ class SagaStep:
     attempts: int = 0
     max_retries: int = 3
     timeout: int = 30  # seconds
+    # Consecutive steps with the same group run concurrently
+    group: Optional[str] = None
 
     def __hash__(self):
         return hash(self.name)
@@ -93,26 +104,242 @@ class SagaExecution:
     error: Optional[str] = None
 
 
+@dataclass
+class SagaLogEntry:
+    """One journaled saga transition; ``data`` is already JSON-encoded"""
+
+    saga_id: str
+    kind: str  # started, step, status
+    status: str
+    step: Optional[str] = None
+    data: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+TERMINAL_STATUSES = (SagaStatus.COMPLETED, SagaStatus.COMPENSATED, SagaStatus.FAILED)
+
+
+class SagaJournalError(Exception):
+    """Saga progress could not be made durable"""
+
+
+class SagaLog(ABC):
+    """Durable, append-only journal of saga progress, with per-saga ownership leases"""
+
+    @abstractmethod
+    def append_batch(
+        self, entries: List[SagaLogEntry], owner: Optional[str] = None, lease_seconds: float = 0
+    ) -> None:
+        """
+        Write entries in one transaction. With an ``owner``, "started" entries
+        also lease their saga to it and terminal statuses release the lease.
+        """
+
+    @abstractmethod
+    def read_incomplete(self) -> Dict[str, List[SagaLogEntry]]:
+        """Entries of every saga without a terminal status, in append order"""
+
+    @abstractmethod
+    def claim(self, saga_id: str, owner: str, lease_seconds: float) -> bool:
+        """Take (or extend) the lease on a saga; False if another live owner holds it"""
+
+    @abstractmethod
+    def renew(self, saga_ids: List[str], owner: str, lease_seconds: float) -> None:
+        """Extend the leases ``owner`` holds on running sagas"""
+
+    @abstractmethod
+    def release(self, saga_id: str, owner: str) -> None:
+        """Give up the lease on a saga if ``owner`` holds it"""
+
+
+class SQLSagaLog(SagaLog):
+    """Saga journal in the ``saga_journal`` and ``saga_leases`` tables (migrations 007, 009)"""
+
+    def __init__(self, db_engine=None):
+        if db_engine is None:
+            from app.core.db import engine as db_engine
+        self.engine = db_engine
+
+    def _session(self) -> Session:
+        return Session(self.engine)
+
+    def append_batch(
+        self, entries: List[SagaLogEntry], owner: Optional[str] = None, lease_seconds: float = 0
+    ) -> None:
+        with self._session() as session:
+            session.execute(
+                insert(SagaJournalRecord.__table__),
+                [
+                    {
+                        "saga_id": e.saga_id,
+                        "kind": e.kind,
+                        "status": e.status,
+                        "step": e.step,
+                        "data": e.data,
+                        "created_at": e.created_at,
+                    }
+                    for e in entries
+                ],
+            )
+            if owner is not None:
+                expires_at = datetime.utcnow() + timedelta(seconds=lease_seconds)
+                started = [e.saga_id for e in entries if e.kind == "started"]
+                if started:
+                    session.execute(
+                        insert(SagaLeaseRecord.__table__),
+                        [
+                            {"saga_id": saga_id, "owner": owner, "expires_at": expires_at}
+                            for saga_id in started
+                        ],
+                    )
+                terminal = {s.value for s in TERMINAL_STATUSES}
+                finished = [
+                    e.saga_id for e in entries if e.kind == "status" and e.status in terminal
+                ]
+                if finished:
+                    session.execute(
+                        delete(SagaLeaseRecord).where(
+                            SagaLeaseRecord.saga_id.in_(finished), SagaLeaseRecord.owner == owner
+                        )
+                    )
+            session.commit()
+
+    def read_incomplete(self) -> Dict[str, List[SagaLogEntry]]:
+        finished = select(SagaJournalRecord.saga_id).where(
+            SagaJournalRecord.kind == "status",
+            SagaJournalRecord.status.in_([s.value for s in TERMINAL_STATUSES]),
+        )
+        with self._session() as session:
+            records = session.exec(
+                select(SagaJournalRecord)
+                .where(SagaJournalRecord.saga_id.not_in(finished))
+                .order_by(SagaJournalRecord.id)
+            ).all()
+
+        sagas: Dict[str, List[SagaLogEntry]] = {}
+        for r in records:
+            sagas.setdefault(r.saga_id, []).append(
+                SagaLogEntry(r.saga_id, r.kind, r.status, r.step, r.data, r.created_at)
+            )
+        return sagas
+
+    def claim(self, saga_id: str, owner: str, lease_seconds: float) -> bool:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=lease_seconds)
+        with self._session() as session:
+            taken = session.execute(
+                update(SagaLeaseRecord)
+                .where(
+                    SagaLeaseRecord.saga_id == saga_id,
+                    or_(SagaLeaseRecord.owner == owner, SagaLeaseRecord.expires_at <= now),
+                )
+                .values(owner=owner, expires_at=expires_at)
+            )
+            if taken.rowcount == 0:
+                if session.get(SagaLeaseRecord, saga_id) is not None:
+                    return False
+                session.add(SagaLeaseRecord(saga_id=saga_id, owner=owner, expires_at=expires_at))
+            try:
+                session.commit()
+            except IntegrityError:
+                return False  # Claimed concurrently
+            return True
+
+    def renew(self, saga_ids: List[str], owner: str, lease_seconds: float) -> None:
+        with self._session() as session:
+            session.execute(
+                update(SagaLeaseRecord)
+                .where(SagaLeaseRecord.saga_id.in_(saga_ids), SagaLeaseRecord.owner == owner)
+                .values(expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+            )
+            session.commit()
+
+    def release(self, saga_id: str, owner: str) -> None:
+        with self._session() as session:
+            session.execute(
+                delete(SagaLeaseRecord).where(
+                    SagaLeaseRecord.saga_id == saga_id, SagaLeaseRecord.owner == owner
+                )
+            )
+            session.commit()
+
+
+def _stages(steps: List[SagaStep]) -> List[List[SagaStep]]:
+    """Split steps into stages; consecutive steps sharing a ``group`` run together"""
+    stages: List[List[SagaStep]] = []
+    for step in steps:
+        if stages and step.group is not None and stages[-1][-1].group == step.group:
+            stages[-1].append(step)
+        else:
+            stages.append([step])
+    return stages
+
+
 class SagaOrchestrator:
     """
     Orchestrates saga execution with compensation.
     Implements choreography-based saga pattern.
+
+    Every step completion, failure and compensation is journaled to ``log``
+    before the saga moves on, so a saga interrupted by a restart is picked
+    up by resume(): it continues forward from the first unfinished step, or
+    finishes compensating. Steps may therefore run more than once and
+    should be idempotent. Sagas are rebuilt from the step builders passed
+    to register(), keyed by ``saga_type``.
+
+    A saga is leased to the orchestrator running it, and the lease is
+    renewed while it runs, so resume() on another worker skips sagas that
+    are still alive elsewhere. If the journal cannot be written even after
+    retries, the saga stops where it is and is left for resume(); a
+    journal outage never triggers compensation of work that succeeded.
+
+    Journal writes from concurrent sagas share one commit. Finished
+    executions are kept for lookup up to ``max_finished``, oldest evicted first.
     """
 
-    def __init__(self):
+    # Attempts per journal write, with exponential backoff from the delay
+    JOURNAL_RETRIES = 3
+    JOURNAL_RETRY_DELAY = 0.2
+
+    def __init__(
+        self,
+        log: Optional[SagaLog] = None,
+        max_finished: int = 10_000,
+        lease_seconds: float = 300.0,
+    ):
+        self.log = log
+        self.max_finished = max_finished
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # In-progress and compensating sagas
         self.executions: Dict[str, SagaExecution] = {}
+        self._finished: "OrderedDict[str, SagaExecution]" = OrderedDict()
+        self._definitions: Dict[str, Callable[[Dict[str, Any]], List[SagaStep]]] = {}
+
+        self._pending_entries: List[SagaLogEntry] = []
+        self._pending_commit: Optional[asyncio.Future] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._resumed: Set[asyncio.Task] = set()
+
+    def register(
+        self, saga_type: str, build_steps: Callable[[Dict[str, Any]], List[SagaStep]]
+    ) -> None:
+        """Make sagas of ``saga_type`` resumable; ``build_steps`` gets the initial data"""
+        self._definitions[saga_type] = build_steps
 
     async def execute_saga(
         self,
         saga_name: str,
         steps: List[SagaStep],
         initial_data: Optional[Dict[str, Any]] = None,
+        saga_type: Optional[str] = None,
     ) -> SagaExecution:
         """
         Execute saga with automatic compensation on failure.
 
         Flow:
-        1. Execute each step sequentially
+        1. Execute each stage in order; steps in a parallel group run concurrently
         2. If any step fails, run compensation for completed steps in reverse
         3. Return execution record
         """
@@ -129,33 +356,102 @@ class SagaOrchestrator:
         )
 
         self.executions[saga_id] = execution
+        self._keep_leases()
+        await self._journal(
+            saga_id,
+            "started",
+            SagaStatus.IN_PROGRESS,
+            data={
+                "saga_name": saga_name,
+                "saga_type": saga_type,
+                "initial_data": context.data,
+                "started_at": execution.started_at,
+            },
+        )
 
-        try:
-            # Execute forward steps
-            for step in steps:
-                await self._execute_step(step, context)
-                context.steps_completed.append(step.name)
-
-            # All steps succeeded
-            execution.status = SagaStatus.COMPLETED
-            execution.completed_at = datetime.now()
+        return await self._run(execution)
 
-            logger.info(f"Saga {saga_id} completed successfully")
+    async def _run(self, execution: SagaExecution) -> SagaExecution:
+        saga_id = execution.saga_id
+        context = execution.context
 
-        except Exception as e:
-            logger.error(f"Saga {saga_id} failed: {e}")
-            execution.status = SagaStatus.FAILED
+        try:
+            if execution.status == SagaStatus.IN_PROGRESS:
+                try:
+                    # Execute forward stages
+                    for stage in _stages(execution.steps):
+                        pending = [s for s in stage if s.status != StepStatus.COMPLETED]
+                        results = await asyncio.gather(
+                            *(self._run_step(step, context) for step in pending),
+                            return_exceptions=True,
+                        )
+                        errors = [r for r in results if isinstance(r, BaseException)]
+                        if errors:
+                            journal_errors = [e for e in errors if isinstance(e, SagaJournalError)]
+                            raise (journal_errors or errors)[0]
+
+                    # All steps succeeded
+                    execution.status = SagaStatus.COMPLETED
+                    execution.completed_at = datetime.now()
+                    await self._journal(saga_id, "status", execution.status)
+
+                    logger.info(f"Saga {saga_id} completed successfully")
+
+                except SagaJournalError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Saga {saga_id} failed: {e}")
+                    execution.status = SagaStatus.COMPENSATING
+                    execution.error = str(e)
+                    await self._journal(saga_id, "status", execution.status, data={"error": str(e)})
+
+            if execution.status == SagaStatus.COMPENSATING:
+                # Run compensation
+                await self._compensate(execution.steps, context)
+                execution.status = SagaStatus.COMPENSATED
+                execution.completed_at = datetime.now()
+                await self._journal(saga_id, "status", execution.status)
+
+        except SagaJournalError as e:
+            # Progress the journal does not show is redone by resume(); nothing is undone
+            logger.error(f"Saga {saga_id} stopped, journal unavailable ({e}); left for resume()")
             execution.error = str(e)
+            self.executions.pop(saga_id, None)
+            await self._release(saga_id)
+            return execution
 
-            # Run compensation
-            await self._compensate(steps, context)
-            execution.status = SagaStatus.COMPENSATED
+        # The terminal status entry released the lease
+        self._retire(execution)
 
         # Persist execution log
         await self._persist_execution(execution)
 
         return execution
 
+    async def _run_step(self, step: SagaStep, context: SagaContext) -> None:
+        saga_id = context.saga_id
+        try:
+            await self._execute_step(step, context)
+        except Exception:
+            await self._journal(saga_id, "step", step.status, step.name, {"error": step.error})
+            raise
+
+        context.steps_completed.append(step.name)
+        await self._journal(
+            saga_id,
+            "step",
+            step.status,
+            step.name,
+            {"result": step.result, "attempts": step.attempts, "context": context.data},
+        )
+
+    def _retire(self, execution: SagaExecution) -> None:
+        """Move a finished saga out of the active set, evicting the oldest finished"""
+        self.executions.pop(execution.saga_id, None)
+        self._finished[execution.saga_id] = execution
+        while len(self._finished) > self.max_finished:
+            self._finished.popitem(last=False)
+
     async def _execute_step(self, step: SagaStep, context: SagaContext) -> None:
         """Execute single step with retry logic"""
         step.status = StepStatus.EXECUTING
@@ -196,25 +492,229 @@ class SagaOrchestrator:
     async def _compensate(self, steps: List[SagaStep], context: SagaContext) -> None:
         """
         Run compensation logic for completed steps in reverse order.
+        Steps of a parallel group are compensated together.
         Best-effort: continues even if compensation fails.
         """
         logger.info(f"Starting compensation for saga {context.saga_id}")
 
         # Reverse order
-        completed_steps = [s for s in steps if s.status == StepStatus.COMPLETED]
+        for stage in reversed(_stages(steps)):
+            completed_steps = [s for s in stage if s.status == StepStatus.COMPLETED]
+            await asyncio.gather(
+                *(self._compensate_step(step, context) for step in completed_steps)
+            )
 
-        for step in reversed(completed_steps):
-            step.status = StepStatus.COMPENSATING
+    async def _compensate_step(self, step: SagaStep, context: SagaContext) -> None:
+        step.status = StepStatus.COMPENSATING
 
-            try:
-                await asyncio.wait_for(step.compensation(context), timeout=step.timeout)
+        try:
+            await asyncio.wait_for(step.compensation(context), timeout=step.timeout)
+
+            step.status = StepStatus.COMPENSATED
+            logger.info(f"Compensated step '{step.name}'")
+
+        except Exception as e:
+            logger.error(f"Compensation failed for '{step.name}': {e}")
+            # Continue with other compensations; not retried on resume
+            step.status = StepStatus.FAILED
+            step.error = str(e)
+
+        await self._journal(context.saga_id, "step", step.status, step.name, {"error": step.error})
 
-                step.status = StepStatus.COMPENSATED
-                logger.info(f"Compensated step '{step.name}'")
+    async def _journal(
+        self,
+        saga_id: str,
+        kind: str,
+        status: str,
+        step: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Append to the journal and wait until it is durable"""
+        if self.log is None:
+            return
+        entry = SagaLogEntry(
+            saga_id=saga_id,
+            kind=kind,
+            status=str(getattr(status, "value", status)),
+            step=step,
+            data=json.dumps(data, default=str) if data is not None else None,
+        )
 
+        loop = asyncio.get_running_loop()
+        if self._pending_commit is None or self._pending_commit.get_loop() is not loop:
+            self._pending_commit = loop.create_future()
+            self._pending_entries = []
+        self._pending_entries.append(entry)
+        commit = self._pending_commit
+
+        if self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            self._flusher = asyncio.create_task(self._flush_pending())
+        await asyncio.shield(commit)
+
+    async def _flush_pending(self) -> None:
+        # Let concurrent sagas join this batch
+        await asyncio.sleep(0)
+
+        while self._pending_commit is not None:
+            entries, self._pending_entries = self._pending_entries, []
+            commit, self._pending_commit = self._pending_commit, None
+
+            error = None
+            for attempt in range(self.JOURNAL_RETRIES):
+                try:
+                    await asyncio.to_thread(
+                        self.log.append_batch, entries, self.owner, self.lease_seconds
+                    )
+                except Exception as e:
+                    error = e
+                    if attempt + 1 < self.JOURNAL_RETRIES:
+                        await asyncio.sleep(self.JOURNAL_RETRY_DELAY * 2**attempt)
+                else:
+                    error = None
+                    break
+
+            if error is not None:
+                logger.error(f"Failed to journal {len(entries)} saga entries: {error}")
+                commit.set_exception(SagaJournalError(str(error)))
+            else:
+                commit.set_result(None)
+
+    async def flush(self) -> None:
+        """Wait until every journal entry has been written"""
+        if self._flusher is not None and not self._flusher.done():
+            if self._flusher.get_loop() is asyncio.get_running_loop():
+                await asyncio.shield(self._flusher)
+
+    async def stop(self) -> None:
+        """Flush the journal and release this worker's leases so others can resume its sagas"""
+        await self.flush()
+        if self._heartbeat is not None and self._heartbeat.get_loop() is asyncio.get_running_loop():
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        for saga_id in list(self.executions):
+            await self._release(saga_id)
+
+    def _keep_leases(self) -> None:
+        """Make sure leases on this worker's sagas are being renewed"""
+        if self.log is None:
+            return
+        loop = asyncio.get_running_loop()
+        if (
+            self._heartbeat is None
+            or self._heartbeat.done()
+            or self._heartbeat.get_loop() is not loop
+        ):
+            self._heartbeat = asyncio.create_task(self._renew_leases())
+
+    async def _release(self, saga_id: str) -> None:
+        if self.log is None:
+            return
+        try:
+            await asyncio.to_thread(self.log.release, saga_id, self.owner)
+        except Exception as e:
+            # The lease expires on its own
+            logger.error(f"Failed to release saga {saga_id}: {e}")
+
+    async def _renew_leases(self) -> None:
+        """Keep leases on running sagas alive; exits once none are running"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self.executions:
+                return
+            try:
+                await asyncio.to_thread(
+                    self.log.renew, list(self.executions), self.owner, self.lease_seconds
+                )
             except Exception as e:
-                logger.error(f"Compensation failed for '{step.name}': {e}")
-                # Continue with other compensations
+                logger.error(f"Failed to renew saga leases: {e}")
+
+    async def resume(self) -> int:
+        """
+        Restart sagas left unfinished in the journal (e.g. by a crash).
+        Sagas still leased to a live worker are skipped. They run in the
+        background; returns how many were resumed.
+        """
+        if self.log is None:
+            return 0
+        incomplete = await asyncio.to_thread(self.log.read_incomplete)
+
+        claimed = []
+        for saga_id, entries in incomplete.items():
+            if saga_id in self.executions:
+                continue
+            execution = self._restore(saga_id, entries)
+            if execution is None:
+                continue
+            try:
+                if await asyncio.to_thread(self.log.claim, saga_id, self.owner, self.lease_seconds):
+                    claimed.append(execution)
+            except Exception as e:
+                logger.error(f"Failed to claim saga {saga_id}: {e}")
+
+        # Sagas not claimed are still running on another worker
+        for execution in claimed:
+            self.executions[execution.saga_id] = execution
+            task = asyncio.create_task(self._run(execution))
+            self._resumed.add(task)
+            task.add_done_callback(self._resumed.discard)
+        if claimed:
+            self._keep_leases()
+
+        resumed = len(claimed)
+        if resumed:
+            logger.info(f"Resumed {resumed} interrupted sagas")
+        return resumed
+
+    def _restore(self, saga_id: str, entries: List[SagaLogEntry]) -> Optional[SagaExecution]:
+        """Rebuild an execution from its journal entries"""
+        started = entries[0]
+        if started.kind != "started":
+            logger.warning(f"Saga {saga_id} journal has no start entry, skipping")
+            return None
+        header = json.loads(started.data)
+        build_steps = self._definitions.get(header.get("saga_type"))
+        if build_steps is None:
+            logger.warning(
+                f"Saga {saga_id} ({header['saga_name']}) has no registered type, cannot resume"
+            )
+            return None
+
+        initial_data = header["initial_data"]
+        steps = build_steps(dict(initial_data))
+        by_name = {step.name: step for step in steps}
+        context = SagaContext(saga_id=saga_id, data=dict(initial_data))
+        execution = SagaExecution(
+            saga_id=saga_id,
+            saga_name=header["saga_name"],
+            status=SagaStatus.IN_PROGRESS,
+            started_at=datetime.fromisoformat(header["started_at"]),
+            steps=steps,
+            context=context,
+        )
+
+        for entry in entries[1:]:
+            data = json.loads(entry.data) if entry.data else {}
+            if entry.kind == "status":
+                execution.status = SagaStatus(entry.status)
+                execution.error = data.get("error", execution.error)
+                continue
+            step = by_name.get(entry.step)
+            if step is None:
+                continue
+            step.status = StepStatus(entry.status)
+            step.error = data.get("error")
+            if step.status == StepStatus.COMPLETED:
+                step.result = data.get("result")
+                step.attempts = data.get("attempts", 0)
+                context.data = data.get("context", context.data)
+                context.steps_completed.append(step.name)
+
+        # A step failure was journaled but the saga stopped before compensating
+        if execution.status == SagaStatus.IN_PROGRESS and any(
+            step.status == StepStatus.FAILED for step in steps
+        ):
+            execution.status = SagaStatus.COMPENSATING
+        return execution
 
     async def _persist_execution(self, execution: SagaExecution) -> None:
         """Persist saga execution log"""
@@ -242,8 +742,8 @@ class SagaOrchestrator:
         cache.set(f"saga_execution:{execution.saga_id}", json.dumps(log_entry), ttl=604800)
 
     def get_execution(self, saga_id: str) -> Optional[SagaExecution]:
-        """Retrieve saga execution by ID"""
-        return self.executions.get(saga_id)
+        """Retrieve saga execution by ID (finished ones until evicted)"""
+        return self.executions.get(saga_id) or self._finished.get(saga_id)
 
     def list_active_sagas(self) -> List[SagaExecution]:
         """List all in-progress sagas"""
@@ -253,26 +753,35 @@ class SagaOrchestrator:
             if exec.status in [SagaStatus.IN_PROGRESS, SagaStatus.COMPENSATING]
         ]
 
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "active": len(self.executions),
+            "finished_retained": len(self._finished),
+            "pending_journal_entries": len(self._pending_entries),
+        }
+
 
 # Global orchestrator
-saga_orchestrator = SagaOrchestrator()
+saga_orchestrator = SagaOrchestrator(log=SQLSagaLog())
 
 
 # Example: Multi-step campaign launch saga
 
 
-async def launch_campaign_saga(campaign_id: int, lead_ids: List[int]) -> SagaExecution:
+def build_launch_campaign_steps(data: Dict[str, Any]) -> List[SagaStep]:
     """
     Example saga: Launch campaign with multiple coordinated steps.
 
     Steps:
     1. Reserve credits (billing service)
-    2. Enqueue emails (email service)
+    2. Enqueue emails (email service) and create analytics records
+       (analytics service), concurrently
     3. Update campaign status (campaign service)
-    4. Create analytics records (analytics service)
 
     If any step fails, compensate (rollback) previous steps.
     """
+    campaign_id = data["campaign_id"]
+    lead_ids = data["lead_ids"]
 
     # Step 1: Reserve credits
     async def reserve_credits(ctx: SagaContext) -> Dict[str, Any]:
@@ -348,7 +857,7 @@ async def launch_campaign_saga(campaign_id: int, lead_ids: List[int]) -> SagaExe
         await asyncio.sleep(0.1)
 
     # Define saga steps
-    steps = [
+    return [
         SagaStep(
             name="reserve_credits",
             action=reserve_credits,
@@ -360,26 +869,34 @@ async def launch_campaign_saga(campaign_id: int, lead_ids: List[int]) -> SagaExe
             action=enqueue_emails,
             compensation=compensate_emails,
             max_retries=3,
-        ),
-        SagaStep(
-            name="update_campaign_status",
-            action=update_campaign_status,
-            compensation=compensate_campaign_status,
-            max_retries=2,
+            group="fan_out",
         ),
         SagaStep(
             name="create_analytics",
             action=create_analytics,
             compensation=compensate_analytics,
             max_retries=2,
+            group="fan_out",
+        ),
+        SagaStep(
+            name="update_campaign_status",
+            action=update_campaign_status,
+            compensation=compensate_campaign_status,
+            max_retries=2,
         ),
     ]
 
+
+async def launch_campaign_saga(campaign_id: int, lead_ids: List[int]) -> SagaExecution:
+    """Launch a campaign; see build_launch_campaign_steps"""
+    initial_data = {"campaign_id": campaign_id, "lead_ids": lead_ids}
+
     # Execute saga
     execution = await saga_orchestrator.execute_saga(
         saga_name=f"launch_campaign_{campaign_id}",
-        steps=steps,
-        initial_data={"campaign_id": campaign_id, "lead_ids": lead_ids},
+        steps=build_launch_campaign_steps(initial_data),
+        initial_data=initial_data,
+        saga_type="launch_campaign",
     )
 
     return execution
@@ -388,7 +905,7 @@ async def launch_campaign_saga(campaign_id: int, lead_ids: List[int]) -> SagaExe
 # Example: User onboarding saga
 
 
-async def onboard_user_saga(user_data: Dict[str, Any]) -> SagaExecution:
+def build_onboard_user_steps(user_data: Dict[str, Any]) -> List[SagaStep]:
     """
     Multi-step user onboarding:
     1. Create user account
@@ -461,7 +978,7 @@ async def onboard_user_saga(user_data: Dict[str, Any]) -> SagaExecution:
         logger.info(f"Revoking {credits} credits from user {user_id}")
         await asyncio.sleep(0.1)
 
-    steps = [
+    return [
         SagaStep(
             name="create_user_account",
             action=create_user_account,
@@ -484,6 +1001,16 @@ async def onboard_user_saga(user_data: Dict[str, Any]) -> SagaExecution:
         ),
     ]
 
+
+async def onboard_user_saga(user_data: Dict[str, Any]) -> SagaExecution:
+    """Onboard a new user; see build_onboard_user_steps"""
     return await saga_orchestrator.execute_saga(
-        saga_name="onboard_user", steps=steps, initial_data=user_data
+        saga_name="onboard_user",
+        steps=build_onboard_user_steps(user_data),
+        initial_data=user_data,
+        saga_type="onboard_user",
     )
+
+
+saga_orchestrator.register("launch_campaign", build_launch_campaign_steps)
+saga_orchestrator.register("onboard_user", build_onboard_user_steps)
@@ -4,16 +4,25 @@ Immutable event log with event replay capabilities and optimized read models.
 """
 
 import asyncio
+import json
 import logging
+from abc import ABC, abstractmethod
+from bisect import bisect_right
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from app.core.cache import cache
-from app.core.db import get_session
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.core.metrics import projection_lag_events
+from app.core.stream_processing import BackpressureBuffer
+from app.models.event_store import CheckpointRecord, EventRecord, SnapshotRecord
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +71,9 @@ class DomainEvent:
     data: Dict[str, Any]
     metadata: Dict[str, Any] = field(default_factory=dict)
     version: int = 1
+    # Assigned by the EventStore on append
+    sequence: int = 0  # 1-based position within the aggregate's stream
+    position: int = 0  # 1-based global position in the log
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize event"""
@@ -75,6 +87,8 @@ class DomainEvent:
             "data": self.data,
             "metadata": self.metadata,
             "version": self.version,
+            "sequence": self.sequence,
+            "position": self.position,
         }
 
     @classmethod
@@ -90,52 +104,578 @@ class DomainEvent:
             data=data.get("data", {}),
             metadata=data.get("metadata", {}),
             version=data.get("version", 1),
+            sequence=data.get("sequence", 0),
+            position=data.get("position", 0),
         )
 
 
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def _history_entry(event: DomainEvent) -> Dict[str, Any]:
+    return {
+        "event": event.event_type.value,
+        "timestamp": event.timestamp.isoformat(),
+        "data": event.data,
+    }
+
+
+@dataclass
+class AggregateSnapshot:
+    """Aggregate state after applying its first ``sequence`` events"""
+
+    aggregate_type: str
+    aggregate_id: str
+    sequence: int
+    max_timestamp: datetime  # latest event timestamp covered
+    state: Dict[str, Any]
+
+
+class EventLog(ABC):
+    """
+    Durable backing store for EventStore.
+    Writes are batched by the store; reads are only used to hydrate it.
+    """
+
+    @abstractmethod
+    def append_batch(
+        self,
+        events: List[DomainEvent],
+        snapshots: List[AggregateSnapshot],
+        after_position: int = 0,
+    ) -> List[DomainEvent]:
+        """
+        Persist ``events`` in one transaction, assigning their ``position``
+        and ``sequence`` there so several writers can share the log.
+        Returns the events other writers committed after ``after_position``
+        and before this batch.
+        """
+
+    @abstractmethod
+    def read(self, after_position: int = 0, limit: int = 10_000) -> List[DomainEvent]:
+        """Up to ``limit`` events after ``after_position``, in position order"""
+
+    @abstractmethod
+    def read_snapshots(self) -> List[AggregateSnapshot]:
+        """Every stored snapshot, in sequence order per aggregate"""
+
+    @abstractmethod
+    def save_checkpoint(
+        self, name: str, position: int, state: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record how far the projection ``name`` has read, with its state"""
+
+    @abstractmethod
+    def load_checkpoint(self, name: str) -> Optional[Tuple[int, Optional[Dict[str, Any]]]]:
+        """(position, state) saved for ``name``, or None"""
+
+
+class SQLEventLog(EventLog):
+    """
+    Event log in the ``domain_events``/``aggregate_snapshots`` tables
+
+    Checkpoints go to ``event_checkpoints``. All three tables are created by
+    migrations (002-004), not by this class.
+    """
+
+    APPEND_RETRIES = 5
+
+    def __init__(self, db_engine=None):
+        self.engine = db_engine if db_engine is not None else engine
+
+    def append_batch(
+        self,
+        events: List[DomainEvent],
+        snapshots: List[AggregateSnapshot],
+        after_position: int = 0,
+    ) -> List[DomainEvent]:
+        for attempt in range(1, self.APPEND_RETRIES + 1):
+            try:
+                return self._append_batch(events, snapshots, after_position)
+            except IntegrityError:
+                # Another writer took the same position or snapshot; recompute
+                if attempt == self.APPEND_RETRIES:
+                    raise
+
+    def _append_batch(
+        self,
+        events: List[DomainEvent],
+        snapshots: List[AggregateSnapshot],
+        after_position: int,
+    ) -> List[DomainEvent]:
+        with Session(self.engine) as session:
+            head = session.exec(select(func.max(EventRecord.position))).one() or 0
+            missed = self._read(session, after_position, head - after_position) if events else []
+
+            sequences: Dict[Tuple[str, str], int] = {}
+            for offset, e in enumerate(events, start=1):
+                key = (e.aggregate_type, e.aggregate_id)
+                if key not in sequences:
+                    sequences[key] = (
+                        session.exec(
+                            select(func.max(EventRecord.sequence)).where(
+                                EventRecord.aggregate_type == e.aggregate_type,
+                                EventRecord.aggregate_id == e.aggregate_id,
+                            )
+                        ).one()
+                        or 0
+                    )
+                sequences[key] += 1
+                e.sequence = sequences[key]
+                e.position = head + offset
+
+            if events:
+                session.execute(
+                    insert(EventRecord.__table__),
+                    [
+                        {
+                            "position": e.position,
+                            "event_id": e.event_id,
+                            "event_type": e.event_type.value,
+                            "aggregate_type": e.aggregate_type,
+                            "aggregate_id": e.aggregate_id,
+                            "sequence": e.sequence,
+                            "timestamp": e.timestamp,
+                            "user_id": e.user_id,
+                            "data": json.dumps(e.data, default=str),
+                            "event_metadata": json.dumps(e.metadata, default=str),
+                            "version": e.version,
+                        }
+                        for e in events
+                    ],
+                )
+
+            # Every process snapshots the same sequences; keep the first copy
+            snapshots = [
+                s
+                for s in snapshots
+                if session.get(SnapshotRecord, (s.aggregate_type, s.aggregate_id, s.sequence))
+                is None
+            ]
+            if snapshots:
+                session.execute(
+                    insert(SnapshotRecord.__table__),
+                    [
+                        {
+                            "aggregate_type": s.aggregate_type,
+                            "aggregate_id": s.aggregate_id,
+                            "sequence": s.sequence,
+                            "max_timestamp": s.max_timestamp,
+                            "state": json.dumps(s.state, default=_json_default),
+                            "created_at": datetime.utcnow(),
+                        }
+                        for s in snapshots
+                    ],
+                )
+            session.commit()
+            return missed
+
+    def read(self, after_position: int = 0, limit: int = 10_000) -> List[DomainEvent]:
+        with Session(self.engine) as session:
+            return self._read(session, after_position, limit)
+
+    @staticmethod
+    def _read(session: Session, after_position: int, limit: int) -> List[DomainEvent]:
+        if limit <= 0:
+            return []
+        rows = session.exec(
+            select(EventRecord)
+            .where(EventRecord.position > after_position)
+            .order_by(EventRecord.position)
+            .limit(limit)
+        ).all()
+        return [
+            DomainEvent(
+                event_id=row.event_id,
+                event_type=EventType(row.event_type),
+                aggregate_id=row.aggregate_id,
+                aggregate_type=row.aggregate_type,
+                timestamp=row.timestamp,
+                user_id=row.user_id,
+                data=json.loads(row.data),
+                metadata=json.loads(row.event_metadata or "{}"),
+                version=row.version,
+                sequence=row.sequence,
+                position=row.position,
+            )
+            for row in rows
+        ]
+
+    def read_snapshots(self) -> List[AggregateSnapshot]:
+        with Session(self.engine) as session:
+            rows = session.exec(
+                select(SnapshotRecord).order_by(
+                    SnapshotRecord.aggregate_type,
+                    SnapshotRecord.aggregate_id,
+                    SnapshotRecord.sequence,
+                )
+            ).all()
+            return [
+                AggregateSnapshot(
+                    aggregate_type=row.aggregate_type,
+                    aggregate_id=row.aggregate_id,
+                    sequence=row.sequence,
+                    max_timestamp=row.max_timestamp,
+                    state=json.loads(row.state, object_hook=_json_object_hook),
+                )
+                for row in rows
+            ]
+
+    def save_checkpoint(
+        self, name: str, position: int, state: Optional[Dict[str, Any]] = None
+    ) -> None:
+        with Session(self.engine) as session:
+            session.merge(
+                CheckpointRecord(
+                    name=name,
+                    position=position,
+                    state=json.dumps(state, default=_json_default) if state is not None else None,
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            session.commit()
+
+    def load_checkpoint(self, name: str) -> Optional[Tuple[int, Optional[Dict[str, Any]]]]:
+        with Session(self.engine) as session:
+            record = session.get(CheckpointRecord, name)
+            if record is None:
+                return None
+            state = (
+                json.loads(record.state, object_hook=_json_object_hook) if record.state else None
+            )
+            return record.position, state
+
+
+def _is_live(task: Optional[asyncio.Task]) -> bool:
+    """Task is still running on the current loop (the app may be restarted on a new one)"""
+    return task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop()
+
+
+class _Signal:
+    """Wake every waiter on notify(); waiters re-check their condition"""
+
+    def __init__(self):
+        self._event: Optional[asyncio.Event] = None
+        self._loop = None
+
+    def notify(self) -> None:
+        if self._event is not None:
+            self._event.set()
+            self._event = None
+
+    async def wait(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._event is None or self._loop is not loop:
+            self._event = asyncio.Event()
+            self._loop = loop
+        await self._event.wait()
+
+
+class Subscription:
+    """
+    Live, resumable tail of the event log.
+
+    A pump task copies committed events after ``position`` into a bounded
+    BackpressureBuffer; the consumer iterates the subscription and calls
+    ack() to checkpoint its progress. A slow consumer only fills its own
+    buffer ("block" pauses its pump, "drop_oldest"/"drop_newest" shed load)
+    and never delays appends.
+    """
+
+    def __init__(
+        self,
+        store: "EventStore",
+        name: Optional[str] = None,
+        event_types: Optional[List[EventType]] = None,
+        position: int = 0,
+        max_buffer: int = 1000,
+        strategy: str = "block",
+    ):
+        self.store = store
+        self.name = name
+        self.event_types = set(event_types) if event_types else None
+        self.position = position  # last position handed to the buffer
+        self.delivered_position = position  # last position yielded to the consumer
+        self.acked_position = position
+        self.buffer = BackpressureBuffer(max_size=max_buffer, strategy=strategy)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> "Subscription":
+        if self._task is None:
+            self._task = asyncio.create_task(self._pump())
+        return self
+
+    async def _pump(self) -> None:
+        store = self.store
+        while True:
+            while self.position < store.committed_position:
+                event = store.events[self.position]
+                self.position += 1
+                if self.event_types is None or event.event_type in self.event_types:
+                    await self.buffer.put(event)
+                if self.position % 1000 == 0:
+                    # Don't starve the loop while catching up on a long backlog
+                    await asyncio.sleep(0)
+            await store._committed.wait()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> DomainEvent:
+        event = await self.buffer.get_wait()
+        self.delivered_position = event.position
+        return event
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[DomainEvent]:
+        """Next event, or None if none arrives within ``timeout``"""
+        event = await self.buffer.get_wait(timeout)
+        if event is not None:
+            self.delivered_position = event.position
+        return event
+
+    async def ack(self, position: Optional[int] = None) -> None:
+        """Checkpoint progress (defaults to the last delivered event)"""
+        self.acked_position = self.delivered_position if position is None else position
+        if self.name:
+            await self.store.save_checkpoint(self.name, self.acked_position)
+
+    async def close(self) -> None:
+        if _is_live(self._task):
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "position": self.position,
+            "acked_position": self.acked_position,
+            "lag": self.store.committed_position - self.acked_position,
+            "buffer": self.buffer.get_stats(),
+        }
+
+
 class EventStore:
     """
     Immutable event store - append-only log of all domain events.
     Provides event replay, temporal queries, and stream processing.
+
+    Events are indexed in memory by aggregate and by type, so reads cost
+    O(events of that aggregate/type) rather than O(all events). Every
+    ``snapshot_interval`` events an aggregate's state is snapshotted and
+    replays start from the nearest snapshot. With a ``log`` configured,
+    appends are group-committed: concurrent appenders share one transaction,
+    in which the log numbers the events so several processes can share it.
+
+    Readers only see committed events: live subscriptions and the handlers
+    registered with subscribe() are fed from the log by background tasks,
+    so appends never wait on them.
     """
 
-    def __init__(self):
+    def __init__(self, log: Optional[EventLog] = None, snapshot_interval: int = 100):
+        self.log = log
+        self.snapshot_interval = snapshot_interval
         self.events: List[DomainEvent] = []
         self.subscribers: Dict[EventType, List[Callable]] = defaultdict(list)
         self._lock = asyncio.Lock()
 
+        self._by_aggregate: Dict[Tuple[str, str], List[DomainEvent]] = defaultdict(list)
+        self._by_type: Dict[EventType, List[DomainEvent]] = defaultdict(list)
+        self._snapshots: Dict[Tuple[str, str], List[AggregateSnapshot]] = defaultdict(list)
+
+        # Group commit state
+        self._pending_events: List[DomainEvent] = []
+        self._pending_snapshots: List[AggregateSnapshot] = []
+        self._pending_commit: Optional[asyncio.Future] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+        # Fan-out state
+        self.committed_position = 0
+        self._committed = _Signal()
+        self._handler_position = 0
+        self._handlers_done = _Signal()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._checkpoints: Dict[str, Tuple[int, Optional[Dict[str, Any]]]] = {}
+
     async def append(self, event: DomainEvent) -> None:
         """
         Append event to store (immutable, append-only).
-        Triggers registered subscribers.
+        Subscribers are notified in the background once it is committed.
+        """
+        await self.append_batch([event])
+
+    async def append_batch(self, events: List[DomainEvent]) -> None:
+        """
+        Append several events atomically with respect to other appenders and
+        persist them in a single write.
         """
+        if not events:
+            return
+
+        commit = None
         async with self._lock:
-            self.events.append(event)
+            if self.log is not None:
+                # Indexed once the log has committed them and assigned positions
+                commit = self._enqueue(events)
+            else:
+                for event in events:
+                    self._index(event, assign=True)
+                self._mark_committed(events[-1].position)
 
-            # Persist to database
-            await self._persist_event(event)
+        if self.subscribers:
+            self._ensure_dispatcher()
 
-            # Notify subscribers
-            await self._notify_subscribers(event)
+        if commit is not None:
+            await asyncio.shield(commit)
 
+        for event in events:
             logger.info(
                 f"Event appended: {event.event_type} for {event.aggregate_type}:{event.aggregate_id}"
             )
 
-    async def _persist_event(self, event: DomainEvent) -> None:
-        """Persist event to database"""
-        with get_session() as session:
-            # In production: store in dedicated events table
-            # CREATE TABLE events (
-            #     event_id UUID PRIMARY KEY,
-            #     event_type VARCHAR,
-            #     aggregate_id VARCHAR,
-            #     aggregate_type VARCHAR,
-            #     timestamp TIMESTAMP,
-            #     data JSONB,
-            #     ...
-            # )
-            pass
+    def _index(
+        self, event: DomainEvent, assign: bool = False, snapshot: bool = True
+    ) -> Optional[AggregateSnapshot]:
+        """
+        Add a committed event to the in-memory log and indexes; return a
+        snapshot if one is due. Without a log, ``assign`` numbers it here.
+        """
+        stream = self._by_aggregate[(event.aggregate_type, event.aggregate_id)]
+        if assign:
+            event.position = len(self.events) + 1
+            event.sequence = len(stream) + 1
+
+        self.events.append(event)
+        stream.append(event)
+        self._by_type[event.event_type].append(event)
+
+        if not snapshot or event.sequence % self.snapshot_interval:
+            return None
+        return self._take_snapshot(event.aggregate_type, event.aggregate_id, stream)
+
+    def _take_snapshot(
+        self, aggregate_type: str, aggregate_id: str, stream: List[DomainEvent]
+    ) -> AggregateSnapshot:
+        snapshots = self._snapshots[(aggregate_type, aggregate_id)]
+        previous = snapshots[-1] if snapshots else None
+        start = previous.sequence if previous else 0
+        tail = stream[start:]
+
+        max_timestamp = max(e.timestamp for e in tail)
+        if previous and previous.max_timestamp > max_timestamp:
+            max_timestamp = previous.max_timestamp
+
+        # History is rebuilt from the stream on replay, not stored per snapshot
+        state = self._apply_events(
+            tail, aggregate_type, dict(previous.state, history=[]) if previous else None
+        )
+        del state["history"]
+        snapshot = AggregateSnapshot(
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            sequence=len(stream),
+            max_timestamp=max_timestamp,
+            state=state,
+        )
+        snapshots.append(snapshot)
+        return snapshot
+
+    def _enqueue(self, events: List[DomainEvent]) -> asyncio.Future:
+        """Queue a write; appends arriving before the flusher runs share its commit"""
+        self._pending_events.extend(events)
+        if self._pending_commit is None:
+            self._pending_commit = asyncio.get_running_loop().create_future()
+        commit = self._pending_commit
+
+        if not _is_live(self._flusher):
+            self._flusher = asyncio.create_task(self._flush_pending())
+        return commit
+
+    async def _flush_pending(self) -> None:
+        # Let concurrent appenders join this batch
+        await asyncio.sleep(0)
+
+        while self._pending_commit is not None or self._pending_snapshots:
+            events, self._pending_events = self._pending_events, []
+            snapshots, self._pending_snapshots = self._pending_snapshots, []
+            commit, self._pending_commit = self._pending_commit, None
+
+            try:
+                missed = await asyncio.to_thread(
+                    self.log.append_batch, events, snapshots, self.committed_position
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to persist {len(events)} events and {len(snapshots)} snapshots: {e}"
+                )
+                if commit is not None:
+                    commit.set_exception(e)
+                continue
+
+            if events:
+                # Other writers' events come first so positions stay list offsets
+                for event in missed + events:
+                    snapshot = self._index(event)
+                    if snapshot is not None:
+                        self._pending_snapshots.append(snapshot)
+                self._mark_committed(events[-1].position)
+            if commit is not None:
+                commit.set_result(None)
+
+    def _mark_committed(self, position: int) -> None:
+        if position > self.committed_position:
+            self.committed_position = position
+            self._committed.notify()
+
+    async def flush(self) -> None:
+        """Wait until every appended event has been persisted"""
+        if _is_live(self._flusher):
+            await asyncio.shield(self._flusher)
+
+    async def load(self, batch_size: int = 10_000) -> int:
+        """
+        Hydrate the in-memory log and indexes from the durable log.
+        Returns the number of events loaded.
+        """
+        if self.log is None:
+            return 0
+
+        loaded = 0
+        position = self.committed_position
+        async with self._lock:
+            while True:
+                batch = await asyncio.to_thread(self.log.read, position, batch_size)
+                for event in batch:
+                    self._index(event, snapshot=False)
+                loaded += len(batch)
+                if len(batch) < batch_size:
+                    break
+                position = batch[-1].position
+
+            for snapshot in await asyncio.to_thread(self.log.read_snapshots):
+                stream = self._by_aggregate.get((snapshot.aggregate_type, snapshot.aggregate_id))
+                if not stream or len(stream) < snapshot.sequence:
+                    continue
+                self._snapshots[(snapshot.aggregate_type, snapshot.aggregate_id)].append(snapshot)
+
+            # Handlers only see events appended from now on
+            self._mark_committed(len(self.events))
+            self._handler_position = self.committed_position
+
+        logger.info(f"Loaded {loaded} events from the event log")
+        return loaded
 
     async def _notify_subscribers(self, event: DomainEvent) -> None:
         """Notify event subscribers asynchronously"""
@@ -144,37 +684,99 @@ class EventStore:
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
 
+    def _ensure_dispatcher(self) -> None:
+        if not _is_live(self._dispatcher):
+            self._dispatcher = asyncio.create_task(self._dispatch_handlers())
+
+    async def _dispatch_handlers(self) -> None:
+        """Feed committed events to subscribe() handlers, in order, off the append path"""
+        while True:
+            while self._handler_position < self.committed_position:
+                event = self.events[self._handler_position]
+                await self._notify_subscribers(event)
+                self._handler_position += 1
+            self._handlers_done.notify()
+            await self._committed.wait()
+
+    async def drain(self) -> None:
+        """Wait until subscribe() handlers have seen every committed event"""
+        if self.subscribers:
+            self._ensure_dispatcher()
+        while self._handler_position < self.committed_position:
+            await self._handlers_done.wait()
+
     def subscribe(self, event_type: EventType, handler: Callable) -> None:
         """Subscribe to specific event type"""
         self.subscribers[event_type].append(handler)
         logger.info(f"Subscribed handler to {event_type}")
 
+    async def subscribe_stream(
+        self,
+        name: Optional[str] = None,
+        event_types: Optional[List[EventType]] = None,
+        from_position: Optional[int] = None,
+        max_buffer: int = 1000,
+        strategy: str = "block",
+    ) -> Subscription:
+        """
+        Open a live subscription yielding events after ``from_position``.
+
+        Named subscriptions resume from their last acked checkpoint when
+        ``from_position`` is omitted; anonymous ones start at the tail.
+        """
+        if from_position is None:
+            checkpoint = await self.load_checkpoint(name) if name else None
+            from_position = checkpoint[0] if checkpoint is not None else self.committed_position
+
+        return Subscription(
+            self,
+            name=name,
+            event_types=event_types,
+            position=min(from_position, self.committed_position),
+            max_buffer=max_buffer,
+            strategy=strategy,
+        ).start()
+
+    async def save_checkpoint(
+        self, name: str, position: int, state: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record a subscriber's offset, optionally with its materialized state"""
+        self._checkpoints[name] = (position, state)
+        if self.log is not None:
+            await asyncio.to_thread(self.log.save_checkpoint, name, position, state)
+
+    async def load_checkpoint(self, name: str) -> Optional[Tuple[int, Optional[Dict[str, Any]]]]:
+        """``(position, state)`` of the last checkpoint, if any"""
+        if name not in self._checkpoints and self.log is not None:
+            checkpoint = await asyncio.to_thread(self.log.load_checkpoint, name)
+            if checkpoint is not None:
+                self._checkpoints[name] = checkpoint
+        return self._checkpoints.get(name)
+
     def get_events_by_aggregate(
         self, aggregate_id: str, aggregate_type: str, after: Optional[datetime] = None
     ) -> List[DomainEvent]:
-        """Get all events for specific aggregate (entity)"""
-        events = [
-            e
-            for e in self.events
-            if e.aggregate_id == aggregate_id and e.aggregate_type == aggregate_type
-        ]
+        """Get all events for specific aggregate (entity), in sequence order"""
+        events = self._by_aggregate.get((aggregate_type, aggregate_id), [])
 
         if after:
-            events = [e for e in events if e.timestamp > after]
+            return [e for e in events if e.timestamp > after]
 
-        return sorted(events, key=lambda e: e.timestamp)
+        return list(events)
 
     def get_events_by_type(
         self, event_type: EventType, after: Optional[datetime] = None, limit: int = 100
     ) -> List[DomainEvent]:
-        """Get events by type"""
-        events = [e for e in self.events if e.event_type == event_type]
-
-        if after:
-            events = [e for e in events if e.timestamp > after]
+        """Get events by type, newest first"""
+        events = []
+        for event in reversed(self._by_type.get(event_type, [])):
+            if len(events) >= limit:
+                break
+            if after and event.timestamp <= after:
+                continue
+            events.append(event)
 
-        events = sorted(events, key=lambda e: e.timestamp, reverse=True)
-        return events[:limit]
+        return events
 
     def replay_events(
         self, aggregate_id: str, aggregate_type: str, up_to: Optional[datetime] = None
@@ -182,19 +784,45 @@ class EventStore:
         """
         Replay events to reconstruct aggregate state at any point in time.
         This is the core of event sourcing - rebuild state from events.
+
+        Starts from the latest snapshot taken at or before ``up_to`` and
+        applies only the events after it.
         """
-        events = self.get_events_by_aggregate(aggregate_id, aggregate_type)
+        key = (aggregate_type, aggregate_id)
+        events = self._by_aggregate.get(key, [])
+
+        snapshots = self._snapshots.get(key)
+        snapshot = None
+        if snapshots:
+            if up_to is None:
+                snapshot = snapshots[-1]
+            else:
+                # max_timestamp is non-decreasing across an aggregate's snapshots
+                idx = bisect_right(snapshots, up_to, key=lambda s: s.max_timestamp)
+                snapshot = snapshots[idx - 1] if idx else None
+
+        if snapshot is not None:
+            state = dict(snapshot.state)
+            state["history"] = [_history_entry(e) for e in events[: snapshot.sequence]]
+            events = events[snapshot.sequence :]
+        else:
+            state = None
 
         if up_to:
             events = [e for e in events if e.timestamp <= up_to]
 
         # Reconstruct state by applying events in order
-        state = self._apply_events(events, aggregate_type)
-        return state
+        return self._apply_events(events, aggregate_type, state)
 
-    def _apply_events(self, events: List[DomainEvent], aggregate_type: str) -> Dict[str, Any]:
+    def _apply_events(
+        self,
+        events: List[DomainEvent],
+        aggregate_type: str,
+        state: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """Apply events to build current state"""
-        state = {"id": None, "history": []}
+        if state is None:
+            state = {"id": None, "history": []}
 
         for event in events:
             if event.event_type == EventType.LEAD_CREATED:
@@ -215,13 +843,7 @@ class EventStore:
                 state["qualified_at"] = event.timestamp
 
             # Track history
-            state["history"].append(
-                {
-                    "event": event.event_type.value,
-                    "timestamp": event.timestamp.isoformat(),
-                    "data": event.data,
-                }
-            )
+            state["history"].append(_history_entry(event))
 
         return state
 
@@ -229,82 +851,98 @@ class EventStore:
         self,
         event_types: Optional[List[EventType]] = None,
         after: Optional[datetime] = None,
+        from_position: int = 0,
+        follow: bool = False,
     ):
         """
         Async generator for event streaming.
-        Yields events as they're appended to the store.
+        Yields committed events after ``from_position`` (and newer than
+        ``after``); with ``follow`` it keeps yielding events as they're
+        appended to the store.
         """
-        start_idx = 0
-
-        # Find starting position
+        position = from_position
         if after:
-            for idx, event in enumerate(self.events):
-                if event.timestamp > after:
-                    start_idx = idx
-                    break
+            # Append order tracks timestamps, so the start can be bisected
+            position = max(
+                position,
+                bisect_right(
+                    self.events, after, hi=self.committed_position, key=lambda e: e.timestamp
+                ),
+            )
 
-        # Yield existing events
-        for event in self.events[start_idx:]:
-            if not event_types or event.event_type in event_types:
-                yield event
+        if not follow:
+            types = set(event_types) if event_types else None
+            for event in self.events[position : self.committed_position]:
+                if types is None or event.event_type in types:
+                    yield event
+            return
 
-        # In production: use Redis pub/sub or message queue
-        # for real-time event streaming
+        subscription = await self.subscribe_stream(event_types=event_types, from_position=position)
+        try:
+            async for event in subscription:
+                yield event
+        finally:
+            await subscription.close()
 
 
-class ReadModel:
+class Projection(ABC):
     """
-    Optimized read model (CQRS pattern).
-    Materialized views for fast queries, updated from events.
+    Materialized view folded from the event log.
+    Subclasses declare the event types they handle and implement apply().
     """
 
-    def __init__(self, event_store: EventStore):
-        self.event_store = event_store
-        self.views: Dict[str, Dict[str, Any]] = defaultdict(dict)
-        self._subscribe_to_events()
-
-    def _subscribe_to_events(self) -> None:
-        """Subscribe to events to keep read models updated"""
-        # Lead analytics view
-        self.event_store.subscribe(EventType.LEAD_CREATED, self._update_lead_analytics)
-        self.event_store.subscribe(EventType.LEAD_SCORED, self._update_lead_analytics)
-        self.event_store.subscribe(EventType.LEAD_QUALIFIED, self._update_lead_analytics)
-
-        # Campaign performance view
-        self.event_store.subscribe(EventType.EMAIL_SENT, self._update_campaign_performance)
-        self.event_store.subscribe(EventType.EMAIL_OPENED, self._update_campaign_performance)
-        self.event_store.subscribe(EventType.EMAIL_CLICKED, self._update_campaign_performance)
-
-        # Engagement funnel view
-        self.event_store.subscribe(EventType.MEETING_SCHEDULED, self._update_engagement_funnel)
-        self.event_store.subscribe(EventType.DEMO_COMPLETED, self._update_engagement_funnel)
-        self.event_store.subscribe(EventType.DEAL_WON, self._update_engagement_funnel)
-
-    async def _update_lead_analytics(self, event: DomainEvent) -> None:
-        """Update lead analytics view"""
-        view = self.views["lead_analytics"]
+    name: str = "projection"
+    event_types: Tuple[EventType, ...] = ()
+
+    def __init__(self):
+        self.state: Dict[str, Any] = self.initial_state()
+        self.position = 0  # last event position applied (or skipped)
+        self.applied = 0
+
+    def initial_state(self) -> Dict[str, Any]:
+        return {}
+
+    @abstractmethod
+    def apply(self, event: DomainEvent) -> None:
+        """Fold one event into ``state``"""
+
+    def reset(self) -> None:
+        self.state = self.initial_state()
+        self.position = 0
+        self.applied = 0
+
+
+class LeadAnalyticsProjection(Projection):
+    """Lead totals and qualification rate"""
+
+    name = "lead_analytics"
+    event_types = (EventType.LEAD_CREATED, EventType.LEAD_SCORED, EventType.LEAD_QUALIFIED)
+
+    def apply(self, event: DomainEvent) -> None:
+        view = self.state
 
         if event.event_type == EventType.LEAD_CREATED:
             view["total_leads"] = view.get("total_leads", 0) + 1
 
         elif event.event_type == EventType.LEAD_QUALIFIED:
             view["qualified_leads"] = view.get("qualified_leads", 0) + 1
-            view["qualification_rate"] = (
-                view["qualified_leads"] / view["total_leads"] if view["total_leads"] > 0 else 0
-            )
+            total = view.get("total_leads", 0)
+            view["qualification_rate"] = view["qualified_leads"] / total if total > 0 else 0
+
+
+class CampaignPerformanceProjection(Projection):
+    """Per-campaign email funnel, keyed ``campaign:{id}``"""
 
-        # Cache updated view
-        cache.set("read_model:lead_analytics", view, ttl=300)
+    name = "campaign_performance"
+    event_types = (EventType.EMAIL_SENT, EventType.EMAIL_OPENED, EventType.EMAIL_CLICKED)
 
-    async def _update_campaign_performance(self, event: DomainEvent) -> None:
-        """Update campaign performance view"""
+    def apply(self, event: DomainEvent) -> None:
         campaign_id = event.data.get("campaign_id")
         if not campaign_id:
             return
 
-        view_key = f"campaign:{campaign_id}"
-        view = self.views["campaign_performance"].get(
-            view_key, {"sent": 0, "opened": 0, "clicked": 0, "replied": 0}
+        view = self.state.setdefault(
+            f"campaign:{campaign_id}", {"sent": 0, "opened": 0, "clicked": 0, "replied": 0}
         )
 
         if event.event_type == EventType.EMAIL_SENT:
@@ -319,41 +957,201 @@ class ReadModel:
             view["open_rate"] = view["opened"] / view["sent"]
             view["click_rate"] = view["clicked"] / view["sent"]
 
-        self.views["campaign_performance"][view_key] = view
-        cache.set(f"read_model:{view_key}", view, ttl=300)
 
-    async def _update_engagement_funnel(self, event: DomainEvent) -> None:
-        """Update engagement funnel view"""
-        view = self.views["engagement_funnel"]
+class EngagementFunnelProjection(Projection):
+    """Meetings, demos and won deals"""
+
+    name = "engagement_funnel"
+    event_types = (EventType.MEETING_SCHEDULED, EventType.DEMO_COMPLETED, EventType.DEAL_WON)
+
+    _COUNTERS = {
+        EventType.MEETING_SCHEDULED: "meetings",
+        EventType.DEMO_COMPLETED: "demos",
+        EventType.DEAL_WON: "deals_won",
+    }
+
+    def apply(self, event: DomainEvent) -> None:
+        counter = self._COUNTERS[event.event_type]
+        self.state[counter] = self.state.get(counter, 0) + 1
+
+
+class ProjectionEngine:
+    """
+    Keeps projections up to date with the event log.
+
+    On start each projection restores its last checkpoint (offset plus
+    materialized state), catches up from the in-memory log in large batches
+    and then tails live events through its own subscription. Checkpoints are
+    written every ``checkpoint_interval`` seconds and on stop.
+    """
 
-        if event.event_type == EventType.MEETING_SCHEDULED:
-            view["meetings"] = view.get("meetings", 0) + 1
-        elif event.event_type == EventType.DEMO_COMPLETED:
-            view["demos"] = view.get("demos", 0) + 1
-        elif event.event_type == EventType.DEAL_WON:
-            view["deals_won"] = view.get("deals_won", 0) + 1
+    CHECKPOINT_PREFIX = "projection:"
+
+    def __init__(
+        self,
+        event_store: EventStore,
+        projections: Optional[List[Projection]] = None,
+        batch_size: int = 5000,
+        checkpoint_interval: float = 5.0,
+    ):
+        self.event_store = event_store
+        self.projections: Dict[str, Projection] = {}
+        self.batch_size = batch_size
+        self.checkpoint_interval = checkpoint_interval
+        self._subscriptions: Dict[str, Subscription] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._checkpointed_at: Dict[str, float] = {}
+        for projection in projections or []:
+            self.register(projection)
+
+    def register(self, projection: Projection) -> None:
+        self.projections[projection.name] = projection
+
+    async def start(self) -> None:
+        for projection in self.projections.values():
+            if _is_live(self._tasks.get(projection.name)):
+                continue
+            await self._start_projection(projection, restore=True)
+
+    async def stop(self) -> None:
+        for name in list(self._tasks):
+            await self._stop_projection(name)
+            await self._checkpoint(self.projections[name])
+
+    async def rebuild(self, name: str) -> None:
+        """Discard a projection's state and replay it from the start of the log"""
+        projection = self.projections[name]
+        await self._stop_projection(name)
+        projection.reset()
+        await self._start_projection(projection, restore=False)
+        await self._checkpoint(projection)
+
+    async def _start_projection(self, projection: Projection, restore: bool) -> None:
+        if restore:
+            checkpoint = await self.event_store.load_checkpoint(
+                self.CHECKPOINT_PREFIX + projection.name
+            )
+            if checkpoint is not None and checkpoint[1] is not None:
+                projection.position, projection.state = checkpoint
+
+        await self._catch_up(projection)
+
+        # No await between catch-up and subscribing, so no event is missed
+        subscription = Subscription(self.event_store, position=projection.position).start()
+        self._subscriptions[projection.name] = subscription
+        self._tasks[projection.name] = asyncio.create_task(self._tail(projection, subscription))
+        logger.info(f"Projection {projection.name} live at position {projection.position}")
+
+    async def _stop_projection(self, name: str) -> None:
+        task = self._tasks.pop(name, None)
+        if _is_live(task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        subscription = self._subscriptions.pop(name, None)
+        if subscription is not None:
+            await subscription.close()
+
+    async def _catch_up(self, projection: Projection) -> None:
+        store = self.event_store
+        types = set(projection.event_types)
+        while projection.position < store.committed_position:
+            end = min(projection.position + self.batch_size, store.committed_position)
+            for event in store.events[projection.position : end]:
+                if event.event_type in types:
+                    projection.apply(event)
+                    projection.applied += 1
+            projection.position = end
+            await asyncio.sleep(0)
+
+    async def _tail(self, projection: Projection, subscription: Subscription) -> None:
+        types = set(projection.event_types)
+        loop = asyncio.get_running_loop()
+        async for event in subscription:
+            if event.event_type in types:
+                try:
+                    projection.apply(event)
+                    projection.applied += 1
+                except Exception as e:
+                    logger.error(f"Projection {projection.name} failed on {event.event_id}: {e}")
+            projection.position = event.position
+            projection_lag_events.labels(projection=projection.name).set(
+                self.event_store.committed_position - projection.position
+            )
 
-        cache.set("read_model:engagement_funnel", view, ttl=300)
+            if (
+                loop.time() - self._checkpointed_at.get(projection.name, 0)
+                >= self.checkpoint_interval
+            ):
+                await self._checkpoint(projection)
+
+    async def _checkpoint(self, projection: Projection) -> None:
+        self._checkpointed_at[projection.name] = asyncio.get_running_loop().time()
+        try:
+            await self.event_store.save_checkpoint(
+                self.CHECKPOINT_PREFIX + projection.name, projection.position, projection.state
+            )
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint projection {projection.name}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        committed = self.event_store.committed_position
+        return {
+            name: {
+                "position": projection.position,
+                "lag": committed - projection.position,
+                "applied": projection.applied,
+                "running": not self._tasks[name].done() if name in self._tasks else False,
+            }
+            for name, projection in self.projections.items()
+        }
+
+
+class ReadModel:
+    """
+    Optimized read model (CQRS pattern).
+    Materialized views for fast queries, updated from events.
+    """
+
+    def __init__(self, event_store: EventStore):
+        self.event_store = event_store
+        self.engine = ProjectionEngine(
+            event_store,
+            [
+                LeadAnalyticsProjection(),
+                CampaignPerformanceProjection(),
+                EngagementFunnelProjection(),
+            ],
+        )
+
+    @property
+    def views(self) -> Dict[str, Dict[str, Any]]:
+        return {name: p.state for name, p in self.engine.projections.items()}
+
+    async def start(self) -> None:
+        await self.engine.start()
+
+    async def stop(self) -> None:
+        await self.engine.stop()
 
     def get_view(self, view_name: str, key: Optional[str] = None) -> Dict[str, Any]:
         """Get materialized view"""
-        # Try cache first
-        cache_key = f"read_model:{view_name}"
+        projection = self.engine.projections.get(view_name)
+        if projection is None:
+            return {}
         if key:
-            cache_key += f":{key}"
+            return projection.state.get(key, {})
+        return projection.state
 
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
-
-        # Fallback to in-memory
-        if key:
-            return self.views.get(view_name, {}).get(key, {})
-        return self.views.get(view_name, {})
+    def get_stats(self) -> Dict[str, Any]:
+        """Position and lag of each projection"""
+        return self.engine.get_stats()
 
 
 # Global event store and read model
-event_store = EventStore()
+event_store = EventStore(log=SQLEventLog())
 read_model = ReadModel(event_store)
 
 
@@ -9,6 +9,7 @@ from typing import Dict, Optional, Set
 
 from fastapi import WebSocket
 
+from app.core.broadcast import BroadcastHub, broadcast_bus
 from app.models.user import User
 
 logger = logging.getLogger(__name__)
@@ -17,85 +18,75 @@ logger = logging.getLogger(__name__)
 class ConnectionManager:
     """Manage WebSocket connections and broadcasts"""
 
-    def __init__(self):
-        # Track active connections by type
-        self.active_connections: Dict[str, Set[WebSocket]] = {
-            "campaign": set(),
-            "leads": set(),
-            "system": set(),
-            "all": set(),
+    CHANNELS = ("campaign", "leads", "system", "all")
+
+    def __init__(self, hub: Optional[BroadcastHub] = None):
+        self.hub = hub or BroadcastHub("events", bus=broadcast_bus)
+
+    @property
+    def active_connections(self) -> Dict[str, Set[WebSocket]]:
+        """Track active connections by channel"""
+        connections = {channel: set() for channel in self.CHANNELS}
+        connections.update(
+            (name, members)
+            for name, members in self.hub.channels.items()
+            if not name.startswith("user:")
+        )
+        return connections
+
+    @property
+    def user_connections(self) -> Dict[int, Set[WebSocket]]:
+        """Track user -> connection mapping"""
+        return {
+            int(name[5:]): members
+            for name, members in self.hub.channels.items()
+            if name.startswith("user:") and members
         }
-        # Track user -> connection mapping
-        self.user_connections: Dict[int, Set[WebSocket]] = {}
 
     async def connect(
         self, websocket: WebSocket, channel: str = "all", user_id: Optional[int] = None
     ):
         """Register new WebSocket connection"""
-        await websocket.accept()
-
-        if channel not in self.active_connections:
-            self.active_connections[channel] = set()
-
-        self.active_connections[channel].add(websocket)
-        self.active_connections["all"].add(websocket)
+        # Clients re-subscribing to more channels are already accepted
+        if not self.hub.is_registered(websocket):
+            await websocket.accept()
 
+        self.hub.join(websocket, channel)
+        self.hub.join(websocket, "all")
         if user_id:
-            if user_id not in self.user_connections:
-                self.user_connections[user_id] = set()
-            self.user_connections[user_id].add(websocket)
+            self.hub.join(websocket, f"user:{user_id}")
 
         logger.info(
-            f"WebSocket connected to channel: {channel}, total: {len(self.active_connections[channel])}"
+            f"WebSocket connected to channel: {channel}, total: {len(self.hub.channels[channel])}"
         )
 
     def disconnect(self, websocket: WebSocket, channel: str = "all", user_id: Optional[int] = None):
         """Remove WebSocket connection"""
-        if channel in self.active_connections:
-            self.active_connections[channel].discard(websocket)
-        self.active_connections["all"].discard(websocket)
+        self.hub.leave(websocket, channel)
+        self.hub.leave(websocket, "all")
+        if user_id:
+            self.hub.leave(websocket, f"user:{user_id}")
 
-        if user_id and user_id in self.user_connections:
-            self.user_connections[user_id].discard(websocket)
-            if not self.user_connections[user_id]:
-                del self.user_connections[user_id]
+        if not self.hub.memberships(websocket):
+            self.hub.remove(websocket)
 
         logger.info(f"WebSocket disconnected from channel: {channel}")
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Send message to specific connection"""
-        try:
-            await websocket.send_json(message)
-        except Exception as e:
-            logger.error(f"Failed to send personal message: {e}")
+        self.hub.send(websocket, message)
 
     async def broadcast(self, message: dict, channel: str = "all"):
-        """Broadcast message to all connections in channel"""
-        if channel not in self.active_connections:
-            return
-
-        disconnected = set()
-        for connection in self.active_connections[channel].copy():
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to broadcast to connection: {e}")
-                disconnected.add(connection)
-
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn, channel)
+        """
+        Broadcast message to all connections in channel.
+        Serialized once and queued per connection, so slow clients never
+        hold up the caller or each other.
+        """
+        await self.hub.publish(channel, message)
 
     async def broadcast_to_user(self, message: dict, user_id: int):
         """Broadcast message to all connections of specific user"""
-        if user_id not in self.user_connections:
-            return
-
-        for connection in self.user_connections[user_id].copy():
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to send to user {user_id}: {e}")
+        await self.hub.publish(f"user:{user_id}", message)
 
 
 # Global connection manager
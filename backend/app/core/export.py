@@ -0,0 +1,464 @@
+"""
+Streaming data export.
+
+Exports run in constant memory whatever the row count:
+- Rows are read through a server-side cursor in fixed-size batches
+- Each batch is encoded (CSV, NDJSON or Parquet row groups) and, optionally,
+  gzipped on the fly
+- Encoded bytes go straight to a sink: an HTTP response body or a multipart
+  upload through FileStorageService
+- A progress callback is told rows and bytes written after every batch
+"""
+
+import csv
+import io
+import json
+import logging
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import types as sa_types
+
+logger = logging.getLogger(__name__)
+
+# Optional columnar output (graceful fallback if not installed)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "ndjson": ("application/x-ndjson", ".ndjson"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+Row = Dict[str, Any]
+ProgressCallback = Callable[[int, int], None]  # (rows written, bytes written)
+
+
+# ============================================================================
+# Reading
+# ============================================================================
+
+
+def _row_to_dict(row: Any) -> Row:
+    """Plain dict for a result row: an ORM entity's columns or the selected columns"""
+    mapping = row._mapping
+    if len(mapping) == 1:
+        entity = row[0]
+        state = sa_inspect(entity, raiseerr=False)
+        if state is not None and hasattr(state, "mapper"):
+            return {attr.key: getattr(entity, attr.key) for attr in state.mapper.column_attrs}
+    return dict(mapping)
+
+
+def iter_query_batches(
+    session: Any, query: Any, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[List[Row]]:
+    """
+    Yield a query's rows as lists of dicts, ``batch_size`` at a time.
+
+    ``yield_per`` streams results from a server-side cursor where the driver
+    supports it (psycopg2), so only one batch is ever held in memory.
+    """
+    result = session.execute(query.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield [_row_to_dict(row) for row in partition]
+
+
+def arrow_schema(query: Any) -> Optional["pa.Schema"]:
+    """
+    Parquet schema for a query's selected columns, from their SQL types.
+
+    Lets the schema survive columns that are all NULL in the first batch;
+    types with no Arrow counterpart are exported as text. None without pyarrow.
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+    return pa.schema(
+        [pa.field(column.key, _arrow_type(column.type)) for column in query.selected_columns]
+    )
+
+
+def _arrow_type(sql_type: Any) -> "pa.DataType":
+    if isinstance(sql_type, sa_types.Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, sa_types.Integer):
+        return pa.int64()
+    if isinstance(sql_type, sa_types.Float):
+        return pa.float64()
+    if isinstance(sql_type, sa_types.Numeric) and sql_type.precision:
+        return pa.decimal128(sql_type.precision, sql_type.scale or 0)
+    if isinstance(sql_type, sa_types.DateTime):
+        return pa.timestamp("us", tz="UTC" if sql_type.timezone else None)
+    if isinstance(sql_type, sa_types.Date):
+        return pa.date32()
+    return pa.string()
+
+
+# ============================================================================
+# Encoding
+# ============================================================================
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _arrow_value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+class RowEncoder(ABC):
+    """Encodes batches of rows into bytes of one export format"""
+
+    def __init__(self, columns: Optional[List[str]] = None):
+        self.columns = columns
+
+    @abstractmethod
+    def encode(self, rows: List[Row]) -> bytes:
+        """Bytes for one batch of rows"""
+
+    def finish(self) -> bytes:
+        """Trailing bytes once every batch has been encoded"""
+        return b""
+
+
+class CSVEncoder(RowEncoder):
+    """CSV with a header row; columns default to the first row's keys"""
+
+    def __init__(self, columns: Optional[List[str]] = None):
+        super().__init__(columns)
+        self._header_written = False
+
+    def encode(self, rows: List[Row]) -> bytes:
+        if not rows:
+            return b""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not self._header_written:
+            if self.columns is None:
+                self.columns = list(rows[0])
+            writer.writerow(self.columns)
+            self._header_written = True
+        for row in rows:
+            writer.writerow(
+                [
+                    json.dumps(value) if isinstance(value, (dict, list)) else _plain(value)
+                    for value in (row.get(column) for column in self.columns)
+                ]
+            )
+        return buffer.getvalue().encode("utf-8")
+
+
+class NDJSONEncoder(RowEncoder):
+    """One JSON object per line"""
+
+    def encode(self, rows: List[Row]) -> bytes:
+        if self.columns is not None:
+            rows = [{column: row.get(column) for column in self.columns} for row in rows]
+        return "".join(
+            json.dumps(row, default=_plain, separators=(",", ":")) + "\n" for row in rows
+        ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Parquet footers record absolute offsets, so this must not reset
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ParquetEncoder(RowEncoder):
+    """
+    Parquet, one row group per batch
+
+    The schema is inferred from the first batch unless ``schema`` is given
+    (see arrow_schema). Inferred columns that are all NULL in the first batch
+    become text, and values of text columns are stringified, so later batches
+    always fit the schema the writer was opened with.
+    """
+
+    def __init__(
+        self,
+        columns: Optional[List[str]] = None,
+        compression: str = "snappy",
+        schema: Optional["pa.Schema"] = None,
+    ):
+        if not PYARROW_AVAILABLE:
+            raise ValueError("Parquet export requires pyarrow")
+        super().__init__(columns)
+        self.compression = compression
+        self.schema = schema
+        self._sink = _ChunkSink()
+        self._writer: Optional["pq.ParquetWriter"] = None
+
+    def encode(self, rows: List[Row]) -> bytes:
+        if not rows:
+            return b""
+        if self.columns is None:
+            self.columns = list(rows[0])
+        # Arrow keeps datetimes and decimals typed; enums become their values
+        text = self._text_columns()
+        rows = [
+            {
+                column: self._text(value) if column in text else _arrow_value(value)
+                for column, value in ((column, row.get(column)) for column in self.columns)
+            }
+            for row in rows
+        ]
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        if self._writer is None:
+            self.schema = pa.schema(
+                [
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ]
+            )
+            table = table.cast(self.schema)
+            self._writer = pq.ParquetWriter(self._sink, self.schema, compression=self.compression)
+        self._writer.write_table(table)
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        if self._writer is not None:
+            self._writer.close()
+        return self._sink.drain()
+
+    def _text_columns(self) -> set:
+        if self.schema is None:
+            return set()
+        return {field.name for field in self.schema if pa.types.is_string(field.type)}
+
+    @staticmethod
+    def _text(value: Any) -> Optional[str]:
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=_plain)
+        return str(_plain(value))
+
+
+def get_encoder(
+    export_format: str,
+    columns: Optional[List[str]] = None,
+    compress: bool = False,
+    schema: Optional["pa.Schema"] = None,
+) -> RowEncoder:
+    """
+    Encoder for a format; Parquet compresses its own pages when ``compress``
+    is set and uses ``schema`` when given
+    """
+    if export_format == "csv":
+        return CSVEncoder(columns)
+    if export_format == "ndjson":
+        return NDJSONEncoder(columns)
+    if export_format == "parquet":
+        return ParquetEncoder(columns, compression="gzip" if compress else "snappy", schema=schema)
+    raise ValueError(f"Unsupported export format: {export_format}")
+
+
+def export_content_type(export_format: str, compress: bool = False) -> str:
+    """MIME type of an export (gzip wraps every format except Parquet)"""
+    if compress and export_format != "parquet":
+        return "application/gzip"
+    return EXPORT_FORMATS[export_format][0]
+
+
+def export_filename(name: str, export_format: str, compress: bool = False) -> str:
+    extension = EXPORT_FORMATS[export_format][1]
+    if compress and export_format != "parquet":
+        extension += ".gz"
+    return f"{name}{extension}"
+
+
+# ============================================================================
+# Writing
+# ============================================================================
+
+
+@dataclass
+class ExportResult:
+    """Outcome of an export"""
+
+    format: str
+    rows: int = 0
+    bytes_written: int = 0
+    compressed: bool = False
+    duration_seconds: float = 0.0
+    file_key: Optional[str] = None
+    download_url: Optional[str] = None
+
+
+class ExportWriter:
+    """
+    Encode row batches into any sink with ``write(bytes)``
+
+    Args:
+        sink: Destination of the encoded (and gzipped) bytes
+        export_format: "csv", "ndjson" or "parquet"
+        compress: Gzip the output (Parquet uses gzip page compression instead)
+        columns: Column order; defaults to the first row's keys
+        progress: Called with (rows, bytes) after every batch
+        schema: Parquet schema (see arrow_schema); other formats ignore it
+    """
+
+    def __init__(
+        self,
+        sink: Any,
+        export_format: str = "csv",
+        compress: bool = False,
+        columns: Optional[List[str]] = None,
+        progress: Optional[ProgressCallback] = None,
+        schema: Optional["pa.Schema"] = None,
+    ):
+        self.sink = sink
+        self.encoder = get_encoder(export_format, columns, compress, schema)
+        self.progress = progress
+        self.result = ExportResult(format=export_format, compressed=compress)
+        self._gzip = (
+            zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+            if compress and export_format != "parquet"
+            else None
+        )
+        self._started = time.monotonic()
+
+    def _emit(self, data: bytes) -> None:
+        if self._gzip is not None:
+            data = self._gzip.compress(data)
+        if data:
+            self.sink.write(data)
+            self.result.bytes_written += len(data)
+
+    def write_batch(self, rows: List[Row]) -> None:
+        self._emit(self.encoder.encode(rows))
+        self.result.rows += len(rows)
+        if self.progress is not None:
+            self.progress(self.result.rows, self.result.bytes_written)
+
+    def close(self) -> ExportResult:
+        self._emit(self.encoder.finish())
+        if self._gzip is not None:
+            tail = self._gzip.flush()
+            self.sink.write(tail)
+            self.result.bytes_written += len(tail)
+        self.result.duration_seconds = round(time.monotonic() - self._started, 3)
+        return self.result
+
+
+def export_rows(
+    batches: Iterable[List[Row]],
+    sink: Any,
+    export_format: str = "csv",
+    compress: bool = False,
+    columns: Optional[List[str]] = None,
+    progress: Optional[ProgressCallback] = None,
+    schema: Optional["pa.Schema"] = None,
+) -> ExportResult:
+    """Write every batch to ``sink`` and return totals"""
+    writer = ExportWriter(sink, export_format, compress, columns, progress, schema)
+    for rows in batches:
+        writer.write_batch(rows)
+    return writer.close()
+
+
+def iter_export(
+    batches: Iterable[List[Row]],
+    export_format: str = "csv",
+    compress: bool = False,
+    columns: Optional[List[str]] = None,
+    schema: Optional["pa.Schema"] = None,
+) -> Iterator[bytes]:
+    """Encoded export as a byte stream, e.g. for a StreamingResponse body"""
+    sink = _ChunkSink()
+    writer = ExportWriter(sink, export_format, compress, columns, schema=schema)
+    for rows in batches:
+        writer.write_batch(rows)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def export_to_storage(
+    batches: Iterable[List[Row]],
+    name: str,
+    user_id: int,
+    export_format: str = "csv",
+    compress: bool = False,
+    columns: Optional[List[str]] = None,
+    progress: Optional[ProgressCallback] = None,
+    storage: Any = None,
+    url_expiration: int = 24 * 3600,
+    schema: Optional["pa.Schema"] = None,
+) -> ExportResult:
+    """
+    Stream an export into object storage as a multipart upload
+
+    The upload is aborted if the export fails, so no partial object is left.
+    """
+    if storage is None:
+        from app.core.storage import storage_service as storage
+
+    filename = export_filename(name, export_format, compress)
+    file_key = f"exports/{storage.generate_file_key(user_id, filename)}"
+    upload = storage.start_multipart_upload(
+        file_key,
+        export_content_type(export_format, compress),
+        metadata={"exported_by": str(user_id)},
+    )
+    try:
+        result = export_rows(batches, upload, export_format, compress, columns, progress, schema)
+        upload.complete()
+    except Exception:
+        upload.abort()
+        raise
+
+    result.file_key = file_key
+    result.download_url = storage.generate_presigned_url(file_key, expiration=url_expiration)
+    logger.info(
+        f"Exported {result.rows} rows ({result.bytes_written} bytes) to {file_key} "
+        f"in {result.duration_seconds}s"
+    )
+    return result
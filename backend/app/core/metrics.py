@@ -33,6 +33,38 @@ leads_total = Gauge("leads_total", "Total leads")
 emails_sent_total = Counter("emails_sent_total", "Total emails sent")
 api_errors_total = Counter("api_errors_total", "Total API errors", ["endpoint", "error_type"])
 
+# Event sourcing
+projection_lag_events = Gauge(
+    "projection_lag_events", "Committed events not yet applied by a projection", ["projection"]
+)
+
+# Outbound webhooks
+webhook_deliveries_total = Counter(
+    "webhook_deliveries_total", "Webhook delivery attempts by outcome", ["outcome"]
+)
+webhook_delivery_duration_seconds = Histogram(
+    "webhook_delivery_duration_seconds", "Webhook HTTP request duration in seconds", ["outcome"]
+)
+webhook_delivery_lag_seconds = Histogram(
+    "webhook_delivery_lag_seconds",
+    "Time from enqueue to successful webhook delivery",
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600, 21600),
+)
+
+# LLM provider concurrency
+ai_limiter_queue_wait_seconds = Histogram(
+    "ai_limiter_queue_wait_seconds",
+    "Time AI requests wait for a provider concurrency slot",
+    ["provider", "model", "lane"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+ai_concurrency_limit = Gauge(
+    "ai_concurrency_limit", "Current adaptive concurrency limit", ["provider", "model"]
+)
+ai_hedged_requests_total = Counter(
+    "ai_hedged_requests_total", "Hedged AI requests by winning attempt", ["outcome"]
+)
+
 
 class PrometheusMiddleware:
     """Middleware to collect Prometheus metrics."""
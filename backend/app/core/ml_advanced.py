@@ -4,8 +4,17 @@ Churn prediction, next-best-action recommendation, sentiment analysis, and looka
 """
 
 import logging
+import math
+import os
+import re
+import zlib
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.vector_index import PartitionedVectorIndex, Where
 
 logger = logging.getLogger(__name__)
 
@@ -321,12 +330,174 @@ class SentimentAnalysis:
         return suggestions.get(intent, "Continue engagement")
 
 
+class LeadVectorizer:
+    """
+    Fixed-length lead vectors for similarity search
+
+    Firmographic features (company size, engagement, seniority, score) and
+    hashed categorical features (industry, title words, tech stack) fill the
+    first FEATURE_DIM slots; an optional text embedding fills the rest. Only
+    the leading EMBEDDING_DIM embedding dimensions are kept, which preserves
+    most of the similarity for Matryoshka models such as text-embedding-3.
+
+    Args:
+        embedding_weight: Share of the squared norm given to the embedding
+    """
+
+    FEATURE_DIM = 64
+    EMBEDDING_DIM = 256
+    dim = FEATURE_DIM + EMBEDDING_DIM
+
+    NUMERIC_FEATURES = 4
+    SENIORITY = {
+        "chief": 1.0,
+        "ceo": 1.0,
+        "cto": 1.0,
+        "cfo": 1.0,
+        "coo": 1.0,
+        "cmo": 1.0,
+        "cro": 1.0,
+        "founder": 1.0,
+        "president": 0.9,
+        "vp": 0.8,
+        "svp": 0.8,
+        "head": 0.7,
+        "director": 0.6,
+        "manager": 0.4,
+        "lead": 0.3,
+    }
+
+    def __init__(self, embedding_weight: float = 0.5):
+        self.embedding_weight = embedding_weight
+
+    @staticmethod
+    def _number(value: Any) -> float:
+        """Numeric value of a field such as 500, "500" or "200-500 employees" """
+        if isinstance(value, (int, float)):
+            return float(value)
+        match = re.search(r"\d+(?:\.\d+)?", str(value or "").replace(",", ""))
+        return float(match.group()) if match else 0.0
+
+    def _hash(self, features: np.ndarray, name: str, weight: float) -> None:
+        slots = self.FEATURE_DIM - self.NUMERIC_FEATURES
+        features[self.NUMERIC_FEATURES + zlib.crc32(name.encode()) % slots] += weight
+
+    def features(self, lead: Dict[str, Any]) -> np.ndarray:
+        """Unit-norm firmographic feature vector"""
+        features = np.zeros(self.FEATURE_DIM, dtype=np.float32)
+        size = self._number(lead.get("company_size", lead.get("size")))
+        features[0] = math.log1p(size) / math.log1p(100000)
+        features[1] = min(max(self._number(lead.get("engagement_score")), 0.0), 1.0)
+        title_words = re.findall(r"[a-z]+", str(lead.get("title") or "").lower())
+        features[2] = max((self.SENIORITY.get(word, 0.0) for word in title_words), default=0.0)
+        features[3] = min(self._number(lead.get("score")), 100.0) / 100
+
+        industry = lead.get("industry")
+        if industry:
+            self._hash(features, f"industry:{str(industry).lower()}", 1.0)
+        for word in title_words:
+            self._hash(features, f"title:{word}", 0.5)
+        stack = lead.get("tech_stack") or []
+        for tool in stack:
+            self._hash(features, f"tech:{str(tool).lower()}", 1.0 / math.sqrt(len(stack)))
+
+        norm = np.linalg.norm(features)
+        return features / norm if norm else features
+
+    def _embedding(self, embedding: Sequence[float]) -> np.ndarray:
+        part = np.zeros(self.EMBEDDING_DIM, dtype=np.float32)
+        truncated = np.asarray(embedding, dtype=np.float32)[: self.EMBEDDING_DIM]
+        part[: len(truncated)] = truncated
+        norm = np.linalg.norm(part)
+        return part / norm if norm else part
+
+    def vector(
+        self, lead: Dict[str, Any], embedding: Optional[Sequence[float]] = None
+    ) -> np.ndarray:
+        """Vector for a lead, with its text embedding if one is available"""
+        if embedding is None:
+            return np.concatenate([self.features(lead), np.zeros(self.EMBEDDING_DIM, np.float32)])
+        return np.concatenate(
+            [
+                self.features(lead) * math.sqrt(1 - self.embedding_weight),
+                self._embedding(embedding) * math.sqrt(self.embedding_weight),
+            ]
+        )
+
+    def query_vector(self, embedding: Sequence[float]) -> np.ndarray:
+        """
+        Vector for a free-text query
+
+        Only the embedding part is set, so lead vectors rank by text similarity.
+        """
+        return np.concatenate([np.zeros(self.FEATURE_DIM, np.float32), self._embedding(embedding)])
+
+
+# Lead vectors per org, shared by lookalike searches
+lead_index = PartitionedVectorIndex(
+    LeadVectorizer.dim,
+    directory=(
+        os.path.join(settings.vector_index_dir, "lookalike") if settings.vector_index_dir else None
+    ),
+)
+
+
 class LookalikeModeling:
     """Find similar leads based on successful conversions"""
 
+    vectorizer = LeadVectorizer()
+
+    @staticmethod
+    def index_leads(
+        org_id: str,
+        leads: List[Dict[str, Any]],
+        embeddings: Optional[List[Sequence[float]]] = None,
+    ) -> int:
+        """
+        Add or update leads in the org's lookalike index
+
+        Args:
+            org_id: Organization partition
+            leads: Lead records with an "id"
+            embeddings: Optional text embedding per lead
+
+        Returns:
+            Number of leads indexed
+        """
+        leads = [lead for lead in leads if lead.get("id") is not None]
+        if not leads:
+            return 0
+        vectorizer = LookalikeModeling.vectorizer
+        embeddings = embeddings or [None] * len(leads)
+        index = lead_index.partition(org_id, create=True)
+        index.add_many(
+            [lead["id"] for lead in leads],
+            [vectorizer.vector(lead, embedding) for lead, embedding in zip(leads, embeddings)],
+            [
+                {
+                    "industry": lead.get("industry"),
+                    "score": lead.get("score"),
+                    "company_size": vectorizer._number(lead.get("company_size", lead.get("size"))),
+                }
+                for lead in leads
+            ],
+            leads,
+        )
+        # Persisted by lead_index's save timer and at shutdown
+        return len(leads)
+
+    @staticmethod
+    def remove_lead(org_id: str, lead_id: Any) -> bool:
+        """Drop a lead from the org's lookalike index"""
+        return lead_index.remove(org_id, lead_id)
+
     @staticmethod
     def find_lookalikes(
-        source_lead_ids: List[int], candidate_pool: List[Dict], top_n: int = 10
+        source_lead_ids: List[int],
+        candidate_pool: Optional[List[Dict]] = None,
+        top_n: int = 10,
+        org_id: Optional[str] = None,
+        where: Optional[Where] = None,
     ) -> List[Dict[str, Any]]:
         """
         Find lookalike leads similar to high-value customers.
@@ -337,58 +508,59 @@ class LookalikeModeling:
         - Tech stack
         - Engagement patterns
         - Job title
-        """
-        # In production: use embeddings or ML similarity
-
-        # Get source leads profile
-        source_profile = LookalikeModeling._create_profile(source_lead_ids)
 
-        # Score candidates
-        scored_candidates = []
-        for candidate in candidate_pool:
-            similarity_score = LookalikeModeling._calculate_similarity(source_profile, candidate)
-            scored_candidates.append({**candidate, "similarity_score": similarity_score})
-
-        # Sort and return top N
-        scored_candidates.sort(key=lambda x: x["similarity_score"], reverse=True)
-
-        return scored_candidates[:top_n]
-
-    @staticmethod
-    def _create_profile(lead_ids: List[int]) -> Dict[str, Any]:
-        """Create aggregate profile from source leads"""
-        # In production: query database and aggregate
-        return {
-            "avg_company_size": 500,
-            "common_industries": ["SaaS", "Technology"],
-            "common_titles": ["VP", "Director", "Manager"],
-            "tech_stack": ["Salesforce", "HubSpot"],
-            "avg_engagement_score": 0.75,
-        }
+        Candidates come from the org's lookalike index when ``org_id`` is given
+        (``where`` filters on industry, score or company_size), otherwise from
+        ``candidate_pool``. The profile is the mean vector of the source leads.
+        """
+        vectorizer = LookalikeModeling.vectorizer
+
+        if org_id is not None:
+            index = lead_index.partition(org_id)
+            if index is None:
+                return []
+            vectors = [index.get_vector(lead_id) for lead_id in source_lead_ids]
+            profile = LookalikeModeling._create_profile([v for v in vectors if v is not None])
+            hits = index.search(profile, top_n, where=where, exclude=source_lead_ids)
+            return [
+                {**(index.get_payload(lead_id) or {"id": lead_id}), "similarity_score": score}
+                for lead_id, score in hits
+            ]
+
+        if not candidate_pool:
+            return []
+        matrix = np.stack([vectorizer.vector(candidate) for candidate in candidate_pool])
+        sources = set(source_lead_ids)
+        is_source = np.array([candidate.get("id") in sources for candidate in candidate_pool])
+        profile = LookalikeModeling._create_profile(list(matrix[is_source]))
+
+        # Score candidates in one pass
+        scores = matrix @ profile
+        scores[is_source] = -np.inf
+        top = min(top_n, int((~is_source).sum()))
+        if top <= 0:
+            return []
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        return [{**candidate_pool[i], "similarity_score": round(float(scores[i]), 4)} for i in best]
 
     @staticmethod
-    def _calculate_similarity(profile: Dict, candidate: Dict) -> float:
-        """Calculate similarity score"""
-        score = 0.0
-
-        # Company size similarity
-        if "company_size" in candidate:
-            size_diff = abs(profile["avg_company_size"] - candidate["company_size"])
-            score += max(0, 1 - (size_diff / 1000)) * 0.3
-
-        # Industry match
-        if candidate.get("industry") in profile["common_industries"]:
-            score += 0.3
-
-        # Title match
-        if any(title in candidate.get("title", "") for title in profile["common_titles"]):
-            score += 0.2
-
-        # Tech stack overlap
-        candidate_stack = set(candidate.get("tech_stack", []))
-        profile_stack = set(profile["tech_stack"])
-        if candidate_stack and profile_stack:
-            overlap = len(candidate_stack & profile_stack) / len(profile_stack)
-            score += overlap * 0.2
-
-        return min(score, 1.0)
+    def _create_profile(source_vectors: List[np.ndarray]) -> np.ndarray:
+        """Unit mean of the source lead vectors (a typical customer when there are none)"""
+        if not source_vectors:
+            vectorizer = LookalikeModeling.vectorizer
+            source_vectors = [
+                vectorizer.vector(
+                    {
+                        "company_size": 500,
+                        "industry": industry,
+                        "title": "VP Director Manager",
+                        "tech_stack": ["Salesforce", "HubSpot"],
+                        "engagement_score": 0.75,
+                    }
+                )
+                for industry in ("SaaS", "Technology")
+            ]
+        profile = np.mean(source_vectors, axis=0)
+        norm = np.linalg.norm(profile)
+        return profile / norm if norm else profile
@@ -12,7 +12,7 @@ from typing import Any, Callable, Dict, List, Optional
 import numpy as np
 import pandas as pd
 
-from app.core.cache import cache
+from app.core.cache import async_cache
 
 logger = logging.getLogger(__name__)
 
@@ -202,10 +202,10 @@ class FeatureStore:
 
     def __init__(self, registry: FeatureRegistry):
         self.registry = registry
-        self.online_cache = cache  # Redis for online serving
+        self.online_cache = async_cache  # Redis for online serving
         self.offline_storage: Dict[str, List[FeatureValue]] = {}  # Mock offline storage
 
-    def compute_and_store(
+    async def compute_and_store(
         self,
         feature_name: str,
         entity_id: str,
@@ -240,7 +240,7 @@ class FeatureStore:
 
         # Store online (Redis with 24h TTL)
         online_key = self._online_key(feature_name, entity_id)
-        self.online_cache.set(online_key, value, ttl=86400)
+        await self.online_cache.set(online_key, value, ttl=86400)
 
         # Store offline (append to history)
         offline_key = f"{feature_name}:{entity_id}"
@@ -251,21 +251,19 @@ class FeatureStore:
         logger.debug(f"Stored feature '{feature_name}' for entity {entity_id}")
         return feature_value
 
-    def get_online_features(self, feature_names: List[str], entity_id: str) -> Dict[str, Any]:
+    async def get_online_features(self, feature_names: List[str], entity_id: str) -> Dict[str, Any]:
         """
         Get features for real-time serving (low latency).
-        Returns latest values from online cache.
+        Returns latest values from online cache in a single MGET.
         """
-        features = {}
-
-        for feature_name in feature_names:
-            online_key = self._online_key(feature_name, entity_id)
-            value = self.online_cache.get(online_key)
+        online_keys = [self._online_key(name, entity_id) for name in feature_names]
+        values = await self.online_cache.mget(online_keys)
 
+        features = {}
+        for feature_name, value in zip(feature_names, values):
             if value is None:
                 logger.warning(f"Feature '{feature_name}' not in online cache for {entity_id}")
                 # Could trigger on-demand computation here
-                value = None
 
             features[feature_name] = value
 
@@ -552,7 +550,7 @@ async def prepare_training_data(lead_ids: List[int]) -> pd.DataFrame:
 async def get_real_time_features(lead_id: int) -> Dict[str, Any]:
     """Get features for real-time prediction"""
 
-    features = feature_store.get_online_features(
+    features = await feature_store.get_online_features(
         feature_names=[
             "engagement_score",
             "lead_quality_score",
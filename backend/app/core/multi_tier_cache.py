@@ -5,83 +5,353 @@ L1: In-memory (LRU), L2: Redis, L3: Database (with write-through/write-back).
 
 import asyncio
 import hashlib
+import inspect
 import logging
+import random
+import sys
+import threading
+import time
+import uuid
 from collections import OrderedDict
 from datetime import datetime, timedelta
+from fnmatch import fnmatchcase
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 
-from app.core.cache import cache as redis_cache
+from app.core.cache import async_cache
+from app.core.config import settings
+from app.core.pubsub import InProcessPubSubBus, PubSubBus, RedisPubSubBus
 
 logger = logging.getLogger(__name__)
 
+# Marks values stored by get_or_load with stale-while-revalidate metadata
+_ENVELOPE_MARKER = "__mtc_swr__"
 
-class LRUCache:
+
+def _is_envelope(value: Any) -> bool:
+    return isinstance(value, dict) and value.get(_ENVELOPE_MARKER) is True
+
+
+def approx_sizeof(value: Any, _depth: int = 0) -> int:
+    """
+    Approximate the in-memory footprint of a cached value in bytes.
+    Walks containers a few levels deep; good enough for eviction accounting.
+    """
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += approx_sizeof(k, _depth + 1) + approx_sizeof(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += approx_sizeof(item, _depth + 1)
+    elif hasattr(value, "__dict__"):
+        size += approx_sizeof(vars(value), _depth + 1)
+
+    return size
+
+
+class _CacheEntry:
+    """Single L1 entry with expiry and accounted size"""
+
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: Optional[float], size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class LRUShard:
     """
-    Thread-safe LRU cache (L1 - in-memory).
-    Fastest access, limited size.
+    One segment of the sharded L1 cache.
+
+    Reads never take the lock: a dict lookup plus a best-effort recency bump
+    are atomic under the GIL. Writes and evictions serialize on a per-shard
+    lock so byte accounting stays consistent.
     """
 
-    def __init__(self, max_size: int = 1000):
-        self.cache: OrderedDict = OrderedDict()
-        self.max_size = max_size
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.data: OrderedDict = OrderedDict()
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bytes = 0
         self.hits = 0
         self.misses = 0
-        self._lock = asyncio.Lock()
-
-    async def get(self, key: str) -> Optional[Any]:
-        """Get from cache, updating LRU order"""
-        async with self._lock:
-            if key in self.cache:
-                # Move to end (most recently used)
-                self.cache.move_to_end(key)
-                self.hits += 1
-                return self.cache[key]
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
 
+    def get(self, key: str, now: float) -> Optional[Any]:
+        entry = self.data.get(key)
+        if entry is None:
             self.misses += 1
             return None
 
-    async def set(self, key: str, value: Any) -> None:
-        """Set value, evicting LRU item if full"""
-        async with self._lock:
-            if key in self.cache:
-                self.cache.move_to_end(key)
-
-            self.cache[key] = value
-
-            # Evict LRU if over size
-            if len(self.cache) > self.max_size:
-                self.cache.popitem(last=False)
+        if entry.expires_at is not None and entry.expires_at <= now:
+            self._remove(key, entry)
+            self.expirations += 1
+            self.misses += 1
+            return None
 
-    async def delete(self, key: str) -> None:
-        """Remove from cache"""
-        async with self._lock:
-            self.cache.pop(key, None)
+        try:
+            self.data.move_to_end(key)
+        except KeyError:
+            # Evicted by a concurrent writer; the value we hold is still valid
+            pass
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        size = approx_sizeof(key) + approx_sizeof(value)
+        if size > self.max_bytes:
+            # Never cache values larger than a whole shard
+            self.delete(key)
+            return
+
+        with self._lock:
+            old = self.data.pop(key, None)
+            if old is not None:
+                self.bytes -= old.size
+
+            self.data[key] = _CacheEntry(value, expires_at, size)
+            self.bytes += size
+
+            while self.bytes > self.max_bytes or len(self.data) > self.max_entries:
+                _, evicted = self.data.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            entry = self.data.pop(key, None)
+            if entry is None:
+                return False
+            self.bytes -= entry.size
+            return True
+
+    def _remove(self, key: str, entry: _CacheEntry) -> None:
+        """Drop ``key`` only if it still maps to ``entry``"""
+        with self._lock:
+            if self.data.get(key) is entry:
+                del self.data[key]
+                self.bytes -= entry.size
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            expired = [
+                k for k, e in self.data.items() if e.expires_at is not None and e.expires_at <= now
+            ]
+            for key in expired:
+                self.bytes -= self.data.pop(key).size
+            self.expirations += len(expired)
+            return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.data.clear()
+            self.bytes = 0
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
         total = self.hits + self.misses
         return {
-            "size": len(self.cache),
-            "max_size": self.max_size,
+            "size": len(self.data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
             "hits": self.hits,
             "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
             "hit_rate": self.hits / total if total > 0 else 0,
-            "utilization": len(self.cache) / self.max_size,
         }
 
 
+class ShardedLRUCache:
+    """
+    Hash-sharded LRU cache (L1 - in-memory).
+    Fastest access, bounded by bytes and entry count, with per-entry TTL.
+
+    Keys are spread over ``num_shards`` independent segments so writers on
+    different keys never contend, and reads are lock-free.
+    """
+
+    def __init__(
+        self,
+        num_shards: int = 16,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entries: int = 10000,
+        default_ttl: Optional[int] = None,
+    ):
+        self.num_shards = max(1, num_shards)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.shards = [
+            LRUShard(
+                max_bytes=max(1, max_bytes // self.num_shards),
+                max_entries=max(1, max_entries // self.num_shards),
+            )
+            for _ in range(self.num_shards)
+        ]
+
+    def _shard(self, key: str) -> LRUShard:
+        return self.shards[hash(key) % self.num_shards]
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get from cache, updating LRU order; expired entries are misses"""
+        return self._shard(key).get(key, time.monotonic())
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Set value with optional TTL (seconds), evicting LRU items over budget"""
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._shard(key).set(key, value, expires_at)
+
+    async def delete(self, key: str) -> bool:
+        """Remove from cache"""
+        return self._shard(key).delete(key)
+
+    def delete_nowait(self, key: str) -> bool:
+        """Synchronous delete, for callers outside a coroutine"""
+        return self._shard(key).delete(key)
+
+    def keys(self) -> List[str]:
+        """Snapshot of all keys currently held (including not-yet-purged expired ones)"""
+        return [key for shard in self.shards for key in list(shard.data.keys())]
+
+    def purge_expired(self) -> int:
+        """Eagerly drop expired entries from every shard"""
+        now = time.monotonic()
+        return sum(shard.purge_expired(now) for shard in self.shards)
+
+    def clear(self) -> None:
+        for shard in self.shards:
+            shard.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get aggregate and per-shard cache statistics"""
+        shard_stats = [shard.get_stats() for shard in self.shards]
+        hits = sum(s["hits"] for s in shard_stats)
+        misses = sum(s["misses"] for s in shard_stats)
+        size = sum(s["size"] for s in shard_stats)
+        used_bytes = sum(s["bytes"] for s in shard_stats)
+        total = hits + misses
+        return {
+            "size": size,
+            "max_size": self.max_entries,
+            "bytes": used_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": sum(s["evictions"] for s in shard_stats),
+            "expirations": sum(s["expirations"] for s in shard_stats),
+            "hit_rate": hits / total if total > 0 else 0,
+            "utilization": used_bytes / self.max_bytes if self.max_bytes else 0,
+            "shards": shard_stats,
+        }
+
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent calls for the same key share one execution.
+
+    The first caller starts the loader as a task; everyone else (including the
+    first caller) awaits it through ``asyncio.shield`` so a cancelled waiter
+    never cancels the load for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    def start(self, key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Return the in-flight task for ``key``, starting ``loader`` if none"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        task = asyncio.ensure_future(loader())
+        self._inflight[key] = task
+        self.executions += 1
+
+        def _done(t: asyncio.Task) -> None:
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            if not t.cancelled() and t.exception() is not None:
+                logger.debug(f"Single-flight load failed for {key}: {t.exception()}")
+
+        task.add_done_callback(_done)
+        return task
+
+    async def do(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``loader`` once for all concurrent callers of ``key``"""
+        return await asyncio.shield(self.start(key, loader))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+
+def create_invalidation_bus() -> PubSubBus:
+    """
+    Pick the invalidation bus matching ``settings.cache_backend``
+
+    Every worker holds its own L1, so deleting a key or tag in one worker
+    must be announced to the others. Messages are small dicts with the
+    sender's ``origin`` id plus ``keys`` and/or ``pattern``.
+    """
+    if settings.cache_backend == "redis":
+        return RedisPubSubBus(settings.redis_url, channel="mtc:invalidate")
+    return InProcessPubSubBus(channel="mtc:invalidate")
+
+
 class MultiTierCache:
     """
     Multi-tier caching system.
-    L1: In-memory LRU (microseconds)
+    L1: In-memory sharded LRU (microseconds)
     L2: Redis (milliseconds)
     L3: Database (with write-through)
+
+    Entries can be registered under tags (e.g. ``lead:123``); the tag -> keys
+    index lives in L2 so any process can invalidate a tag in
+    O(entries-under-tag), and L1 deletions are broadcast on ``bus``.
+
+    L1 keeps the cached object itself, while a Redis L2 stores it through
+    ``settings.cache_serializer``. With the JSON-family serializers an L2 hit
+    returns datetimes as strings and tuples as lists, unlike an L1 hit of the
+    same entry. Cache JSON-native values (e.g. ``model_dump(mode="json")``),
+    or use the pickle serializer with a trusted Redis.
     """
 
-    def __init__(self):
-        self.l1 = LRUCache(max_size=1000)
-        self.l2 = redis_cache
+    TAG_PREFIX = "mtc:tag:"
+    # Minimum lifetime of a tag index set; refreshed on every tagged write
+    TAG_TTL = 86400
+
+    def __init__(self, l1_promotion_ttl: int = 60, bus: Optional[PubSubBus] = None):
+        self.l1 = ShardedLRUCache(
+            num_shards=settings.l1_cache_shards,
+            max_bytes=settings.l1_cache_max_bytes,
+            max_entries=settings.l1_cache_max_entries,
+        )
+        self.l2 = async_cache
+        # L2 hits don't carry their remaining TTL, so promoted copies get a
+        # short one to keep L1 from outliving the L2 entry by much
+        self.l1_promotion_ttl = l1_promotion_ttl
+        self.single_flight = SingleFlight()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self.instance_id = uuid.uuid4().hex
+        self.bus = bus or create_invalidation_bus()
+        self.bus.subscribe(self._on_invalidation)
         # L3 is database - handled by ORM
 
         # Track access patterns for predictive invalidation
@@ -100,11 +370,11 @@ class MultiTierCache:
             return value
 
         # Try L2 (Redis)
-        value = self.l2.get(key)
+        value = await self.l2.get(key)
         if value is not None:
             logger.debug(f"L2 HIT: {key}")
             # Promote to L1
-            await self.l1.set(key, value)
+            await self.l1.set(key, value, ttl=self.l1_promotion_ttl)
             self._track_access(key)
             return value
 
@@ -117,59 +387,186 @@ class MultiTierCache:
         value: Any,
         ttl: Optional[int] = None,
         write_through: bool = True,
+        tags: Optional[List[str]] = None,
     ) -> None:
         """
         Set value in all tiers.
         write_through: immediately persist to all levels
+        tags: register the key under these tags for invalidate_tags()
         """
-        # Set in L1
-        await self.l1.set(key, value)
+        # Set in L1 (same TTL so it never outlives L2)
+        await self.l1.set(key, value, ttl=ttl)
 
         # Set in L2 with TTL
-        if ttl:
-            self.l2.set(key, value, ttl=ttl)
-        else:
-            self.l2.set(key, value)
+        await self.l2.set(key, value, ttl=ttl)
+
+        if tags:
+            tag_ttl = None if not ttl else max(ttl, self.TAG_TTL)
+            for tag in tags:
+                await self.l2.sadd(self.TAG_PREFIX + tag, key, ttl=tag_ttl)
 
         logger.debug(f"CACHE SET: {key}")
 
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = 300,
+        stale_ttl: int = 0,
+        early_refresh: float = 0.0,
+        tags: Optional[List[str]] = None,
+    ) -> Any:
+        """
+        Read-through get with stampede protection.
+
+        Misses on the same key are coalesced into one ``loader`` call. With
+        ``stale_ttl`` an expired value is still served for that many seconds
+        while a single background task refreshes it. ``early_refresh`` (0-1)
+        starts that background refresh at a random point within the last
+        fraction of the TTL, so hot keys don't all expire at the same instant.
+        """
+        cached_value = await self.get(key)
+
+        if cached_value is not None:
+            if not _is_envelope(cached_value):
+                return cached_value
+
+            if time.time() >= cached_value["refresh_at"]:
+                self._refresh_in_background(key, loader, ttl, stale_ttl, early_refresh, tags)
+            return cached_value["value"]
+
+        return await self.single_flight.do(
+            key, lambda: self._load_and_set(key, loader, ttl, stale_ttl, early_refresh, tags)
+        )
+
+    async def _load_and_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        early_refresh: float,
+        tags: Optional[List[str]] = None,
+    ) -> Any:
+        value = await loader()
+        if value is None:
+            return None
+
+        if stale_ttl > 0 or early_refresh > 0:
+            now = time.time()
+            envelope = {
+                _ENVELOPE_MARKER: True,
+                "value": value,
+                "refresh_at": now + ttl * (1 - early_refresh * random.random()),
+            }
+            await self.set(key, envelope, ttl=ttl + stale_ttl, tags=tags)
+        else:
+            await self.set(key, value, ttl=ttl, tags=tags)
+
+        return value
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        early_refresh: float,
+        tags: Optional[List[str]] = None,
+    ) -> None:
+        if self.single_flight.in_flight(key):
+            return
+
+        task = self.single_flight.start(
+            key, lambda: self._load_and_set(key, loader, ttl, stale_ttl, early_refresh, tags)
+        )
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
     async def delete(self, key: str) -> None:
         """Delete from all tiers"""
         await self.l1.delete(key)
-        self.l2.delete(key)
+        await self.l2.delete(key)
+        await self._broadcast(keys=[key])
         logger.debug(f"CACHE DELETE: {key}")
 
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Invalidate every entry registered under any of ``tags``.
+        Cost is proportional to the number of entries under those tags.
+        """
+        tag_keys = [self.TAG_PREFIX + tag for tag in tags]
+        keys: Set[str] = set()
+        for members in await asyncio.gather(*(self.l2.smembers(t) for t in tag_keys)):
+            keys |= members
+
+        for key in keys:
+            await self.l1.delete(key)
+        # Index sets may still name keys that already expired
+        removed = await self.l2.delete_many(keys)
+        await self.l2.delete_many(tag_keys)
+
+        if keys:
+            await self._broadcast(keys=sorted(keys))
+
+        logger.info(f"Invalidated {removed} keys tagged {', '.join(tags)}")
+        return removed
+
     async def invalidate_pattern(self, pattern: str) -> int:
         """
         Invalidate all keys matching pattern.
         Example: invalidate_pattern("user:123:*")
-        """
-        count = 0
 
+        Prefer invalidate_tags(); pattern matching has to scan every key.
+        """
         # L1: check all keys
-        keys_to_delete = [k for k in self.l1.cache.keys() if self._matches_pattern(k, pattern)]
-        for key in keys_to_delete:
-            await self.l1.delete(key)
-            count += 1
+        l1_count = self._invalidate_l1_pattern(pattern)
+
+        # L2: glob delete (SCAN on Redis)
+        l2_count = await self.l2.delete_pattern(pattern)
 
-        # L2: use Redis SCAN (in production)
-        # For now, just delete exact match
-        self.l2.delete(pattern)
-        count += 1
+        await self._broadcast(pattern=pattern)
 
+        count = max(l1_count, l2_count)
         logger.info(f"Invalidated {count} keys matching {pattern}")
         return count
 
+    def _invalidate_l1_pattern(self, pattern: str) -> int:
+        keys_to_delete = [k for k in self.l1.keys() if self._matches_pattern(k, pattern)]
+        for key in keys_to_delete:
+            self.l1.delete_nowait(key)
+        return len(keys_to_delete)
+
     def _matches_pattern(self, key: str, pattern: str) -> bool:
-        """Simple pattern matching (* wildcard)"""
-        if "*" not in pattern:
-            return key == pattern
+        """Redis-style glob matching (*, ?, [...])"""
+        return fnmatchcase(key, pattern)
+
+    async def start(self) -> None:
+        """Start receiving invalidations from other processes"""
+        await self.bus.start()
 
-        parts = pattern.split("*")
-        if len(parts) == 2:
-            return key.startswith(parts[0]) and key.endswith(parts[1])
+    async def stop(self) -> None:
+        await self.bus.stop()
 
-        return False
+    async def _broadcast(
+        self, keys: Optional[List[str]] = None, pattern: Optional[str] = None
+    ) -> None:
+        message: Dict[str, Any] = {"origin": self.instance_id}
+        if keys:
+            message["keys"] = keys
+        if pattern:
+            message["pattern"] = pattern
+        await self.bus.publish(message)
+
+    async def _on_invalidation(self, message: Dict[str, Any]) -> None:
+        """Drop L1 entries invalidated by another process"""
+        if message.get("origin") == self.instance_id:
+            return
+
+        for key in message.get("keys", []):
+            self.l1.delete_nowait(key)
+        if message.get("pattern"):
+            self._invalidate_l1_pattern(message["pattern"])
 
     def _track_access(self, key: str) -> None:
         """Track access patterns for predictive invalidation"""
@@ -221,6 +618,7 @@ class MultiTierCache:
         """Get comprehensive cache statistics"""
         return {
             "l1": self.l1.get_stats(),
+            "single_flight": self.single_flight.get_stats(),
             "hot_keys": self.get_hot_keys(5),
             "total_tracked_keys": len(self.access_patterns),
         }
@@ -247,12 +645,8 @@ class CacheWarmer:
         logger.info(f"Starting cache warming for {len(keys)} keys")
 
         async def warm_key(key: str):
-            value = await self.cache.get(key)
-            if value is None:
-                # Fetch from database
-                value = await query_func(key)
-                if value is not None:
-                    await self.cache.set(key, value, ttl=3600)
+            # Coalesces with any request already loading this key
+            await self.cache.get_or_load(key, lambda: query_func(key), ttl=3600)
 
         # Warm in parallel (rate-limited)
         semaphore = asyncio.Semaphore(10)  # Max 10 concurrent
@@ -286,17 +680,32 @@ class CacheWarmer:
 # Decorators for easy caching
 
 
-def cached(ttl: int = 300, key_prefix: str = "", skip_cache_if: Optional[Callable] = None):
+def cached(
+    ttl: int = 300,
+    key_prefix: str = "",
+    skip_cache_if: Optional[Callable] = None,
+    stale_ttl: int = 0,
+    early_refresh: float = 0.0,
+    tags: Optional[List[str]] = None,
+):
     """
     Decorator for caching function results.
 
+    Concurrent misses on the same key share a single execution of the wrapped
+    coroutine. ``stale_ttl`` enables stale-while-revalidate and
+    ``early_refresh`` adds jittered refresh ahead of expiry (see
+    ``MultiTierCache.get_or_load``). ``tags`` are format strings filled from
+    the call's arguments, e.g. ``"user:{user_id}"``.
+
     Usage:
-        @cached(ttl=600, key_prefix="user_profile")
+        @cached(ttl=600, key_prefix="user_profile", stale_ttl=60, tags=["user:{user_id}"])
         async def get_user_profile(user_id: int):
             return await fetch_from_db(user_id)
     """
 
     def decorator(func: Callable):
+        signature = inspect.signature(func)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key
@@ -307,41 +716,46 @@ def cached(ttl: int = 300, key_prefix: str = "", skip_cache_if: Optional[Callabl
             if skip_cache_if and skip_cache_if(*args, **kwargs):
                 return await func(*args, **kwargs)
 
-            # Try cache
-            cached_value = await multi_tier_cache.get(cache_key_hash)
-            if cached_value is not None:
-                return cached_value
-
-            # Execute function
-            result = await func(*args, **kwargs)
-
-            # Cache result
-            await multi_tier_cache.set(cache_key_hash, result, ttl=ttl)
-
-            return result
+            return await multi_tier_cache.get_or_load(
+                cache_key_hash,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                early_refresh=early_refresh,
+                tags=_format_tags(tags, signature, args, kwargs),
+            )
 
         return wrapper
 
     return decorator
 
 
-def invalidate_on_write(key_pattern: str):
+def invalidate_on_write(key_pattern: Optional[str] = None, tags: Optional[List[str]] = None):
     """
     Decorator to invalidate cache on write operations.
 
+    ``tags`` are format strings filled from the call's arguments and are
+    invalidated through the tag index; ``key_pattern`` falls back to a glob scan.
+
     Usage:
-        @invalidate_on_write("user:*")
+        @invalidate_on_write(tags=["user:{user_id}"])
         async def update_user(user_id: int, data: dict):
             ...
     """
 
     def decorator(func: Callable):
+        signature = inspect.signature(func)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             result = await func(*args, **kwargs)
 
             # Invalidate matching cache entries
-            await multi_tier_cache.invalidate_pattern(key_pattern)
+            resolved_tags = _format_tags(tags, signature, args, kwargs)
+            if resolved_tags:
+                await multi_tier_cache.invalidate_tags(*resolved_tags)
+            if key_pattern:
+                await multi_tier_cache.invalidate_pattern(key_pattern)
 
             return result
 
@@ -350,6 +764,18 @@ def invalidate_on_write(key_pattern: str):
     return decorator
 
 
+def _format_tags(
+    tags: Optional[List[str]], signature: inspect.Signature, args: tuple, kwargs: dict
+) -> Optional[List[str]]:
+    """Fill ``{param}`` placeholders in tag templates from a call's arguments"""
+    if not tags:
+        return None
+
+    bound = signature.bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+    return [tag.format(**bound.arguments) for tag in tags]
+
+
 # Global instances
 multi_tier_cache = MultiTierCache()
 cache_warmer = CacheWarmer(multi_tier_cache)
@@ -1,16 +1,37 @@
 """
 Pagination and filtering utilities for API endpoints.
+
+Two modes:
+- Offset (``paginate``): page numbers, fine for shallow pages of small lists
+- Keyset (``paginate_cursor``): opaque cursors over (sort key, id), constant
+  cost at any depth, for large tables such as leads
+
+Totals are exact only when asked for; otherwise they come from a short-lived
+cache or, on Postgres, the planner's row estimate.
 """
 
+import base64
+import hashlib
+import json
+import logging
+from datetime import date, datetime
 from math import ceil
-from typing import Any, Dict, Generic, List, Optional, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar
 
 from pydantic import BaseModel, Field
-from sqlalchemy import func, or_
-from sqlmodel import Select, Session, select
+from sqlalchemy import func, or_, text, tuple_
+from sqlmodel import Session, select
+from sqlmodel.sql.expression import Select
+
+from app.core.cache import cache
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# How long a counted total is reused across pages
+COUNT_CACHE_TTL = 60
+
 
 class PaginationParams(BaseModel):
     """Standard pagination parameters"""
@@ -20,6 +41,9 @@ class PaginationParams(BaseModel):
     offset: int = Field(default=0, ge=0, description="Items to skip")
     sort_by: Optional[str] = Field(default=None, description="Field to sort by")
     sort_order: str = Field(default="asc", description="Sort order: asc or desc")
+    exact_total: bool = Field(
+        default=False, description="Count the total exactly instead of using a cached estimate"
+    )
 
     @classmethod
     def from_query(
@@ -49,6 +73,7 @@ class PageInfo(BaseModel):
     items_per_page: int
     has_next: bool
     has_previous: bool
+    total_is_estimate: bool = False
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
@@ -63,6 +88,77 @@ class CursorParams(BaseModel):
 
     cursor: Optional[str] = Field(default=None, description="Cursor for next page")
     limit: int = Field(default=20, ge=1, le=100, description="Items per page")
+    sort_by: Optional[str] = Field(default=None, description="Field to sort by")
+    sort_order: str = Field(default="asc", description="Sort order: asc or desc")
+    exact_total: bool = Field(
+        default=False, description="Count the total exactly instead of using a cached estimate"
+    )
+
+
+class CursorPageInfo(BaseModel):
+    """Cursor pagination metadata"""
+
+    total_items: int
+    items_per_page: int
+    has_next: bool
+    has_previous: bool
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+    total_is_estimate: bool = False
+
+
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    """Cursor-paginated response envelope"""
+
+    data: List[T]
+    page_info: CursorPageInfo
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+    return value
+
+
+def encode_cursor(keys: List[Any], direction: str, sort_by: Optional[str], sort_order: str) -> str:
+    """
+    Opaque cursor for the row with the given keyset values
+
+    The sort it was issued for is embedded so it can't be replayed against a
+    different ordering.
+    """
+    payload = {
+        "k": [_encode_value(key) for key in keys],
+        "d": direction,
+        "s": sort_by,
+        "o": sort_order,
+    }
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        payload["k"] = [_decode_value(key) for key in payload["k"]]
+        if payload["d"] not in ("next", "prev"):
+            raise ValueError(payload["d"])
+        return payload
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
 
 
 class FilterBuilder:
@@ -131,6 +227,57 @@ class FilterBuilder:
         return [or_(*conditions)] if conditions else []
 
 
+def _count_cache_key(query: Select) -> str:
+    compiled = query.compile()
+    raw = f"{compiled}|{sorted(compiled.params.items(), key=lambda item: item[0])!r}"
+    return f"pagination:count:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+def _planner_estimate(session: Session, query: Select) -> Optional[int]:
+    """Row estimate from the Postgres planner, without running the query"""
+    dialect = session.get_bind().dialect
+    if dialect.name != "postgresql":
+        return None
+    try:
+        sql = query.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"Planner row estimate failed, counting instead: {e}")
+        return None
+
+
+def count_items(
+    session: Session, query: Select, exact: bool = False, ttl: int = COUNT_CACHE_TTL
+) -> Tuple[int, bool]:
+    """
+    Total rows a query returns.
+
+    Exact counts scan every matching row, so unless ``exact`` is set the
+    total comes from a cache shared by every page of the same query, then
+    from the Postgres planner estimate, and only then from a real count.
+
+    Returns:
+        Tuple of (total, is_estimate)
+    """
+    key = _count_cache_key(query)
+    if not exact:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, True
+        estimate = _planner_estimate(session, query)
+        if estimate is not None:
+            cache.set(key, estimate, ttl=ttl)
+            return estimate, True
+
+    count_query = select(func.count()).select_from(query.alias())
+    total = session.exec(count_query).one()
+    cache.set(key, total, ttl=ttl)
+    return total, False
+
+
 def paginate(
     session: Session, query: Select, params: PaginationParams, model_class: type = None
 ) -> tuple[List[Any], PageInfo]:
@@ -146,9 +293,8 @@ def paginate(
     Returns:
         Tuple of (results, page_info)
     """
-    # Get total count
-    count_query = select(func.count()).select_from(query.alias())
-    total_items = session.exec(count_query).one()
+    # Get total count (cached or estimated unless an exact total is requested)
+    total_items, total_is_estimate = count_items(session, query, exact=params.exact_total)
 
     # Apply sorting
     if params.sort_by and model_class:
@@ -159,9 +305,18 @@ def paginate(
             else:
                 query = query.order_by(sort_field.asc())
 
-    # Apply pagination
-    query = query.offset(params.offset).limit(params.limit)
-    results = session.exec(query).all()
+    # One extra row tells whether there is a next page, whatever the total says
+    query = query.offset(params.offset).limit(params.limit + 1)
+    results = list(session.exec(query).all())
+    has_next = len(results) > params.limit
+    results = results[: params.limit]
+
+    # Keep an estimated total consistent with the rows actually seen
+    seen = params.offset + len(results)
+    if results and not has_next:
+        total_items, total_is_estimate = seen, False
+    elif has_next and total_items <= seen:
+        total_items = seen + 1
 
     # Calculate metadata
     total_pages = ceil(total_items / params.limit) if params.limit > 0 else 0
@@ -171,13 +326,101 @@ def paginate(
         total_pages=total_pages,
         current_page=params.page,
         items_per_page=params.limit,
-        has_next=params.page < total_pages,
+        has_next=has_next,
         has_previous=params.page > 1,
+        total_is_estimate=total_is_estimate,
     )
 
     return results, page_info
 
 
+def paginate_cursor(
+    session: Session,
+    query: Select,
+    params: CursorParams,
+    model_class: type,
+    key_field: str = "id",
+) -> tuple[List[Any], CursorPageInfo]:
+    """
+    Keyset pagination: seek past the cursor row instead of skipping rows.
+
+    Rows are ordered by (sort_by, key_field) so ties on the sort column are
+    broken by the unique key; both columns should be indexed together and the
+    sort column non-null. Cursors work in both directions.
+
+    Args:
+        session: Database session
+        query: SQLModel select query (without ORDER BY/OFFSET/LIMIT)
+        params: Cursor parameters
+        model_class: Model class the query selects
+        key_field: Unique, non-null column used as the tie-breaker
+
+    Returns:
+        Tuple of (results, page_info)
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    key_column = getattr(model_class, key_field)
+    sort_column = getattr(model_class, params.sort_by, None) if params.sort_by else None
+    sort_by = params.sort_by if sort_column is not None else None
+    sort_order = params.sort_order.lower()
+    columns = [sort_column, key_column] if sort_column is not None else [key_column]
+    descending = sort_order == "desc"
+
+    # Total first, before the keyset condition narrows the query
+    total_items, total_is_estimate = count_items(session, query, exact=params.exact_total)
+
+    direction = "next"
+    if params.cursor:
+        cursor = decode_cursor(params.cursor)
+        if cursor["s"] != sort_by or cursor["o"] != sort_order:
+            raise ValueError("Cursor was issued for a different sort order")
+        if len(cursor["k"]) != len(columns):
+            raise ValueError("Invalid pagination cursor")
+        direction = cursor["d"]
+        # Walking backwards inverts the comparison and the ordering
+        after = descending == (direction == "prev")
+        row = tuple_(*columns) if len(columns) > 1 else columns[0]
+        bound = tuple_(*cursor["k"]) if len(columns) > 1 else cursor["k"][0]
+        query = query.where(row > bound if after else row < bound)
+
+    reverse = descending != (direction == "prev")
+    query = query.order_by(*(column.desc() if reverse else column.asc() for column in columns))
+
+    # One extra row tells whether there is another page in this direction
+    results = list(session.exec(query.limit(params.limit + 1)).all())
+    more = len(results) > params.limit
+    results = results[: params.limit]
+    if direction == "prev":
+        results.reverse()
+        has_next, has_previous = params.cursor is not None, more
+    else:
+        has_next, has_previous = more, params.cursor is not None
+
+    def keys(row: Any) -> List[Any]:
+        return [getattr(row, column.key) for column in columns]
+
+    page_info = CursorPageInfo(
+        next_cursor=(
+            encode_cursor(keys(results[-1]), "next", sort_by, sort_order)
+            if has_next and results
+            else None
+        ),
+        previous_cursor=(
+            encode_cursor(keys(results[0]), "prev", sort_by, sort_order)
+            if has_previous and results
+            else None
+        ),
+        has_next=has_next,
+        has_previous=has_previous,
+        items_per_page=params.limit,
+        total_items=total_items,
+        total_is_estimate=total_is_estimate,
+    )
+    return results, page_info
+
+
 def paginate_response(
     session: Session, query: Select, params: PaginationParams, model_class: type = None
 ) -> PaginatedResponse:
@@ -186,3 +429,17 @@ def paginate_response(
     """
     results, page_info = paginate(session, query, params, model_class)
     return PaginatedResponse(data=results, page_info=page_info)
+
+
+def paginate_cursor_response(
+    session: Session,
+    query: Select,
+    params: CursorParams,
+    model_class: type,
+    key_field: str = "id",
+) -> CursorPaginatedResponse:
+    """
+    Convenience function that returns a complete CursorPaginatedResponse.
+    """
+    results, page_info = paginate_cursor(session, query, params, model_class, key_field)
+    return CursorPaginatedResponse(data=results, page_info=page_info)
@@ -0,0 +1,134 @@
+"""
+Cross-Process Pub/Sub
+Message bus shared by L1 cache invalidation and WebSocket broadcast fan-out
+"""
+
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class PubSubBus(ABC):
+    """
+    Channel carrying small JSON-able dicts between worker processes.
+
+    Every subscriber of a bus receives every published message, including
+    the publisher's own; callers tag messages with an ``origin`` id to skip
+    their own echoes.
+    """
+
+    async def start(self) -> None:
+        """Begin receiving messages (no-op for in-process buses)"""
+
+    async def stop(self) -> None:
+        """Stop receiving messages"""
+
+    @abstractmethod
+    def subscribe(self, handler: Handler) -> None:
+        """Register a coroutine called with every message"""
+
+    @abstractmethod
+    async def publish(self, message: Dict[str, Any]) -> None:
+        """Send a message to every subscriber"""
+
+
+async def _dispatch(handlers: List[Handler], message: Dict[str, Any], channel: str) -> None:
+    for handler in list(handlers):
+        try:
+            await handler(message)
+        except Exception as e:
+            logger.error(f"Handler for {channel} failed: {e}")
+
+
+class InProcessPubSubBus(PubSubBus):
+    """
+    In-memory bus: every subscriber sees every message.
+    Used for single-process deployments and to simulate several workers in tests.
+    """
+
+    def __init__(self, channel: str = "local"):
+        self.channel = channel
+        self._handlers: List[Handler] = []
+
+    def subscribe(self, handler: Handler) -> None:
+        self._handlers.append(handler)
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        await _dispatch(self._handlers, message, self.channel)
+
+
+class RedisPubSubBus(PubSubBus):
+    """
+    Redis pub/sub bus
+
+    The listener resubscribes after a dropped connection, waiting
+    RECONNECT_SECONDS (doubling up to MAX_RECONNECT_SECONDS) between attempts.
+    Messages published while it is disconnected are lost.
+    """
+
+    RECONNECT_SECONDS = 1.0
+    MAX_RECONNECT_SECONDS = 30.0
+
+    def __init__(self, redis_url: str, channel: str):
+        self.redis_url = redis_url
+        self.channel = channel
+        self._handlers: List[Handler] = []
+        self._client = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def _get_client(self):
+        if self._client is None:
+            import redis.asyncio as aioredis
+
+            self._client = aioredis.from_url(self.redis_url)
+        return self._client
+
+    def subscribe(self, handler: Handler) -> None:
+        self._handlers.append(handler)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        try:
+            await self._get_client().publish(self.channel, json.dumps(message))
+        except Exception as e:
+            logger.error(f"Failed to publish to {self.channel}: {e}")
+
+    async def _listen(self) -> None:
+        delay = self.RECONNECT_SECONDS
+        while True:
+            pubsub = self._get_client().pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                delay = self.RECONNECT_SECONDS
+                async for raw in pubsub.listen():
+                    if raw.get("type") != "message":
+                        continue
+                    await _dispatch(self._handlers, json.loads(raw["data"]), self.channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Subscription to {self.channel} lost, retrying in {delay:.0f}s: {e}"
+                )
+            finally:
+                try:
+                    await pubsub.unsubscribe(self.channel)
+                    await pubsub.aclose()
+                except Exception as e:
+                    logger.debug(f"Closing subscription to {self.channel} failed: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RECONNECT_SECONDS)
@@ -107,15 +107,33 @@ class QueryCache:
 
     @staticmethod
     def set(key: str, value: Any, ttl: int = DEFAULT_TTL):
-        """Cache query result"""
+        """Cache query result and index it under its prefix"""
         cache.set(key, value, ttl=ttl)
+        prefix = QueryCache._prefix_of(key)
+        if prefix:
+            cache.sadd(QueryCache._tag_key(prefix), key, ttl=max(ttl, QueryCache.DEFAULT_TTL))
 
     @staticmethod
-    def invalidate(prefix: str):
+    def invalidate(prefix: str) -> int:
         """Invalidate all cached queries with prefix"""
-        pattern = f"query:{prefix}:*"
-        # In production, use Redis SCAN to find and delete keys
-        logger.info(f"Invalidating cache pattern: {pattern}")
+        tag_key = QueryCache._tag_key(prefix)
+        keys = cache.smembers(tag_key)
+        removed = cache.delete_many(keys)
+        cache.delete(tag_key)
+        logger.info(f"Invalidated {removed} cached queries for prefix: {prefix}")
+        return removed
+
+    @staticmethod
+    def _tag_key(prefix: str) -> str:
+        return f"query-index:{prefix}"
+
+    @staticmethod
+    def _prefix_of(key: str) -> Optional[str]:
+        """Extract ``prefix`` from keys shaped like ``query:{prefix}:{hash}``"""
+        parts = key.split(":")
+        if len(parts) >= 3 and parts[0] == "query":
+            return ":".join(parts[1:-1])
+        return None
 
     @staticmethod
     def cached_query(prefix: str, ttl: int = DEFAULT_TTL):
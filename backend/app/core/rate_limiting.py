@@ -0,0 +1,355 @@
+"""
+Rate limiting engine.
+
+Token-bucket and sliding-window-counter algorithms with atomic, all-or-nothing
+checks across several limits at once (e.g. per-minute burst plus the hourly
+and daily limits of the caller's plan). State lives in Redis (one Lua call per
+request) when the cache backend is Redis, otherwise in a bounded in-process
+LRU. Either way a check is a handful of dict operations or one round-trip.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.cache import RedisAsyncCache, async_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``limit`` units per ``window_seconds``"""
+
+    limit: int
+    window_seconds: int
+    name: str = "default"
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a check, reported for the tightest limit"""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+
+    def headers(self) -> Dict[str, str]:
+        """Standard ``X-RateLimit-*`` response headers"""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, self.remaining)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+def _tightest(results: List[RateLimitResult], allowed: bool) -> RateLimitResult:
+    tightest = min(results, key=lambda r: (r.remaining, -r.reset_after))
+    retry_after = max((r.retry_after for r in results), default=0.0)
+    return RateLimitResult(
+        allowed=allowed,
+        limit=tightest.limit,
+        remaining=0 if not allowed else tightest.remaining,
+        reset_after=tightest.reset_after,
+        retry_after=retry_after if not allowed else 0.0,
+    )
+
+
+# ============================================================================
+# In-process store
+# ============================================================================
+
+
+class LocalRateLimitStore:
+    """
+    Bounded in-process state for both algorithms.
+    Least recently used keys are dropped once ``max_keys`` is reached, so
+    memory stays flat no matter how many distinct clients show up.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._state: OrderedDict = OrderedDict()
+
+    def _slot(self, key: str, default: list) -> list:
+        slot = self._state.get(key)
+        if slot is None:
+            slot = default
+            self._state[key] = slot
+            if len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+        else:
+            self._state.move_to_end(key)
+        return slot
+
+    def sliding_window(
+        self, key: str, limits: Sequence[RateLimit], cost: int, now: float
+    ) -> RateLimitResult:
+        slots = []
+        results = []
+        allowed = True
+        for rl in limits:
+            window = rl.window_seconds
+            index = int(now // window)
+            # [window_index, current_count, previous_count]
+            slot = self._slot(f"{key}:{rl.name}:{window}", [index, 0, 0])
+            if slot[0] != index:
+                slot[2] = slot[1] if slot[0] == index - 1 else 0
+                slot[1] = 0
+                slot[0] = index
+
+            elapsed = now - index * window
+            estimate = slot[2] * (1 - elapsed / window) + slot[1]
+            ok = estimate + cost <= rl.limit
+            allowed = allowed and ok
+            slots.append(slot)
+            results.append((rl, estimate, window - elapsed))
+
+        if allowed:
+            for slot in slots:
+                slot[1] += cost
+
+        return _tightest(
+            [
+                RateLimitResult(
+                    allowed=allowed,
+                    limit=rl.limit,
+                    remaining=int(rl.limit - estimate - (cost if allowed else 0)),
+                    reset_after=reset_after,
+                    retry_after=reset_after if estimate + cost > rl.limit else 0.0,
+                )
+                for rl, estimate, reset_after in results
+            ],
+            allowed,
+        )
+
+    def token_bucket(
+        self, key: str, limits: Sequence[RateLimit], cost: int, now: float
+    ) -> RateLimitResult:
+        buckets = []
+        allowed = True
+        for rl in limits:
+            rate = rl.limit / rl.window_seconds
+            # [tokens, last_refill]
+            bucket = self._slot(f"{key}:{rl.name}:{rl.window_seconds}", [float(rl.limit), now])
+            bucket[0] = min(float(rl.limit), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            allowed = allowed and bucket[0] >= cost
+            buckets.append((rl, rate, bucket))
+
+        if allowed:
+            for _, _, bucket in buckets:
+                bucket[0] -= cost
+
+        return _tightest(
+            [
+                RateLimitResult(
+                    allowed=allowed,
+                    limit=rl.limit,
+                    remaining=int(bucket[0]),
+                    reset_after=(rl.limit - bucket[0]) / rate,
+                    retry_after=max(0.0, (cost - bucket[0]) / rate),
+                )
+                for rl, rate, bucket in buckets
+            ],
+            allowed,
+        )
+
+
+# ============================================================================
+# Redis store
+# ============================================================================
+
+# KEYS: (current, previous) window counters per limit
+# ARGV: cost, then (limit, previous_weight, ttl_ms) per limit
+# Returns: {allowed, estimate_1, estimate_2, ...}
+_SLIDING_WINDOW_LUA = """
+local cost = tonumber(ARGV[1])
+local n = #KEYS / 2
+local estimates = {}
+local allowed = 1
+for i = 1, n do
+    local limit = tonumber(ARGV[(i - 1) * 3 + 2])
+    local weight = tonumber(ARGV[(i - 1) * 3 + 3])
+    local curr = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local prev = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    local estimate = prev * weight + curr
+    if estimate + cost > limit then
+        allowed = 0
+    end
+    estimates[i] = tostring(estimate)
+end
+if allowed == 1 then
+    for i = 1, n do
+        redis.call('INCRBY', KEYS[2 * i - 1], cost)
+        redis.call('PEXPIRE', KEYS[2 * i - 1], tonumber(ARGV[(i - 1) * 3 + 4]))
+    end
+end
+table.insert(estimates, 1, allowed)
+return estimates
+"""
+
+# KEYS: one hash per limit holding tokens (t) and last refill ms (ts)
+# ARGV: now_ms, cost, then (capacity, rate_per_ms, ttl_ms) per limit
+# Returns: {allowed, tokens_1, tokens_2, ...}
+_TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local tokens = {}
+local allowed = 1
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[(i - 1) * 3 + 3])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 4])
+    local state = redis.call('HMGET', KEYS[i], 't', 'ts')
+    local t = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    t = math.min(capacity, t + math.max(0, now - ts) * rate)
+    if t < cost then
+        allowed = 0
+    end
+    tokens[i] = t
+end
+for i = 1, #KEYS do
+    if allowed == 1 then
+        tokens[i] = tokens[i] - cost
+    end
+    redis.call('HSET', KEYS[i], 't', tostring(tokens[i]), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], tonumber(ARGV[(i - 1) * 3 + 5]))
+    tokens[i] = tostring(tokens[i])
+end
+table.insert(tokens, 1, allowed)
+return tokens
+"""
+
+
+class RedisRateLimitStore:
+    """Shared state in Redis; each check is one atomic script call"""
+
+    def __init__(self, client):
+        self.client = client
+        self._sliding_window = client.register_script(_SLIDING_WINDOW_LUA)
+        self._token_bucket = client.register_script(_TOKEN_BUCKET_LUA)
+
+    async def sliding_window(
+        self, key: str, limits: Sequence[RateLimit], cost: int, now: float
+    ) -> RateLimitResult:
+        keys: List[str] = []
+        args: List = [cost]
+        windows: List[Tuple[RateLimit, float]] = []
+        for rl in limits:
+            window = rl.window_seconds
+            index = int(now // window)
+            elapsed = now - index * window
+            keys += [f"{key}:{rl.name}:{window}:{index}", f"{key}:{rl.name}:{window}:{index - 1}"]
+            args += [rl.limit, 1 - elapsed / window, window * 2000]
+            windows.append((rl, window - elapsed))
+
+        reply = await self._sliding_window(keys=keys, args=args)
+        allowed = int(reply[0]) == 1
+        estimates = [float(v) for v in reply[1:]]
+
+        return _tightest(
+            [
+                RateLimitResult(
+                    allowed=allowed,
+                    limit=rl.limit,
+                    remaining=int(rl.limit - estimate - (cost if allowed else 0)),
+                    reset_after=reset_after,
+                    retry_after=reset_after if estimate + cost > rl.limit else 0.0,
+                )
+                for (rl, reset_after), estimate in zip(windows, estimates)
+            ],
+            allowed,
+        )
+
+    async def token_bucket(
+        self, key: str, limits: Sequence[RateLimit], cost: int, now: float
+    ) -> RateLimitResult:
+        now_ms = int(now * 1000)
+        keys = [f"{key}:{rl.name}:{rl.window_seconds}:tb" for rl in limits]
+        args: List = [now_ms, cost]
+        for rl in limits:
+            args += [rl.limit, rl.limit / (rl.window_seconds * 1000), rl.window_seconds * 1000]
+
+        reply = await self._token_bucket(keys=keys, args=args)
+        allowed = int(reply[0]) == 1
+        tokens = [float(v) for v in reply[1:]]
+
+        results = []
+        for rl, remaining in zip(limits, tokens):
+            rate = rl.limit / rl.window_seconds
+            results.append(
+                RateLimitResult(
+                    allowed=allowed,
+                    limit=rl.limit,
+                    remaining=int(remaining),
+                    reset_after=(rl.limit - remaining) / rate,
+                    retry_after=max(0.0, (cost - remaining) / rate),
+                )
+            )
+        return _tightest(results, allowed)
+
+
+# ============================================================================
+# Engine
+# ============================================================================
+
+
+class RateLimitEngine:
+    """
+    Front door for rate-limit checks.
+
+    Uses Redis when the shared cache is Redis and falls back to the local
+    store if Redis errors, so an outage degrades to per-process limits rather
+    than failing requests.
+    """
+
+    ALGORITHMS = ("sliding_window", "token_bucket")
+
+    def __init__(
+        self,
+        algorithm: str = "sliding_window",
+        redis_client=None,
+        max_local_keys: int = 100_000,
+    ):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+
+        self.algorithm = algorithm
+        self.local = LocalRateLimitStore(max_keys=max_local_keys)
+        self.redis = RedisRateLimitStore(redis_client) if redis_client is not None else None
+
+    async def hit(
+        self,
+        key: str,
+        limits: Sequence[RateLimit],
+        cost: int = 1,
+        now: Optional[float] = None,
+    ) -> RateLimitResult:
+        """
+        Consume ``cost`` units from every limit, or none if any would be
+        exceeded.
+        """
+        now = time.time() if now is None else now
+
+        if self.redis is not None:
+            try:
+                return await getattr(self.redis, self.algorithm)(key, limits, cost, now)
+            except Exception as e:
+                logger.warning(f"Redis rate limiting failed, using local state: {e}")
+
+        return getattr(self.local, self.algorithm)(key, limits, cost, now)
+
+
+def create_rate_limit_engine(algorithm: str = "sliding_window") -> RateLimitEngine:
+    """Build an engine sharing the Redis connection pool of ``async_cache`` if any"""
+    client = async_cache.client if isinstance(async_cache, RedisAsyncCache) else None
+    return RateLimitEngine(algorithm=algorithm, redis_client=client)
@@ -2,7 +2,7 @@ import logging
 import re
 import time
 import uuid
-from collections import defaultdict
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import wraps
 from typing import Callable, Dict, List, Optional
@@ -15,8 +15,10 @@ from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoin
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
+from app.core.api_gateway import RateLimiter
 from app.core.cache import cache
 from app.core.config import settings
+from app.core.rate_limiting import RateLimit, create_rate_limit_engine
 from app.models.user import ROLE_PERMISSIONS, Permission, User, UserRole
 
 # Password hashing context
@@ -135,61 +137,106 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
-    Per-user rate limiter using Redis for distributed rate limiting.
+    Per-user rate limiter backed by the shared rate limit engine.
     Falls back to IP-based limiting for unauthenticated requests.
+
+    Every caller gets the ``max_requests``/``window_seconds`` burst limit
+    plus a plan's hourly and daily limits: authenticated callers the plan in
+    the token's ``tier`` claim via ``RateLimiter.get_limits``, anonymous
+    callers and tokens without a known tier the free plan, so signing in
+    never tightens a caller's limits. ``route_costs`` maps path prefixes to
+    the number of units a request consumes.
     """
 
-    def __init__(self, app, max_requests: int = 100, window_seconds: int = 60):
+    def __init__(
+        self,
+        app,
+        max_requests: int = 100,
+        window_seconds: int = 60,
+        algorithm: str = "sliding_window",
+        route_costs: Optional[Dict[str, int]] = None,
+        token_cache_size: int = 10000,
+    ):
         super().__init__(app)
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(list)  # Fallback for when Redis unavailable
+        self.engine = create_rate_limit_engine(algorithm)
+        self.burst_limit = RateLimit(max_requests, window_seconds, name="burst")
+        # Longest prefix first so specific routes win
+        self.route_costs = sorted((route_costs or {}).items(), key=lambda x: -len(x[0]))
+        self.token_cache_size = token_cache_size
+        # token -> (subject, tier, exp); avoids re-verifying the JWT per request
+        self._token_cache: OrderedDict = OrderedDict()
+        self._tier_limits = {
+            tier: (
+                RateLimit(limits["requests_per_hour"], 3600, name=f"{tier}:hour"),
+                RateLimit(limits["requests_per_day"], 86400, name=f"{tier}:day"),
+            )
+            for tier, limits in RateLimiter.TIERS.items()
+        }
+        self._default_tier = next(
+            tier
+            for tier, limits in RateLimiter.TIERS.items()
+            if limits is RateLimiter.get_limits(None)
+        )
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        # Try to get user from Authorization header
-        user_key = None
+    def _identify(self, request: Request) -> tuple:
+        """Return (rate limit key, plan tier) for the caller"""
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
-            try:
-                token = auth_header.split(" ")[1]
-                payload = jwt.decode(
-                    token, settings.secret_key, algorithms=[settings.jwt_algorithm]
-                )
-                user_key = f"ratelimit:user:{payload.get('sub')}"
-            except:
-                pass
-
-        # Fallback to IP-based rate limiting
-        if not user_key:
-            client_ip = request.client.host if request.client else "unknown"
-            user_key = f"ratelimit:ip:{client_ip}"
-
+            token = auth_header[7:]
+            claims = self._decode_token(token)
+            if claims is not None:
+                subject, tier = claims
+                if tier not in self._tier_limits:
+                    tier = self._default_tier
+                return f"ratelimit:user:{subject}", tier
+
+        client_ip = request.client.host if request.client else "unknown"
+        return f"ratelimit:ip:{client_ip}", self._default_tier
+
+    def _decode_token(self, token: str) -> Optional[tuple]:
         now = time.time()
+        cached = self._token_cache.get(token)
+        if cached is not None:
+            subject, tier, exp = cached
+            if exp is None or exp > now:
+                return subject, tier
+            self._token_cache.pop(token, None)
+            return None
 
-        # Try Redis first
         try:
-            count = cache.get(user_key) or 0
-            if count >= self.max_requests:
-                return JSONResponse(
-                    {"detail": "Rate limit exceeded. Try again later."},
-                    status_code=429,
-                    headers={
-                        "X-RateLimit-Limit": str(self.max_requests),
-                        "X-RateLimit-Remaining": "0",
-                    },
-                )
-            cache.set(user_key, count + 1, ttl=self.window_seconds)
-        except:
-            # Fallback to in-memory
-            self.requests[user_key] = [
-                ts for ts in self.requests[user_key] if now - ts < self.window_seconds
-            ]
-            if len(self.requests[user_key]) >= self.max_requests:
-                return JSONResponse({"detail": "Rate limit exceeded"}, status_code=429)
-            self.requests[user_key].append(now)
+            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+        except Exception:
+            return None
+
+        entry = (payload.get("sub"), payload.get("tier"), payload.get("exp"))
+        self._token_cache[token] = entry
+        if len(self._token_cache) > self.token_cache_size:
+            self._token_cache.popitem(last=False)
+        return entry[0], entry[1]
+
+    def _cost(self, path: str) -> int:
+        for prefix, cost in self.route_costs:
+            if path.startswith(prefix):
+                return cost
+        return 1
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        key, tier = self._identify(request)
+
+        limits = [self.burst_limit, *self._tier_limits[tier]]
+
+        result = await self.engine.hit(key, limits, cost=self._cost(request.url.path))
+        if not result.allowed:
+            return JSONResponse(
+                {"detail": "Rate limit exceeded. Try again later."},
+                status_code=429,
+                headers=result.headers(),
+            )
 
         response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(self.max_requests)
+        response.headers.update(result.headers())
         return response
 
 
@@ -259,6 +306,7 @@ async def get_current_user(
                 "email": email,
                 "name": payload.get("name", "User"),
                 "role": payload.get("role", UserRole.USER.value),
+                "tier": payload.get("tier", "free"),
                 "is_active": payload.get("is_active", True),
                 "created_at": datetime.now().isoformat(),
             }
@@ -2,7 +2,7 @@
 
 import os
 from datetime import datetime
-from typing import BinaryIO, Optional
+from typing import BinaryIO, Dict, List, Optional
 
 import boto3
 import magic
@@ -11,6 +11,92 @@ from botocore.exceptions import ClientError
 from app.core.config import settings
 
 
+class MultipartUpload:
+    """
+    Writable S3 object uploaded in parts as data arrives.
+
+    Holds at most one part in memory. S3 needs every part but the last to be
+    at least 5MB.
+    """
+
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(
+        self,
+        s3_client,
+        bucket_name: str,
+        file_key: str,
+        content_type: str,
+        metadata: Optional[Dict[str, str]] = None,
+        part_size: int = 8 * 1024 * 1024,
+    ):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.file_key = file_key
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+        self.bytes_written = 0
+        self._buffer = bytearray()
+        self._parts: List[dict] = []
+        try:
+            response = s3_client.create_multipart_upload(
+                Bucket=bucket_name,
+                Key=file_key,
+                ContentType=content_type,
+                Metadata=metadata or {},
+            )
+        except ClientError as e:
+            raise Exception(f"Failed to upload file: {str(e)}")
+        self.upload_id = response["UploadId"]
+
+    def _upload_part(self, data: bytes) -> None:
+        part_number = len(self._parts) + 1
+        try:
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=self.file_key,
+                UploadId=self.upload_id,
+                PartNumber=part_number,
+                Body=data,
+            )
+        except ClientError as e:
+            raise Exception(f"Failed to upload file: {str(e)}")
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def write(self, data: bytes) -> int:
+        """Buffer data, uploading a part each time a full one is available."""
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return len(data)
+
+    def complete(self) -> dict:
+        """Upload the remaining bytes as the last part and assemble the object."""
+        if self._buffer or not self._parts:
+            self._upload_part(bytes(self._buffer))
+            self._buffer.clear()
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.file_key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+        except ClientError as e:
+            raise Exception(f"Failed to upload file: {str(e)}")
+        return {"file_key": self.file_key, "size": self.bytes_written, "parts": len(self._parts)}
+
+    def abort(self) -> None:
+        """Discard the parts uploaded so far."""
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=self.file_key, UploadId=self.upload_id
+            )
+        except ClientError as e:
+            print(f"Failed to abort upload: {str(e)}")
+
+
 class FileStorageService:
     """Service for handling file uploads and storage."""
 
@@ -105,6 +191,18 @@ class FileStorageService:
         except ClientError as e:
             raise Exception(f"Failed to upload file: {str(e)}")
 
+    def start_multipart_upload(
+        self,
+        file_key: str,
+        content_type: str,
+        metadata: Optional[Dict[str, str]] = None,
+        part_size: int = 8 * 1024 * 1024,
+    ) -> MultipartUpload:
+        """Start a streamed upload for content too large to buffer (e.g. exports)."""
+        return MultipartUpload(
+            self.s3_client, self.bucket_name, file_key, content_type, metadata, part_size
+        )
+
     def generate_presigned_url(self, file_key: str, expiration: int = 3600) -> str:
         """Generate presigned URL for file access."""
         try:
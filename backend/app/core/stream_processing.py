@@ -34,38 +34,52 @@ class BackpressureBuffer:
         self.max_size = max_size
         self.strategy = strategy  # drop_oldest, drop_newest, block
         self.dropped_count = 0
-        self._lock = asyncio.Lock()
+        self._cond = asyncio.Condition()
 
     async def put(self, item: Any) -> bool:
         """
         Add item to buffer with backpressure handling.
         Returns True if added, False if dropped.
         """
-        async with self._lock:
+        async with self._cond:
             if len(self.buffer) >= self.max_size:
                 if self.strategy == "drop_oldest":
                     self.buffer.popleft()
                     self.buffer.append(item)
                     self.dropped_count += 1
+                    self._cond.notify_all()
                     return True
                 elif self.strategy == "drop_newest":
                     self.dropped_count += 1
                     return False
                 elif self.strategy == "block":
-                    # Wait for space (with timeout)
-                    await asyncio.sleep(0.1)
-                    return await self.put(item)
-            else:
-                self.buffer.append(item)
-                return True
+                    # Wait for a consumer to make space
+                    await self._cond.wait_for(lambda: len(self.buffer) < self.max_size)
+
+            self.buffer.append(item)
+            self._cond.notify_all()
+            return True
 
     async def get(self) -> Optional[Any]:
         """Get item from buffer"""
-        async with self._lock:
+        async with self._cond:
             if self.buffer:
-                return self.buffer.popleft()
+                item = self.buffer.popleft()
+                self._cond.notify_all()
+                return item
             return None
 
+    async def get_wait(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Wait for an item; returns None if ``timeout`` expires first"""
+        async with self._cond:
+            try:
+                await asyncio.wait_for(self._cond.wait_for(lambda: self.buffer), timeout)
+            except asyncio.TimeoutError:
+                return None
+            item = self.buffer.popleft()
+            self._cond.notify_all()
+            return item
+
     def size(self) -> int:
         """Current buffer size"""
         return len(self.buffer)
@@ -436,7 +450,8 @@ async def campaign_metrics_stream(campaign_id: str) -> AsyncIterator[Dict[str, A
             EventType.EMAIL_SENT,
             EventType.EMAIL_OPENED,
             EventType.EMAIL_CLICKED,
-        ]
+        ],
+        follow=True,
     )
 
     # Convert to StreamEvent format
@@ -0,0 +1,556 @@
+"""
+Quantized Vector Index
+
+In-process approximate nearest-neighbour search for similarity lookups that
+shouldn't leave the process (lookalike leads, similar accounts):
+- Unit vectors stored as int8 codes with a per-vector scale (4x smaller than
+  float32), optionally memory-mapped from disk
+- IVF: k-means centroids split each partition into lists; a query scans only
+  the ``nprobe`` closest lists
+- Filtered top-k over numeric and categorical attributes
+- Incremental insert, update and delete; lists are retrained as a partition
+  outgrows its clustering
+- One index per partition key (org), created on first insert
+- Saved on a timer and at shutdown, only when something changed
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import zlib
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# A where-clause value is either an exact match or an inclusive (low, high) range
+# where either bound may be None
+Where = Dict[str, Any]
+
+
+def _normalize(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class QuantizedIVFIndex:
+    """
+    IVF index over int8-quantized unit vectors (cosine similarity)
+
+    Below ``min_train_size`` vectors the index is scanned exhaustively; the
+    int8 matrix product is fast enough there and clustering would be noise.
+
+    Args:
+        dim: Vector dimension
+        path: Directory for the memory-mapped codes and saved metadata
+            (None keeps everything in memory)
+        nprobe: Lists scanned per query
+        min_train_size: Vectors needed before clustering
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        path: Optional[str] = None,
+        nprobe: int = 16,
+        min_train_size: int = 4096,
+    ):
+        self.dim = dim
+        self.path = path
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+
+        self._capacity = 0
+        self._size = 0  # High-water mark of used slots
+        self._codes = np.zeros((0, dim), dtype=np.int8)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._list_of = np.zeros(0, dtype=np.int32)
+        self._attributes: Dict[str, np.ndarray] = {}
+        self._vocab: Dict[str, Dict[str, int]] = {}  # Categorical attribute value codes
+
+        self._ids: List[Optional[Hashable]] = []
+        self._slots: Dict[Hashable, int] = {}
+        self._free: List[int] = []
+        self._payloads: Dict[Hashable, Any] = {}
+
+        self._centroids: Optional[np.ndarray] = None
+        self._members: List[List[int]] = []
+        self._member_arrays: List[Optional[np.ndarray]] = []
+        self._trained_at = 0
+        self._dirty = False  # Changed since the last save
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            if os.path.exists(os.path.join(path, "meta.json")):
+                self._load()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._slots
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @property
+    def _codes_file(self) -> str:
+        return os.path.join(self.path, "vectors.int8")
+
+    def _map_codes(self, capacity: int) -> np.ndarray:
+        """Codes matrix for ``capacity`` rows, growing the backing file if needed"""
+        if self.path is None:
+            codes = np.zeros((capacity, self.dim), dtype=np.int8)
+            codes[: self._size] = self._codes[: self._size]
+            return codes
+        nbytes = capacity * self.dim
+        with open(self._codes_file, "ab") as f:
+            if f.tell() < nbytes:
+                f.truncate(nbytes)
+        return np.memmap(self._codes_file, dtype=np.int8, mode="r+", shape=(capacity, self.dim))
+
+    def _grow(self, capacity: int) -> None:
+        if isinstance(self._codes, np.memmap):
+            self._codes.flush()
+        self._codes = self._map_codes(capacity)
+        grow = capacity - self._capacity
+        self._scales = np.concatenate([self._scales, np.zeros(grow, dtype=np.float32)])
+        self._alive = np.concatenate([self._alive, np.zeros(grow, dtype=bool)])
+        self._list_of = np.concatenate([self._list_of, np.full(grow, -1, dtype=np.int32)])
+        for name, column in self._attributes.items():
+            self._attributes[name] = np.concatenate([column, np.full(grow, np.nan)])
+        self._ids.extend([None] * grow)
+        self._capacity = capacity
+
+    def _attribute_value(self, name: str, value: Any) -> float:
+        if value is None:
+            return np.nan
+        if isinstance(value, (bool, int, float, np.number)):
+            return float(value)
+        vocab = self._vocab.setdefault(name, {})
+        return float(vocab.setdefault(str(value), len(vocab)))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(
+        self,
+        item_id: Hashable,
+        vector,
+        attributes: Optional[Dict[str, Any]] = None,
+        payload: Any = None,
+    ) -> None:
+        """Insert a vector, replacing any existing one with the same ID"""
+        self.add_many([item_id], [vector], [attributes or {}], [payload])
+
+    def add_many(
+        self,
+        item_ids: List[Hashable],
+        vectors,
+        attributes: Optional[List[Dict[str, Any]]] = None,
+        payloads: Optional[List[Any]] = None,
+    ) -> None:
+        """Insert vectors in bulk (quantized and assigned to lists in one pass)"""
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(item_ids), -1)
+        if matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {matrix.shape[1]}")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms > 0, norms, 1.0)
+        attributes = attributes or [{}] * len(item_ids)
+        payloads = payloads or [None] * len(item_ids)
+
+        # An ID repeated within the batch keeps its last vector
+        last = {item_id: i for i, item_id in enumerate(item_ids)}
+        if len(last) < len(item_ids):
+            keep = sorted(last.values())
+            item_ids = [item_ids[i] for i in keep]
+            attributes = [attributes[i] for i in keep]
+            payloads = [payloads[i] for i in keep]
+            matrix = matrix[keep]
+
+        slots = []
+        for item_id in item_ids:
+            if item_id in self._slots:
+                self.remove(item_id)
+            if self._free:
+                slots.append(self._free.pop())
+                continue
+            if self._size == self._capacity:
+                self._grow(max(1024, self._capacity * 2))
+            slots.append(self._size)
+            self._size += 1
+        slots = np.array(slots, dtype=np.int64)
+
+        scales = np.abs(matrix).max(axis=1) / 127
+        scales[scales == 0] = 1.0
+        self._codes[slots] = np.round(matrix / scales[:, None]).astype(np.int8)
+        self._scales[slots] = scales
+        self._alive[slots] = True
+        for slot, item_id, attrs, payload in zip(slots.tolist(), item_ids, attributes, payloads):
+            for name, value in attrs.items():
+                column = self._attributes.get(name)
+                if column is None:
+                    column = self._attributes[name] = np.full(self._capacity, np.nan)
+                column[slot] = self._attribute_value(name, value)
+            self._ids[slot] = item_id
+            self._slots[item_id] = slot
+            if payload is not None:
+                self._payloads[item_id] = payload
+        self._dirty = True
+
+        if len(self._slots) >= max(self.min_train_size, 4 * self._trained_at):
+            self.train()
+        elif self._centroids is not None:
+            self._assign(slots)
+
+    def remove(self, item_id: Hashable) -> bool:
+        """Delete a vector; returns False if the ID isn't indexed"""
+        slot = self._slots.pop(item_id, None)
+        if slot is None:
+            return False
+        self._alive[slot] = False
+        for column in self._attributes.values():
+            column[slot] = np.nan
+        self._ids[slot] = None
+        self._payloads.pop(item_id, None)
+        list_id = self._list_of[slot]
+        if list_id >= 0:
+            self._members[list_id].remove(slot)
+            self._member_arrays[list_id] = None
+            self._list_of[slot] = -1
+        self._free.append(slot)
+        self._dirty = True
+        return True
+
+    def _vectors(self, slots: np.ndarray) -> np.ndarray:
+        """Dequantized vectors for slots"""
+        return self._codes[slots].astype(np.float32) * self._scales[slots, None]
+
+    def train(self, iterations: int = 10, seed: int = 0) -> None:
+        """(Re)cluster the index into about 4 * sqrt(n) lists with spherical k-means"""
+        slots = np.flatnonzero(self._alive[: self._size])
+        n = len(slots)
+        if n == 0:
+            return
+        nlist = int(min(4096, max(16, 4 * np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample = self._vectors(rng.choice(slots, size=min(n, nlist * 64), replace=False))
+        centroids = sample[rng.choice(len(sample), size=min(nlist, len(sample)), replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty lists keep their old centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+        self._centroids = centroids.astype(np.float32)
+        self._members = [[] for _ in range(len(centroids))]
+        self._member_arrays = [None] * len(centroids)
+        self._list_of[:] = -1
+        for start in range(0, n, 65536):
+            self._assign(slots[start : start + 65536])
+        self._trained_at = n
+        self._dirty = True
+        logger.info(f"Trained vector index: {n} vectors in {len(centroids)} lists")
+
+    def _assign(self, slots: np.ndarray) -> None:
+        lists = np.argmax(self._vectors(slots) @ self._centroids.T, axis=1)
+        self._list_of[slots] = lists
+        for slot, list_id in zip(slots.tolist(), lists.tolist()):
+            self._members[list_id].append(slot)
+            self._member_arrays[list_id] = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _list_slots(self, list_id: int) -> np.ndarray:
+        array = self._member_arrays[list_id]
+        if array is None:
+            array = self._member_arrays[list_id] = np.array(self._members[list_id], dtype=np.int64)
+        return array
+
+    def _where_mask(self, slots: np.ndarray, where: Where) -> np.ndarray:
+        mask = np.ones(len(slots), dtype=bool)
+        for name, condition in where.items():
+            column = self._attributes.get(name)
+            if column is None:
+                return np.zeros(len(slots), dtype=bool)
+            values = column[slots]
+            if isinstance(condition, tuple):
+                low, high = condition
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            elif isinstance(condition, (bool, int, float, np.number)):
+                mask &= values == float(condition)
+            else:
+                code = self._vocab.get(name, {}).get(str(condition))
+                if code is None:
+                    return np.zeros(len(slots), dtype=bool)
+                mask &= values == code
+        return mask
+
+    def search(
+        self,
+        vector,
+        k: int = 10,
+        where: Optional[Where] = None,
+        exclude: Optional[List[Hashable]] = None,
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Top-k (item_id, cosine similarity) pairs, best first
+
+        When filters leave fewer than k candidates in the probed lists, more
+        lists are probed until k are found or the partition is exhausted.
+        """
+        if not self._slots or k <= 0:
+            return []
+        query = _normalize(vector)
+        excluded = {self._slots[i] for i in (exclude or []) if i in self._slots}
+
+        nprobe = self.nprobe
+        while True:
+            if self._centroids is None:
+                candidates = np.flatnonzero(self._alive[: self._size])
+            else:
+                nlist = len(self._centroids)
+                nprobe = min(nprobe, nlist)
+                closeness = self._centroids @ query
+                probe = np.argpartition(-closeness, nprobe - 1)[:nprobe]
+                candidates = np.concatenate([self._list_slots(i) for i in probe])
+            if where:
+                candidates = candidates[self._where_mask(candidates, where)]
+            if excluded:
+                candidates = candidates[~np.isin(candidates, list(excluded))]
+            exhausted = self._centroids is None or nprobe >= len(self._centroids)
+            if len(candidates) >= k or exhausted:
+                break
+            nprobe *= 4
+
+        if len(candidates) == 0:
+            return []
+        scores = (self._codes[candidates].astype(np.float32) @ query) * self._scales[candidates]
+        top = min(k, len(scores))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        return [(self._ids[candidates[i]], float(scores[i])) for i in best]
+
+    def get_vector(self, item_id: Hashable) -> Optional[np.ndarray]:
+        """Dequantized stored vector"""
+        slot = self._slots.get(item_id)
+        return None if slot is None else self._vectors(np.array([slot]))[0]
+
+    def get_payload(self, item_id: Hashable) -> Any:
+        return self._payloads.get(item_id)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def save(self) -> None:
+        """
+        Flush codes and write the metadata needed to reopen the index
+
+        Metadata is rewritten in full, so callers save on a timer or at
+        shutdown rather than after every insert; a clean index is skipped.
+        Payload values JSON can't represent (datetimes, decimals) are stored
+        as strings and come back as strings after a reload.
+        """
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            self.write(snapshot)
+
+    def snapshot(self) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        """
+        Copy the metadata to save, or None if there is nothing to save
+
+        Cheap next to writing it, so the copy can be taken on the event loop
+        and handed to ``write`` in a worker thread while inserts continue.
+        """
+        if self.path is None or not self._dirty:
+            return None
+        self._dirty = False
+        arrays = {
+            "scales": self._scales[: self._size].copy(),
+            "alive": self._alive[: self._size].copy(),
+            "list_of": self._list_of[: self._size].copy(),
+        }
+        for name, column in self._attributes.items():
+            arrays[f"attr_{name}"] = column[: self._size].copy()
+        if self._centroids is not None:
+            arrays["centroids"] = self._centroids
+        meta = {
+            "dim": self.dim,
+            "size": self._size,
+            "trained_at": self._trained_at,
+            "ids": self._ids[: self._size],
+            "vocab": {name: dict(codes) for name, codes in self._vocab.items()},
+            "attributes": list(self._attributes),
+            "payloads": list(self._payloads.items()),
+        }
+        return arrays, meta
+
+    def write(self, snapshot: Tuple[Dict[str, np.ndarray], Dict[str, Any]]) -> None:
+        """Write a snapshot taken by ``snapshot``"""
+        arrays, meta = snapshot
+        if isinstance(self._codes, np.memmap):
+            self._codes.flush()
+        np.savez(os.path.join(self.path, "meta.npz"), **arrays)
+        # Write then rename so a crash mid-save leaves the previous metadata readable
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, default=str)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def _load(self) -> None:
+        with open(os.path.join(self.path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim:
+            raise ValueError(f"Index at {self.path} has dimension {meta['dim']}, not {self.dim}")
+        arrays = np.load(os.path.join(self.path, "meta.npz"))
+        size = meta["size"]
+        capacity = max(1024, size)
+        self._size = size
+        self._codes = self._map_codes(capacity)
+        self._capacity = capacity
+        pad = capacity - size
+        self._scales = np.concatenate([arrays["scales"], np.zeros(pad, dtype=np.float32)])
+        self._alive = np.concatenate([arrays["alive"], np.zeros(pad, dtype=bool)])
+        self._list_of = np.concatenate([arrays["list_of"], np.full(pad, -1, dtype=np.int32)])
+        for name in meta["attributes"]:
+            self._attributes[name] = np.concatenate([arrays[f"attr_{name}"], np.full(pad, np.nan)])
+        self._vocab = meta["vocab"]
+        self._ids = meta["ids"] + [None] * pad
+        self._slots = {
+            item_id: slot for slot, item_id in enumerate(meta["ids"]) if item_id is not None
+        }
+        self._free = [slot for slot in range(size) if not self._alive[slot]]
+        self._payloads = {item_id: payload for item_id, payload in meta["payloads"]}
+        self._trained_at = meta["trained_at"]
+        if "centroids" in arrays:
+            self._centroids = arrays["centroids"]
+            self._members = [[] for _ in range(len(self._centroids))]
+            self._member_arrays = [None] * len(self._centroids)
+            for slot in np.flatnonzero(self._list_of[:size] >= 0).tolist():
+                self._members[self._list_of[slot]].append(slot)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "vectors": len(self),
+            "lists": 0 if self._centroids is None else len(self._centroids),
+            "bytes": int(self._size * (self.dim + 4)),
+            "memory_mapped": isinstance(self._codes, np.memmap),
+        }
+
+
+class PartitionedVectorIndex:
+    """
+    One QuantizedIVFIndex per partition key (e.g. org_id)
+
+    ``start`` saves changed partitions every SAVE_INTERVAL_SECONDS in a worker
+    thread; ``stop`` cancels the timer and saves whatever is left.
+
+    Args:
+        dim: Vector dimension
+        directory: Root for memory-mapped partitions (None keeps them in memory)
+        **index_kwargs: Passed to each QuantizedIVFIndex
+    """
+
+    SAVE_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, dim: int, directory: Optional[str] = None, **index_kwargs):
+        self.dim = dim
+        self.directory = directory
+        self.index_kwargs = index_kwargs
+        self._partitions: Dict[str, QuantizedIVFIndex] = {}
+        self._saver: Optional[asyncio.Task] = None
+
+    def _path(self, key: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        # Readable prefix plus a checksum so distinct keys never share a directory
+        safe = re.sub(r"[^A-Za-z0-9_-]", "_", key)[:64]
+        return os.path.join(self.directory, f"{safe}-{zlib.crc32(key.encode()):08x}")
+
+    def partition(self, key: str, create: bool = False) -> Optional[QuantizedIVFIndex]:
+        index = self._partitions.get(key)
+        if index is None:
+            path = self._path(key)
+            if create or (path is not None and os.path.exists(os.path.join(path, "meta.json"))):
+                index = self._partitions[key] = QuantizedIVFIndex(
+                    self.dim, path=path, **self.index_kwargs
+                )
+        return index
+
+    def add(
+        self,
+        key: str,
+        item_id: Hashable,
+        vector,
+        attributes: Optional[Dict[str, Any]] = None,
+        payload: Any = None,
+    ) -> None:
+        self.partition(key, create=True).add(item_id, vector, attributes, payload)
+
+    def remove(self, key: str, item_id: Hashable) -> bool:
+        index = self.partition(key)
+        return index.remove(item_id) if index is not None else False
+
+    def search(
+        self,
+        key: str,
+        vector,
+        k: int = 10,
+        where: Optional[Where] = None,
+        exclude: Optional[List[Hashable]] = None,
+    ) -> List[Tuple[Hashable, float]]:
+        index = self.partition(key)
+        return index.search(vector, k, where, exclude) if index is not None else []
+
+    def save(self) -> None:
+        for index in list(self._partitions.values()):
+            index.save()
+
+    async def save_async(self) -> None:
+        """Save changed partitions without blocking the event loop on file I/O"""
+        for index in list(self._partitions.values()):
+            snapshot = index.snapshot()
+            if snapshot is None:
+                continue
+            try:
+                await asyncio.to_thread(index.write, snapshot)
+            except Exception as e:
+                index._dirty = True
+                logger.error(f"Failed to save vector index {index.path}: {e}")
+
+    async def start(self) -> None:
+        if self.directory and self._saver is None:
+            self._saver = asyncio.create_task(self._save_periodically())
+
+    async def stop(self) -> None:
+        if self._saver is not None:
+            self._saver.cancel()
+            self._saver = None
+        await self.save_async()
+
+    async def _save_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.SAVE_INTERVAL_SECONDS)
+            await self.save_async()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {key: index.get_stats() for key, index in self._partitions.items()}
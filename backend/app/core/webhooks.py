@@ -1,17 +1,58 @@
 """Webhook system for external integrations."""
 
+import asyncio
 import hashlib
+import heapq
 import hmac
+import itertools
 import json
-from datetime import datetime
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from uuid import uuid4
 
 import httpx
 from pydantic import BaseModel
-from sqlalchemy import JSON, Boolean, Column, DateTime, Integer, String
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    update,
+)
+from sqlmodel import Session, select
 
+from app.core.api_gateway import CircuitBreaker, CircuitState
+from app.core.config import settings
 from app.core.db import Base
+from app.core.metrics import (
+    webhook_deliveries_total,
+    webhook_delivery_duration_seconds,
+    webhook_delivery_lag_seconds,
+)
+from app.models.webhook_delivery import WebhookDeliveryRecord
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 
 class WebhookEvent(str, Enum):
@@ -42,6 +83,10 @@ class Webhook(Base):
     failure_count = Column(Integer, default=0)
     max_retries = Column(Integer, default=3)
     timeout_seconds = Column(Integer, default=30)
+    # Events per request; above 1 the subscriber receives {"event": "batch", "deliveries": [...]}
+    batch_size = Column(Integer, default=1)
+    # Requests in flight to this endpoint at once
+    max_concurrency = Column(Integer, default=2)
 
 
 class WebhookPayload(BaseModel):
@@ -53,93 +98,768 @@ class WebhookPayload(BaseModel):
     webhook_id: int
 
 
-class WebhookService:
-    """Service for managing and triggering webhooks."""
+@dataclass
+class WebhookDelivery:
+    """One event queued for one endpoint"""
+
+    id: int
+    webhook_id: int
+    event: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+    next_attempt_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    lease_token: Optional[str] = None
+    last_error: Optional[str] = None
+
+
+class WebhookDeliveryQueue:
+    """
+    In-process delivery queue, partitioned by endpoint.
+
+    Each webhook has its own heap ordered by next attempt time, so a
+    backlog for one endpoint never delays another. Retries are scheduled
+    by re-queueing with a later next_attempt_at rather than by sleeping.
+    """
+
+    def __init__(self, dead_letter_limit: int = 1000):
+        self._partitions: Dict[int, List[Tuple[datetime, int]]] = {}
+        self._pending: Dict[int, WebhookDelivery] = {}
+        self._leased: Dict[int, WebhookDelivery] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.dead_letters: deque = deque(maxlen=dead_letter_limit)
+        self.delivered = 0
+
+    def _push(self, delivery: WebhookDelivery) -> None:
+        self._pending[delivery.id] = delivery
+        heapq.heappush(
+            self._partitions.setdefault(delivery.webhook_id, []),
+            (delivery.next_attempt_at, delivery.id),
+        )
+
+    def enqueue_many(self, items: List[Tuple[int, str, Dict[str, Any]]]) -> List[int]:
+        """Queue ``(webhook_id, event, payload)`` items for immediate delivery"""
+        with self._lock:
+            ids = []
+            for webhook_id, event, payload in items:
+                delivery = WebhookDelivery(next(self._ids), webhook_id, event, payload)
+                self._push(delivery)
+                ids.append(delivery.id)
+            return ids
+
+    def due_partitions(self, now: Optional[datetime] = None, limit: int = 100) -> List[int]:
+        """Endpoints with at least one delivery due"""
+        now = now or datetime.utcnow()
+        with self._lock:
+            due = [wid for wid, heap in self._partitions.items() if heap and heap[0][0] <= now]
+            return due[:limit]
+
+    def next_due_at(self) -> Optional[datetime]:
+        with self._lock:
+            heads = [heap[0][0] for heap in self._partitions.values() if heap]
+            return min(heads) if heads else None
+
+    def lease(
+        self,
+        webhook_id: int,
+        limit: int,
+        lease_seconds: int = 60,
+        now: Optional[datetime] = None,
+    ) -> List[WebhookDelivery]:
+        """Take up to ``limit`` due deliveries for one endpoint, oldest first"""
+        now = now or datetime.utcnow()
+        with self._lock:
+            heap = self._partitions.get(webhook_id)
+            leased = []
+            while heap and heap[0][0] <= now and len(leased) < limit:
+                _, delivery_id = heapq.heappop(heap)
+                delivery = self._pending.pop(delivery_id)
+                delivery.lease_token = uuid4().hex
+                self._leased[delivery_id] = delivery
+                leased.append(delivery)
+            if heap is not None and not heap:
+                del self._partitions[webhook_id]
+            return leased
+
+    def ack(self, deliveries: List[WebhookDelivery]) -> None:
+        with self._lock:
+            for delivery in deliveries:
+                if self._leased.pop(delivery.id, None) is not None:
+                    self.delivered += 1
+
+    def retry(self, delivery: WebhookDelivery, retry_at: datetime, error: str) -> None:
+        """Put a leased delivery back, due again at ``retry_at``"""
+        with self._lock:
+            if self._leased.pop(delivery.id, None) is None:
+                return
+            delivery.attempts += 1
+            delivery.next_attempt_at = retry_at
+            delivery.last_error = error
+            delivery.lease_token = None
+            self._push(delivery)
+
+    def dead_letter(self, delivery: WebhookDelivery, error: str) -> None:
+        """Give up on a leased delivery"""
+        with self._lock:
+            if self._leased.pop(delivery.id, None) is None:
+                return
+            delivery.attempts += 1
+            delivery.last_error = error
+            self.dead_letters.append(delivery)
+
+    def postpone(self, webhook_id: int, until: datetime) -> None:
+        """Hold every pending delivery for an endpoint until ``until``"""
+        with self._lock:
+            heap = self._partitions.get(webhook_id)
+            if not heap:
+                return
+            for delivery_id in [delivery_id for _, delivery_id in heap]:
+                delivery = self._pending[delivery_id]
+                delivery.next_attempt_at = max(delivery.next_attempt_at, until)
+            self._partitions[webhook_id] = [
+                (self._pending[delivery_id].next_attempt_at, delivery_id) for _, delivery_id in heap
+            ]
+            heapq.heapify(self._partitions[webhook_id])
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "leased": len(self._leased),
+            "endpoints": len(self._partitions),
+            "delivered": self.delivered,
+            "dead_lettered": len(self.dead_letters),
+        }
+
+
+class SQLWebhookDeliveryQueue(WebhookDeliveryQueue):
+    """
+    Delivery queue persisted in the ``webhook_deliveries`` table.
+
+    Survives restarts and can be drained by several processes: deliveries
+    are leased with a compare-and-set on next_attempt_at, which moves to the
+    lease expiry so a delivery whose dispatcher died becomes due again.
+    Delivered and dead-lettered rows are kept with their final status.
+    The table is created by migration 006.
+    """
+
+    def __init__(self, db_engine=None):
+        if db_engine is None:
+            from app.core.db import engine as db_engine
+        self.engine = db_engine
+
+    def _session(self) -> Session:
+        return Session(self.engine)
 
     @staticmethod
-    def generate_signature(payload: dict, secret: str) -> str:
-        """Generate HMAC signature for webhook payload."""
-        payload_str = json.dumps(payload, sort_keys=True)
-        signature = hmac.new(secret.encode(), payload_str.encode(), hashlib.sha256).hexdigest()
-        return signature
+    def _to_delivery(record: WebhookDeliveryRecord) -> WebhookDelivery:
+        return WebhookDelivery(
+            id=record.id,
+            webhook_id=record.webhook_id,
+            event=record.event,
+            payload=json.loads(record.payload),
+            attempts=record.attempts,
+            next_attempt_at=record.next_attempt_at,
+            created_at=record.created_at,
+            lease_token=record.lease_token,
+            last_error=record.last_error,
+        )
+
+    def enqueue_many(self, items: List[Tuple[int, str, Dict[str, Any]]]) -> List[int]:
+        with self._session() as session:
+            records = [
+                WebhookDeliveryRecord(
+                    webhook_id=webhook_id, event=event, payload=json.dumps(payload, default=str)
+                )
+                for webhook_id, event, payload in items
+            ]
+            session.add_all(records)
+            session.commit()
+            return [record.id for record in records]
+
+    def _pending_query(self, now: datetime):
+        return select(WebhookDeliveryRecord).where(
+            WebhookDeliveryRecord.status == "pending",
+            WebhookDeliveryRecord.next_attempt_at <= now,
+        )
+
+    def due_partitions(self, now: Optional[datetime] = None, limit: int = 100) -> List[int]:
+        now = now or datetime.utcnow()
+        with self._session() as session:
+            return list(
+                session.exec(
+                    select(WebhookDeliveryRecord.webhook_id)
+                    .where(
+                        WebhookDeliveryRecord.status == "pending",
+                        WebhookDeliveryRecord.next_attempt_at <= now,
+                    )
+                    .distinct()
+                    .limit(limit)
+                ).all()
+            )
+
+    def next_due_at(self) -> Optional[datetime]:
+        with self._session() as session:
+            return session.exec(
+                select(func.min(WebhookDeliveryRecord.next_attempt_at)).where(
+                    WebhookDeliveryRecord.status == "pending"
+                )
+            ).one()
+
+    def lease(
+        self,
+        webhook_id: int,
+        limit: int,
+        lease_seconds: int = 60,
+        now: Optional[datetime] = None,
+    ) -> List[WebhookDelivery]:
+        now = now or datetime.utcnow()
+        expires_at = now + timedelta(seconds=lease_seconds)
+        leased = []
+        with self._session() as session:
+            records = session.exec(
+                self._pending_query(now)
+                .where(WebhookDeliveryRecord.webhook_id == webhook_id)
+                .order_by(WebhookDeliveryRecord.next_attempt_at, WebhookDeliveryRecord.id)
+                .limit(limit)
+            ).all()
+            for record in records:
+                token = uuid4().hex
+                claimed = session.execute(
+                    update(WebhookDeliveryRecord)
+                    .where(
+                        WebhookDeliveryRecord.id == record.id,
+                        WebhookDeliveryRecord.next_attempt_at == record.next_attempt_at,
+                    )
+                    .values(next_attempt_at=expires_at, lease_token=token)
+                )
+                if claimed.rowcount == 1:
+                    delivery = self._to_delivery(record)
+                    delivery.lease_token = token
+                    leased.append(delivery)
+            session.commit()
+        return leased
+
+    def _finish(self, delivery: WebhookDelivery, **values) -> None:
+        with self._session() as session:
+            session.execute(
+                update(WebhookDeliveryRecord)
+                .where(
+                    WebhookDeliveryRecord.id == delivery.id,
+                    WebhookDeliveryRecord.lease_token == delivery.lease_token,
+                )
+                .values(lease_token=None, **values)
+            )
+            session.commit()
+
+    def ack(self, deliveries: List[WebhookDelivery]) -> None:
+        with self._session() as session:
+            for delivery in deliveries:
+                session.execute(
+                    update(WebhookDeliveryRecord)
+                    .where(
+                        WebhookDeliveryRecord.id == delivery.id,
+                        WebhookDeliveryRecord.lease_token == delivery.lease_token,
+                    )
+                    .values(
+                        status="delivered",
+                        lease_token=None,
+                        attempts=delivery.attempts + 1,
+                        delivered_at=datetime.utcnow(),
+                    )
+                )
+            session.commit()
+
+    def retry(self, delivery: WebhookDelivery, retry_at: datetime, error: str) -> None:
+        self._finish(
+            delivery,
+            attempts=delivery.attempts + 1,
+            next_attempt_at=retry_at,
+            last_error=error[:500],
+        )
+
+    def dead_letter(self, delivery: WebhookDelivery, error: str) -> None:
+        self._finish(
+            delivery, status="failed", attempts=delivery.attempts + 1, last_error=error[:500]
+        )
+
+    def postpone(self, webhook_id: int, until: datetime) -> None:
+        with self._session() as session:
+            session.execute(
+                update(WebhookDeliveryRecord)
+                .where(
+                    WebhookDeliveryRecord.webhook_id == webhook_id,
+                    WebhookDeliveryRecord.status == "pending",
+                    WebhookDeliveryRecord.next_attempt_at < until,
+                )
+                .values(next_attempt_at=until)
+            )
+            session.commit()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._session() as session:
+            counts = dict(
+                session.exec(
+                    select(WebhookDeliveryRecord.status, func.count()).group_by(
+                        WebhookDeliveryRecord.status
+                    )
+                ).all()
+            )
+            return {
+                "pending": counts.get("pending", 0),
+                "delivered": counts.get("delivered", 0),
+                "dead_lettered": counts.get("failed", 0),
+            }
+
+
+def create_webhook_queue() -> WebhookDeliveryQueue:
+    """Queue for ``settings.webhook_queue_backend`` ("memory" or "database")"""
+    if settings.webhook_queue_backend == "database":
+        return SQLWebhookDeliveryQueue()
+    return WebhookDeliveryQueue()
+
+
+class WebhookEndpointStore:
+    """
+    Reads and updates endpoints in the ``webhooks`` table.
+
+    The table is reflected rather than mapped, because its schema comes from
+    the SQLModel ``Webhook`` in app.models.enhanced_models (events stored
+    comma-separated) rather than the ``Webhook`` model here. The per-endpoint
+    delivery settings (max_retries, timeout_seconds, batch_size,
+    max_concurrency) are columns there, added to existing tables by migration
+    010; NULLs, or a table that predates them, fall back to ``DEFAULTS``.
+    Only columns the table actually has are read or written.
+    """
+
+    DEFAULTS = {"max_retries": 3, "timeout_seconds": 30, "batch_size": 1, "max_concurrency": 2}
+
+    # Reflected once per engine and shared by every store on it
+    _tables: "weakref.WeakKeyDictionary[Any, Table]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, db_engine=None):
+        if db_engine is None:
+            from app.core.db import engine as db_engine
+        self.engine = db_engine
+
+    @property
+    def table(self) -> Table:
+        table = self._tables.get(self.engine)
+        if table is None:
+            table = Table("webhooks", MetaData(), autoload_with=self.engine)
+            self._tables[self.engine] = table
+        return table
 
     @staticmethod
-    async def trigger_webhook(
-        webhook: Webhook,
-        event: WebhookEvent,
-        data: Dict[str, Any],
-        retry_count: int = 0,
-    ) -> bool:
-        """Trigger a webhook with payload."""
-        if not webhook.is_active:
-            return False
+    def _events(value: Any) -> List[str]:
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = value.split(",")
+        return [str(event).strip() for event in value or [] if str(event).strip()]
 
-        if event not in webhook.events:
-            return False
+    def _to_webhook(self, row: Dict[str, Any]) -> Webhook:
+        values = dict(self.DEFAULTS)
+        for name in Webhook.__table__.columns.keys():
+            if row.get(name) is not None:
+                values[name] = row[name]
+        values["events"] = self._events(row.get("events"))
+        return Webhook(**values)
+
+    def load(self, webhook_id: int) -> Optional[Webhook]:
+        """Current configuration of one endpoint, or None if it was deleted"""
+        table = self.table
+        with self.engine.connect() as connection:
+            row = connection.execute(select(table).where(table.c.id == webhook_id)).first()
+        return self._to_webhook(dict(row._mapping)) if row is not None else None
+
+    def list_active(self) -> List[Webhook]:
+        table = self.table
+        with self.engine.connect() as connection:
+            rows = connection.execute(select(table).where(table.c.is_active == True)).all()
+        return [self._to_webhook(dict(row._mapping)) for row in rows]
+
+    def save(self, webhook_id: int, **values) -> None:
+        """Update delivery state (failure count, last delivery, ...) where the table has it"""
+        table = self.table
+        values = {name: value for name, value in values.items() if name in table.c}
+        if not values:
+            return
+        with self.engine.begin() as connection:
+            connection.execute(update(table).where(table.c.id == webhook_id).values(**values))
+
+
+class WebhookDispatcher:
+    """
+    Drains the delivery queue in the background.
+
+    Every endpoint with due deliveries is drained by its own task, capped at
+    the webhook's ``max_concurrency`` requests and guarded by a per-endpoint
+    circuit breaker, so a slow or failing subscriber only backs up its own
+    partition. Requests reuse one pooled (HTTP/2 where available) client per
+    host. Failed deliveries are re-queued with jittered exponential backoff.
+
+    Endpoint configuration is re-read every ``ENDPOINT_TTL`` seconds, so
+    edits, secret rotation and deactivation take effect without a restart;
+    failure counts and deactivation are written back to the table.
+    """
+
+    # Consecutive failures before the endpoint's circuit opens, and for how long
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_TIMEOUT = 60
+    # Failures (across deliveries) after which a webhook is deactivated
+    DISABLE_AFTER_FAILURES = 10
+    MAX_BACKOFF_SECONDS = 3600
+    # Seconds an endpoint's configuration is cached before it is re-read
+    ENDPOINT_TTL = 30.0
+    # Seconds to hold an endpoint's deliveries when its configuration cannot be read
+    LOAD_RETRY_SECONDS = 30
+
+    def __init__(
+        self,
+        queue: WebhookDeliveryQueue,
+        endpoints: Optional[WebhookEndpointStore] = None,
+        lease_seconds: int = 120,
+        idle_interval: float = 5.0,
+        max_active_endpoints: int = 100,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.queue = queue
+        self.transport = transport
+        self.lease_seconds = lease_seconds
+        self.idle_interval = idle_interval
+        self.max_active_endpoints = max_active_endpoints
+        self.endpoints = endpoints or WebhookEndpointStore()
+        self._endpoints: Dict[int, Tuple[float, Webhook]] = {}
+        self._breakers: Dict[int, CircuitBreaker] = {}
+
+        # Loop-bound resources, recreated if used from a new event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._active: Dict[int, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._clients = {}
+            self._active = {}
+            self._wakeup = asyncio.Event()
+            self._task = None
+
+    def register(self, webhook: Webhook) -> None:
+        """Cache an endpoint's configuration for delivery"""
+        self._endpoints[webhook.id] = (time.monotonic(), webhook)
+
+    async def _endpoint(self, webhook_id: int) -> Optional[Webhook]:
+        """
+        Cached endpoint configuration, re-read once it is ``ENDPOINT_TTL`` old
+
+        Returns None if the webhook no longer exists; errors reading it propagate.
+        """
+        cached = self._endpoints.get(webhook_id)
+        if cached is not None and time.monotonic() - cached[0] < self.ENDPOINT_TTL:
+            return cached[1]
+        webhook = await asyncio.to_thread(self.endpoints.load, webhook_id)
+        if webhook is None:
+            self._endpoints.pop(webhook_id, None)
+        else:
+            self.register(webhook)
+        return webhook
+
+    async def _save_endpoint(self, webhook: Webhook, **values) -> None:
+        try:
+            await asyncio.to_thread(self.endpoints.save, webhook.id, **values)
+        except Exception as e:
+            logger.error(f"Failed to update webhook {webhook.id}: {e}")
+
+    def _breaker(self, webhook_id: int) -> CircuitBreaker:
+        breaker = self._breakers.get(webhook_id)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=self.CIRCUIT_FAILURE_THRESHOLD, timeout=self.CIRCUIT_TIMEOUT
+            )
+            self._breakers[webhook_id] = breaker
+        return breaker
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """Pooled client shared by every endpoint on the same host"""
+        self._bind_loop()
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(key)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                transport=self.transport,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+            self._clients[key] = client
+        return client
+
+    async def enqueue(
+        self, webhooks: List[Webhook], event: WebhookEvent, data: Dict[str, Any]
+    ) -> int:
+        """Queue ``event`` for each webhook and wake the dispatcher"""
+        timestamp = datetime.utcnow().isoformat()
+        items = []
+        for webhook in webhooks:
+            self.register(webhook)
+            payload = {
+                "event": WebhookEvent(event).value,
+                "data": data,
+                "timestamp": timestamp,
+                "webhook_id": webhook.id,
+            }
+            items.append((webhook.id, payload["event"], payload))
+        if not items:
+            return 0
+        await asyncio.to_thread(self.queue.enqueue_many, items)
+        self.wake()
+        return len(items)
+
+    def wake(self) -> None:
+        if self._wakeup is not None and self._loop is asyncio.get_running_loop():
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        self._bind_loop()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._loop is not asyncio.get_running_loop():
+            return
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._active.values()):
+            task.cancel()
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients = {}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.dispatch_due()
+                next_due = await asyncio.to_thread(self.queue.next_due_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook dispatch failed: {e}")
+                next_due = None
+
+            timeout = self.idle_interval
+            if next_due is not None:
+                timeout = min(timeout, max((next_due - datetime.utcnow()).total_seconds(), 0.05))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def dispatch_due(self, now: Optional[datetime] = None) -> List[asyncio.Task]:
+        """Start a drain task for every endpoint with due deliveries"""
+        self._bind_loop()
+        started = []
+        for webhook_id in await asyncio.to_thread(
+            self.queue.due_partitions, now, self.max_active_endpoints
+        ):
+            if webhook_id in self._active or len(self._active) >= self.max_active_endpoints:
+                continue
+            task = asyncio.create_task(self._drain(webhook_id, now))
+            self._active[webhook_id] = task
+            task.add_done_callback(lambda _, wid=webhook_id: self._active.pop(wid, None))
+            started.append(task)
+        return started
+
+    async def run_once(self, now: Optional[datetime] = None) -> None:
+        """Deliver everything currently due and wait for it to finish"""
+        await asyncio.gather(*await self.dispatch_due(now))
+
+    async def _drain(self, webhook_id: int, now: Optional[datetime] = None) -> None:
+        try:
+            webhook = await self._endpoint(webhook_id)
+        except Exception as e:
+            # Not knowing the endpoint is no reason to drop its deliveries
+            logger.error(f"Failed to load webhook {webhook_id}: {e}")
+            retry_at = datetime.utcnow() + timedelta(seconds=self.LOAD_RETRY_SECONDS)
+            await asyncio.to_thread(self.queue.postpone, webhook_id, retry_at)
+            return
+        if webhook is None or not webhook.is_active:
+            for delivery in await asyncio.to_thread(
+                self.queue.lease, webhook_id, 1000, self.lease_seconds, now
+            ):
+                await asyncio.to_thread(
+                    self.queue.dead_letter, delivery, "webhook removed or inactive"
+                )
+                webhook_deliveries_total.labels(outcome="failed").inc()
+            return
 
-        # Prepare payload
-        payload = {
-            "event": event,
-            "data": data,
+        breaker = self._breaker(webhook_id)
+        batch_size = max(webhook.batch_size or 1, 1)
+        while True:
+            if not breaker.allow_request():
+                # The breaker keeps local time; the queue is scheduled in UTC
+                elapsed = (datetime.now() - breaker.last_failure_time).total_seconds()
+                reopen_at = datetime.utcnow() + timedelta(seconds=max(breaker.timeout - elapsed, 0))
+                await asyncio.to_thread(self.queue.postpone, webhook_id, reopen_at)
+                return
+
+            # A half-open circuit gets a single probe request
+            slots = 1 if breaker.state == CircuitState.HALF_OPEN else webhook.max_concurrency or 1
+            deliveries = await asyncio.to_thread(
+                self.queue.lease, webhook_id, slots * batch_size, self.lease_seconds, now
+            )
+            if not deliveries:
+                return
+            batches = [
+                deliveries[i : i + batch_size] for i in range(0, len(deliveries), batch_size)
+            ]
+            await asyncio.gather(*(self._send(webhook, batch) for batch in batches))
+
+    @staticmethod
+    def _batch_payload(webhook: Webhook, batch: List[WebhookDelivery]) -> Dict[str, Any]:
+        if len(batch) == 1 and (webhook.batch_size or 1) <= 1:
+            return batch[0].payload
+        return {
+            "event": "batch",
+            "deliveries": [delivery.payload for delivery in batch],
             "timestamp": datetime.utcnow().isoformat(),
             "webhook_id": webhook.id,
         }
 
-        # Generate signature
-        signature = WebhookService.generate_signature(payload, webhook.secret)
+    def _backoff(self, attempt: int, retry_after: str = "") -> float:
+        if retry_after.isdigit():
+            return float(retry_after)
+        delay = min(2**attempt, self.MAX_BACKOFF_SECONDS)
+        return delay * random.uniform(0.5, 1.5)
 
+    async def _send(self, webhook: Webhook, batch: List[WebhookDelivery]) -> bool:
+        payload = self._batch_payload(webhook, batch)
+        body = json.dumps(payload, sort_keys=True, default=str)
         headers = {
             "Content-Type": "application/json",
-            "X-Webhook-Signature": signature,
-            "X-Webhook-Event": event,
+            "X-Webhook-Signature": WebhookService.generate_signature(payload, webhook.secret),
+            "X-Webhook-Event": payload["event"],
+            "X-Webhook-Delivery": ",".join(str(delivery.id) for delivery in batch),
             "User-Agent": "Enterprise-Webhook/1.0",
         }
 
+        started = time.perf_counter()
+        retry_after = ""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    webhook.url,
-                    json=payload,
-                    headers=headers,
-                    timeout=webhook.timeout_seconds,
+            response = await self.client_for(webhook.url).post(
+                webhook.url, content=body, headers=headers, timeout=webhook.timeout_seconds
+            )
+            ok = 200 <= response.status_code < 300
+            error = None if ok else f"HTTP {response.status_code}"
+            retry_after = response.headers.get("Retry-After", "")
+        except Exception as e:
+            ok, error = False, f"{type(e).__name__}: {e}"
+        webhook_delivery_duration_seconds.labels(outcome="success" if ok else "failure").observe(
+            time.perf_counter() - started
+        )
+
+        breaker = self._breaker(webhook.id)
+        if ok:
+            breaker.record_success()
+            webhook.last_triggered = datetime.utcnow()
+            webhook.failure_count = 0
+            await asyncio.to_thread(self.queue.ack, batch)
+            await self._save_endpoint(
+                webhook,
+                last_triggered=webhook.last_triggered,
+                last_success=webhook.last_triggered,
+                failure_count=0,
+            )
+            for delivery in batch:
+                webhook_delivery_lag_seconds.observe(
+                    (webhook.last_triggered - delivery.created_at).total_seconds()
                 )
+            webhook_deliveries_total.labels(outcome="delivered").inc(len(batch))
+            return True
 
-                if response.status_code >= 200 and response.status_code < 300:
-                    # Success
-                    webhook.last_triggered = datetime.utcnow()
-                    webhook.failure_count = 0
-                    return True
-                else:
-                    # Failed
-                    webhook.failure_count += 1
+        logger.warning(f"Webhook {webhook.id} delivery failed: {error}")
+        breaker.record_failure()
+        webhook.failure_count = (webhook.failure_count or 0) + 1
+        if webhook.failure_count >= self.DISABLE_AFTER_FAILURES:
+            webhook.is_active = False
+            logger.warning(f"Webhook {webhook.id} deactivated after repeated failures")
+        await self._save_endpoint(
+            webhook,
+            last_triggered=datetime.utcnow(),
+            last_failure=datetime.utcnow(),
+            failure_count=webhook.failure_count,
+            is_active=webhook.is_active,
+        )
 
-                    # Retry logic
-                    if retry_count < webhook.max_retries:
-                        await asyncio.sleep(2**retry_count)  # Exponential backoff
-                        return await WebhookService.trigger_webhook(
-                            webhook, event, data, retry_count + 1
-                        )
+        for delivery in batch:
+            if delivery.attempts >= (webhook.max_retries or 0):
+                await asyncio.to_thread(self.queue.dead_letter, delivery, error)
+                webhook_deliveries_total.labels(outcome="failed").inc()
+            else:
+                retry_at = datetime.utcnow() + timedelta(
+                    seconds=self._backoff(delivery.attempts, retry_after)
+                )
+                await asyncio.to_thread(self.queue.retry, delivery, retry_at, error)
+                webhook_deliveries_total.labels(outcome="retried").inc()
+        return False
 
-                    # Disable after max failures
-                    if webhook.failure_count >= 10:
-                        webhook.is_active = False
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.queue.get_stats(),
+            "active_endpoints": len(self._active),
+            "open_circuits": sum(
+                1 for breaker in self._breakers.values() if breaker.state != CircuitState.CLOSED
+            ),
+            "host_clients": len(self._clients),
+        }
 
-                    return False
 
-        except Exception as e:
-            print(f"Webhook error: {e}")
-            webhook.failure_count += 1
-            return False
+webhook_queue = create_webhook_queue()
+webhook_dispatcher = WebhookDispatcher(webhook_queue)
+
+
+class WebhookService:
+    """Service for managing and triggering webhooks."""
+
+    @staticmethod
+    def generate_signature(payload: dict, secret: str) -> str:
+        """Generate HMAC signature for webhook payload."""
+        payload_str = json.dumps(payload, sort_keys=True, default=str)
+        signature = hmac.new(secret.encode(), payload_str.encode(), hashlib.sha256).hexdigest()
+        return signature
 
     @staticmethod
-    async def trigger_event(db_session, event: WebhookEvent, data: Dict[str, Any]):
-        """Trigger all webhooks subscribed to an event."""
-        webhooks = db_session.query(Webhook).filter(Webhook.is_active == True).all()
+    async def trigger_webhook(
+        webhook: Webhook,
+        event: WebhookEvent,
+        data: Dict[str, Any],
+    ) -> bool:
+        """
+        Queue a webhook delivery.
+        Delivery, retries and backoff happen in the background dispatcher.
+        """
+        if not webhook.is_active:
+            return False
 
-        for webhook in webhooks:
-            if event in webhook.events:
-                await WebhookService.trigger_webhook(webhook, event, data)
+        if event not in webhook.events:
+            return False
 
+        return await webhook_dispatcher.enqueue([webhook], event, data) == 1
 
-# Import asyncio for retry logic
-import asyncio
+    @staticmethod
+    async def trigger_event(db_session, event: WebhookEvent, data: Dict[str, Any]) -> int:
+        """Queue deliveries for all webhooks subscribed to an event."""
+        store = webhook_dispatcher.endpoints
+        if db_session.get_bind() is not store.engine:
+            store = WebhookEndpointStore(db_session.get_bind())
+        webhooks = await asyncio.to_thread(store.list_active)
+
+        subscribed = [webhook for webhook in webhooks if event in webhook.events]
+        return await webhook_dispatcher.enqueue(subscribed, event, data)
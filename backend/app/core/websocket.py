@@ -1,51 +1,54 @@
 """WebSocket support for real-time updates."""
 
 from datetime import datetime
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 
 from fastapi import WebSocket
 
+from app.core.broadcast import BroadcastHub, broadcast_bus
+
 
 class ConnectionManager:
     """Manage WebSocket connections."""
 
-    def __init__(self):
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
+    def __init__(self, hub: Optional[BroadcastHub] = None):
+        self.hub = hub or BroadcastHub("updates", bus=broadcast_bus)
+
+    @property
+    def active_connections(self) -> Dict[int, Set[WebSocket]]:
+        """Connections by user id."""
+        return {
+            int(name[5:]): members
+            for name, members in self.hub.channels.items()
+            if name.startswith("user:") and members
+        }
 
     async def connect(self, websocket: WebSocket, user_id: int):
         """Connect a new WebSocket client."""
         await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = set()
-        self.active_connections[user_id].add(websocket)
+        self.hub.join(websocket, f"user:{user_id}")
+        self.hub.join(websocket, "all")
 
     def disconnect(self, websocket: WebSocket, user_id: int):
         """Disconnect a WebSocket client."""
-        if user_id in self.active_connections:
-            self.active_connections[user_id].discard(websocket)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
+        self.hub.remove(websocket)
+
+    def send_json(self, websocket: WebSocket, message: dict):
+        """Queue a reply on one connection, behind any frames already queued."""
+        self.hub.send(websocket, message)
+
+    def send_text(self, websocket: WebSocket, text: str):
+        """Queue a raw text reply on one connection."""
+        self.hub.send_text(websocket, text)
 
     async def send_personal_message(self, message: dict, user_id: int):
         """Send message to specific user."""
-        if user_id in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except:
-                    disconnected.add(connection)
-
-            # Clean up disconnected connections
-            for conn in disconnected:
-                self.active_connections[user_id].discard(conn)
+        await self.hub.publish(f"user:{user_id}", message)
 
     async def broadcast(self, message: dict, exclude_user: int = None):
         """Broadcast message to all connected users."""
-        for user_id, connections in self.active_connections.items():
-            if exclude_user and user_id == exclude_user:
-                continue
-            await self.send_personal_message(message, user_id)
+        exclude = f"user:{exclude_user}" if exclude_user else None
+        await self.hub.publish("all", message, exclude=exclude)
 
     async def send_to_role(self, message: dict, role: str):
         """Send message to all users with specific role."""
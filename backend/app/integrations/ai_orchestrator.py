@@ -4,18 +4,25 @@ AI Orchestrator - Single Entry Point
 Policy-based orchestration with explicit policies per use case
 """
 
+import asyncio
+import json
 import logging
+import re
 import time
+from contextlib import aclosing
 from pathlib import Path
-from typing import Any, AsyncIterator, Dict, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import yaml
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
-from ..core.cache import cache
+from ..core.metrics import ai_hedged_requests_total
 from .budget_manager import BudgetManager
+from .concurrency import AdaptiveConcurrencyLimiter
+from .embedding_service import get_embedding_service
 from .policies import DEFAULT_POLICIES, AIPolicy, UseCaseType
-from .providers import AIProvider, ProviderFactory
+from .prompt_cache import Embedder, PromptCache
+from .providers import AIProvider, ProviderFactory, ProviderResponse
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +49,17 @@ class OrchestrationResult(BaseModel):
     latency_ms: float = 0.0
 
 
+class BatchItemResult(BaseModel):
+    """Result for one item of an execute_batch call"""
+
+    index: int  # Position in the submitted items
+    content: Optional[str] = None
+    output: Optional[Dict[str, Any]] = None  # Validated structured output
+    error: Optional[str] = None
+    cached: bool = False
+    packed: bool = False  # Answered as part of a multi-item prompt
+
+
 class AIOrchestrator:
     """
     Central AI orchestration with policy-based routing
@@ -52,16 +70,21 @@ class AIOrchestrator:
     - Multi-provider support
     - Budget management
     - Caching and streaming
+    - Batched execution (multi-item prompts, bounded concurrency)
+    - Adaptive per-model concurrency limits with priority lanes
+    - Failover and hedged requests to a fallback provider
     - Memory and RAG integration
     - Observability
     """
 
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, embedder: Optional[Embedder] = None):
         """
         Initialize orchestrator
 
         Args:
             config_path: Path to ai_config.yaml (optional, uses default if not provided)
+            embedder: Async text -> vector function for the semantic cache
+                (optional, defaults to OpenAI embeddings)
         """
         # Load configuration
         self.config = self._load_config(config_path)
@@ -78,6 +101,21 @@ class AIOrchestrator:
         # Provider cache
         self._provider_cache: Dict[str, AIProvider] = {}
 
+        # Response cache (exact digest + optional semantic tier)
+        performance_config = self.config.get("performance", {})
+        embedding_model = performance_config.get(
+            "semantic_cache_embedding_model", "text-embedding-3-small"
+        )
+        self.prompt_cache = PromptCache(
+            # Prompt vectors share the cached, batched query embedding service
+            embedder=embedder
+            or (lambda text: get_embedding_service(embedding_model).embed_query(text)),
+            index_capacity=performance_config.get("semantic_cache_entries", 512),
+        )
+
+        # Concurrency limiters, one per provider:model
+        self._limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
         logger.info("AIOrchestrator initialized with config-driven routing")
 
     def _load_config(self, config_path: Optional[str] = None) -> Dict[str, Any]:
@@ -116,6 +154,24 @@ class AIOrchestrator:
                         policy.max_tokens = use_case_config["max_tokens"]
                     if "streaming" in use_case_config:
                         policy.streaming_enabled = use_case_config["streaming"]
+                    if "cache" in use_case_config:
+                        policy.cache_results = use_case_config["cache"]
+                    if "cache_ttl_seconds" in use_case_config:
+                        policy.cache_ttl_seconds = use_case_config["cache_ttl_seconds"]
+                    if "semantic_cache" in use_case_config:
+                        policy.semantic_cache = use_case_config["semantic_cache"]
+                    if "semantic_cache_threshold" in use_case_config:
+                        policy.semantic_cache_threshold = use_case_config[
+                            "semantic_cache_threshold"
+                        ]
+                    if "priority" in use_case_config:
+                        policy.priority = use_case_config["priority"]
+                    if "fallback_provider" in use_case_config:
+                        policy.fallback_provider = use_case_config["fallback_provider"]
+                    if "fallback_model" in use_case_config:
+                        policy.fallback_model = use_case_config["fallback_model"]
+                    if "hedge" in use_case_config:
+                        policy.hedge_requests = use_case_config["hedge"]
 
                     logger.info(
                         f"Applied config overrides to {use_case_type.value}: {policy.provider}/{policy.model}"
@@ -123,9 +179,15 @@ class AIOrchestrator:
             except ValueError:
                 logger.warning(f"Unknown use case in config: {use_case_name}")
 
+    @staticmethod
+    def _provider_key(policy: AIPolicy) -> str:
+        # Providers are built with the policy's sampling settings, so policies
+        # sharing a model but not temperature/max_tokens need separate instances
+        return f"{policy.provider}:{policy.model}:{policy.temperature}:{policy.max_tokens}"
+
     def _get_provider(self, policy: AIPolicy) -> AIProvider:
         """Get or create provider for policy"""
-        cache_key = f"{policy.provider}:{policy.model}"
+        cache_key = self._provider_key(policy)
 
         if cache_key not in self._provider_cache:
             self._provider_cache[cache_key] = ProviderFactory.create(
@@ -137,6 +199,107 @@ class AIOrchestrator:
 
         return self._provider_cache[cache_key]
 
+    def _get_limiter(self, policy: AIPolicy) -> AdaptiveConcurrencyLimiter:
+        """Get or create the concurrency limiter shared by all policies on a provider:model"""
+        cache_key = f"{policy.provider}:{policy.model}"
+
+        if cache_key not in self._limiters:
+            concurrency_config = self.config.get("concurrency", {})
+            self._limiters[cache_key] = AdaptiveConcurrencyLimiter(
+                provider=policy.provider,
+                model=policy.model,
+                initial_limit=concurrency_config.get("initial_limit", 8),
+                min_limit=concurrency_config.get("min_limit", 1),
+                max_limit=concurrency_config.get("max_limit", 64),
+                backoff_ratio=concurrency_config.get("backoff_ratio", 0.5),
+                latency_tolerance=concurrency_config.get("latency_tolerance", 2.0),
+                cooldown_seconds=concurrency_config.get("cooldown_seconds", 1.0),
+            )
+
+        return self._limiters[cache_key]
+
+    def _get_fallback_policy(self, policy: AIPolicy) -> Optional[AIPolicy]:
+        """Policy copy pointed at the fallback provider/model, if one is configured"""
+        if not policy.fallback_provider:
+            return None
+        return policy.model_copy(
+            update={
+                "provider": policy.fallback_provider,
+                "model": policy.fallback_model
+                or ProviderFactory._get_default_model(policy.fallback_provider),
+            }
+        )
+
+    async def _attempt(self, policy: AIPolicy, call: Callable[[AIProvider], Awaitable[Any]]):
+        """Run one provider call inside a slot of its model's limiter"""
+        provider = self._get_provider(policy)
+        async with self._get_limiter(policy).slot(policy.priority) as permit:
+            result = await call(provider)
+            # Structured calls return (output, response)
+            response = result[-1] if isinstance(result, tuple) else result
+            if isinstance(response, ProviderResponse):
+                metadata = response.metadata
+                permit.complete(
+                    metadata.get("completion_tokens", metadata.get("output_tokens"))
+                    or response.tokens_used
+                )
+            return result
+
+    async def _invoke(self, policy: AIPolicy, call: Callable[[AIProvider], Awaitable[Any]]):
+        """
+        Run a provider call with failover and optional hedging
+
+        Without a fallback this is a single limited attempt. With one, a primary
+        error starts the fallback immediately; with hedge_requests the fallback
+        is also started once the primary runs past its p95 latency. The first
+        success wins and the other attempt is cancelled.
+        """
+        fallback = self._get_fallback_policy(policy)
+        if fallback is None:
+            return await self._attempt(policy, call)
+
+        primary = asyncio.create_task(self._attempt(policy, call))
+        tasks = {primary}
+        try:
+            hedge_delay = None
+            if policy.hedge_requests:
+                hedge_delay = self._get_limiter(policy).p95()
+                if hedge_delay is None:
+                    hedge_delay = self.config.get("concurrency", {}).get("hedge_delay_ms", 2000)
+                    hedge_delay /= 1000
+            await asyncio.wait(tasks, timeout=hedge_delay)
+            if primary.done() and primary.exception() is None:
+                return primary.result()
+
+            if primary.done():
+                logger.warning(
+                    f"{policy.provider}/{policy.model} failed, failing over to "
+                    f"{fallback.provider}/{fallback.model}: {primary.exception()}"
+                )
+                outcome = "failover"
+            else:
+                outcome = "hedge"
+            secondary = asyncio.create_task(self._attempt(fallback, call))
+            tasks.add(secondary)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = "primary" if task is primary else "fallback"
+                        ai_hedged_requests_total.labels(outcome=f"{outcome}_{winner}").inc()
+                        return task.result()
+
+            ai_hedged_requests_total.labels(outcome=f"{outcome}_failed").inc()
+            raise primary.exception()
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            # Let the loser unwind so its limiter slot is back before we return
+            await asyncio.gather(*losers, return_exceptions=True)
+
     async def execute(
         self,
         use_case: UseCaseType,
@@ -166,6 +329,17 @@ class AIOrchestrator:
             raise ValueError(f"No policy defined for use case: {use_case}")
 
         # Check budget
+        await self._check_budget(policy, context)
+
+        # Format prompt with variables
+        if variables:
+            formatted_prompt = policy.user_prompt_template.format(**variables)
+        else:
+            formatted_prompt = prompt
+
+        return await self._generate(policy, formatted_prompt, context, response_model, start_time)
+
+    async def _check_budget(self, policy: AIPolicy, context: OrchestrationContext) -> None:
         budget_check = await self.budget_manager.check_budget(
             user_id=context.user_id,
             org_id=context.org_id,
@@ -175,19 +349,35 @@ class AIOrchestrator:
         if not budget_check["allowed"]:
             raise ValueError(f"Budget exceeded: {budget_check['reason']}")
 
-        # Format prompt with variables
-        if variables:
-            formatted_prompt = policy.user_prompt_template.format(**variables)
-        else:
-            formatted_prompt = prompt
+    async def _generate(
+        self,
+        policy: AIPolicy,
+        formatted_prompt: str,
+        context: OrchestrationContext,
+        response_model: Optional[type[BaseModel]] = None,
+        start_time: Optional[float] = None,
+        include_budget: bool = True,
+        reserved: Tuple[int, float] = (0, 0.0),
+    ) -> OrchestrationResult:
+        """
+        Cache lookup, provider call, usage recording and caching for one prompt
+
+        ``reserved`` is budget already spent for this call; it is settled
+        against the actual usage, or released if no call is made.
+        """
+        start_time = start_time or time.time()
+        use_case = policy.use_case
 
         # Check cache if enabled
         cache_key = None
+        prompt_vector = None
         if policy.cache_results:
-            cache_key = f"ai:{use_case.value}:{hash(formatted_prompt)}"
-            cached_result = await cache.get(cache_key)
+            cache_key, cached_result, prompt_vector = await self.prompt_cache.lookup(
+                policy, context.org_id, formatted_prompt, response_model
+            )
             if cached_result:
                 logger.info(f"Cache hit for {use_case.value}")
+                await self.budget_manager.release(context.user_id, context.org_id, reserved)
                 return OrchestrationResult(
                     content=cached_result["content"],
                     provider_response=cached_result["provider_response"],
@@ -196,41 +386,53 @@ class AIOrchestrator:
                     latency_ms=(time.time() - start_time) * 1000,
                 )
 
-        # Get provider
-        provider = self._get_provider(policy)
-
         # Execute based on structured vs. unstructured
-        if response_model:
-            validated_output, provider_response = await provider.generate_structured(
-                prompt=formatted_prompt,
-                response_model=response_model,
-                system_prompt=policy.system_prompt,
-            )
-            content = validated_output.model_dump_json()
-        else:
-            provider_response = await provider.generate(
-                prompt=formatted_prompt,
-                system_prompt=policy.system_prompt,
-            )
-            content = provider_response.content
+        try:
+            if response_model:
+                validated_output, provider_response = await self._invoke(
+                    policy,
+                    lambda provider: provider.generate_structured(
+                        prompt=formatted_prompt,
+                        response_model=response_model,
+                        system_prompt=policy.system_prompt,
+                    ),
+                )
+                content = validated_output.model_dump_json()
+            else:
+                provider_response = await self._invoke(
+                    policy,
+                    lambda provider: provider.generate(
+                        prompt=formatted_prompt,
+                        system_prompt=policy.system_prompt,
+                    ),
+                )
+                content = provider_response.content
+        except Exception:
+            await self.budget_manager.release(context.user_id, context.org_id, reserved)
+            raise
 
         # Update budget
         await self.budget_manager.record_usage(
             user_id=context.user_id,
             org_id=context.org_id,
             tokens_used=provider_response.tokens_used,
-            cost=provider_response.tokens_used * 0.00001,  # Rough estimate
+            cost=self.budget_manager.response_cost(provider_response),
+            policy=policy,
+            reserved=reserved,
         )
 
         # Cache result if enabled
         if policy.cache_results and cache_key:
-            await cache.set(
+            await self.prompt_cache.store(
+                policy,
+                context.org_id,
                 cache_key,
                 {
                     "content": content,
                     "provider_response": provider_response.model_dump(),
                 },
-                ttl=policy.cache_ttl_seconds,
+                vector=prompt_vector,
+                response_model=response_model,
             )
 
         # Log for observability
@@ -239,28 +441,296 @@ class AIOrchestrator:
             extra={
                 "use_case": use_case.value,
                 "policy": policy.name,
-                "provider": provider.name,
-                "model": policy.model,
+                "provider": provider_response.provider,
+                "model": provider_response.model,
                 "tokens_used": provider_response.tokens_used,
                 "latency_ms": provider_response.latency_ms,
                 "user_id": context.user_id,
                 "org_id": context.org_id,
-                "request_id": context.request_id,
+                "orchestration_request_id": context.request_id,
             },
         )
 
+        budget_remaining = {}
+        if include_budget:
+            budget_remaining = await self.budget_manager.get_remaining_budget(
+                user_id=context.user_id,
+                org_id=context.org_id,
+            )
+
         return OrchestrationResult(
             content=content,
             provider_response=provider_response.model_dump(),
             policy_used=policy.name,
             cached=False,
-            budget_remaining=await self.budget_manager.get_remaining_budget(
-                user_id=context.user_id,
-                org_id=context.org_id,
-            ),
+            budget_remaining=budget_remaining,
             latency_ms=(time.time() - start_time) * 1000,
         )
 
+    async def execute_batch(
+        self,
+        use_case: UseCaseType,
+        items: List[Dict[str, Any]],
+        context: OrchestrationContext,
+        response_model: Optional[type[BaseModel]] = None,
+        pack_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> AsyncIterator[BatchItemResult]:
+        """
+        Execute many small requests for one use case, yielding results as they finish
+
+        Budget is reserved before every provider call. Once a reservation is
+        refused, no further calls are made: the refused items and the items of
+        packs that had not started report "Budget exceeded" as their error,
+        while calls already in flight still finish. Every input item yields
+        exactly one result. With a response_model,
+        uncached items are packed pack_size at a time into one multi-item
+        prompt whose answer is split and validated per item; items missing or
+        invalid in the packed answer are retried on their own. Without one,
+        every item is its own call. Packs run with bounded concurrency on top
+        of the provider's adaptive limit.
+
+        Args:
+            use_case: Use case type
+            items: Template variables per item
+            context: Orchestration context (user, org, session)
+            response_model: Optional Pydantic model for structured output
+            pack_size: Items per packed prompt (default from config, 1 disables packing)
+            max_concurrency: Packs in flight at once (default from config)
+
+        Yields:
+            BatchItemResult per item, in completion order
+        """
+        policy = self.policies.get(use_case)
+        if not policy:
+            raise ValueError(f"No policy defined for use case: {use_case}")
+
+        await self._check_budget(policy, context)
+
+        batch_config = self.config.get("batch", {})
+        if response_model is None:
+            pack_size = 1
+        pack_size = max(1, pack_size or batch_config.get("pack_size", 10))
+        semaphore = asyncio.Semaphore(max_concurrency or batch_config.get("max_concurrency", 8))
+        denied: List[str] = []  # Why the budget was refused, once it has been
+
+        prompts: List[Tuple[int, str]] = []
+        for index, variables in enumerate(items):
+            try:
+                prompts.append((index, policy.user_prompt_template.format(**variables)))
+            except (KeyError, IndexError) as e:
+                yield BatchItemResult(index=index, error=f"Missing template variable: {e}")
+
+        async def run(chunk: List[Tuple[int, str]]) -> List[BatchItemResult]:
+            async with semaphore:
+                if len(chunk) == 1:
+                    return [
+                        await self._batch_single(policy, *chunk[0], context, response_model, denied)
+                    ]
+                return await self._batch_pack(policy, chunk, context, response_model, denied)
+
+        tasks = [
+            asyncio.create_task(run(prompts[start : start + pack_size]))
+            for start in range(0, len(prompts), pack_size)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for result in await finished:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _batch_single(
+        self,
+        policy: AIPolicy,
+        index: int,
+        formatted_prompt: str,
+        context: OrchestrationContext,
+        response_model: Optional[type[BaseModel]],
+        denied: List[str],
+    ) -> BatchItemResult:
+        """One item on its own call, unless the batch's budget already ran out"""
+        if denied:
+            return BatchItemResult(index=index, error=f"Budget exceeded: {denied[0]}")
+        reserved = self.budget_manager.reservation(policy)
+        reason = await self.budget_manager.spend(context.user_id, context.org_id, *reserved)
+        if reason:
+            denied.append(reason)
+            return BatchItemResult(index=index, error=f"Budget exceeded: {reason}")
+
+        try:
+            result = await self._generate(
+                policy,
+                formatted_prompt,
+                context,
+                response_model,
+                include_budget=False,
+                reserved=reserved,
+            )
+        except Exception as e:
+            logger.warning(f"Batch item {index} failed: {e}")
+            return BatchItemResult(index=index, error=str(e))
+        output = json.loads(result.content) if response_model else None
+        return BatchItemResult(
+            index=index, content=result.content, output=output, cached=result.cached
+        )
+
+    async def _batch_pack(
+        self,
+        policy: AIPolicy,
+        chunk: List[Tuple[int, str]],
+        context: OrchestrationContext,
+        response_model: type[BaseModel],
+        denied: List[str],
+    ) -> List[BatchItemResult]:
+        """Answer several prompts with one call, falling back per item"""
+        results: List[BatchItemResult] = []
+        cache_entries: Dict[int, Tuple[str, Any]] = {}
+        uncached: List[Tuple[int, str]] = []
+        for index, formatted_prompt in chunk:
+            if not policy.cache_results:
+                uncached.append((index, formatted_prompt))
+                continue
+            cache_key, cached_result, vector = await self.prompt_cache.lookup(
+                policy, context.org_id, formatted_prompt, response_model
+            )
+            if cached_result:
+                results.append(
+                    BatchItemResult(
+                        index=index,
+                        content=cached_result["content"],
+                        output=json.loads(cached_result["content"]),
+                        cached=True,
+                    )
+                )
+            else:
+                cache_entries[index] = (cache_key, vector)
+                uncached.append((index, formatted_prompt))
+
+        if len(uncached) <= 1:
+            for index, formatted_prompt in uncached:
+                results.append(
+                    await self._batch_single(
+                        policy, index, formatted_prompt, context, response_model, denied
+                    )
+                )
+            return results
+
+        reason = denied[0] if denied else None
+        if reason is None:
+            reserved = self.budget_manager.reservation(policy, len(uncached))
+            reason = await self.budget_manager.spend(context.user_id, context.org_id, *reserved)
+            if reason:
+                denied.append(reason)
+        if reason:
+            results.extend(
+                BatchItemResult(index=index, error=f"Budget exceeded: {reason}")
+                for index, _ in uncached
+            )
+            return results
+
+        # One call for the whole pack, with room for every item's answer
+        pack_policy = policy.model_copy(
+            update={"max_tokens": policy.max_tokens * len(uncached) if policy.max_tokens else None}
+        )
+        packed_prompt = self._pack_prompt([p for _, p in uncached], response_model)
+        answers: Dict[int, Any] = {}
+        try:
+            provider_response = await self._invoke(
+                pack_policy,
+                lambda provider: provider.generate(
+                    prompt=packed_prompt, system_prompt=policy.system_prompt
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"Packed request of {len(uncached)} items failed: {e}")
+            await self.budget_manager.release(context.user_id, context.org_id, reserved)
+            provider_response = None
+        else:
+            await self.budget_manager.record_usage(
+                user_id=context.user_id,
+                org_id=context.org_id,
+                tokens_used=provider_response.tokens_used,
+                cost=self.budget_manager.response_cost(provider_response),
+                reserved=reserved,
+            )
+            try:
+                answers = self._split_packed(provider_response.content, len(uncached))
+            except Exception as e:
+                logger.warning(f"Packed answer for {len(uncached)} items was unreadable: {e}")
+
+        retry: List[Tuple[int, str]] = []
+        for position, (index, formatted_prompt) in enumerate(uncached, start=1):
+            try:
+                output = response_model.model_validate(answers[position])
+            except (KeyError, ValidationError, TypeError):
+                retry.append((index, formatted_prompt))
+                continue
+            content = output.model_dump_json()
+            results.append(
+                BatchItemResult(
+                    index=index, content=content, output=output.model_dump(), packed=True
+                )
+            )
+            if index in cache_entries:
+                cache_key, vector = cache_entries[index]
+                item_response = provider_response.model_copy(
+                    update={
+                        "content": content,
+                        "tokens_used": provider_response.tokens_used // len(uncached),
+                    }
+                )
+                await self.prompt_cache.store(
+                    policy,
+                    context.org_id,
+                    cache_key,
+                    {"content": content, "provider_response": item_response.model_dump()},
+                    vector=vector,
+                    response_model=response_model,
+                )
+
+        if retry:
+            logger.info(f"Retrying {len(retry)} of {len(uncached)} packed items individually")
+            retried = await asyncio.gather(
+                *(
+                    self._batch_single(policy, index, prompt, context, response_model, denied)
+                    for index, prompt in retry
+                )
+            )
+            results.extend(retried)
+        return results
+
+    @staticmethod
+    def _pack_prompt(prompts: List[str], response_model: type[BaseModel]) -> str:
+        schema = json.dumps(response_model.model_json_schema())
+        sections = [
+            f"You will receive {len(prompts)} independent requests. Answer each one exactly "
+            "as if it were the only request.",
+            'Respond with only a JSON object of the form {"results": [{"item": <request '
+            'number>, ...}, ...]} containing one entry per request. Apart from "item", '
+            f"each entry must match this JSON schema: {schema}",
+        ]
+        for number, prompt in enumerate(prompts, start=1):
+            sections.append(f"### Request {number}\n{prompt}")
+        return "\n\n".join(sections)
+
+    @staticmethod
+    def _split_packed(content: str, expected: int) -> Dict[int, Any]:
+        """Map request number -> raw answer from a packed response"""
+        text = re.sub(r"^```(?:json)?\s*|\s*```$", "", content.strip())
+        data = json.loads(text)
+        entries = data.get("results", []) if isinstance(data, dict) else data
+        answers: Dict[int, Any] = {}
+        for position, entry in enumerate(entries, start=1):
+            if not isinstance(entry, dict):
+                continue
+            entry = dict(entry)
+            number = entry.pop("item", position)
+            if isinstance(number, int) and 1 <= number <= expected:
+                answers.setdefault(number, entry)
+        return answers
+
     async def stream(
         self,
         use_case: UseCaseType,
@@ -307,12 +777,40 @@ class AIOrchestrator:
         # Get provider
         provider = self._get_provider(policy)
 
-        # Stream
-        async for chunk in provider.stream(
-            prompt=formatted_prompt,
-            system_prompt=policy.system_prompt,
-        ):
-            yield chunk
+        # Meter usage chunk by chunk; the stream stops early once the request
+        # or the user/org daily budget is spent
+        meter = self.budget_manager.meter(
+            user_id=context.user_id,
+            org_id=context.org_id,
+            policy=policy,
+            count_tokens=provider.count_tokens,
+            prompt=f"{policy.system_prompt}\n{formatted_prompt}",
+        )
+
+        # Stream, holding a concurrency slot until the stream ends; the latency
+        # sample is time to first chunk so long answers don't shrink the limit
+        try:
+            async with self._get_limiter(policy).slot(policy.priority) as permit:
+                async with aclosing(
+                    provider.stream(
+                        prompt=formatted_prompt,
+                        system_prompt=policy.system_prompt,
+                    )
+                ) as chunks:
+                    async for chunk in chunks:
+                        permit.observe()
+                        if not await meter.add(chunk):
+                            logger.warning(
+                                f"Stream for {use_case.value} cut off: {meter.cutoff_reason}"
+                            )
+                            break
+                        yield chunk
+        finally:
+            await meter.close()
+
+    def get_concurrency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Current limit, in-flight and queue depth per provider:model"""
+        return {key: limiter.get_stats() for key, limiter in self._limiters.items()}
 
     def get_policy(self, use_case: UseCaseType) -> Optional[AIPolicy]:
         """Get policy for use case"""
@@ -334,3 +832,9 @@ def get_orchestrator() -> AIOrchestrator:
     if _orchestrator is None:
         _orchestrator = AIOrchestrator()
     return _orchestrator
+
+
+async def close_orchestrator() -> None:
+    """Write pending AI usage and return leased budget quota (shutdown hook)"""
+    if _orchestrator is not None:
+        await _orchestrator.budget_manager.close()
@@ -5,17 +5,42 @@ Central budget/cost control system with:
 - Per-request token ceilings
 - Per-user/org daily budgets
 - Per-endpoint default token limits
+- Per-model pricing
+- Incremental metering and cutoff for streamed responses
+- Per-worker quota leases, so budget checks rarely touch the shared cache
 """
 
+import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from ..core.cache import cache
+from ..core.cache import async_cache
 from .policies import AIPolicy
+from .providers import ProviderResponse
 
 logger = logging.getLogger(__name__)
 
+# USD per million tokens (input, output); overridable via the pricing section
+# of ai_config.yaml. Models match exactly or by longest prefix, so dated
+# snapshots such as gpt-4o-mini-2024-07-18 use their family's price.
+DEFAULT_MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-4.1": (2.0, 8.0),
+    "gpt-4.1-mini": (0.4, 1.6),
+    "claude-3-5-sonnet": (3.0, 15.0),
+    "claude-3-5-haiku": (0.8, 4.0),
+    "claude-3-opus": (15.0, 75.0),
+    "fake": (0.0, 0.0),
+}
+
+# Used for models missing from the table (the old flat $0.00001/token)
+FALLBACK_PRICE: Tuple[float, float] = (10.0, 10.0)
+
 
 class BudgetManager:
     """
@@ -26,6 +51,13 @@ class BudgetManager:
     - Per-user daily budgets
     - Per-org daily budgets
     - Usage tracking and reporting
+
+    Daily limits are enforced with leases: each worker claims a slice
+    (``lease_fraction`` of the limit) of a user's or org's quota by atomically
+    incrementing a shared "leased" counter, then spends it locally. Checks
+    and usage recording are in-memory until a lease runs low; refills run in
+    the background and carry pending usage writes with them. The leased
+    counter never passes the limit, so org limits hold across processes.
     """
 
     def __init__(self, global_config: Dict[str, Any]):
@@ -51,6 +83,51 @@ class BudgetManager:
         )
         self.default_daily_cost_limit_per_org = global_config.get("daily_cost_limit_per_org", 500.0)
 
+        # Share of a daily limit leased to a worker per refill
+        self.lease_fraction = global_config.get("lease_fraction", 0.01)
+        # Spent usage is written back once this many tokens are pending
+        self.usage_flush_tokens = global_config.get("usage_flush_tokens", 5000)
+        # How long an exhausted quota is trusted before asking the shared counter again
+        self.exhausted_retry_seconds = global_config.get("exhausted_retry_seconds", 5.0)
+
+        self._leases: Dict[str, QuotaLease] = {}
+        self._retired: List[QuotaLease] = []  # Previous days' leases with unwritten usage
+        self._flush_task: Optional[asyncio.Task] = None
+        self._avg_request_tokens: Dict[str, float] = {}
+
+        self.prices = dict(DEFAULT_MODEL_PRICES)
+        for model, price in (global_config.get("pricing") or {}).items():
+            self.prices[model] = (float(price["input"]), float(price["output"]))
+        self._price_cache: Dict[str, Tuple[float, float]] = {}
+
+    def price_for(self, model: str) -> Tuple[float, float]:
+        """(input, output) USD per million tokens for a model"""
+        price = self._price_cache.get(model)
+        if price is None:
+            match = max(
+                (name for name in self.prices if model == name or model.startswith(f"{name}-")),
+                key=len,
+                default=None,
+            )
+            price = self.prices[match] if match else FALLBACK_PRICE
+            self._price_cache[model] = price
+        return price
+
+    def estimate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """Cost in USD of a request to ``model``"""
+        input_price, output_price = self.price_for(model)
+        return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def response_cost(self, provider_response: ProviderResponse) -> float:
+        """Cost of a completed provider response, split by input/output where reported"""
+        metadata = provider_response.metadata
+        input_tokens = metadata.get("prompt_tokens", metadata.get("input_tokens"))
+        output_tokens = metadata.get("completion_tokens", metadata.get("output_tokens"))
+        if input_tokens is None or output_tokens is None:
+            # Only a total: price it all as output, the dearer side
+            input_tokens, output_tokens = 0, provider_response.tokens_used
+        return self.estimate_cost(provider_response.model, input_tokens, output_tokens)
+
     async def check_budget(
         self,
         user_id: str,
@@ -60,6 +137,9 @@ class BudgetManager:
         """
         Check if request is within budget limits
 
+        Served from this worker's leases; only touches the shared cache when
+        a lease has to be refilled.
+
         Args:
             user_id: User ID
             org_id: Organization ID
@@ -68,56 +148,61 @@ class BudgetManager:
         Returns:
             Dict with 'allowed' (bool) and 'reason' (str if not allowed)
         """
-        # Check per-request limits from policy
-        if policy.budget.max_tokens_per_request:
-            # We don't know exact tokens yet, but we can check if historical average exceeds limit
-            pass  # Would implement historical average check
-
-        # Check user daily budget
-        user_usage = await self._get_daily_usage(f"user:{user_id}")
-        user_token_limit = self.default_daily_token_limit_per_user
-        user_cost_limit = self.default_daily_cost_limit_per_user
-
-        if user_usage["tokens"] >= user_token_limit:
+        # Check per-request limits from policy against this use case's average
+        max_tokens = policy.budget.max_tokens_per_request
+        average = self._avg_request_tokens.get(policy.name)
+        if max_tokens and average is not None and average > max_tokens:
+            # Decay toward the policy default so a few huge requests can't
+            # block the use case for good
+            self._avg_request_tokens[policy.name] = (
+                average * 0.9 + (policy.max_tokens or max_tokens) * 0.1
+            )
             return {
                 "allowed": False,
-                "reason": f"User daily token limit exceeded ({user_usage['tokens']}/{user_token_limit})",
+                "reason": f"Average request size ({average:.0f} tokens) exceeds per-request limit ({max_tokens})",
             }
 
-        if user_usage["cost"] >= user_cost_limit:
-            return {
-                "allowed": False,
-                "reason": f"User daily cost limit exceeded (${user_usage['cost']:.2f}/${user_cost_limit:.2f})",
-            }
+        leases = [self._get_lease(f"user:{user_id}"), self._get_lease(f"org:{org_id}")]
+        await self._ensure(leases, self.expected_tokens(policy), 0.0)
 
-        # Check org daily budget
-        org_usage = await self._get_daily_usage(f"org:{org_id}")
-        org_token_limit = self.default_daily_token_limit_per_org
-        org_cost_limit = self.default_daily_cost_limit_per_org
-
-        if org_usage["tokens"] >= org_token_limit:
-            return {
-                "allowed": False,
-                "reason": f"Organization daily token limit exceeded ({org_usage['tokens']}/{org_token_limit})",
-            }
-
-        if org_usage["cost"] >= org_cost_limit:
-            return {
-                "allowed": False,
-                "reason": f"Organization daily cost limit exceeded (${org_usage['cost']:.2f}/${org_cost_limit:.2f})",
-            }
+        for lease in leases:
+            if lease.tokens <= 0 or lease.cost <= 0:
+                return {"allowed": False, "reason": self._denial(lease)}
 
+        self._prefetch(leases)
         return {
             "allowed": True,
             "reason": None,
         }
 
+    def expected_tokens(self, policy: AIPolicy) -> int:
+        """Typical tokens per request for a policy (running average, else its max_tokens)"""
+        average = self._avg_request_tokens.get(policy.name)
+        if average is None:
+            return policy.max_tokens or 1000
+        return int(average)
+
+    def reservation(self, policy: AIPolicy, requests: int = 1) -> Tuple[int, float]:
+        """Tokens and cost to hold back before making ``requests`` calls under a policy"""
+        tokens = self.expected_tokens(policy) * requests
+        # Priced as output, the dearer side, until the real split is known
+        return tokens, self.estimate_cost(policy.model, 0, tokens)
+
+    def observe_request(self, policy: AIPolicy, tokens: int) -> None:
+        """Fold one request's size into the policy's running average"""
+        average = self._avg_request_tokens.get(policy.name)
+        self._avg_request_tokens[policy.name] = (
+            tokens if average is None else average * 0.9 + tokens * 0.1
+        )
+
     async def record_usage(
         self,
         user_id: str,
         org_id: str,
         tokens_used: int,
         cost: float,
+        policy: Optional[AIPolicy] = None,
+        reserved: Tuple[int, float] = (0, 0.0),
     ):
         """
         Record usage for budget tracking
@@ -127,20 +212,13 @@ class BudgetManager:
             org_id: Organization ID
             tokens_used: Tokens consumed
             cost: Cost in USD
+            policy: Policy the request ran under (feeds its average request size)
+            reserved: Tokens and cost already spent for this request, settled here
         """
-        # Update user usage
-        await self._increment_daily_usage(
-            f"user:{user_id}",
-            tokens_used,
-            cost,
-        )
-
-        # Update org usage
-        await self._increment_daily_usage(
-            f"org:{org_id}",
-            tokens_used,
-            cost,
-        )
+        # Already consumed, so charged even if it overdraws the lease
+        await self.spend(user_id, org_id, tokens_used - reserved[0], cost - reserved[1], force=True)
+        if policy is not None:
+            self.observe_request(policy, tokens_used)
 
         logger.info(
             f"Recorded usage: {tokens_used} tokens, ${cost:.4f}",
@@ -152,6 +230,43 @@ class BudgetManager:
             },
         )
 
+    async def spend(
+        self,
+        user_id: str,
+        org_id: str,
+        tokens: int,
+        cost: float,
+        force: bool = False,
+    ) -> Optional[str]:
+        """
+        Charge usage to the user's and org's leases
+
+        Without ``force`` nothing is charged when the quota can't cover it and
+        the reason is returned instead. Returns None once charged.
+        """
+        leases = [self._get_lease(f"user:{user_id}"), self._get_lease(f"org:{org_id}")]
+        if not force:
+            await self._ensure(leases, tokens, cost)
+            for lease in leases:
+                if lease.tokens < tokens or lease.cost < cost:
+                    return self._denial(lease)
+
+        for lease in leases:
+            lease.tokens -= tokens
+            lease.cost -= cost
+            lease.pending_tokens += tokens
+            lease.pending_cost += cost
+
+        if any(lease.pending_tokens >= self.usage_flush_tokens for lease in leases):
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self.flush())
+        self._prefetch(leases)
+        return None
+
+    async def release(self, user_id: str, org_id: str, reserved: Tuple[int, float]) -> None:
+        """Hand back a reservation whose request never reached the provider"""
+        await self.spend(user_id, org_id, -reserved[0], -reserved[1], force=True)
+
     async def get_remaining_budget(
         self,
         user_id: str,
@@ -167,8 +282,7 @@ class BudgetManager:
         Returns:
             Dict with remaining tokens and cost for user and org
         """
-        user_usage = await self._get_daily_usage(f"user:{user_id}")
-        org_usage = await self._get_daily_usage(f"org:{org_id}")
+        user_usage, org_usage = await self._get_daily_usages([f"user:{user_id}", f"org:{org_id}"])
 
         return {
             "user": {
@@ -197,42 +311,345 @@ class BudgetManager:
 
     async def _get_daily_usage(self, key: str) -> Dict[str, Any]:
         """Get daily usage from cache"""
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        cache_key = f"budget:{key}:{today}"
-
-        usage = await cache.get(cache_key)
-        if not usage:
-            usage = {"tokens": 0, "cost": 0.0}
-
+        (usage,) = await self._get_daily_usages([key])
         return usage
 
-    async def _increment_daily_usage(
-        self,
-        key: str,
-        tokens: int,
-        cost: float,
-    ):
-        """Increment daily usage in cache"""
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        cache_key = f"budget:{key}:{today}"
-
-        # Get current usage
-        usage = await self._get_daily_usage(key)
-
-        # Increment
-        usage["tokens"] += tokens
-        usage["cost"] += cost
-
-        # Save with TTL until end of day
+    async def _get_daily_usages(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get daily usage for several budget keys in one read, including usage
+        this worker has charged but not yet written
+        """
+        counter_keys = [k for key in keys for k in self._usage_keys(key)]
+        values = await async_cache.get_counters(counter_keys)
+
+        usages = []
+        for i, key in enumerate(keys):
+            lease = self._leases.get(key)
+            pending = lease is not None and lease.day == self._today()
+            usages.append(
+                {
+                    "tokens": int(values[2 * i]) + (lease.pending_tokens if pending else 0),
+                    "cost": float(values[2 * i + 1]) + (lease.pending_cost if pending else 0.0),
+                }
+            )
+        return usages
+
+    # ------------------------------------------------------------------
+    # Leases
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.utcnow().strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _ttl() -> int:
+        """Seconds until counters expire (end of day)"""
         tomorrow = datetime.utcnow() + timedelta(days=1)
         tomorrow_midnight = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
-        ttl = int((tomorrow_midnight - datetime.utcnow()).total_seconds())
+        return int((tomorrow_midnight - datetime.utcnow()).total_seconds()) + 1
+
+    def _limits(self, key: str) -> Tuple[int, float]:
+        if key.startswith("org:"):
+            return self.default_daily_token_limit_per_org, self.default_daily_cost_limit_per_org
+        return self.default_daily_token_limit_per_user, self.default_daily_cost_limit_per_user
+
+    def _denial(self, lease: "QuotaLease") -> str:
+        scope = "Organization" if lease.key.startswith("org:") else "User"
+        token_limit, cost_limit = self._limits(lease.key)
+        if lease.tokens <= 0:
+            return f"{scope} daily token limit exceeded ({token_limit} tokens)"
+        return f"{scope} daily cost limit exceeded (${cost_limit:.2f})"
+
+    def _get_lease(self, key: str) -> "QuotaLease":
+        day = self._today()
+        lease = self._leases.get(key)
+        if lease is None or lease.day != day:
+            if lease is not None and (lease.pending_tokens or lease.pending_cost):
+                # Yesterday's usage is still written to yesterday's counters
+                self._retired.append(lease)
+            lease = self._leases[key] = QuotaLease(key, day)
+        return lease
+
+    async def _ensure(self, leases: List["QuotaLease"], tokens: int, cost: float) -> None:
+        """Refill any lease that can't cover ``tokens``/``cost`` (one round-trip)"""
+
+        def short(lease: QuotaLease) -> bool:
+            return lease.tokens < max(tokens, 1) or lease.cost < cost or lease.cost <= 0
+
+        now = time.monotonic()
+        todo = [
+            lease
+            for lease in leases
+            if short(lease)
+            and not (lease.exhausted and now - lease.checked_at < self.exhausted_retry_seconds)
+        ]
+        in_flight = [lease.refill for lease in todo if lease.refill is not None]
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            todo = [lease for lease in todo if short(lease)]
+        if todo:
+            await self._start_refill(todo, tokens, cost)
+
+    def _prefetch(self, leases: List["QuotaLease"]) -> None:
+        """Top up low leases in the background before requests have to wait"""
+        low = []
+        for lease in leases:
+            token_limit, cost_limit = self._limits(lease.key)
+            if lease.refill is not None or lease.exhausted:
+                continue
+            if (
+                lease.tokens < token_limit * self.lease_fraction / 4
+                or lease.cost < cost_limit * self.lease_fraction / 4
+            ):
+                low.append(lease)
+        if low:
+            self._start_refill(low, 0, 0.0)
+
+    def _start_refill(self, leases: List["QuotaLease"], tokens: int, cost: float) -> asyncio.Task:
+        task = asyncio.create_task(self._refill(leases, tokens, cost))
+        for lease in leases:
+            lease.refill = task
+
+        def done(_):
+            for lease in leases:
+                if lease.refill is task:
+                    lease.refill = None
+
+        task.add_done_callback(done)
+        return task
+
+    async def _refill(self, leases: List["QuotaLease"], tokens: int, cost: float) -> None:
+        """
+        Claim more quota for each lease from the shared leased counters
 
-        await cache.set(cache_key, usage, ttl=ttl)
+        Whatever would take a counter past its limit is handed straight back,
+        so the leased total never exceeds the daily limit. Pending usage
+        rides along in the same transaction.
+        """
+        increments: Dict[str, Any] = {}
+        wanted: Dict[str, Tuple[int, float]] = {}
+        for lease in leases:
+            token_limit, cost_limit = self._limits(lease.key)
+            want_tokens = max(int(token_limit * self.lease_fraction), tokens - lease.tokens, 1)
+            want_cost = max(cost_limit * self.lease_fraction, cost - lease.cost)
+            tokens_key, cost_key = self._lease_keys(lease.key, lease.day)
+            increments[tokens_key] = want_tokens
+            increments[cost_key] = float(want_cost)
+            wanted[lease.key] = (want_tokens, want_cost)
+
+        written = self._take_pending(increments)
+        try:
+            totals = await async_cache.incr_many(increments, ttl=self._ttl())
+        except Exception:
+            self._restore_pending(written)
+            raise
+
+        returns: Dict[str, Any] = {}
+        for lease in leases:
+            token_limit, cost_limit = self._limits(lease.key)
+            want_tokens, want_cost = wanted[lease.key]
+            tokens_key, cost_key = self._lease_keys(lease.key, lease.day)
+            granted_tokens = max(
+                0, min(want_tokens, token_limit - (totals[tokens_key] - want_tokens))
+            )
+            granted_cost = max(0.0, min(want_cost, cost_limit - (totals[cost_key] - want_cost)))
+            if granted_tokens < want_tokens:
+                returns[tokens_key] = granted_tokens - want_tokens
+            if granted_cost < want_cost:
+                returns[cost_key] = float(granted_cost - want_cost)
+            lease.tokens += granted_tokens
+            lease.cost += granted_cost
+            lease.exhausted = granted_tokens < want_tokens or granted_cost < want_cost
+            lease.checked_at = time.monotonic()
+
+        if returns:
+            await async_cache.incr_many(returns, ttl=self._ttl())
+
+    def _take_pending(self, increments: Dict[str, Any]) -> List[Tuple["QuotaLease", int, float]]:
+        """Move all unwritten usage into ``increments``; returns what was taken"""
+        taken = []
+        for lease in self._retired + list(self._leases.values()):
+            if not lease.pending_tokens and not lease.pending_cost:
+                continue
+            tokens_key, cost_key = self._usage_keys(lease.key, lease.day)
+            increments[tokens_key] = increments.get(tokens_key, 0) + int(lease.pending_tokens)
+            increments[cost_key] = increments.get(cost_key, 0.0) + float(lease.pending_cost)
+            taken.append((lease, lease.pending_tokens, lease.pending_cost))
+            lease.pending_tokens, lease.pending_cost = 0, 0.0
+        self._retired = []
+        return taken
+
+    def _restore_pending(self, taken: List[Tuple["QuotaLease", int, float]]) -> None:
+        for lease, tokens, cost in taken:
+            lease.pending_tokens += tokens
+            lease.pending_cost += cost
+            if self._leases.get(lease.key) is not lease:
+                self._retired.append(lease)
+
+    async def flush(self) -> None:
+        """Write all usage charged locally to the shared counters"""
+        increments: Dict[str, Any] = {}
+        taken = self._take_pending(increments)
+        if not increments:
+            return
+        try:
+            # Counters are per day and expire on their own; a retired day's
+            # keys only need to outlive the flush
+            await async_cache.incr_many(increments, ttl=self._ttl())
+        except Exception as e:
+            logger.error(f"Failed to write budget usage: {e}")
+            self._restore_pending(taken)
+
+    async def close(self) -> None:
+        """Write pending usage and hand unspent quota back to the shared pool"""
+        await self.flush()
+        returns: Dict[str, Any] = {}
+        today = self._today()
+        for lease in self._leases.values():
+            if lease.day != today:
+                continue
+            tokens_key, cost_key = self._lease_keys(lease.key, lease.day)
+            if lease.tokens > 0:
+                returns[tokens_key] = -int(lease.tokens)
+            if lease.cost > 0:
+                returns[cost_key] = -float(lease.cost)
+        self._leases.clear()
+        if returns:
+            await async_cache.incr_many(returns, ttl=self._ttl())
+
+    def _usage_keys(self, key: str, day: Optional[str] = None) -> tuple:
+        """Counter keys for a day's token and cost usage (default today)"""
+        day = day or self._today()
+        return f"budget:{key}:{day}:tokens", f"budget:{key}:{day}:cost"
+
+    def _lease_keys(self, key: str, day: str) -> tuple:
+        """Counter keys for the token and cost quota leased out by all workers"""
+        return f"budget:{key}:{day}:leased_tokens", f"budget:{key}:{day}:leased_cost"
+
+    def meter(
+        self,
+        user_id: str,
+        org_id: str,
+        policy: AIPolicy,
+        count_tokens: Callable[[str], int],
+        prompt: str,
+    ) -> "StreamMeter":
+        """Create a meter that accounts for a streamed response chunk by chunk"""
+        return StreamMeter(self, user_id, org_id, policy, count_tokens, prompt)
 
     async def reset_budget(self, key: str):
         """Reset budget for a key (admin operation)"""
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        cache_key = f"budget:{key}:{today}"
-        await cache.delete(cache_key)
+        day = self._today()
+        self._leases.pop(key, None)
+        await async_cache.delete_many([*self._usage_keys(key, day), *self._lease_keys(key, day)])
         logger.info(f"Reset budget for {key}")
+
+
+class QuotaLease:
+    """A worker's locally held slice of one user's or org's daily quota"""
+
+    def __init__(self, key: str, day: str):
+        self.key = key
+        self.day = day
+        self.tokens = 0  # Spendable
+        self.cost = 0.0
+        self.pending_tokens = 0  # Spent but not yet written to the usage counters
+        self.pending_cost = 0.0
+        self.exhausted = False  # Last refill hit the daily limit
+        self.checked_at = 0.0
+        self.refill: Optional[asyncio.Task] = None
+
+
+class StreamMeter:
+    """
+    Usage accounting for one streamed response
+
+    The prompt is charged when the first chunk arrives. Each chunk is then
+    counted with the provider's tokenizer and charged against the user's and
+    org's leases before it is sent, so concurrent streams share the daily
+    limits and stop once quota runs out. A stream is also cut at the
+    policy's per-request token/cost ceiling.
+    """
+
+    def __init__(
+        self,
+        budget_manager: BudgetManager,
+        user_id: str,
+        org_id: str,
+        policy: AIPolicy,
+        count_tokens: Callable[[str], int],
+        prompt: str,
+    ):
+        self.budget_manager = budget_manager
+        self.user_id = user_id
+        self.org_id = org_id
+        self.policy = policy
+        self.model = policy.model
+        self.count_tokens = count_tokens
+        self.input_tokens = count_tokens(prompt)
+        self.output_tokens = 0
+        self.cutoff_reason: Optional[str] = None
+        self._input_charged = False
+
+        max_tokens = (
+            policy.budget.max_tokens_per_request or budget_manager.default_max_tokens_per_request
+        )
+        max_cost = policy.budget.max_cost_per_request or budget_manager.default_max_cost_per_request
+        _, output_price = budget_manager.price_for(self.model)
+        input_cost = budget_manager.estimate_cost(self.model, self.input_tokens, 0)
+        self.max_output_tokens = max_tokens - self.input_tokens
+        if output_price:
+            affordable = int((max_cost - input_cost) * 1_000_000 / output_price)
+            self.max_output_tokens = min(self.max_output_tokens, affordable)
+
+    @property
+    def cost(self) -> float:
+        return self.budget_manager.estimate_cost(self.model, self.input_tokens, self.output_tokens)
+
+    async def _charge_input(self) -> None:
+        if not self._input_charged:
+            self._input_charged = True
+            await self.budget_manager.spend(
+                self.user_id,
+                self.org_id,
+                self.input_tokens,
+                self.budget_manager.estimate_cost(self.model, self.input_tokens, 0),
+                force=True,
+            )
+
+    async def add(self, chunk: str) -> bool:
+        """Account for a chunk; False means the budget is spent and the chunk must not be sent"""
+        if self.cutoff_reason:
+            return False
+        await self._charge_input()
+        tokens = self.count_tokens(chunk)
+        if self.output_tokens + tokens > self.max_output_tokens:
+            self.cutoff_reason = "per-request limit"
+            return False
+
+        self.cutoff_reason = await self.budget_manager.spend(
+            self.user_id,
+            self.org_id,
+            tokens,
+            self.budget_manager.estimate_cost(self.model, 0, tokens),
+        )
+        if self.cutoff_reason:
+            return False
+        self.output_tokens += tokens
+        return True
+
+    async def close(self) -> None:
+        """Settle the prompt charge and record the request size once the stream ends"""
+        await self._charge_input()
+        self.budget_manager.observe_request(self.policy, self.input_tokens + self.output_tokens)
+        logger.info(
+            f"Stream usage: {self.input_tokens}+{self.output_tokens} tokens, ${self.cost:.4f}"
+            + (f" (cut off: {self.cutoff_reason})" if self.cutoff_reason else ""),
+            extra={
+                "user_id": self.user_id,
+                "org_id": self.org_id,
+                "tokens_used": self.input_tokens + self.output_tokens,
+                "cost": self.cost,
+            },
+        )
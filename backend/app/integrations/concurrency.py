@@ -0,0 +1,258 @@
+"""
+Adaptive Concurrency Limits for AI Providers
+
+Caps in-flight requests per provider/model and adjusts the cap from observed
+latency and rate-limit responses, admitting waiters by priority lane.
+Latency is judged per unit of work: time to first token for streams, time
+per output token otherwise, so long answers don't read as congestion.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from statistics import median
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from ..core.metrics import ai_concurrency_limit, ai_limiter_queue_wait_seconds
+
+logger = logging.getLogger(__name__)
+
+# Lower value = admitted first when requests are queued
+LANE_PRIORITY = {
+    "interactive": 0,
+    "standard": 1,
+    "batch": 2,
+}
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """True for provider rate-limit / capacity errors (HTTP 429 or *RateLimit* types)"""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    return "RateLimit" in type(exc).__name__
+
+
+class Permit:
+    """
+    A held concurrency slot
+
+    Streams call observe() at the first token; other calls report their
+    answer's size with complete() so the sample can be normalized by it.
+    """
+
+    def __init__(self, lane: str, wait_seconds: float):
+        self.lane = lane
+        self.wait_seconds = wait_seconds
+        self.started = time.monotonic()
+        self.latency: Optional[float] = None  # To first token, else to completion
+        self.first_token = False
+        self.output_tokens: Optional[int] = None
+
+    def observe(self) -> None:
+        if self.latency is None:
+            self.latency = time.monotonic() - self.started
+            self.first_token = True
+
+    def complete(self, output_tokens: Optional[int]) -> None:
+        self.output_tokens = output_tokens
+
+    def sample(self) -> Tuple[str, float]:
+        """(kind, value) fed to the limiter; kinds are only compared with themselves"""
+        if self.latency is None:
+            self.latency = time.monotonic() - self.started
+        if self.first_token:
+            return "ttft", self.latency
+        if self.output_tokens:
+            return "per_token", self.latency / self.output_tokens
+        return "call", self.latency
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit for one provider/model
+
+    - Success within ``latency_tolerance`` x baseline latency while the limit
+      is saturated: limit grows by 1/limit (about +1 per round trip)
+    - Median of the last ``drift_samples`` samples above tolerance (sustained
+      drift, not one slow call): limit shrinks to 90%
+    - Rate-limit error: limit is multiplied by ``backoff_ratio``
+
+    Samples are kept per kind (time to first token, time per output token,
+    whole call when neither is known), each with its own baseline.
+    Decreases happen at most once per ``cooldown_seconds`` so a burst of
+    429s from one overload is answered with a single cut.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        cooldown_seconds: float = 1.0,
+        window: int = 200,
+        drift_samples: int = 20,
+    ):
+        self.provider = provider
+        self.model = model
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.cooldown_seconds = cooldown_seconds
+        self.drift_samples = drift_samples
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.in_flight = 0
+        self.baselines: Dict[str, float] = {}  # Lowest recent median per sample kind
+        self._recent: Dict[str, Deque[float]] = {}
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._last_decrease = 0.0
+        self.admitted = 0
+        self.overloads = 0
+        ai_concurrency_limit.labels(provider=provider, model=model).set(self.limit)
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    async def acquire(self, lane: str = "standard") -> float:
+        """Wait for a slot; returns seconds spent queued"""
+        if self._has_capacity() and not self.queued:
+            self.in_flight += 1
+            self.admitted += 1
+            self._observe_wait(lane, 0.0)
+            return 0.0
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (LANE_PRIORITY.get(lane, 1), next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted in the same tick we were cancelled: hand the slot on
+                self.in_flight -= 1
+                self._wake()
+            else:
+                future.cancel()
+            raise
+        waited = time.monotonic() - start
+        self._observe_wait(lane, waited)
+        return waited
+
+    def _observe_wait(self, lane: str, waited: float) -> None:
+        ai_limiter_queue_wait_seconds.labels(
+            provider=self.provider, model=self.model, lane=lane
+        ).observe(waited)
+
+    def _wake(self) -> None:
+        while self._waiters and self._has_capacity():
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            self.admitted += 1
+            future.set_result(None)
+
+    def release(
+        self,
+        latency: Optional[float] = None,
+        overloaded: bool = False,
+        sample: Optional[Tuple[str, float]] = None,
+    ) -> None:
+        """
+        Return a slot, feeding its outcome into the limit
+
+        ``sample`` is the call's normalized (kind, value), see Permit.sample;
+        a bare ``latency`` counts as a whole-call sample.
+        """
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        now = time.monotonic()
+
+        if overloaded:
+            self.overloads += 1
+            self._decrease(now, self.backoff_ratio)
+        elif latency is not None:
+            self._latencies.append(latency)
+            kind, value = sample or ("call", latency)
+            recent = self._recent.setdefault(kind, deque(maxlen=self.drift_samples))
+            recent.append(value)
+            p50 = median(recent)
+            baseline = self.baselines.get(kind)
+            if baseline is None or p50 < baseline:
+                baseline = p50
+            else:
+                # Let the baseline drift up so a lucky fast stretch doesn't pin it
+                baseline = baseline * 0.99 + p50 * 0.01
+            self.baselines[kind] = baseline
+
+            if len(recent) == self.drift_samples and p50 > baseline * self.latency_tolerance:
+                self._decrease(now, 0.9)
+            elif saturated and value <= baseline * self.latency_tolerance:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        ai_concurrency_limit.labels(provider=self.provider, model=self.model).set(self.limit)
+        self._wake()
+
+    def _decrease(self, now: float, ratio: float) -> None:
+        if now - self._last_decrease < self.cooldown_seconds:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.min_limit), self.limit * ratio)
+        logger.info(
+            f"Concurrency limit for {self.provider}:{self.model} "
+            f"reduced {previous:.1f} -> {self.limit:.1f}"
+        )
+
+    @asynccontextmanager
+    async def slot(self, lane: str = "standard") -> AsyncIterator[Permit]:
+        """Hold a slot for the body; rate-limit errors shrink the limit"""
+        waited = await self.acquire(lane)
+        permit = Permit(lane, waited)
+        try:
+            yield permit
+        except Exception as e:
+            self.release(overloaded=is_overload_error(e))
+            raise
+        except BaseException:
+            # Cancelled or abandoned: no latency sample
+            self.release()
+            raise
+        else:
+            sample = permit.sample()
+            self.release(latency=permit.latency, sample=sample)
+
+    def p95(self) -> Optional[float]:
+        """95th percentile latency over the recent window, or None when too few samples"""
+        if len(self._latencies) < 20:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "overloads": self.overloads,
+            **{
+                f"baseline_{kind}_ms": round(baseline * 1000, 3)
+                for kind, baseline in self.baselines.items()
+            },
+            "p95_ms": round((self.p95() or 0) * 1000, 1),
+        }
@@ -0,0 +1,278 @@
+"""
+Query Embedding Service
+
+Shared front for the query embeddings retrieval needs on every search:
+- Bounded LRU + TTL cache keyed by model and normalized text
+- Concurrent lookups within a short window go to the provider as one batch
+- Provider calls run in a worker thread, never on the event loop
+
+Used by EnhancedRAGManager, LlamaIndexRAG (through CachedQueryEmbedding) and
+EnhancedMemoryManager (through Mem0QueryEmbedder). Callers on the same OpenAI
+model share one service through ``get_embedding_service``, so a battle-card
+query embedded by one is a cache hit for the others; Mem0 on any other
+embedder gets a cache of its own.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.embeddings.openai import OpenAIEmbedding
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+EmbedBatch = Callable[[List[str]], List[List[float]]]
+
+
+def normalize_query(text: str) -> str:
+    """Unicode-normalized text with whitespace runs collapsed"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class EmbeddingService:
+    """
+    Cached, micro-batched query embedding for one model
+
+    Args:
+        embed_batch: Blocking function embedding a list of texts in one call
+        model: Model name (part of every cache key)
+        max_entries: Cache capacity; least recently used entries go first
+        ttl_seconds: How long a cached embedding is served
+        max_batch_size: Most texts sent in one provider call
+        batch_window_ms: How long a lookup waits for others to share its call
+    """
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatch,
+        model: str,
+        max_entries: int = 10000,
+        ttl_seconds: int = 3600,
+        max_batch_size: int = 64,
+        batch_window_ms: float = 5.0,
+    ):
+        self._embed_batch = embed_batch
+        self.model = model
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self.embed_model: Optional[BaseEmbedding] = None
+
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        # The sync path is called from worker threads (e.g. inside Mem0)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, asyncio.Future] = {}  # queued or in flight
+        self._queue: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    @classmethod
+    def for_llama_index(cls, embed_model: BaseEmbedding, **kwargs) -> "EmbeddingService":
+        """
+        Serve a LlamaIndex embedding model's queries
+
+        Queries are embedded with the model's document batch call, which is
+        equivalent for symmetric models such as OpenAI's.
+        """
+        service = cls(embed_model.get_text_embedding_batch, embed_model.model_name, **kwargs)
+        service.embed_model = embed_model
+        return service
+
+    def _cached(self, text: str) -> Optional[List[float]]:
+        key = (self.model, text)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, vector = entry
+            if expires_at < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return vector
+
+    def _store(self, text: str, vector: List[float]) -> None:
+        with self._lock:
+            self._cache[(self.model, text)] = (time.monotonic() + self.ttl_seconds, vector)
+            self._cache.move_to_end((self.model, text))
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    async def embed_query(self, text: str) -> List[float]:
+        """Embedding for one query"""
+        return (await self.embed_queries([text]))[0]
+
+    async def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings for several queries, cached ones without a provider call"""
+        loop = asyncio.get_running_loop()
+        results: List[Optional[List[float]]] = []
+        waiting: List[Tuple[int, asyncio.Future]] = []
+        for text in texts:
+            normalized = normalize_query(text)
+            vector = self._cached(normalized)
+            if vector is not None:
+                self.hits += 1
+                results.append(vector)
+                continue
+            self.misses += 1
+            future = self._pending.get(normalized)
+            if future is None:
+                # Identical concurrent queries share one pending embedding
+                future = self._pending[normalized] = loop.create_future()
+                future.add_done_callback(_consume_exception)
+                self._queue.append(normalized)
+            waiting.append((len(results), future))
+            results.append(None)
+
+        if self._queue:
+            if len(self._queue) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        for index, future in waiting:
+            # Shielded: one caller giving up mustn't cancel the others' result
+            results[index] = await asyncio.shield(future)
+        return results
+
+    def embed_query_sync(self, text: str) -> List[float]:
+        """Blocking variant for code that already runs in a worker thread"""
+        normalized = normalize_query(text)
+        vector = self._cached(normalized)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        self.batches += 1
+        vector = self._embed_batch([normalized])[0]
+        self._store(normalized, vector)
+        return vector
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queue:
+            batch = self._queue[: self.max_batch_size]
+            self._queue = self._queue[self.max_batch_size :]
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[str]) -> None:
+        self.batches += 1
+        try:
+            vectors = await asyncio.to_thread(self._embed_batch, batch)
+        except Exception as e:
+            logger.warning(f"Query embedding batch of {len(batch)} failed: {e}")
+            for text in batch:
+                future = self._pending.pop(text, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        for text, vector in zip(batch, vectors):
+            self._store(text, vector)
+            future = self._pending.pop(text, None)
+            if future is not None and not future.done():
+                future.set_result(vector)
+
+    def as_llama_index(self) -> "CachedQueryEmbedding":
+        """LlamaIndex embedding model whose queries go through this service"""
+        if self.embed_model is None:
+            raise ValueError("Service was not created from a LlamaIndex embedding model")
+        return CachedQueryEmbedding(self.embed_model, self)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model,
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "provider_batches": self.batches,
+        }
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Failures whose callers were cancelled shouldn't log "never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+class CachedQueryEmbedding(BaseEmbedding):
+    """LlamaIndex embedding: queries via an EmbeddingService, documents via the wrapped model"""
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _service: EmbeddingService = PrivateAttr()
+
+    def __init__(self, inner: BaseEmbedding, service: EmbeddingService, **kwargs: Any):
+        super().__init__(
+            model_name=inner.model_name, embed_batch_size=inner.embed_batch_size, **kwargs
+        )
+        self._inner = inner
+        self._service = service
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._service.embed_query_sync(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return await self._service.embed_query(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._inner.get_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._inner.get_text_embedding_batch(texts)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return await self._inner.aget_text_embedding(text)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self._inner.aget_text_embedding_batch(texts)
+
+
+class Mem0QueryEmbedder:
+    """Mem0 embedder wrapper that serves "search" embeddings from an EmbeddingService"""
+
+    def __init__(self, inner: Any, service: EmbeddingService):
+        self._inner = inner
+        self._service = service
+
+    def embed(self, text, memory_action: Optional[str] = None):
+        if memory_action == "search" and isinstance(text, str):
+            return self._service.embed_query_sync(text)
+        return self._inner.embed(text, memory_action)
+
+    def embed_batch(self, texts, memory_action: Optional[str] = None):
+        if memory_action == "search":
+            return [self._service.embed_query_sync(text) for text in texts]
+        return self._inner.embed_batch(texts, memory_action)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+
+# Shared services, one per model
+_services: Dict[str, EmbeddingService] = {}
+
+
+def get_embedding_service(model: str = "text-embedding-3-small") -> EmbeddingService:
+    """Get the shared query embedding service for an OpenAI model"""
+    service = _services.get(model)
+    if service is None:
+        service = _services[model] = EmbeddingService.for_llama_index(
+            OpenAIEmbedding(model=model, api_key=os.getenv("OPENAI_API_KEY"))
+        )
+    return service
@@ -0,0 +1,238 @@
+"""
+BM25 Keyword Index
+
+In-process inverted index kept alongside the Qdrant collections so hybrid
+search can match exact terms (product names, SKUs, competitor names) that
+embeddings blur. Partitioned by collection and org, so a query only ever
+scores its own tenant's chunks.
+"""
+
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from .rag_schemas import SearchFilter
+
+logger = logging.getLogger(__name__)
+
+# Words joined by -, _, . or / stay one token ("gpt-4o", "zx-4410") and are
+# also indexed by their parts
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+_SPLIT = re.compile(r"[-_./]")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was "
+    "were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms, compounds plus their parts, minus stopwords"""
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        if token not in STOPWORDS:
+            terms.append(token)
+        if _SPLIT.search(token):
+            terms.extend(part for part in _SPLIT.split(token) if part and part not in STOPWORDS)
+    return terms
+
+
+def matches_filter(metadata: Dict[str, Any], filters: SearchFilter) -> bool:
+    """True if a chunk's metadata satisfies every field set on ``filters``"""
+    if metadata.get("org_id") != filters.org_id:
+        return False
+    for field in ("source", "object_type", "access_level"):
+        wanted = getattr(filters, field)
+        if wanted is not None and metadata.get(field) != wanted.value:
+            return False
+    for field in ("industry", "region"):
+        wanted = getattr(filters, field)
+        if wanted is not None and metadata.get(field) != wanted:
+            return False
+    if filters.tags and not set(filters.tags) <= set(metadata.get("tags") or []):
+        return False
+    if filters.date_from or filters.date_to:
+        created = metadata.get("created_at")
+        if not created:
+            return False
+        created_at = datetime.fromisoformat(created) if isinstance(created, str) else created
+        if filters.date_from and created_at < filters.date_from:
+            return False
+        if filters.date_to and created_at > filters.date_to:
+            return False
+    return True
+
+
+class _Partition:
+    """Postings and length statistics for one org within one collection"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # term -> chunk_id -> tf
+        self.lengths: Dict[str, int] = {}
+        self.chunks: Dict[str, Tuple[str, Dict[str, Any]]] = {}  # chunk_id -> (text, metadata)
+        self.by_document: Dict[str, Set[str]] = defaultdict(set)
+        self.total_length = 0
+
+    def add(self, chunk_id: str, text: str, metadata: Dict[str, Any]) -> None:
+        if chunk_id in self.chunks:
+            self.remove(chunk_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings[term][chunk_id] = tf
+        length = sum(counts.values())
+        self.lengths[chunk_id] = length
+        self.total_length += length
+        self.chunks[chunk_id] = (text, metadata)
+        self.by_document[metadata.get("document_id")].add(chunk_id)
+
+    def remove(self, chunk_id: str) -> None:
+        text, metadata = self.chunks.pop(chunk_id)
+        for term in set(tokenize(text)):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.lengths.pop(chunk_id)
+        chunk_ids = self.by_document.get(metadata.get("document_id"))
+        if chunk_ids is not None:
+            chunk_ids.discard(chunk_id)
+            if not chunk_ids:
+                del self.by_document[metadata.get("document_id")]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunk text, partitioned by collection and org_id
+
+    Args:
+        k1: Term frequency saturation
+        b: Document length normalisation
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._partitions: Dict[Tuple[str, str], _Partition] = {}
+        # Collections whose existing chunks have been loaded (see rebuild)
+        self.loaded: Set[str] = set()
+
+    def __len__(self) -> int:
+        return sum(len(p.chunks) for p in self._partitions.values())
+
+    def add(self, collection: str, chunk_id: str, text: str, metadata: Dict[str, Any]) -> None:
+        """Index (or re-index) one chunk; metadata must carry org_id"""
+        key = (collection, metadata["org_id"])
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition = self._partitions[key] = _Partition()
+        partition.add(chunk_id, text, metadata)
+
+    def remove_document(self, collection: str, org_id: str, document_id: str) -> int:
+        """Drop every chunk of a document; returns how many were removed"""
+        partition = self._partitions.get((collection, org_id))
+        if partition is None:
+            return 0
+        chunk_ids = list(partition.by_document.get(document_id, ()))
+        for chunk_id in chunk_ids:
+            partition.remove(chunk_id)
+        return len(chunk_ids)
+
+    def remove_chunks(self, collection: str, org_id: str, chunk_ids: Iterable[str]) -> None:
+        """Drop individual chunks (ignores IDs that aren't indexed)"""
+        partition = self._partitions.get((collection, org_id))
+        if partition is None:
+            return
+        for chunk_id in chunk_ids:
+            if chunk_id in partition.chunks:
+                partition.remove(chunk_id)
+
+    def rebuild(self, collection: str, chunks: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Replace a collection's partitions with ``(chunk_id, text, metadata)`` rows"""
+        for key in [key for key in self._partitions if key[0] == collection]:
+            del self._partitions[key]
+        count = 0
+        for chunk_id, text, metadata in chunks:
+            if metadata.get("org_id"):
+                self.add(collection, chunk_id, text, metadata)
+                count += 1
+        self.loaded.add(collection)
+        logger.info(f"Built keyword index for {collection}: {count} chunks")
+
+    def search(
+        self,
+        collection: str,
+        query: str,
+        filters: SearchFilter,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Top ``limit`` chunks by BM25 score that pass ``filters``"""
+        partition = self._partitions.get((collection, filters.org_id))
+        if partition is None or not partition.chunks:
+            return []
+
+        n = len(partition.chunks)
+        avg_length = partition.total_length / n or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = partition.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * partition.lengths[chunk_id] / avg_length)
+                scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        # Filters are checked best-first so most queries stop after a few candidates
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for chunk_id, score in ranked:
+            text, metadata = partition.chunks[chunk_id]
+            if not matches_filter(metadata, filters):
+                continue
+            results.append(
+                {
+                    "content": text,
+                    "metadata": metadata,
+                    "score": score,
+                    "search_type": "keyword",
+                }
+            )
+            if len(results) >= limit:
+                break
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "partitions": len(self._partitions),
+            "chunks": len(self),
+            "terms": sum(len(p.postings) for p in self._partitions.values()),
+        }
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[Dict[str, Any]]],
+    k: int = 60,
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked result lists by summing 1 / (k + rank) per chunk
+
+    Results are matched across lists by ``metadata["chunk_id"]``. The fused score
+    replaces ``score``; the original per-list scores are kept under
+    ``scores`` keyed by search_type.
+    """
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            chunk_id = result["metadata"].get("chunk_id") or result["content"]
+            entry = fused.get(chunk_id)
+            if entry is None:
+                entry = fused[chunk_id] = {**result, "score": 0.0, "scores": {}}
+            elif entry["search_type"] != result["search_type"]:
+                entry["search_type"] = "hybrid"
+            entry["score"] += 1.0 / (k + rank)
+            entry["scores"][result["search_type"]] = result["score"]
+    return sorted(fused.values(), key=lambda r: r["score"], reverse=True)
@@ -10,8 +10,10 @@ Provides advanced document ingestion and retrieval with:
 - Hybrid search (vector + keyword)
 """
 
+import asyncio
+import hashlib
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from llama_index.core import (
     Document,
@@ -23,10 +25,16 @@ from llama_index.core.chat_engine import ContextChatEngine
 from llama_index.core.node_parser import SentenceSplitter
 from llama_index.core.query_engine import RetrieverQueryEngine
 from llama_index.core.retrievers import VectorIndexRetriever
+from llama_index.core.schema import TextNode
 from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
-from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openai import OpenAI
 
+from app.core.config import settings
+from app.core.ml_advanced import LeadVectorizer
+from app.core.vector_index import PartitionedVectorIndex
+
+from .embedding_service import get_embedding_service
+
 
 class LlamaIndexRAG:
     """
@@ -68,10 +76,8 @@ class LlamaIndexRAG:
             model=llm_model,
             api_key=os.getenv("OPENAI_API_KEY"),
         )
-        self.embed_model = OpenAIEmbedding(
-            model=embedding_model,
-            api_key=os.getenv("OPENAI_API_KEY"),
-        )
+        # Query embeddings are cached and batched by the shared service
+        self.embed_model = get_embedding_service(embedding_model).as_llama_index()
 
         # Configure global settings
         Settings.llm = self.llm
@@ -90,6 +96,20 @@ class LlamaIndexRAG:
         self.query_engines: Dict[str, RetrieverQueryEngine] = {}
         self.chat_engines: Dict[str, ContextChatEngine] = {}
 
+        # Content hashes of leads already in each lead index
+        self.lead_fingerprints: Dict[str, Set[str]] = {}
+
+        # Lead vectors per lead index, searched in-process by find_similar_leads
+        self.lead_vectorizer = LeadVectorizer()
+        self.lead_vectors = PartitionedVectorIndex(
+            LeadVectorizer.dim,
+            directory=(
+                os.path.join(settings.vector_index_dir, "rag_leads")
+                if settings.vector_index_dir
+                else None
+            ),
+        )
+
     async def ingest_documents(
         self,
         documents: List[Document] | str,
@@ -346,15 +366,26 @@ Provide specific, actionable insights based on the data."""
         """
         Ingest lead database for semantic search
 
+        Incremental: leads whose text is already in the index are skipped and
+        new ones are inserted into the existing index instead of rebuilding it.
+        Each new lead is embedded once; the embedding is reused by the vector
+        index and the in-process lead index used by find_similar_leads.
+
         Args:
             leads: List of lead records
             index_name: Index name
 
         Returns:
-            Created index
+            Created or updated index
         """
+        seen = self.lead_fingerprints.setdefault(index_name, set())
+        existing_index = self.indices.get(index_name)
+        if existing_index is None:
+            seen.clear()
+
         # Create text representation of each lead
-        documents = []
+        new_leads = []
+        nodes = []
         for lead in leads:
             text = f"""Lead: {lead.get('name', 'Unknown')}
 Company: {lead.get('company', 'Unknown')}
@@ -364,7 +395,12 @@ Email: {lead.get('email', 'Unknown')}
 Score: {lead.get('score', 0)}
 Notes: {lead.get('notes', 'No notes')}"""
 
-            doc = Document(
+            fingerprint = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            node = TextNode(
+                id_=fingerprint,
                 text=text,
                 metadata={
                     "lead_id": lead.get("id"),
@@ -374,9 +410,39 @@ Notes: {lead.get('notes', 'No notes')}"""
                     "category": "lead",
                 },
             )
-            documents.append(doc)
+            new_leads.append(lead)
+            nodes.append(node)
 
-        return await self.ingest_documents(documents, index_name)
+        if nodes:
+            embeddings = await self.embed_model.aget_text_embedding_batch(
+                [node.text for node in nodes]
+            )
+            for node, embedding in zip(nodes, embeddings):
+                node.embedding = embedding
+            lead_vectors = self.lead_vectors.partition(index_name, create=True)
+            lead_vectors.add_many(
+                [node.metadata["lead_id"] or node.id_ for node in nodes],
+                [
+                    self.lead_vectorizer.vector(lead, embedding)
+                    for lead, embedding in zip(new_leads, embeddings)
+                ],
+                [
+                    {"score": node.metadata["score"], "industry": node.metadata["industry"]}
+                    for node in nodes
+                ],
+                [{"text": node.text, "metadata": node.metadata} for node in nodes],
+            )
+            await asyncio.to_thread(lead_vectors.save)
+
+        # Nodes carry their embeddings, so indexing doesn't embed them again
+        if existing_index is None:
+            index = await asyncio.to_thread(VectorStoreIndex, nodes, embed_model=self.embed_model)
+            self.indices[index_name] = index
+            return index
+
+        if nodes:
+            await asyncio.to_thread(existing_index.insert_nodes, nodes)
+        return existing_index
 
     async def ingest_campaign_results(
         self,
@@ -456,34 +522,50 @@ Key Learnings: {campaign.get('learnings', 'None documented')}"""
         lead_description: str,
         top_k: int = 10,
         min_score: Optional[int] = None,
+        index_name: str = "leads",
     ) -> List[Dict[str, Any]]:
         """
         Find similar leads based on description
 
+        Searches the in-process lead index built by ingest_lead_database: one
+        (cached) query embedding and an ANN lookup, without an LLM call.
+
         Args:
             lead_description: Description of target lead
             top_k: Number of results
             min_score: Minimum lead score filter
+            index_name: Lead index to search
 
         Returns:
             Similar leads with scores
         """
-        filters = None
-        if min_score is not None:
-            filters = MetadataFilters(
-                filters=[
-                    MetadataFilter(key="score", value=min_score, operator=">="),
-                ]
+        query_embedding = await self.embed_model.aget_query_embedding(lead_description)
+        hits = self.lead_vectors.search(
+            index_name,
+            self.lead_vectorizer.query_vector(query_embedding),
+            k=top_k,
+            where={"score": (min_score, None)} if min_score is not None else None,
+        )
+
+        index = self.lead_vectors.partition(index_name)
+        sources = []
+        for lead_id, score in hits:
+            payload = index.get_payload(lead_id) or {"text": "", "metadata": {"lead_id": lead_id}}
+            sources.append(
+                {"text": payload["text"], "score": score, "metadata": payload["metadata"]}
             )
 
-        result = await self.query(
-            query=f"Find leads similar to: {lead_description}",
-            index_name="leads",
-            similarity_top_k=top_k,
-            filters=filters,
+        answer = "\n".join(
+            f"- {source['metadata'].get('company') or 'Unknown'} "
+            f"({source['metadata'].get('industry') or 'Unknown'}, "
+            f"score {source['metadata'].get('score', 0)}): similarity {source['score']:.2f}"
+            for source in sources
         )
-
-        return result
+        return {
+            "answer": answer or "No similar leads found.",
+            "sources": sources,
+            "query": lead_description,
+        }
 
     async def analyze_campaign_patterns(
         self,
@@ -631,6 +713,4 @@ async def example_usage():
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(example_usage())
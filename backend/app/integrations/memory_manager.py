@@ -4,6 +4,7 @@ Enhanced Memory Manager with Typed Memory System
 Wraps Mem0 with typed memory models, retention policies, PII redaction, and tenant isolation
 """
 
+import asyncio
 import logging
 import os
 from datetime import datetime, timedelta
@@ -11,6 +12,7 @@ from typing import Any, Dict, List, Optional
 
 from mem0 import Memory, MemoryClient
 
+from .embedding_service import EmbeddingService, Mem0QueryEmbedder, get_embedding_service
 from .memory_models import (
     RETENTION_CONFIG,
     BaseMemory,
@@ -22,6 +24,29 @@ from .memory_models import (
 logger = logging.getLogger(__name__)
 
 
+def _query_embedding_service(embedder_config: Dict[str, Any], embedder: Any) -> EmbeddingService:
+    """
+    Service for Mem0's search embeddings
+
+    A stock OpenAI embedder produces the same vectors as ``get_embedding_service``
+    for its model, so it shares that cache with the RAG managers. Anything
+    else (other providers, custom dimensions or endpoints) gets its own.
+    """
+    provider = embedder_config.get("provider")
+    options = embedder_config.get("config", {})
+    model = options.get("model", "text-embedding-3-small")
+    if (
+        provider == "openai"
+        and set(options) <= {"api_key", "model"}
+        and options.get("api_key") in (None, os.getenv("OPENAI_API_KEY"))
+    ):
+        return get_embedding_service(model)
+    return EmbeddingService(
+        lambda texts: [embedder.embed(text, "search") for text in texts],
+        model=f"mem0:{options.get('model', provider)}",
+    )
+
+
 class EnhancedMemoryManager:
     """
     Enhanced memory manager with typed memory system on top of Mem0
@@ -92,6 +117,11 @@ class EnhancedMemoryManager:
             final_config = {**default_config, **(config or {})}
             self.client = Memory.from_config(final_config)
 
+            # Cache search embeddings; memories are still embedded by Mem0's own embedder
+            embedder = self.client.embedding_model
+            self.query_embeddings = _query_embedding_service(final_config["embedder"], embedder)
+            self.client.embedding_model = Mem0QueryEmbedder(embedder, self.query_embeddings)
+
     async def store_memory(
         self,
         memory: BaseMemory,
@@ -205,7 +235,9 @@ class EnhancedMemoryManager:
         )
 
         try:
-            results = self.client.search(
+            # Mem0's search blocks on the embedding and vector store calls
+            results = await asyncio.to_thread(
+                self.client.search,
                 query=query,
                 user_id=namespace,
                 limit=limit,
@@ -100,6 +100,12 @@ class AIPolicy(BaseModel):
     streaming_enabled: bool = False
     cache_results: bool = False
     cache_ttl_seconds: int = 300
+    semantic_cache: bool = False  # Also reuse responses to near-duplicate prompts
+    semantic_cache_threshold: float = 0.95  # Minimum cosine similarity for a semantic hit
+    priority: str = "standard"  # interactive, standard, batch: queueing order under load
+    fallback_provider: Optional[str] = None
+    fallback_model: Optional[str] = None
+    hedge_requests: bool = False  # Race the fallback when the primary is slower than its p95
 
     # Observability
     trace_enabled: bool = True
@@ -119,6 +125,7 @@ DEFAULT_POLICIES: Dict[UseCaseType, AIPolicy] = {
         model="gpt-4.1-mini",  # Faster, cheaper for structured scoring
         temperature=0.3,  # Lower temperature for consistent scoring
         max_tokens=500,
+        priority="batch",  # Bulk scoring yields to interactive traffic
         memory=MemoryConfig(
             enabled=True,
             memory_type="summary",
@@ -274,6 +281,7 @@ Industry insights:
         model="gpt-4",
         temperature=0.7,
         max_tokens=1500,
+        priority="interactive",
         memory=MemoryConfig(
             enabled=True,
             memory_type="buffer",
@@ -0,0 +1,216 @@
+"""
+Prompt/Response Cache
+
+Two tiers in front of AI provider calls:
+- Exact: a stable digest of model, system prompt, temperature, output schema
+  and prompt, stored in the shared async cache so every worker can hit it
+- Semantic (opt-in per policy): reuses a cached response whose prompt
+  embedding is within a cosine threshold, scoped per use case and org
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.cache import AsyncCacheBackend, async_cache
+from .policies import AIPolicy
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], Awaitable[List[float]]]
+
+
+def prompt_digest(
+    policy: AIPolicy,
+    prompt: str,
+    response_model: Optional[type] = None,
+) -> str:
+    """SHA-256 over everything that determines the response for a prompt"""
+    schema = response_model.__name__ if response_model is not None else ""
+    parts = [
+        policy.provider,
+        policy.model,
+        f"{policy.temperature:.4f}",
+        str(policy.max_tokens),
+        schema,
+        policy.system_prompt,
+        prompt,
+    ]
+    hasher = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so field boundaries can't be forged
+        hasher.update(len(encoded).to_bytes(8, "big"))
+        hasher.update(encoded)
+    return hasher.hexdigest()
+
+
+class SemanticIndex:
+    """
+    Bounded in-process set of unit prompt vectors for one scope
+
+    Entries point at exact cache keys; the responses themselves live in the
+    shared cache, so an entry whose key has expired there is just a miss.
+    """
+
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self._vectors: Optional[np.ndarray] = None
+        self._keys: List[str] = []
+        self._expiry: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, vector: np.ndarray, key: str, ttl: int) -> None:
+        if key in self._keys:
+            return
+        row = vector.reshape(1, -1)
+        if self._vectors is None or self._vectors.shape[1] != row.shape[1]:
+            self._vectors, self._keys, self._expiry = row, [], []
+        else:
+            self._vectors = np.vstack([self._vectors, row])
+        self._keys.append(key)
+        self._expiry.append(time.time() + ttl)
+        if len(self._keys) > self.capacity:
+            # Oldest first
+            drop = len(self._keys) - self.capacity
+            self._vectors = self._vectors[drop:]
+            self._keys = self._keys[drop:]
+            self._expiry = self._expiry[drop:]
+
+    def nearest(self, vector: np.ndarray) -> Optional[Tuple[str, float]]:
+        """Best live match as (cache key, cosine similarity)"""
+        if self._vectors is None or not self._keys:
+            return None
+        scores = self._vectors @ vector
+        now = time.time()
+        for index in np.argsort(scores)[::-1][:3]:
+            if self._expiry[index] > now:
+                return self._keys[index], float(scores[index])
+        return None
+
+    def discard(self, key: str) -> None:
+        if key in self._keys:
+            index = self._keys.index(key)
+            self._vectors = np.delete(self._vectors, index, axis=0)
+            del self._keys[index]
+            del self._expiry[index]
+
+
+class PromptCache:
+    """Exact + semantic response cache used by AIOrchestrator.execute"""
+
+    def __init__(
+        self,
+        backend: Optional[AsyncCacheBackend] = None,
+        embedder: Optional[Embedder] = None,
+        index_capacity: int = 512,
+        max_scopes: int = 1000,
+    ):
+        self.backend = backend or async_cache
+        self.embedder = embedder
+        self.index_capacity = index_capacity
+        self.max_scopes = max_scopes
+        # Least recently used scope is dropped first
+        self._indexes: "OrderedDict[Tuple[str, str, str], SemanticIndex]" = OrderedDict()
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+
+    @staticmethod
+    def _key(policy: AIPolicy, digest: str) -> str:
+        return f"ai:{policy.use_case.value}:{digest}"
+
+    @staticmethod
+    def _scope(policy: AIPolicy, org_id: str, response_model: Optional[type]):
+        # Only prompts that differ in wording may share a response: same use
+        # case, org and generation settings
+        settings_digest = prompt_digest(policy, "", response_model)
+        return policy.use_case.value, org_id, settings_digest
+
+    def _semantic_enabled(self, policy: AIPolicy) -> bool:
+        return policy.semantic_cache and self.embedder is not None
+
+    async def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(await self.embedder(prompt), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Prompt embedding failed, skipping semantic cache: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    async def lookup(
+        self,
+        policy: AIPolicy,
+        org_id: str,
+        prompt: str,
+        response_model: Optional[type] = None,
+    ) -> Tuple[str, Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Find a cached response for a prompt
+
+        Returns (exact cache key, cached value or None, prompt vector). The
+        key and vector are handed back to store() on a miss so the prompt
+        isn't hashed or embedded twice.
+        """
+        key = self._key(policy, prompt_digest(policy, prompt, response_model))
+        cached = await self.backend.get(key)
+        if cached:
+            self.hits["exact"] += 1
+            return key, cached, None
+
+        vector = None
+        if self._semantic_enabled(policy):
+            vector = await self._embed(prompt)
+            index = self._indexes.get(self._scope(policy, org_id, response_model))
+            match = index.nearest(vector) if index is not None and vector is not None else None
+            if match and match[1] >= policy.semantic_cache_threshold:
+                cached = await self.backend.get(match[0])
+                if cached:
+                    self.hits["semantic"] += 1
+                    logger.info(
+                        f"Semantic cache hit for {policy.use_case.value} "
+                        f"(similarity {match[1]:.3f})"
+                    )
+                    return key, cached, None
+                index.discard(match[0])
+
+        self.misses += 1
+        return key, None, vector
+
+    async def store(
+        self,
+        policy: AIPolicy,
+        org_id: str,
+        key: str,
+        value: Dict[str, Any],
+        vector: Optional[np.ndarray] = None,
+        response_model: Optional[type] = None,
+    ) -> None:
+        """Cache a response under its exact key and index its prompt vector"""
+        await self.backend.set(key, value, ttl=policy.cache_ttl_seconds)
+        if vector is not None and self._semantic_enabled(policy):
+            scope = self._scope(policy, org_id, response_model)
+            index = self._indexes.get(scope)
+            if index is None:
+                index = self._indexes[scope] = SemanticIndex(self.index_capacity)
+                if len(self._indexes) > self.max_scopes:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(scope)
+            index.add(vector, key, policy.cache_ttl_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.misses + sum(self.hits.values())
+        return {
+            "exact_hits": self.hits["exact"],
+            "semantic_hits": self.hits["semantic"],
+            "misses": self.misses,
+            "hit_rate": round(sum(self.hits.values()) / lookups, 3) if lookups else 0.0,
+            "semantic_scopes": len(self._indexes),
+            "semantic_entries": sum(len(index) for index in self._indexes.values()),
+        }
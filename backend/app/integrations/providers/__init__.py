@@ -5,8 +5,9 @@ Eliminates hardcoded AI_PROVIDER checks throughout codebase
 """
 
 from .anthropic_provider import AnthropicProvider
-from .base import AIProvider, ProviderResponse
+from .base import AIProvider, ProviderRateLimitError, ProviderResponse
 from .factory import ProviderFactory
+from .fake_provider import FakeProvider
 from .openai_provider import OpenAIProvider
 
 __all__ = [
@@ -14,5 +15,7 @@ __all__ = [
     "ProviderResponse",
     "OpenAIProvider",
     "AnthropicProvider",
+    "FakeProvider",
+    "ProviderRateLimitError",
     "ProviderFactory",
 ]
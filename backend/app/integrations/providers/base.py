@@ -24,6 +24,12 @@ class ProviderResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+class ProviderRateLimitError(Exception):
+    """Provider rejected the request for rate or capacity reasons (HTTP 429)"""
+
+    status_code = 429
+
+
 class AIProvider(ABC):
     """Abstract base class for AI providers"""
 
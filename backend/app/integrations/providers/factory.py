@@ -10,6 +10,7 @@ from typing import Optional
 
 from .anthropic_provider import AnthropicProvider
 from .base import AIProvider
+from .fake_provider import FakeProvider
 from .openai_provider import OpenAIProvider
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,7 @@ class ProviderFactory:
     _providers = {
         "openai": OpenAIProvider,
         "anthropic": AnthropicProvider,
+        "fake": FakeProvider,
     }
 
     @classmethod
@@ -36,7 +38,7 @@ class ProviderFactory:
         Create AI provider instance
 
         Args:
-            provider: Provider name ('openai', 'anthropic'). Defaults to AI_PROVIDER env var
+            provider: Provider name ('openai', 'anthropic', 'fake'). Defaults to AI_PROVIDER env var
             model: Model name. Defaults based on provider
             temperature: Sampling temperature
             max_tokens: Max tokens to generate
@@ -75,6 +77,7 @@ class ProviderFactory:
         defaults = {
             "openai": os.getenv("OPENAI_MODEL", "gpt-4"),
             "anthropic": os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022"),
+            "fake": "fake-model",
         }
         return defaults.get(provider, "gpt-4")
 
@@ -0,0 +1,116 @@
+"""
+Fake Provider Implementation
+
+Local stand-in for a model API with configurable latency and capacity,
+for development and load tests without network calls or API keys.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import AsyncIterator, Optional
+
+from pydantic import BaseModel
+
+from .base import AIProvider, ProviderRateLimitError, ProviderResponse
+
+logger = logging.getLogger(__name__)
+
+
+class FakeProvider(AIProvider):
+    """
+    Echoes prompts after a simulated delay
+
+    Extra parameters:
+        latency_ms: mean response time
+        jitter_ms: uniform +/- spread around latency_ms
+        capacity: concurrent requests served before returning 429s (None = unlimited)
+        response: content to return instead of the echo, or a callable prompt -> content
+    """
+
+    def __init__(
+        self,
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs,
+    ):
+        self.latency_ms = kwargs.pop("latency_ms", 50.0)
+        self.jitter_ms = kwargs.pop("jitter_ms", 0.0)
+        self.capacity = kwargs.pop("capacity", None)
+        self.response = kwargs.pop("response", None)
+        super().__init__(model, temperature, max_tokens, **kwargs)
+        self.in_flight = 0
+        self.calls = 0
+        self.rejected = 0
+
+    async def _respond(self, prompt: str) -> ProviderResponse:
+        start_time = time.time()
+        self.calls += 1
+        if self.capacity is not None and self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise ProviderRateLimitError(f"{self.model} over capacity ({self.capacity})")
+
+        self.in_flight += 1
+        try:
+            delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+            await asyncio.sleep(max(delay, 0) / 1000)
+        finally:
+            self.in_flight -= 1
+
+        if callable(self.response):
+            content = self.response(prompt)
+        else:
+            content = self.response if self.response is not None else prompt
+        return ProviderResponse(
+            content=content,
+            model=self.model,
+            provider=self.name,
+            tokens_used=self.count_tokens(prompt) + self.count_tokens(content),
+            latency_ms=(time.time() - start_time) * 1000,
+            finish_reason="stop",
+        )
+
+    async def generate(
+        self, prompt: str, system_prompt: Optional[str] = None, **kwargs
+    ) -> ProviderResponse:
+        """Return the prompt (or the configured response) after the simulated delay"""
+        return await self._respond(prompt)
+
+    async def generate_structured(
+        self,
+        prompt: str,
+        response_model: type[BaseModel],
+        system_prompt: Optional[str] = None,
+        **kwargs,
+    ) -> tuple[BaseModel, ProviderResponse]:
+        """Validate the response (JSON) against response_model"""
+        provider_response = await self._respond(prompt)
+        validated_output = response_model(**json.loads(provider_response.content))
+        return validated_output, provider_response
+
+    async def stream(
+        self, prompt: str, system_prompt: Optional[str] = None, **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream the response word by word"""
+        provider_response = await self._respond(prompt)
+        for word in provider_response.content.split(" "):
+            yield word + " "
+
+    def count_tokens(self, text: str) -> int:
+        """Roughly four characters per token"""
+        return max(1, len(text) // 4)
+
+    @property
+    def name(self) -> str:
+        return "fake"
+
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
+    @property
+    def supports_function_calling(self) -> bool:
+        return False
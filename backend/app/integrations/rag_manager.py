@@ -1,31 +1,37 @@
 """
 Enhanced RAG Manager
 
-Hybrid search (vector + keyword), index versioning, and safe context filtering
+Hybrid search (vector + BM25 keyword, fused by reciprocal rank), index versioning,
+and safe context filtering
 """
 
+import asyncio
+import hashlib
+import json
 import logging
 import os
 import re
+import time
+import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import qdrant_client
-from llama_index.core import (
-    Document,
-    StorageContext,
-    VectorStoreIndex,
-)
+from llama_index.core import Document, VectorStoreIndex
 from llama_index.core.node_parser import SentenceSplitter, SimpleNodeParser
+from llama_index.core.schema import MetadataMode, NodeRelationship, RelatedNodeInfo, TextNode
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openai import OpenAI
 from llama_index.vector_stores.qdrant import QdrantVectorStore
-from qdrant_client.models import Distance, VectorParams
+from qdrant_client.models import Distance, PointIdsList, VectorParams
 
+from .embedding_service import get_embedding_service
+from .keyword_index import BM25Index, reciprocal_rank_fusion
 from .rag_schemas import (
     ChunkingStrategy,
     IngestionRequest,
     IngestionResult,
+    NormalizedDocument,
     SafeContextFilter,
     SearchFilter,
 )
@@ -36,13 +42,17 @@ logger = logging.getLogger(__name__)
 class EnhancedRAGManager:
     """
     Enhanced RAG manager with:
-    - Normalized document ingestion
+    - Normalized document ingestion (batched, incremental)
     - Hybrid search (vector + keyword)
     - Index versioning (blue/green deployments)
     - Safe context filtering
     - Tenant isolation
     """
 
+    # After a failed scan of a collection's stored chunks, wait this long before rescanning
+    # (applies to the ingest manifest and the keyword index separately)
+    LOAD_RETRY_SECONDS = 30.0
+
     def __init__(
         self,
         qdrant_host: str = "localhost",
@@ -50,6 +60,9 @@ class EnhancedRAGManager:
         embedding_model: str = "text-embedding-3-small",
         llm_model: str = "gpt-4",
         current_index_version: str = "kb_v1",
+        rrf_k: int = 60,
+        embed_batch_size: int = 256,
+        ingest_workers: int = 4,
     ):
         """
         Initialize enhanced RAG manager
@@ -60,6 +73,9 @@ class EnhancedRAGManager:
             embedding_model: OpenAI embedding model
             llm_model: LLM model for queries
             current_index_version: Current active index version
+            rrf_k: Reciprocal-rank-fusion constant (higher flattens rank differences)
+            embed_batch_size: Chunks per embedding request during ingestion
+            ingest_workers: Documents chunked in parallel during ingestion
         """
         self.qdrant_host = qdrant_host
         self.qdrant_port = qdrant_port
@@ -77,7 +93,10 @@ class EnhancedRAGManager:
         self.embed_model = OpenAIEmbedding(
             model=embedding_model,
             api_key=os.getenv("OPENAI_API_KEY"),
+            embed_batch_size=embed_batch_size,
         )
+        # Cached, micro-batched query embeddings shared with other retrievers
+        self.query_embeddings = get_embedding_service(embedding_model)
 
         self.llm = OpenAI(
             model=llm_model,
@@ -87,6 +106,18 @@ class EnhancedRAGManager:
         # Index cache
         self._index_cache: Dict[str, VectorStoreIndex] = {}
 
+        # BM25 index over the same chunks, filled at ingest time
+        self.keyword_index = BM25Index()
+        self.rrf_k = rrf_k
+
+        self.embed_batch_size = embed_batch_size
+        self.ingest_workers = ingest_workers
+        self._vector_stores: Dict[str, QdrantVectorStore] = {}
+        # collection -> (org_id, document_id) -> version, content hash and chunk hashes
+        self._manifests: Dict[str, Dict[Tuple[str, str], Dict[str, Any]]] = {}
+        self._manifest_retry_at: Dict[str, float] = {}
+        self._keyword_retry_at: Dict[str, float] = {}
+
         logger.info(f"Initialized RAG manager with index version {current_index_version}")
 
     async def ingest_documents(
@@ -96,6 +127,13 @@ class EnhancedRAGManager:
         """
         Ingest normalized documents with chunking and embedding
 
+        Runs as a streaming pipeline: documents are chunked in a worker pool,
+        new or changed chunks are embedded in batches of ``embed_batch_size``
+        and upserted in bulk while the next batch embeds. Chunks whose content
+        hash is already stored are skipped, so re-ingesting a lightly edited
+        knowledge base only re-embeds what changed. An indexed document is
+        replaced when ``request.upsert`` is set or its version is bumped.
+
         Args:
             request: Ingestion request with documents and settings
 
@@ -103,78 +141,176 @@ class EnhancedRAGManager:
             Ingestion result with stats
         """
         job_id = f"ingest_{datetime.utcnow().timestamp()}"
+        started = time.perf_counter()
 
         # Get collection name for index version
         collection_name = self._get_collection_name(request.index_version)
 
         # Ensure collection exists
         await self._ensure_collection(collection_name, request.index_version)
+        manifest = await self._get_manifest(collection_name)
 
-        # Process documents
-        documents_processed = 0
-        chunks_created = 0
-        failed_documents = []
-
+        # Skip documents that are already indexed as-is
+        work: List[Tuple[NormalizedDocument, str]] = []
+        documents_skipped = 0
         for doc in request.documents:
+            doc_hash = self._document_hash(doc)
+            existing = manifest.get((doc.org_id, doc.document_id))
+            if existing is not None and (
+                existing["doc_hash"] == doc_hash
+                or (not request.upsert and doc.version <= existing["version"])
+            ):
+                documents_skipped += 1
+                continue
+            work.append((doc, doc_hash))
+
+        stats = {stage: {"items": 0, "seconds": 0.0} for stage in ("chunk", "embed", "upsert")}
+        chunked: Dict[Tuple[str, str], Tuple[NormalizedDocument, str, List[TextNode]]] = {}
+        failed_documents: List[str] = []
+        counts = {"created": 0, "skipped": 0}
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        workers = asyncio.Semaphore(self.ingest_workers)
+
+        def fail(doc_keys):
+            for key in doc_keys:
+                if key in chunked and key[1] not in failed_documents:
+                    failed_documents.append(key[1])
+
+        async def chunk_one(doc: NormalizedDocument, doc_hash: str):
+            async with workers:
+                start = time.perf_counter()
+                try:
+                    chunks = await self._chunk_document(
+                        self._to_llama_document(doc, doc_hash),
+                        strategy=request.chunking_strategy,
+                        chunk_size=request.chunk_size,
+                        chunk_overlap=request.chunk_overlap,
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to chunk document {doc.document_id}: {e}")
+                    return doc, doc_hash, None
+                stats["chunk"]["items"] += len(chunks)
+                stats["chunk"]["seconds"] += time.perf_counter() - start
+                return doc, doc_hash, chunks
+
+        async def chunk_stage():
+            batch: List[TextNode] = []
             try:
-                # Convert to LlamaIndex Document
-                llama_doc = Document(
-                    text=doc.content,
-                    metadata={
-                        "document_id": doc.document_id,
-                        "title": doc.title,
-                        "source": doc.source.value,
-                        "object_type": doc.object_type.value,
-                        "org_id": doc.org_id,
-                        "account_id": doc.account_id,
-                        "access_level": doc.access_level.value,
-                        "tags": doc.tags,
-                        "industry": doc.industry,
-                        "region": doc.region,
-                        "created_at": doc.created_at.isoformat(),
-                        "version": doc.version,
-                        **doc.metadata,
-                    },
-                )
-
-                # Chunk document
-                chunks = await self._chunk_document(
-                    llama_doc,
-                    strategy=request.chunking_strategy,
-                    chunk_size=request.chunk_size,
-                    chunk_overlap=request.chunk_overlap,
-                )
-
-                # Add to index
-                await self._add_chunks_to_index(
-                    chunks,
-                    collection_name,
-                    request.index_version,
-                )
-
-                documents_processed += 1
-                chunks_created += len(chunks)
-
-            except Exception as e:
-                logger.error(f"Failed to ingest document {doc.document_id}: {e}")
-                failed_documents.append(doc.document_id)
+                tasks = [chunk_one(doc, doc_hash) for doc, doc_hash in work]
+                for next_done in asyncio.as_completed(tasks):
+                    doc, doc_hash, chunks = await next_done
+                    if chunks is None:
+                        failed_documents.append(doc.document_id)
+                        continue
+                    key = (doc.org_id, doc.document_id)
+                    chunked[key] = (doc, doc_hash, chunks)
+                    known = manifest.get(key, {}).get("chunks", {})
+                    for chunk in chunks:
+                        if known.get(chunk.metadata["chunk_id"]) == chunk.metadata["content_hash"]:
+                            counts["skipped"] += 1
+                            continue
+                        batch.append(chunk)
+                        if len(batch) >= self.embed_batch_size:
+                            await embed_queue.put(batch)
+                            batch = []
+                if batch:
+                    await embed_queue.put(batch)
+            finally:
+                await embed_queue.put(None)
+
+        async def embed_stage():
+            try:
+                while (batch := await embed_queue.get()) is not None:
+                    start = time.perf_counter()
+                    try:
+                        embeddings = await self.embed_model.aget_text_embedding_batch(
+                            [chunk.get_content(metadata_mode=MetadataMode.EMBED) for chunk in batch]
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to embed {len(batch)} chunks: {e}")
+                        fail({(c.metadata["org_id"], c.metadata["document_id"]) for c in batch})
+                        continue
+                    for chunk, embedding in zip(batch, embeddings):
+                        chunk.embedding = embedding
+                    stats["embed"]["items"] += len(batch)
+                    stats["embed"]["seconds"] += time.perf_counter() - start
+                    await upsert_queue.put(batch)
+            finally:
+                await upsert_queue.put(None)
+
+        async def upsert_stage():
+            while (batch := await upsert_queue.get()) is not None:
+                start = time.perf_counter()
+                try:
+                    await self._add_chunks_to_index(batch, collection_name, request.index_version)
+                except Exception as e:
+                    logger.error(f"Failed to upsert {len(batch)} chunks: {e}")
+                    fail({(c.metadata["org_id"], c.metadata["document_id"]) for c in batch})
+                    continue
+                for chunk in batch:
+                    self.keyword_index.add(
+                        collection_name, chunk.metadata["chunk_id"], chunk.text, chunk.metadata
+                    )
+                counts["created"] += len(batch)
+                stats["upsert"]["items"] += len(batch)
+                stats["upsert"]["seconds"] += time.perf_counter() - start
+
+        await asyncio.gather(chunk_stage(), embed_stage(), upsert_stage())
+
+        # Drop chunks that no longer exist (document got shorter) and record
+        # what is now indexed
+        for key, (doc, doc_hash, chunks) in chunked.items():
+            if doc.document_id in failed_documents:
+                continue
+            new_hashes = {c.metadata["chunk_id"]: c.metadata["content_hash"] for c in chunks}
+            stale = [c for c in manifest.get(key, {}).get("chunks", {}) if c not in new_hashes]
+            if stale:
+                try:
+                    await self._delete_chunks(collection_name, doc.org_id, stale)
+                except Exception as e:
+                    logger.error(f"Failed to remove stale chunks of {doc.document_id}: {e}")
+                    failed_documents.append(doc.document_id)
+                    continue
+            manifest[key] = {"version": doc.version, "doc_hash": doc_hash, "chunks": new_hashes}
+
+        documents_processed = len(chunked) - len(
+            [key for key in chunked if key[1] in failed_documents]
+        )
+        stage_stats = {
+            stage: {
+                "items": values["items"],
+                "seconds": round(values["seconds"], 3),
+                "items_per_second": (
+                    round(values["items"] / values["seconds"], 1) if values["seconds"] else 0.0
+                ),
+            }
+            for stage, values in stats.items()
+        }
 
         logger.info(
-            f"Ingestion complete: {documents_processed} documents, {chunks_created} chunks",
+            f"Ingestion complete: {documents_processed} documents, {counts['created']} chunks "
+            f"embedded, {counts['skipped']} unchanged chunks and {documents_skipped} "
+            f"unchanged documents skipped",
             extra={
                 "job_id": job_id,
                 "index_version": request.index_version,
                 "documents_processed": documents_processed,
-                "chunks_created": chunks_created,
+                "chunks_created": counts["created"],
+                "stage_stats": stage_stats,
             },
         )
 
         return IngestionResult(
             job_id=job_id,
             documents_processed=documents_processed,
-            chunks_created=chunks_created,
+            documents_skipped=documents_skipped,
+            chunks_created=counts["created"],
+            chunks_skipped=counts["skipped"],
             failed_documents=failed_documents,
             index_version=request.index_version,
+            stage_stats=stage_stats,
+            duration_seconds=round(time.perf_counter() - started, 3),
         )
 
     async def hybrid_search(
@@ -214,15 +350,15 @@ class EnhancedRAGManager:
             limit=max_results * 2,  # Get more for reranking
         )
 
-        # Keyword search (simplified - in production, use BM25 or Elasticsearch)
+        # BM25 keyword search over the same org's chunks
         keyword_results = await self._keyword_search(
             query=query,
             collection_name=collection_name,
-            filters=qdrant_filters,
-            limit=max_results,
+            filters=filters,
+            limit=max_results * 2,
         )
 
-        # Combine and deduplicate results
+        # Reciprocal-rank fusion of both lists
         combined_results = self._merge_results(
             vector_results,
             keyword_results,
@@ -308,14 +444,47 @@ class EnhancedRAGManager:
             )
             logger.info(f"Created collection {collection_name}")
 
+    @staticmethod
+    def _document_hash(doc: NormalizedDocument) -> str:
+        """Hash of everything about a document that ends up in its chunks"""
+        payload = doc.model_dump(mode="json", exclude={"version", "updated_at", "indexed_at"})
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _to_llama_document(self, doc: NormalizedDocument, doc_hash: str) -> Document:
+        """Convert to LlamaIndex Document"""
+        return Document(
+            text=doc.content,
+            metadata={
+                "document_id": doc.document_id,
+                "title": doc.title,
+                "source": doc.source.value,
+                "object_type": doc.object_type.value,
+                "org_id": doc.org_id,
+                "account_id": doc.account_id,
+                "access_level": doc.access_level.value,
+                "tags": doc.tags,
+                "industry": doc.industry,
+                "region": doc.region,
+                "created_at": doc.created_at.isoformat(),
+                "version": doc.version,
+                "doc_hash": doc_hash,
+                **doc.metadata,
+            },
+        )
+
+    @staticmethod
+    def _point_id(org_id: str, chunk_id: str) -> str:
+        """Stable Qdrant point ID, so re-ingested chunks overwrite themselves"""
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{org_id}/{chunk_id}"))
+
     async def _chunk_document(
         self,
         document: Document,
         strategy: ChunkingStrategy,
         chunk_size: int,
         chunk_overlap: int,
-    ) -> List[Document]:
-        """Chunk document based on strategy"""
+    ) -> List[TextNode]:
+        """Chunk document based on strategy (parsing runs in a worker thread)"""
         if strategy == ChunkingStrategy.SEMANTIC:
             parser = SentenceSplitter(
                 chunk_size=chunk_size,
@@ -327,45 +496,99 @@ class EnhancedRAGManager:
                 chunk_overlap=chunk_overlap,
             )
 
-        nodes = parser.get_nodes_from_documents([document])
+        nodes = await asyncio.to_thread(parser.get_nodes_from_documents, [document])
 
-        # Convert nodes back to documents with chunk metadata
+        # Rebuild nodes with stable IDs, chunk metadata and a content hash
+        document_id = document.metadata["document_id"]
         chunks = []
         for idx, node in enumerate(nodes):
-            chunk_doc = Document(
-                text=node.text,
-                metadata={
-                    **document.metadata,
-                    "chunk_index": idx,
-                    "chunk_id": f"{document.metadata['document_id']}_chunk_{idx}",
-                },
+            chunk_id = f"{document_id}_chunk_{idx}"
+            metadata = {
+                **document.metadata,
+                "chunk_index": idx,
+                "chunk_id": chunk_id,
+            }
+            content = {k: v for k, v in metadata.items() if k not in ("version", "doc_hash")}
+            metadata["content_hash"] = hashlib.sha256(
+                json.dumps([node.text, content], sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest()
+            chunks.append(
+                TextNode(
+                    id_=self._point_id(metadata["org_id"], chunk_id),
+                    text=node.text,
+                    metadata=metadata,
+                    # Bookkeeping fields don't belong in the embedded text
+                    excluded_embed_metadata_keys=["version", "doc_hash", "content_hash"],
+                    relationships={
+                        NodeRelationship.SOURCE: RelatedNodeInfo(node_id=document_id),
+                    },
+                )
             )
-            chunks.append(chunk_doc)
 
         return chunks
 
     async def _add_chunks_to_index(
         self,
-        chunks: List[Document],
+        chunks: List[TextNode],
         collection_name: str,
         index_version: str,
     ):
-        """Add chunks to Qdrant collection"""
-        # Create vector store
-        vector_store = QdrantVectorStore(
-            client=self.qdrant_client,
+        """Upsert embedded chunks to the Qdrant collection in one bulk write"""
+        vector_store = self._vector_stores.get(collection_name)
+        if vector_store is None:
+            vector_store = self._vector_stores[collection_name] = QdrantVectorStore(
+                client=self.qdrant_client,
+                collection_name=collection_name,
+                batch_size=self.embed_batch_size,
+            )
+        await asyncio.to_thread(vector_store.add, chunks)
+
+    async def _delete_chunks(self, collection_name: str, org_id: str, chunk_ids: List[str]):
+        """Remove chunks from Qdrant and the keyword index"""
+        await asyncio.to_thread(
+            self.qdrant_client.delete,
             collection_name=collection_name,
+            points_selector=PointIdsList(
+                points=[self._point_id(org_id, chunk_id) for chunk_id in chunk_ids]
+            ),
         )
+        self.keyword_index.remove_chunks(collection_name, org_id, chunk_ids)
 
-        # Create storage context
-        storage_context = StorageContext.from_defaults(vector_store=vector_store)
+    async def _get_manifest(self, collection_name: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        What is indexed per document, read from Qdrant payloads on first use
 
-        # Create or update index
-        VectorStoreIndex.from_documents(
-            chunks,
-            storage_context=storage_context,
-            embed_model=self.embed_model,
-        )
+        The scan runs in a worker thread. If it fails, ingests skip it for
+        LOAD_RETRY_SECONDS instead of rescanning the collection every time.
+        """
+        manifest = self._manifests.get(collection_name)
+        if manifest is not None:
+            return manifest
+        if time.monotonic() < self._manifest_retry_at.get(collection_name, 0.0):
+            return {}
+
+        try:
+            manifest = await asyncio.to_thread(self._read_manifest, collection_name)
+        except Exception as e:
+            # Nothing can be skipped this time; everything is re-embedded
+            logger.warning(f"Could not read indexed chunks of {collection_name}: {e}")
+            self._manifest_retry_at[collection_name] = time.monotonic() + self.LOAD_RETRY_SECONDS
+            return {}
+        self._manifest_retry_at.pop(collection_name, None)
+        self._manifests[collection_name] = manifest
+        return manifest
+
+    def _read_manifest(self, collection_name: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        manifest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for chunk_id, _, payload in self._scroll_chunks(collection_name):
+            entry = manifest.setdefault(
+                (payload.get("org_id"), payload.get("document_id")),
+                {"version": 0, "doc_hash": None, "chunks": {}},
+            )
+            entry["version"] = max(entry["version"], payload.get("version") or 0)
+            entry["doc_hash"] = entry["doc_hash"] or payload.get("doc_hash")
+            entry["chunks"][chunk_id] = payload.get("content_hash")
+        return manifest
 
     def _build_qdrant_filters(self, filters: SearchFilter) -> Dict[str, Any]:
         """Build Qdrant filter conditions"""
@@ -393,8 +616,8 @@ class EnhancedRAGManager:
         limit: int,
     ) -> List[Dict[str, Any]]:
         """Perform vector similarity search"""
-        # Embed query
-        query_embedding = self.embed_model.get_query_embedding(query)
+        # Embed query (cached; the provider call runs off the event loop)
+        query_embedding = await self.query_embeddings.embed_query(query)
 
         # Search
         results = self.qdrant_client.search(
@@ -406,7 +629,7 @@ class EnhancedRAGManager:
 
         return [
             {
-                "content": r.payload.get("text", ""),
+                "content": self._payload_text(r.payload),
                 "metadata": r.payload,
                 "score": r.score,
                 "search_type": "vector",
@@ -418,17 +641,56 @@ class EnhancedRAGManager:
         self,
         query: str,
         collection_name: str,
-        filters: Dict[str, Any],
+        filters: SearchFilter,
         limit: int,
     ) -> List[Dict[str, Any]]:
-        """
-        Perform keyword search
-
-        Note: This is simplified. In production, use Elasticsearch or
-        Qdrant's payload-based filtering with full-text search.
-        """
-        # For now, return empty - would integrate with keyword index
-        return []
+        """Perform BM25 keyword search"""
+        if collection_name not in self.keyword_index.loaded:
+            await self._load_keyword_index(collection_name)
+        return self.keyword_index.search(collection_name, query, filters, limit)
+
+    @staticmethod
+    def _payload_text(payload: Dict[str, Any]) -> str:
+        """Chunk text from a Qdrant payload (LlamaIndex keeps it inside _node_content)"""
+        text = payload.get("text")
+        if text is None and payload.get("_node_content"):
+            text = json.loads(payload["_node_content"]).get("text")
+        return text or ""
+
+    def _scroll_chunks(self, collection_name: str) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (chunk_id, text, payload) for every chunk stored in a collection"""
+        offset = None
+        while True:
+            points, offset = self.qdrant_client.scroll(
+                collection_name=collection_name,
+                limit=1000,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for point in points:
+                payload = point.payload or {}
+                chunk_id = payload.get("chunk_id")
+                if chunk_id:
+                    yield chunk_id, self._payload_text(payload), payload
+            if offset is None:
+                break
+
+    async def _load_keyword_index(self, collection_name: str):
+        """Build the keyword index from chunks already stored in Qdrant (e.g. after a restart)"""
+        if time.monotonic() < self._keyword_retry_at.get(collection_name, 0.0):
+            return
+        try:
+            rows = await asyncio.to_thread(
+                lambda: [row for row in self._scroll_chunks(collection_name) if row[1]]
+            )
+        except Exception as e:
+            # Retried after LOAD_RETRY_SECONDS; until then only newly ingested chunks match
+            logger.warning(f"Could not load keyword index for {collection_name}: {e}")
+            self._keyword_retry_at[collection_name] = time.monotonic() + self.LOAD_RETRY_SECONDS
+            return
+        self._keyword_retry_at.pop(collection_name, None)
+        self.keyword_index.rebuild(collection_name, rows)
 
     def _merge_results(
         self,
@@ -436,24 +698,12 @@ class EnhancedRAGManager:
         keyword_results: List[Dict[str, Any]],
         similarity_threshold: float,
     ) -> List[Dict[str, Any]]:
-        """Merge and rerank vector and keyword results"""
+        """Fuse vector and keyword results by reciprocal rank"""
         # Filter by similarity threshold
         vector_results = [r for r in vector_results if r["score"] >= similarity_threshold]
 
-        # Combine (deduplicate by chunk_id)
-        seen_chunks = set()
-        merged = []
-
-        for result in vector_results + keyword_results:
-            chunk_id = result["metadata"].get("chunk_id")
-            if chunk_id not in seen_chunks:
-                seen_chunks.add(chunk_id)
-                merged.append(result)
-
-        # Sort by score
-        merged.sort(key=lambda x: x["score"], reverse=True)
-
-        return merged
+        # Ranks, not raw scores, are combined: cosine and BM25 aren't comparable
+        return reciprocal_rank_fusion([vector_results, keyword_results], k=self.rrf_k)
 
     def _apply_safe_context_filter(
         self,
@@ -189,8 +189,14 @@ class IngestionResult(BaseModel):
     job_id: str
     documents_processed: int
     chunks_created: int
+    documents_skipped: int = Field(0, description="Already indexed and unchanged")
+    chunks_skipped: int = Field(0, description="Unchanged chunks that were not re-embedded")
     failed_documents: List[str] = Field(default_factory=list)
     index_version: str
+    stage_stats: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict, description="Items, busy seconds and throughput per pipeline stage"
+    )
+    duration_seconds: float = 0.0
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
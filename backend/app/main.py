@@ -42,10 +42,15 @@ from app.api.routes.playbooks import router as playbooks_router  # New enhanced
 from app.api.routes.status import router as status_router
 from app.api.routes.tasks import router as tasks_router  # NEW
 from app.api.routes.websocket import router as websocket_router
+from app.core.broadcast import broadcast_bus
 from app.core.cache import cache
 from app.core.config import settings
 from app.core.db import engine, init_db, seed_if_empty
+from app.core.distributed_saga import saga_orchestrator
+from app.core.event_sourcing import event_store, read_model
 from app.core.metrics import metrics_endpoint
+from app.core.ml_advanced import lead_index
+from app.core.multi_tier_cache import multi_tier_cache
 from app.core.security import (
     RateLimitMiddleware,
     RequestIDMiddleware,
@@ -53,6 +58,10 @@ from app.core.security import (
     SecurityHeadersMiddleware,
 )
 from app.core.sentry import init_sentry
+from app.core.webhooks import webhook_dispatcher
+from app.integrations.ai_orchestrator import close_orchestrator
+from app.services.enrichment_service import enrichment_service
+from app.services.sequence_service import sequence_service
 
 # from app.core.tracing import init_tracing  # Commented out - OpenTelemetry not installed
 
@@ -97,7 +106,18 @@ app.add_middleware(RequestSizeLimitMiddleware, max_body_size=settings.max_reques
 
 # Add request ID and rate limiting
 app.add_middleware(RequestIDMiddleware)
-app.add_middleware(RateLimitMiddleware, max_requests=100, window_seconds=60)
+app.add_middleware(
+    RateLimitMiddleware,
+    max_requests=100,
+    window_seconds=60,
+    # LLM-backed endpoints consume more of the budget per call
+    route_costs={
+        "/api/ai/": 5,
+        "/api/ai-advanced/": 5,
+        "/api/ai/status": 1,
+        "/api/ai/templates": 1,
+    },
+)
 
 
 @app.get("/health")
@@ -171,6 +191,42 @@ def on_startup():
     logger.info("✅ Application ready to serve requests")
 
 
+@app.on_event("startup")
+async def start_cache_invalidation():
+    await multi_tier_cache.start()
+
+
+@app.on_event("startup")
+async def start_broadcast_bus():
+    await broadcast_bus.start()
+
+
+@app.on_event("startup")
+async def start_webhook_dispatcher():
+    await webhook_dispatcher.start()
+
+
+@app.on_event("startup")
+async def resume_sagas():
+    await saga_orchestrator.resume()
+
+
+@app.on_event("startup")
+async def start_sequence_service():
+    await sequence_service.start()
+
+
+@app.on_event("startup")
+async def start_vector_index_saver():
+    await lead_index.start()
+
+
+@app.on_event("startup")
+async def load_event_store():
+    await event_store.load()
+    await read_model.start()
+
+
 @app.on_event("shutdown")
 def on_shutdown():
     logger.info("🔄 Application shutting down gracefully...")
@@ -179,6 +235,52 @@ def on_shutdown():
     logger.info("✅ Cleanup complete")
 
 
+@app.on_event("shutdown")
+async def stop_cache_invalidation():
+    await multi_tier_cache.stop()
+
+
+@app.on_event("shutdown")
+async def stop_broadcast_bus():
+    await broadcast_bus.stop()
+
+
+@app.on_event("shutdown")
+async def stop_webhook_dispatcher():
+    await webhook_dispatcher.stop()
+
+
+@app.on_event("shutdown")
+async def stop_saga_orchestrator():
+    await saga_orchestrator.stop()
+
+
+@app.on_event("shutdown")
+async def flush_event_store():
+    await read_model.stop()
+    await event_store.flush()
+
+
+@app.on_event("shutdown")
+async def stop_sequence_service():
+    await sequence_service.stop()
+
+
+@app.on_event("shutdown")
+async def save_vector_indexes():
+    await lead_index.stop()
+
+
+@app.on_event("shutdown")
+async def close_enrichment_client():
+    await enrichment_service.close()
+
+
+@app.on_event("shutdown")
+async def release_ai_budget():
+    await close_orchestrator()
+
+
 # Include all routers
 app.include_router(leads_router, prefix="/api", tags=["leads"])
 app.include_router(campaigns_router, prefix="/api", tags=["campaigns"])
@@ -293,6 +293,14 @@ class Webhook(SQLModel, table=True):
     last_failure: Optional[datetime] = None
     failure_count: int = Field(default=0, ge=0)
 
+    # Delivery settings (see app.core.webhooks.WebhookDispatcher)
+    max_retries: int = Field(default=3, ge=0, sa_column_kwargs={"server_default": "3"})
+    timeout_seconds: int = Field(default=30, ge=1, sa_column_kwargs={"server_default": "30"})
+    # Events per request; above 1 the subscriber receives {"event": "batch", "deliveries": [...]}
+    batch_size: int = Field(default=1, ge=1, sa_column_kwargs={"server_default": "1"})
+    # Requests in flight to this endpoint at once
+    max_concurrency: int = Field(default=2, ge=1, sa_column_kwargs={"server_default": "2"})
+
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
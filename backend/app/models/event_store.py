@@ -0,0 +1,66 @@
+"""
+Event Store Models
+
+Durable storage for app.core.event_sourcing:
+- domain_events: append-only log with a global position and a
+  per-aggregate sequence number
+- aggregate_snapshots: periodic aggregate state so replays only apply the tail
+- event_checkpoints: resumable offsets of named subscriptions and projections
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Index, UniqueConstraint
+from sqlmodel import TEXT, Column, Field, SQLModel
+
+
+class EventRecord(SQLModel, table=True):
+    """One row per domain event"""
+
+    __tablename__ = "domain_events"
+    __table_args__ = (
+        UniqueConstraint(
+            "aggregate_type", "aggregate_id", "sequence", name="uq_domain_events_stream"
+        ),
+        Index("idx_domain_events_type", "event_type", "position"),
+    )
+
+    # Global, gap-free offset in append order
+    position: int = Field(primary_key=True)
+    event_id: str = Field(max_length=64, unique=True)
+    event_type: str = Field(max_length=100)
+    aggregate_type: str = Field(max_length=100)
+    aggregate_id: str = Field(max_length=255)
+    # 1-based position within the aggregate's own stream
+    sequence: int
+    timestamp: datetime
+    user_id: Optional[int] = None
+    data: str = Field(sa_column=Column(TEXT))  # JSON
+    event_metadata: str = Field(default="{}", sa_column=Column(TEXT))  # JSON
+    version: int = Field(default=1)
+
+
+class SnapshotRecord(SQLModel, table=True):
+    """Aggregate state after applying its first ``sequence`` events"""
+
+    __tablename__ = "aggregate_snapshots"
+
+    aggregate_type: str = Field(primary_key=True, max_length=100)
+    aggregate_id: str = Field(primary_key=True, max_length=255)
+    sequence: int = Field(primary_key=True)
+    # Latest event timestamp covered by the snapshot
+    max_timestamp: datetime
+    state: str = Field(sa_column=Column(TEXT))  # JSON, without history
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CheckpointRecord(SQLModel, table=True):
+    """Last event position processed by a named subscriber"""
+
+    __tablename__ = "event_checkpoints"
+
+    name: str = Field(primary_key=True, max_length=200)
+    position: int = Field(default=0)
+    state: Optional[str] = Field(default=None, sa_column=Column(TEXT))  # JSON, projections only
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,45 @@
+"""
+Saga Journal Model
+
+Write-ahead log for app.core.distributed_saga: one row per saga start,
+step completion/failure/compensation and saga status change. Sagas whose
+journal has no terminal status are resumed on startup.
+
+A saga being run holds a lease in ``saga_leases``, renewed while its worker
+is alive, so resume() on another worker only picks up sagas whose worker
+has stopped.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import TEXT, Column, Field, SQLModel
+
+
+class SagaJournalRecord(SQLModel, table=True):
+    """One saga progress entry"""
+
+    __tablename__ = "saga_journal"
+    __table_args__ = (
+        Index("idx_saga_journal_saga", "saga_id", "id"),
+        Index("idx_saga_journal_kind", "kind", "status"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    saga_id: str = Field(max_length=64)
+    kind: str = Field(max_length=20)  # started, step, status
+    status: str = Field(max_length=20)
+    step: Optional[str] = Field(default=None, max_length=100)
+    data: Optional[str] = Field(default=None, sa_column=Column(TEXT))  # JSON
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SagaLeaseRecord(SQLModel, table=True):
+    """Which worker is running a saga, and until when"""
+
+    __tablename__ = "saga_leases"
+
+    saga_id: str = Field(primary_key=True, max_length=64)
+    owner: str = Field(max_length=100)
+    expires_at: datetime = Field(index=True)
@@ -0,0 +1,30 @@
+"""
+Sequence Schedule Model
+
+Due-time index for app.services.sequence_scheduler: one row per active
+enrollment, ordered by when its next step is due. Leased rows carry the
+lease token and are pushed to the lease expiry so they reappear if the
+worker never acks. ``owner`` names the worker holding the enrollment, since
+enrollment state lives in that worker's SequenceService; the owner renews
+``owner_expires_at`` while it runs, and rows whose owner has stopped are
+reclaimed by the other workers.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class ScheduledStepRecord(SQLModel, table=True):
+    """Next step due for one enrollment"""
+
+    __tablename__ = "sequence_schedule"
+
+    enrollment_id: str = Field(primary_key=True, max_length=64)
+    due_at: datetime = Field(index=True)
+    owner: Optional[str] = Field(default=None, max_length=64, index=True)
+    owner_expires_at: Optional[datetime] = Field(default=None)
+    lease_token: Optional[str] = Field(default=None, max_length=64)
+    # Bumped on every change; leases are taken with compare-and-set on it
+    version: int = Field(default=0)
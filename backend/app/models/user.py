@@ -88,6 +88,7 @@ class User(BaseModel):
     name: str = "Test User"
     hashed_password: Optional[str] = None
     role: UserRole = UserRole.USER
+    tier: str = "free"  # Plan in RateLimiter.TIERS; issued as the token's "tier" claim
     is_active: bool = True
     created_at: datetime = datetime.now()
     last_login: Optional[datetime] = None
@@ -0,0 +1,35 @@
+"""
+Webhook Delivery Model
+
+Outbound queue for app.core.webhooks: one row per event to deliver to one
+endpoint. Rows are partitioned by webhook_id and picked up in
+next_attempt_at order; a leased row is pushed to the lease expiry so it is
+retried if the dispatcher dies mid-delivery.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import TEXT, Column, Field, SQLModel
+
+
+class WebhookDeliveryRecord(SQLModel, table=True):
+    """One pending, delivered or dead-lettered webhook delivery"""
+
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        Index("idx_webhook_deliveries_due", "status", "webhook_id", "next_attempt_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    webhook_id: int
+    event: str = Field(max_length=100)
+    payload: str = Field(sa_column=Column(TEXT))  # JSON
+    status: str = Field(default="pending", max_length=20)  # pending, delivered, failed
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    lease_token: Optional[str] = Field(default=None, max_length=64)
+    last_error: Optional[str] = Field(default=None, max_length=500)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    delivered_at: Optional[datetime] = None
@@ -3,14 +3,18 @@ Lead Enrichment Service
 Provides company and contact enrichment via multiple data sources
 """
 
+import asyncio
 import logging
 import os
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 import httpx
 from pydantic import BaseModel
 
+from app.core.multi_tier_cache import ShardedLRUCache, SingleFlight
+from app.core.rate_limiting import RateLimit, create_rate_limit_engine
+
 logger = logging.getLogger(__name__)
 
 
@@ -67,140 +71,262 @@ class EnrichmentService:
     """
     Multi-source enrichment service
     Supports Clearbit, Apollo, and mock data for development
+
+    All provider calls share one pooled HTTP client and go through a
+    per-provider concurrency cap and request-rate limit, with retries on
+    429/5xx. Results are kept in a bounded TTL cache, and concurrent lookups
+    of the same email or domain are coalesced.
     """
 
-    def __init__(self):
+    # Parallel requests and requests per minute allowed per provider
+    PROVIDER_LIMITS: Dict[str, Dict[str, int]] = {
+        "clearbit": {"concurrency": 10, "per_minute": 600},
+        "apollo": {"concurrency": 5, "per_minute": 200},
+    }
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    MAX_RETRIES = 3
+
+    def __init__(
+        self,
+        cache_ttl: int = 24 * 3600,
+        cache_max_entries: int = 100_000,
+        bulk_concurrency: int = 50,
+    ):
         self.clearbit_key = os.getenv("CLEARBIT_API_KEY")
         self.apollo_key = os.getenv("APOLLO_API_KEY")
         self.hunter_key = os.getenv("HUNTER_API_KEY")
+        self.bulk_concurrency = bulk_concurrency
+
+        self._cache = ShardedLRUCache(
+            num_shards=8,
+            max_bytes=256 * 1024 * 1024,
+            max_entries=cache_max_entries,
+            default_ttl=cache_ttl,
+        )
+        self._inflight = SingleFlight()
+        self._rate_limiter = create_rate_limit_engine("token_bucket")
+
+        # Loop-bound resources, recreated if used from a new event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._provider_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Connections and semaphores cannot be shared across event loops
+            self._loop = loop
+            self._client = None
+            self._provider_slots = {
+                provider: asyncio.Semaphore(limits["concurrency"])
+                for provider, limits in self.PROVIDER_LIMITS.items()
+            }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client"""
+        self._bind_loop()
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+
+    async def _request(self, provider: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Call a provider API within its concurrency and rate limits, retrying
+        throttled and failed requests with backoff.
+        """
+        client = self.client
+        limits = self.PROVIDER_LIMITS[provider]
+        rate = [RateLimit(limits["per_minute"], 60, name=provider)]
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            while True:
+                check = await self._rate_limiter.hit(f"enrichment:{provider}", rate)
+                if check.allowed:
+                    break
+                await asyncio.sleep(check.retry_after)
+
+            try:
+                async with self._provider_slots[provider]:
+                    response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == self.MAX_RETRIES:
+                    raise
+                logger.warning(f"{provider} request failed ({e}), retrying")
+                await asyncio.sleep(min(0.5 * 2**attempt, 10.0))
+                continue
+
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                return response
+
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else min(0.5 * 2**attempt, 10.0)
+            logger.warning(f"{provider} returned {response.status_code}, retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+        return response
+
+    async def _cached(self, cache_key: str, loader) -> EnrichmentResult:
+        result = await self._cache.get(cache_key)
+        if result is not None:
+            return result.model_copy(update={"cached": True})
+
+        async def load() -> EnrichmentResult:
+            result = await loader()
+            if result.success:
+                await self._cache.set(cache_key, result)
+            return result
 
-        # In-memory cache for development
-        self._cache: Dict[str, EnrichmentResult] = {}
+        return await self._inflight.do(cache_key, load)
 
     async def enrich_email(self, email: str) -> EnrichmentResult:
         """
         Enrich a contact by email address
         Tries multiple sources in priority order
         """
-        # Check cache first
-        cache_key = f"email:{email.lower()}"
-        if cache_key in self._cache:
-            result = self._cache[cache_key]
-            result.cached = True
-            return result
+        return await self._cached(f"email:{email.lower()}", lambda: self._lookup_email(email))
+
+    async def _lookup_email(self, email: str) -> EnrichmentResult:
+        result = None
 
         # Try Clearbit first (if configured)
         if self.clearbit_key:
             result = await self._enrich_clearbit(email)
-            if result.success:
-                self._cache[cache_key] = result
-                return result
 
         # Try Apollo (if configured)
-        if self.apollo_key:
+        if self.apollo_key and not (result and result.success):
             result = await self._enrich_apollo(email)
-            if result.success:
-                self._cache[cache_key] = result
-                return result
 
         # Fallback to mock enrichment for development
-        result = await self._enrich_mock(email)
-        self._cache[cache_key] = result
+        if not (result and result.success):
+            result = await self._enrich_mock(email)
+
+        # Company data is looked up once per domain, however many contacts share it
+        if result.contact and result.company is None and "@" in email:
+            company = await self.enrich_company(email.split("@")[1])
+            if company.success:
+                result.company = company.company
+                result.contact.company = company.company
+
         return result
 
     async def enrich_company(self, domain: str) -> EnrichmentResult:
         """Enrich a company by domain"""
-        cache_key = f"domain:{domain.lower()}"
-        if cache_key in self._cache:
-            result = self._cache[cache_key]
-            result.cached = True
-            return result
+        return await self._cached(f"domain:{domain.lower()}", lambda: self._lookup_company(domain))
 
+    async def _lookup_company(self, domain: str) -> EnrichmentResult:
         # Try Clearbit
         if self.clearbit_key:
             result = await self._enrich_company_clearbit(domain)
             if result.success:
-                self._cache[cache_key] = result
                 return result
 
         # Fallback to mock
-        result = await self._enrich_company_mock(domain)
-        self._cache[cache_key] = result
-        return result
+        return await self._enrich_company_mock(domain)
 
-    async def bulk_enrich(self, emails: list[str]) -> list[EnrichmentResult]:
-        """Enrich multiple emails"""
-        results = []
+    async def bulk_enrich(
+        self, emails: list[str], concurrency: Optional[int] = None
+    ) -> list[EnrichmentResult]:
+        """
+        Enrich multiple emails concurrently.
+        Each distinct email is looked up once; results keep the input order.
+        """
+        unique: Dict[str, str] = {}
         for email in emails:
-            result = await self.enrich_email(email)
-            results.append(result)
-        return results
+            unique.setdefault(email.lower(), email)
+        results: Dict[str, EnrichmentResult] = {}
+        pending = iter(unique.items())
+
+        async def worker() -> None:
+            for key, email in pending:
+                try:
+                    results[key] = await self.enrich_email(email)
+                except Exception as e:
+                    logger.error(f"Enrichment failed for {email}: {e}")
+                    results[key] = EnrichmentResult(success=False, source="bulk", error=str(e))
+
+        workers = min(concurrency or self.bulk_concurrency, len(unique))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        return [results[email.lower()] for email in emails]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cache": self._cache.get_stats(),
+            "inflight": self._inflight.get_stats(),
+        }
 
     async def _enrich_clearbit(self, email: str) -> EnrichmentResult:
         """Enrich via Clearbit API"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://person.clearbit.com/v2/combined/find",
-                    params={"email": email},
-                    headers={"Authorization": f"Bearer {self.clearbit_key}"},
-                    timeout=10.0,
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    person = data.get("person", {})
-                    company = data.get("company", {})
-
-                    enriched_company = None
-                    if company:
-                        enriched_company = EnrichedCompany(
-                            name=company.get("name", ""),
-                            domain=company.get("domain"),
-                            industry=company.get("category", {}).get("industry"),
-                            size=company.get("metrics", {}).get("employeesRange"),
-                            revenue=company.get("metrics", {}).get("estimatedAnnualRevenue"),
-                            founded=company.get("foundedYear"),
-                            location=company.get("location"),
-                            description=company.get("description"),
-                            linkedin_url=company.get("linkedin", {}).get("handle"),
-                            twitter_url=company.get("twitter", {}).get("handle"),
-                            tech_stack=company.get("tech", []),
-                            tags=company.get("tags", []),
-                        )
-
-                    enriched_contact = EnrichedContact(
-                        email=email,
-                        first_name=person.get("name", {}).get("givenName"),
-                        last_name=person.get("name", {}).get("familyName"),
-                        full_name=person.get("name", {}).get("fullName"),
-                        title=person.get("employment", {}).get("title"),
-                        seniority=person.get("employment", {}).get("seniority"),
-                        linkedin_url=person.get("linkedin", {}).get("handle"),
-                        twitter_url=person.get("twitter", {}).get("handle"),
-                        location=person.get("location"),
-                        bio=person.get("bio"),
-                        avatar_url=person.get("avatar"),
-                        company=enriched_company,
+            response = await self._request(
+                "clearbit",
+                "GET",
+                "https://person.clearbit.com/v2/combined/find",
+                params={"email": email},
+                headers={"Authorization": f"Bearer {self.clearbit_key}"},
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                person = data.get("person", {})
+                company = data.get("company", {})
+
+                enriched_company = None
+                if company:
+                    enriched_company = EnrichedCompany(
+                        name=company.get("name", ""),
+                        domain=company.get("domain"),
+                        industry=company.get("category", {}).get("industry"),
+                        size=company.get("metrics", {}).get("employeesRange"),
+                        revenue=company.get("metrics", {}).get("estimatedAnnualRevenue"),
+                        founded=company.get("foundedYear"),
+                        location=company.get("location"),
+                        description=company.get("description"),
+                        linkedin_url=company.get("linkedin", {}).get("handle"),
+                        twitter_url=company.get("twitter", {}).get("handle"),
+                        tech_stack=company.get("tech", []),
+                        tags=company.get("tags", []),
                     )
 
-                    return EnrichmentResult(
-                        success=True,
-                        source="clearbit",
-                        contact=enriched_contact,
-                        company=enriched_company,
-                        credits_used=1,
-                    )
-                elif response.status_code == 404:
-                    return EnrichmentResult(
-                        success=False, source="clearbit", error="Contact not found"
-                    )
-                else:
-                    return EnrichmentResult(
-                        success=False,
-                        source="clearbit",
-                        error=f"API error: {response.status_code}",
-                    )
+                enriched_contact = EnrichedContact(
+                    email=email,
+                    first_name=person.get("name", {}).get("givenName"),
+                    last_name=person.get("name", {}).get("familyName"),
+                    full_name=person.get("name", {}).get("fullName"),
+                    title=person.get("employment", {}).get("title"),
+                    seniority=person.get("employment", {}).get("seniority"),
+                    linkedin_url=person.get("linkedin", {}).get("handle"),
+                    twitter_url=person.get("twitter", {}).get("handle"),
+                    location=person.get("location"),
+                    bio=person.get("bio"),
+                    avatar_url=person.get("avatar"),
+                    company=enriched_company,
+                )
+
+                return EnrichmentResult(
+                    success=True,
+                    source="clearbit",
+                    contact=enriched_contact,
+                    company=enriched_company,
+                    credits_used=1,
+                )
+            elif response.status_code == 404:
+                return EnrichmentResult(success=False, source="clearbit", error="Contact not found")
+            else:
+                return EnrichmentResult(
+                    success=False,
+                    source="clearbit",
+                    error=f"API error: {response.status_code}",
+                )
         except Exception as e:
             logger.error(f"Clearbit enrichment error: {e}")
             return EnrichmentResult(success=False, source="clearbit", error=str(e))
@@ -208,74 +334,71 @@ class EnrichmentService:
     async def _enrich_apollo(self, email: str) -> EnrichmentResult:
         """Enrich via Apollo API"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.apollo.io/v1/people/match",
-                    json={"email": email},
-                    headers={"X-Api-Key": self.apollo_key},
-                    timeout=10.0,
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    person = data.get("person", {})
-                    org = person.get("organization", {})
-
-                    enriched_company = None
-                    if org:
-                        enriched_company = EnrichedCompany(
-                            name=org.get("name", ""),
-                            domain=org.get("primary_domain"),
-                            industry=org.get("industry"),
-                            size=org.get("estimated_num_employees"),
-                            location=f"{org.get('city', '')}, {org.get('state', '')}",
-                            linkedin_url=org.get("linkedin_url"),
-                            twitter_url=org.get("twitter_url"),
-                        )
-
-                    enriched_contact = EnrichedContact(
-                        email=email,
-                        first_name=person.get("first_name"),
-                        last_name=person.get("last_name"),
-                        full_name=person.get("name"),
-                        title=person.get("title"),
-                        seniority=person.get("seniority"),
-                        department=(
-                            person.get("departments", [""])[0]
-                            if person.get("departments")
-                            else None
-                        ),
-                        phone=(
-                            person.get("phone_numbers", [{}])[0].get("sanitized_number")
-                            if person.get("phone_numbers")
-                            else None
-                        ),
-                        linkedin_url=person.get("linkedin_url"),
-                        location=f"{person.get('city', '')}, {person.get('state', '')}",
-                        company=enriched_company,
+            response = await self._request(
+                "apollo",
+                "POST",
+                "https://api.apollo.io/v1/people/match",
+                json={"email": email},
+                headers={"X-Api-Key": self.apollo_key},
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                person = data.get("person", {})
+                org = person.get("organization", {})
+
+                enriched_company = None
+                if org:
+                    enriched_company = EnrichedCompany(
+                        name=org.get("name", ""),
+                        domain=org.get("primary_domain"),
+                        industry=org.get("industry"),
+                        size=org.get("estimated_num_employees"),
+                        location=f"{org.get('city', '')}, {org.get('state', '')}",
+                        linkedin_url=org.get("linkedin_url"),
+                        twitter_url=org.get("twitter_url"),
                     )
 
-                    return EnrichmentResult(
-                        success=True,
-                        source="apollo",
-                        contact=enriched_contact,
-                        company=enriched_company,
-                        credits_used=1,
-                    )
-                else:
-                    return EnrichmentResult(
-                        success=False,
-                        source="apollo",
-                        error=f"API error: {response.status_code}",
-                    )
+                enriched_contact = EnrichedContact(
+                    email=email,
+                    first_name=person.get("first_name"),
+                    last_name=person.get("last_name"),
+                    full_name=person.get("name"),
+                    title=person.get("title"),
+                    seniority=person.get("seniority"),
+                    department=(
+                        person.get("departments", [""])[0] if person.get("departments") else None
+                    ),
+                    phone=(
+                        person.get("phone_numbers", [{}])[0].get("sanitized_number")
+                        if person.get("phone_numbers")
+                        else None
+                    ),
+                    linkedin_url=person.get("linkedin_url"),
+                    location=f"{person.get('city', '')}, {person.get('state', '')}",
+                    company=enriched_company,
+                )
+
+                return EnrichmentResult(
+                    success=True,
+                    source="apollo",
+                    contact=enriched_contact,
+                    company=enriched_company,
+                    credits_used=1,
+                )
+            else:
+                return EnrichmentResult(
+                    success=False,
+                    source="apollo",
+                    error=f"API error: {response.status_code}",
+                )
         except Exception as e:
             logger.error(f"Apollo enrichment error: {e}")
             return EnrichmentResult(success=False, source="apollo", error=str(e))
 
     async def _enrich_mock(self, email: str) -> EnrichmentResult:
-        """Mock enrichment for development/testing"""
-        # Extract domain and generate mock data
-        domain = email.split("@")[1] if "@" in email else "example.com"
+        """Mock enrichment for development/testing (company is resolved per domain)"""
+        # Generate mock data from the local part
         name_part = email.split("@")[0]
 
         # Generate realistic mock data
@@ -290,33 +413,11 @@ class EnrichmentService:
             "CTO",
             "Sales Manager",
         ]
-        mock_industries = [
-            "SaaS",
-            "FinTech",
-            "Healthcare",
-            "E-commerce",
-            "Enterprise Software",
-        ]
-        mock_sizes = ["11-50", "51-200", "201-500", "501-1000", "1000+"]
 
         import hashlib
 
         hash_val = int(hashlib.md5(email.encode()).hexdigest(), 16)
 
-        enriched_company = EnrichedCompany(
-            name=domain.split(".")[0].title() + " Inc.",
-            domain=domain,
-            industry=mock_industries[hash_val % len(mock_industries)],
-            size=mock_sizes[hash_val % len(mock_sizes)],
-            revenue="$10M-$50M",
-            founded=2015 + (hash_val % 8),
-            location="San Francisco, CA",
-            description=f"A leading {mock_industries[hash_val % len(mock_industries)]} company",
-            linkedin_url=f"https://linkedin.com/company/{domain.split('.')[0]}",
-            tech_stack=["Salesforce", "HubSpot", "Slack", "AWS"],
-            tags=["B2B", "Growth Stage", "Tech"],
-        )
-
         enriched_contact = EnrichedContact(
             email=email,
             first_name=first_name,
@@ -335,57 +436,55 @@ class EnrichmentService:
             linkedin_url=f"https://linkedin.com/in/{first_name.lower()}{last_name.lower()}",
             location="San Francisco, CA",
             avatar_url=f"https://api.dicebear.com/7.x/avataaars/svg?seed={email}",
-            company=enriched_company,
         )
 
         return EnrichmentResult(
             success=True,
             source="mock",
             contact=enriched_contact,
-            company=enriched_company,
             credits_used=0,
         )
 
     async def _enrich_company_clearbit(self, domain: str) -> EnrichmentResult:
         """Enrich company via Clearbit"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://company.clearbit.com/v2/companies/find",
-                    params={"domain": domain},
-                    headers={"Authorization": f"Bearer {self.clearbit_key}"},
-                    timeout=10.0,
+            response = await self._request(
+                "clearbit",
+                "GET",
+                "https://company.clearbit.com/v2/companies/find",
+                params={"domain": domain},
+                headers={"Authorization": f"Bearer {self.clearbit_key}"},
+            )
+
+            if response.status_code == 200:
+                company = response.json()
+                enriched_company = EnrichedCompany(
+                    name=company.get("name", ""),
+                    domain=company.get("domain"),
+                    industry=company.get("category", {}).get("industry"),
+                    size=company.get("metrics", {}).get("employeesRange"),
+                    revenue=company.get("metrics", {}).get("estimatedAnnualRevenue"),
+                    founded=company.get("foundedYear"),
+                    location=company.get("location"),
+                    description=company.get("description"),
+                    linkedin_url=company.get("linkedin", {}).get("handle"),
+                    twitter_url=company.get("twitter", {}).get("handle"),
+                    tech_stack=company.get("tech", []),
+                    tags=company.get("tags", []),
                 )
 
-                if response.status_code == 200:
-                    company = response.json()
-                    enriched_company = EnrichedCompany(
-                        name=company.get("name", ""),
-                        domain=company.get("domain"),
-                        industry=company.get("category", {}).get("industry"),
-                        size=company.get("metrics", {}).get("employeesRange"),
-                        revenue=company.get("metrics", {}).get("estimatedAnnualRevenue"),
-                        founded=company.get("foundedYear"),
-                        location=company.get("location"),
-                        description=company.get("description"),
-                        linkedin_url=company.get("linkedin", {}).get("handle"),
-                        twitter_url=company.get("twitter", {}).get("handle"),
-                        tech_stack=company.get("tech", []),
-                        tags=company.get("tags", []),
-                    )
-
-                    return EnrichmentResult(
-                        success=True,
-                        source="clearbit",
-                        company=enriched_company,
-                        credits_used=1,
-                    )
-                else:
-                    return EnrichmentResult(
-                        success=False,
-                        source="clearbit",
-                        error=f"API error: {response.status_code}",
-                    )
+                return EnrichmentResult(
+                    success=True,
+                    source="clearbit",
+                    company=enriched_company,
+                    credits_used=1,
+                )
+            else:
+                return EnrichmentResult(
+                    success=False,
+                    source="clearbit",
+                    error=f"API error: {response.status_code}",
+                )
         except Exception as e:
             return EnrichmentResult(success=False, source="clearbit", error=str(e))
 
@@ -0,0 +1,314 @@
+"""
+Sequence Step Scheduler
+Time-ordered index of enrollments' next steps with lease/ack delivery
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import delete, func, or_, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.sequence_schedule import ScheduledStepRecord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StepLease:
+    """An enrollment's due step, reserved for one worker until ``expires_at``"""
+
+    enrollment_id: str
+    due_at: datetime
+    token: str
+    expires_at: datetime
+    owner: Optional[str] = None  # Worker the entry was tagged with when leased
+
+
+class SequenceScheduler:
+    """
+    In-process scheduler: a min-heap keyed on due time.
+
+    Rescheduling pushes a new heap entry and bumps the enrollment's version;
+    superseded entries are skipped when they surface. Finding k due steps
+    costs O(k log n) no matter how many enrollments are waiting.
+
+    Leasing moves the entry to the lease expiry, so a step whose worker dies
+    before ack() becomes due again and is handed to another worker. Only the
+    holder of the current lease token can ack or release it.
+
+    ``owner`` tags an entry with the worker holding its enrollment; peek_due()
+    and lease() given an owner only return that worker's entries (and
+    untagged ones). The tag is itself a lease: it lasts OWNER_LEASE_SECONDS
+    and the owner keeps it with renew_owner(), so entries of a worker that
+    stopped become visible to the others. Everything in this in-process
+    scheduler belongs to the one process, so it ignores the tag.
+    """
+
+    OWNER_LEASE_SECONDS = 300
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._entries: Dict[str, Tuple[datetime, int]] = {}
+        self._leases: Dict[str, str] = {}
+        self._versions = itertools.count()
+        self._lock = threading.Lock()
+
+    def _push(self, enrollment_id: str, due_at: datetime) -> None:
+        version = next(self._versions)
+        self._entries[enrollment_id] = (due_at, version)
+        heapq.heappush(self._heap, (due_at, version, enrollment_id))
+
+        if len(self._heap) > 2 * len(self._entries) + 1024:
+            # Mostly superseded entries; rebuild from the live ones
+            self._heap = [(due, ver, eid) for eid, (due, ver) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self, now: datetime, limit: int) -> List[Tuple[str, datetime]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < limit:
+            due_at, version, enrollment_id = heapq.heappop(self._heap)
+            entry = self._entries.get(enrollment_id)
+            if entry is None or entry[1] != version:
+                continue  # superseded or cancelled
+            due.append((enrollment_id, due_at))
+        return due
+
+    def schedule(self, enrollment_id: str, due_at: datetime, owner: Optional[str] = None) -> None:
+        """Set (or move) the time an enrollment's next step is due"""
+        with self._lock:
+            self._leases.pop(enrollment_id, None)
+            self._push(enrollment_id, due_at)
+
+    def cancel(self, enrollment_id: str) -> None:
+        with self._lock:
+            self._entries.pop(enrollment_id, None)
+            self._leases.pop(enrollment_id, None)
+
+    def renew_owner(self, owner: str, now: Optional[datetime] = None) -> None:
+        """Extend ``owner``'s tag on its entries by OWNER_LEASE_SECONDS"""
+
+    def peek_due(
+        self, limit: int = 100, now: Optional[datetime] = None, owner: Optional[str] = None
+    ) -> List[Tuple[str, datetime]]:
+        """Due enrollments in due-time order, without leasing them"""
+        now = now or datetime.utcnow()
+        with self._lock:
+            due = self._pop_due(now, limit)
+            for enrollment_id, due_at in due:
+                heapq.heappush(self._heap, (due_at, self._entries[enrollment_id][1], enrollment_id))
+            return due
+
+    def lease(
+        self,
+        limit: int = 100,
+        lease_seconds: int = 300,
+        now: Optional[datetime] = None,
+        owner: Optional[str] = None,
+    ) -> List[StepLease]:
+        """Reserve up to ``limit`` due steps"""
+        now = now or datetime.utcnow()
+        expires_at = now + timedelta(seconds=lease_seconds)
+        with self._lock:
+            leases = []
+            for enrollment_id, due_at in self._pop_due(now, limit):
+                token = uuid4().hex
+                self._leases[enrollment_id] = token
+                self._push(enrollment_id, expires_at)
+                leases.append(StepLease(enrollment_id, due_at, token, expires_at))
+            return leases
+
+    def ack(self, enrollment_id: str, token: str) -> bool:
+        """Complete a lease; False if it expired and was handed to someone else"""
+        with self._lock:
+            if self._leases.get(enrollment_id) != token:
+                return False
+            del self._leases[enrollment_id]
+            self._entries.pop(enrollment_id, None)
+            return True
+
+    def release(self, enrollment_id: str, token: str, retry_at: Optional[datetime] = None) -> bool:
+        """Give a lease back so the step is retried at ``retry_at`` (default: now)"""
+        with self._lock:
+            if self._leases.get(enrollment_id) != token:
+                return False
+            del self._leases[enrollment_id]
+            self._push(enrollment_id, retry_at or datetime.utcnow())
+            return True
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "scheduled": len(self._entries),
+            "leased": len(self._leases),
+            "heap_size": len(self._heap),
+        }
+
+
+class SQLSequenceScheduler(SequenceScheduler):
+    """
+    Scheduler persisted in the ``sequence_schedule`` table.
+
+    Due steps are read through the ``due_at`` index and leased with a
+    compare-and-set on the row version, so workers in separate processes
+    can drain the same schedule without double-sending. The table is
+    created by migrations 005, 008 and 011.
+
+    Rows whose owner tag has expired (``owner_expires_at`` in the past or
+    unset) are returned to every worker, so a restarted process's rows are
+    reclaimed instead of waiting on a worker ID that no longer exists.
+    """
+
+    def __init__(self, db_engine=None):
+        if db_engine is None:
+            from app.core.db import engine as db_engine
+        self.engine = db_engine
+
+    def _session(self) -> Session:
+        return Session(self.engine)
+
+    def schedule(self, enrollment_id: str, due_at: datetime, owner: Optional[str] = None) -> None:
+        owner_expires_at = (
+            datetime.utcnow() + timedelta(seconds=self.OWNER_LEASE_SECONDS) if owner else None
+        )
+        with self._session() as session:
+            record = session.get(ScheduledStepRecord, enrollment_id)
+            if record is None:
+                record = ScheduledStepRecord(
+                    enrollment_id=enrollment_id,
+                    due_at=due_at,
+                    owner=owner,
+                    owner_expires_at=owner_expires_at,
+                )
+            else:
+                record.due_at = due_at
+                record.owner = owner
+                record.owner_expires_at = owner_expires_at
+                record.lease_token = None
+                record.version += 1
+            session.add(record)
+            session.commit()
+
+    def cancel(self, enrollment_id: str) -> None:
+        with self._session() as session:
+            session.execute(
+                delete(ScheduledStepRecord).where(
+                    ScheduledStepRecord.enrollment_id == enrollment_id
+                )
+            )
+            session.commit()
+
+    def _due(
+        self, session: Session, now: datetime, limit: int, owner: Optional[str]
+    ) -> List[ScheduledStepRecord]:
+        query = select(ScheduledStepRecord).where(ScheduledStepRecord.due_at <= now)
+        if owner is not None:
+            query = query.where(
+                or_(
+                    ScheduledStepRecord.owner == owner,
+                    ScheduledStepRecord.owner.is_(None),
+                    ScheduledStepRecord.owner_expires_at.is_(None),
+                    ScheduledStepRecord.owner_expires_at <= now,
+                )
+            )
+        return session.exec(query.order_by(ScheduledStepRecord.due_at).limit(limit)).all()
+
+    def renew_owner(self, owner: str, now: Optional[datetime] = None) -> None:
+        expires_at = (now or datetime.utcnow()) + timedelta(seconds=self.OWNER_LEASE_SECONDS)
+        with self._session() as session:
+            session.execute(
+                update(ScheduledStepRecord)
+                .where(ScheduledStepRecord.owner == owner)
+                .values(owner_expires_at=expires_at)
+            )
+            session.commit()
+
+    def peek_due(
+        self, limit: int = 100, now: Optional[datetime] = None, owner: Optional[str] = None
+    ) -> List[Tuple[str, datetime]]:
+        with self._session() as session:
+            return [
+                (r.enrollment_id, r.due_at)
+                for r in self._due(session, now or datetime.utcnow(), limit, owner)
+            ]
+
+    def lease(
+        self,
+        limit: int = 100,
+        lease_seconds: int = 300,
+        now: Optional[datetime] = None,
+        owner: Optional[str] = None,
+    ) -> List[StepLease]:
+        now = now or datetime.utcnow()
+        expires_at = now + timedelta(seconds=lease_seconds)
+        leases = []
+        with self._session() as session:
+            for record in self._due(session, now, limit, owner):
+                token = uuid4().hex
+                claimed = session.execute(
+                    update(ScheduledStepRecord)
+                    .where(
+                        ScheduledStepRecord.enrollment_id == record.enrollment_id,
+                        ScheduledStepRecord.version == record.version,
+                    )
+                    .values(due_at=expires_at, lease_token=token, version=record.version + 1)
+                )
+                if claimed.rowcount == 1:
+                    leases.append(
+                        StepLease(
+                            record.enrollment_id, record.due_at, token, expires_at, record.owner
+                        )
+                    )
+            session.commit()
+        return leases
+
+    def ack(self, enrollment_id: str, token: str) -> bool:
+        with self._session() as session:
+            result = session.execute(
+                delete(ScheduledStepRecord).where(
+                    ScheduledStepRecord.enrollment_id == enrollment_id,
+                    ScheduledStepRecord.lease_token == token,
+                )
+            )
+            session.commit()
+            return result.rowcount == 1
+
+    def release(self, enrollment_id: str, token: str, retry_at: Optional[datetime] = None) -> bool:
+        with self._session() as session:
+            result = session.execute(
+                update(ScheduledStepRecord)
+                .where(
+                    ScheduledStepRecord.enrollment_id == enrollment_id,
+                    ScheduledStepRecord.lease_token == token,
+                )
+                .values(
+                    due_at=retry_at or datetime.utcnow(),
+                    lease_token=None,
+                    version=ScheduledStepRecord.version + 1,
+                )
+            )
+            session.commit()
+            return result.rowcount == 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._session() as session:
+            scheduled = session.exec(select(func.count()).select_from(ScheduledStepRecord)).one()
+            leased = session.exec(
+                select(func.count())
+                .select_from(ScheduledStepRecord)
+                .where(ScheduledStepRecord.lease_token.is_not(None))
+            ).one()
+            return {"scheduled": scheduled, "leased": leased}
+
+
+def create_sequence_scheduler() -> SequenceScheduler:
+    """Scheduler for ``settings.sequence_scheduler_backend`` ("memory" or "database")"""
+    if settings.sequence_scheduler_backend == "database":
+        return SQLSequenceScheduler()
+    return SequenceScheduler()
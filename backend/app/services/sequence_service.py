@@ -3,6 +3,7 @@ Follow-up Sequence Service
 Manages multi-step automated outreach sequences with AI personalization
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from enum import Enum
@@ -11,6 +12,8 @@ from uuid import uuid4
 
 from pydantic import BaseModel, Field
 
+from app.services.sequence_scheduler import SequenceScheduler, create_sequence_scheduler
+
 logger = logging.getLogger(__name__)
 
 
@@ -133,17 +136,52 @@ class Sequence(BaseModel):
 class SequenceService:
     """
     Manages outreach sequences and enrollments
+
+    Due steps come from a scheduler ordered on ``next_step_at`` rather than
+    a scan of all enrollments; workers lease steps with lease_pending_steps()
+    and confirm them with complete_step().
+
+    Enrollments are held in memory by the service that created them, so
+    schedule entries are tagged with ``worker_id`` and each service only
+    leases its own. start() keeps the tag alive; once a worker stops, its
+    entries expire and whichever worker leases them drops them, since their
+    enrollments went with the process. Untagged entries are released, never
+    dropped.
     """
 
-    def __init__(self):
+    def __init__(self, scheduler: Optional[SequenceScheduler] = None):
         # In-memory storage for development
         self._sequences: Dict[str, Sequence] = {}
         self._enrollments: Dict[str, SequenceEnrollment] = {}
         self._lead_enrollments: Dict[str, List[str]] = {}  # lead_id -> [enrollment_ids]
 
+        self.scheduler = scheduler or create_sequence_scheduler()
+        self.worker_id = uuid4().hex
+        self._heartbeat: Optional[asyncio.Task] = None
+        # sequence_id -> {step_number: step}
+        self._step_index: Dict[str, Dict[int, SequenceStep]] = {}
+
         # Initialize with sample sequences
         self._init_sample_sequences()
 
+    async def start(self) -> None:
+        """Renew this worker's tag on its schedule entries until stop()"""
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._renew_ownership())
+
+    async def stop(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    async def _renew_ownership(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.scheduler.renew_owner, self.worker_id)
+            except Exception as e:
+                logger.error(f"Failed to renew sequence schedule ownership: {e}")
+            await asyncio.sleep(self.scheduler.OWNER_LEASE_SECONDS / 3)
+
     def _init_sample_sequences(self):
         """Create sample sequences for demo"""
         # Cold Outreach Sequence
@@ -288,6 +326,14 @@ Best,
         self._sequences[cold_outreach.id] = cold_outreach
         self._sequences[demo_followup.id] = demo_followup
 
+    def _get_step(self, sequence: Sequence, step_number: int) -> Optional[SequenceStep]:
+        """Look up a step by number, re-indexing if the step list changed"""
+        index = self._step_index.get(sequence.id)
+        if index is None or len(index) != len(sequence.steps):
+            index = {step.step_number: step for step in sequence.steps}
+            self._step_index[sequence.id] = index
+        return index.get(step_number)
+
     # CRUD Operations
     def create_sequence(self, sequence: Sequence) -> Sequence:
         """Create a new sequence"""
@@ -318,6 +364,9 @@ Best,
             if hasattr(sequence, key):
                 setattr(sequence, key, value)
 
+        if "steps" in updates:
+            self._step_index.pop(sequence_id, None)
+
         sequence.updated_at = datetime.utcnow()
         self._sequences[sequence_id] = sequence
         return sequence
@@ -326,6 +375,7 @@ Best,
         """Delete a sequence"""
         if sequence_id in self._sequences:
             del self._sequences[sequence_id]
+            self._step_index.pop(sequence_id, None)
             return True
         return False
 
@@ -364,6 +414,7 @@ Best,
         )
 
         self._enrollments[enrollment.id] = enrollment
+        self.scheduler.schedule(enrollment.id, enrollment.next_step_at, owner=self.worker_id)
 
         if lead_id not in self._lead_enrollments:
             self._lead_enrollments[lead_id] = []
@@ -383,6 +434,7 @@ Best,
 
         enrollment.status = StepStatus.SKIPPED
         enrollment.completed_at = datetime.utcnow()
+        self.scheduler.cancel(enrollment_id)
         return True
 
     def get_enrollment(self, enrollment_id: str) -> Optional[SequenceEnrollment]:
@@ -394,37 +446,96 @@ Best,
         enrollment_ids = self._lead_enrollments.get(lead_id, [])
         return [self._enrollments[eid] for eid in enrollment_ids if eid in self._enrollments]
 
+    def _resolve_step(self, enrollment_id: str) -> Optional[Dict[str, Any]]:
+        enrollment = self._enrollments.get(enrollment_id)
+        if not enrollment or enrollment.status != StepStatus.PENDING:
+            return None
+
+        sequence = self.get_sequence(enrollment.sequence_id)
+        if not sequence:
+            return None
+
+        current_step = self._get_step(sequence, enrollment.current_step)
+        if not current_step:
+            return None
+
+        return {"enrollment": enrollment, "sequence": sequence, "step": current_step}
+
     def get_pending_steps(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get steps that are ready to be executed"""
+        """Get steps that are ready to be executed, earliest first"""
         now = datetime.utcnow()
         pending = []
-
-        for enrollment in self._enrollments.values():
-            if enrollment.status != StepStatus.PENDING:
-                continue
-
-            if enrollment.next_step_at and enrollment.next_step_at <= now:
-                sequence = self.get_sequence(enrollment.sequence_id)
-                if not sequence:
+        fetch = limit
+
+        # Entries for enrollments that stopped being sendable are skipped,
+        # so keep reading further down the schedule until ``limit`` is met
+        while len(pending) < limit:
+            due = self.scheduler.peek_due(fetch, now=now, owner=self.worker_id)
+            pending = []
+            for enrollment_id, _ in due:
+                if enrollment_id not in self._enrollments:
+                    continue  # Held by another worker
+                item = self._resolve_step(enrollment_id)
+                if item is None:
+                    # Enrollment ended (opened/clicked/removed) or its sequence or
+                    # step is gone; it won't send again
+                    self.scheduler.cancel(enrollment_id)
                     continue
+                pending.append(item)
+            if len(due) < fetch:
+                break
+            fetch *= 2
+
+        return pending[:limit]
 
-                # Find current step
-                current_step = None
-                for step in sequence.steps:
-                    if step.step_number == enrollment.current_step:
-                        current_step = step
-                        break
-
-                if current_step:
-                    pending.append(
-                        {
-                            "enrollment": enrollment,
-                            "sequence": sequence,
-                            "step": current_step,
-                        }
+    def lease_pending_steps(
+        self, limit: int = 100, lease_seconds: int = 300
+    ) -> List[Dict[str, Any]]:
+        """
+        Reserve due steps for this worker.
+        Each item carries a ``lease_token`` to pass to complete_step(); steps
+        not completed within ``lease_seconds`` are handed out again.
+        """
+        leased = []
+        for lease in self.scheduler.lease(limit, lease_seconds=lease_seconds, owner=self.worker_id):
+            if lease.enrollment_id not in self._enrollments:
+                if lease.owner is not None and lease.owner != self.worker_id:
+                    # Its owner stopped renewing, and the enrollment went with it
+                    logger.warning(
+                        f"Dropping step for enrollment {lease.enrollment_id} "
+                        f"orphaned by worker {lease.owner}"
                     )
+                    self.scheduler.ack(lease.enrollment_id, lease.token)
+                else:
+                    # Not ours to resolve (e.g. untagged); leave it for its worker
+                    self.scheduler.release(lease.enrollment_id, lease.token, lease.due_at)
+                continue
+            item = self._resolve_step(lease.enrollment_id)
+            if item is None:
+                # No longer sendable; drop it from the schedule
+                self.scheduler.ack(lease.enrollment_id, lease.token)
+                continue
+            item["lease_token"] = lease.token
+            leased.append(item)
+        return leased
 
-        return pending[:limit]
+    def complete_step(
+        self, enrollment_id: str, lease_token: str, step_status: StepStatus = StepStatus.SENT
+    ) -> Optional[SequenceEnrollment]:
+        """
+        Ack a leased step and advance the enrollment.
+        Returns None if the lease was lost to another worker.
+        """
+        if not self.scheduler.ack(enrollment_id, lease_token):
+            logger.warning(f"Lease for enrollment {enrollment_id} expired before completion")
+            return None
+        return self.advance_enrollment(enrollment_id, step_status)
+
+    def release_step(
+        self, enrollment_id: str, lease_token: str, retry_at: Optional[datetime] = None
+    ) -> bool:
+        """Give a leased step back to be retried at ``retry_at``"""
+        return self.scheduler.release(enrollment_id, lease_token, retry_at)
 
     def advance_enrollment(
         self, enrollment_id: str, step_status: StepStatus
@@ -445,26 +556,25 @@ Best,
             enrollment.status = StepStatus.REPLIED
             enrollment.completed_at = datetime.utcnow()
             sequence.total_replied += 1
+            self.scheduler.cancel(enrollment_id)
             return enrollment
 
         # Find next step
         next_step_number = enrollment.current_step + 1
-        next_step = None
-        for step in sequence.steps:
-            if step.step_number == next_step_number:
-                next_step = step
-                break
+        next_step = self._get_step(sequence, next_step_number)
 
         if next_step:
             # Schedule next step
             delay = timedelta(days=next_step.delay_days, hours=next_step.delay_hours)
             enrollment.current_step = next_step_number
             enrollment.next_step_at = datetime.utcnow() + delay
+            self.scheduler.schedule(enrollment_id, enrollment.next_step_at, owner=self.worker_id)
         else:
             # Sequence completed
             enrollment.status = StepStatus.SENT  # Mark as completed
             enrollment.completed_at = datetime.utcnow()
             sequence.total_completed += 1
+            self.scheduler.cancel(enrollment_id)
 
         return enrollment
 
@@ -3,9 +3,48 @@ Analytics background tasks
 """
 
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from sqlmodel import select
 
 from app.core.celery_app import celery_app
+from app.core.db import get_session
+from app.core.export import arrow_schema, export_to_storage, iter_query_batches
+from app.core.pagination import FilterBuilder
+from app.models.schemas import Campaign, Lead
+
+# Presigned download links for exports stay valid this long
+EXPORT_URL_EXPIRATION = 24 * 3600
+
+
+def lead_export_query(filters: Optional[Dict[str, Any]] = None):
+    """Leads to export, narrowed by FilterBuilder-style filters"""
+    return select(Lead).where(*FilterBuilder.build_filters(Lead, filters or {})).order_by(Lead.id)
+
+
+def _export_progress(task, user_id: int):
+    """Progress callback publishing rows/bytes written as the task's PROGRESS state"""
+
+    def report(rows: int, bytes_written: int) -> None:
+        task.update_state(
+            state="PROGRESS",
+            meta={"user_id": user_id, "rows": rows, "bytes_written": bytes_written},
+        )
+
+    return report
+
+
+def _export_summary(user_id: int, export_format: str, result) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "format": export_format,
+        "rows": result.rows,
+        "file_size_bytes": result.bytes_written,
+        "file_key": result.file_key,
+        "download_url": result.download_url,
+        "expires_at": (datetime.now() + timedelta(seconds=EXPORT_URL_EXPIRATION)).isoformat(),
+        "generated_at": datetime.now().isoformat(),
+    }
 
 
 @celery_app.task(name="app.tasks.analytics_tasks.calculate_daily_metrics")
@@ -66,27 +105,71 @@ def generate_user_report(user_id: int, period_days: int = 30):
         return {"success": False, "error": str(e)}
 
 
-@celery_app.task(name="app.tasks.analytics_tasks.export_analytics_data")
-def export_analytics_data(user_id: int, export_format: str = "csv", filters: Dict[str, Any] = None):
+@celery_app.task(bind=True, name="app.tasks.analytics_tasks.export_analytics_data")
+def export_analytics_data(
+    self,
+    user_id: int,
+    export_format: str = "csv",
+    filters: Dict[str, Any] = None,
+    compress: bool = False,
+):
     """
-    Export analytics data in specified format
+    Export campaign data in the specified format (csv, ndjson, parquet)
+    Streams rows from the database into a multipart upload in constant memory
     """
     try:
         print(f"Exporting analytics data for user {user_id} in {export_format} format")
 
-        # TODO: Generate export file and upload to S3 or similar
-        # Return download URL
+        query = (
+            select(Campaign)
+            .where(*FilterBuilder.build_filters(Campaign, filters or {}))
+            .order_by(Campaign.id)
+        )
+        with get_session() as session:
+            result = export_to_storage(
+                iter_query_batches(session, query),
+                "analytics_export",
+                user_id,
+                export_format,
+                compress,
+                progress=_export_progress(self, user_id),
+                url_expiration=EXPORT_URL_EXPIRATION,
+                schema=arrow_schema(query),
+            )
+
+        return _export_summary(user_id, export_format, result)
 
-        export_result = {
-            "user_id": user_id,
-            "format": export_format,
-            "file_size_bytes": 0,
-            "download_url": "https://example.com/exports/analytics_export.csv",
-            "expires_at": (datetime.now() + timedelta(hours=24)).isoformat(),
-            "generated_at": datetime.now().isoformat(),
-        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
-        return export_result
+
+@celery_app.task(bind=True, name="app.tasks.analytics_tasks.export_leads")
+def export_leads(
+    self,
+    user_id: int,
+    export_format: str = "csv",
+    filters: Dict[str, Any] = None,
+    compress: bool = False,
+):
+    """
+    Export leads to storage in the specified format
+    Progress (rows and bytes written) is reported as the PROGRESS task state
+    """
+    try:
+        query = lead_export_query(filters)
+        with get_session() as session:
+            result = export_to_storage(
+                iter_query_batches(session, query),
+                "leads_export",
+                user_id,
+                export_format,
+                compress,
+                progress=_export_progress(self, user_id),
+                url_expiration=EXPORT_URL_EXPIRATION,
+                schema=arrow_schema(query),
+            )
+
+        return _export_summary(user_id, export_format, result)
 
     except Exception as e:
         return {"success": False, "error": str(e)}
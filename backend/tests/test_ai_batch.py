@@ -0,0 +1,138 @@
+"""Tests for batched AI execution."""
+
+import json
+import re
+
+import pytest
+
+from app.integrations.ai_orchestrator import AIOrchestrator, OrchestrationContext
+from app.integrations.policies import UseCaseType
+from app.integrations.providers import FakeProvider
+from app.integrations.pydantic_agent import LeadScore
+
+
+def score_for(company):
+    return {"score": len(company) * 5, "confidence": 0.8, "recommendation": f"call {company}"}
+
+
+def scorer(prompt):
+    """Answer packed prompts per request; leads named "Skip" are left out."""
+    if "### Request" not in prompt:
+        return json.dumps(score_for(re.search(r"Company: (\w+)", prompt).group(1)))
+    results = []
+    for number, section in enumerate(prompt.split("### Request ")[1:], start=1):
+        company = re.search(r"Company: (\w+)", section).group(1)
+        if company != "Skip":
+            results.append({"item": number, **score_for(company)})
+    return json.dumps({"results": results})
+
+
+def lead(company):
+    return {
+        "company_name": company,
+        "industry": "saas",
+        "company_size": 50,
+        "engagement_summary": "opened 3 emails",
+        "buying_signals": "pricing page",
+        "rag_context": "",
+    }
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = AIOrchestrator()
+    policy = orchestrator.get_policy(UseCaseType.LEAD_SCORING).model_copy(
+        update={"provider": "fake", "model": "scorer", "cache_results": False}
+    )
+    orchestrator.update_policy(UseCaseType.LEAD_SCORING, policy)
+    provider = FakeProvider("scorer", latency_ms=1, response=scorer)
+    orchestrator._get_provider = lambda policy: provider
+    orchestrator.provider = provider
+    return orchestrator
+
+
+@pytest.mark.unit
+class TestExecuteBatch:
+    """Test packing, per-item fallback and streaming."""
+
+    context = OrchestrationContext(user_id="u1", org_id="o1")
+
+    async def test_packs_items_and_retries_missing_ones(self, orchestrator):
+        """Test 25 leads take 3 packed calls plus one retry for the dropped lead."""
+        budget_checks = []
+        check_budget = orchestrator.budget_manager.check_budget
+
+        async def counting_check(**kwargs):
+            budget_checks.append(kwargs)
+            return await check_budget(**kwargs)
+
+        orchestrator.budget_manager.check_budget = counting_check
+        companies = [f"Co{i}" for i in range(24)] + ["Skip"]
+
+        results = [
+            item
+            async for item in orchestrator.execute_batch(
+                UseCaseType.LEAD_SCORING,
+                [lead(c) for c in companies],
+                self.context,
+                response_model=LeadScore,
+                pack_size=10,
+            )
+        ]
+
+        assert len(budget_checks) == 1
+        assert orchestrator.provider.calls == 4
+        by_index = {item.index: item for item in results}
+        assert sorted(by_index) == list(range(25))
+        assert by_index[3].output == score_for("Co3") | {"factors": []}
+        assert by_index[3].packed
+        assert not by_index[24].packed and by_index[24].output["score"] == 20
+
+    async def test_item_errors_are_reported_per_item(self, orchestrator):
+        """Test a malformed item fails alone while the rest are scored."""
+        items = [lead("Acme"), {"company_name": "NoFields"}, lead("Globex")]
+
+        results = {
+            item.index: item
+            async for item in orchestrator.execute_batch(
+                UseCaseType.LEAD_SCORING, items, self.context, response_model=LeadScore
+            )
+        }
+
+        assert "Missing template variable" in results[1].error
+        assert results[0].output["score"] == 20
+        assert results[2].output["score"] == 30
+        assert orchestrator.provider.calls == 1
+
+    async def test_stops_once_budget_is_refused(self, orchestrator):
+        """Test packs after a refusal never run but still report every item."""
+        reservations = []
+        spend = orchestrator.budget_manager.spend
+
+        async def limited_spend(user_id, org_id, tokens, cost, force=False):
+            if not force:
+                reservations.append(tokens)
+                if len(reservations) > 1:
+                    return "daily limit reached"
+            return await spend(user_id, org_id, tokens, cost, force=force)
+
+        orchestrator.budget_manager.spend = limited_spend
+        results = [
+            item
+            async for item in orchestrator.execute_batch(
+                UseCaseType.LEAD_SCORING,
+                [lead(f"Co{i}") for i in range(30)],
+                self.context,
+                response_model=LeadScore,
+                pack_size=10,
+                max_concurrency=1,
+            )
+        ]
+
+        assert orchestrator.provider.calls == 1
+        assert len(reservations) == 2
+        scored = [item for item in results if item.output]
+        refused = [item for item in results if item.error]
+        assert len(scored) == 10 and len(refused) == 20
+        assert sorted(item.index for item in results) == list(range(30))
+        assert {item.error for item in refused} == {"Budget exceeded: daily limit reached"}
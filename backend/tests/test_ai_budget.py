@@ -0,0 +1,182 @@
+"""Tests for AI usage pricing and streamed budget enforcement."""
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.cache import async_cache
+from app.integrations.ai_orchestrator import AIOrchestrator, OrchestrationContext
+from app.integrations.budget_manager import FALLBACK_PRICE, BudgetManager
+from app.integrations.policies import BudgetConfig, UseCaseType
+from app.integrations.providers import FakeProvider, ProviderResponse
+
+WORDS = " ".join(f"w{i:03d}" for i in range(200))
+
+
+def make_orchestrator(**budget_config):
+    orchestrator = AIOrchestrator()
+    orchestrator.budget_manager = BudgetManager({**orchestrator.config["budget"], **budget_config})
+    policy = orchestrator.get_policy(UseCaseType.CONVERSATION).model_copy(
+        update={"provider": "fake", "model": "gpt-4o", "budget": BudgetConfig()}
+    )
+    orchestrator.update_policy(UseCaseType.CONVERSATION, policy)
+    orchestrator._get_provider = lambda policy: FakeProvider("gpt-4o", latency_ms=1, response=WORDS)
+    return orchestrator
+
+
+def new_context():
+    return OrchestrationContext(user_id=uuid.uuid4().hex, org_id=uuid.uuid4().hex)
+
+
+async def collect(orchestrator, context):
+    return [chunk async for chunk in orchestrator.stream(UseCaseType.CONVERSATION, "hi", context)]
+
+
+@pytest.mark.unit
+class TestPricing:
+    """Test per-model cost estimation."""
+
+    def test_prices_match_by_model_family(self):
+        """Test dated snapshots use their family price and unknown models the fallback."""
+        manager = BudgetManager({"pricing": {"acme-1": {"input": 1, "output": 2}}})
+        assert manager.price_for("gpt-4o-mini-2024-07-18") == manager.price_for("gpt-4o-mini")
+        assert manager.price_for("gpt-4o-2024-08-06") != manager.price_for("gpt-4o-mini")
+        assert manager.price_for("mystery") == FALLBACK_PRICE
+        assert manager.estimate_cost("acme-1", 1_000_000, 500_000) == 2.0
+
+    def test_response_cost_splits_input_and_output(self):
+        """Test reported prompt/completion tokens are priced separately."""
+        manager = BudgetManager({})
+        response = ProviderResponse(
+            content="",
+            model="gpt-4o",
+            provider="openai",
+            tokens_used=3000,
+            metadata={"prompt_tokens": 2000, "completion_tokens": 1000},
+        )
+        assert manager.response_cost(response) == pytest.approx(0.005 + 0.01)
+
+
+@pytest.mark.unit
+class TestStreamBudget:
+    """Test streamed usage is metered and enforced."""
+
+    async def test_stream_usage_is_recorded(self):
+        """Test a completed stream is charged for its prompt and output tokens."""
+        orchestrator = make_orchestrator()
+        context = new_context()
+
+        chunks = await collect(orchestrator, context)
+
+        assert len(chunks) == 200
+        remaining = await orchestrator.budget_manager.get_remaining_budget(
+            context.user_id, context.org_id
+        )
+        assert remaining["user"]["tokens_used"] > 200
+        assert remaining["org"]["cost_used"] > 0
+
+    async def test_stream_is_cut_at_request_limit(self):
+        """Test the stream stops before exceeding the per-request token ceiling."""
+        orchestrator = make_orchestrator(max_tokens_per_request=100)
+        context = new_context()
+
+        chunks = await collect(orchestrator, context)
+
+        remaining = await orchestrator.budget_manager.get_remaining_budget(
+            context.user_id, context.org_id
+        )
+        assert 0 < len(chunks) < 100
+        assert remaining["user"]["tokens_used"] <= 100
+
+    async def test_concurrent_streams_share_the_daily_limit(self):
+        """Test parallel streams stop once their combined spend crosses the org limit."""
+        orchestrator = make_orchestrator(daily_token_limit_per_org=500)
+        org_id = uuid.uuid4().hex
+        contexts = [OrchestrationContext(user_id=uuid.uuid4().hex, org_id=org_id) for _ in range(5)]
+
+        streams = await asyncio.gather(*(collect(orchestrator, c) for c in contexts))
+
+        used = (await orchestrator.budget_manager._get_daily_usage(f"org:{org_id}"))["tokens"]
+        policy = orchestrator.get_policy(UseCaseType.CONVERSATION)
+        prompt_tokens = FakeProvider("m").count_tokens(f"{policy.system_prompt}\nhi")
+        assert sum(len(chunks) for chunks in streams) < 5 * 200
+        # Output is only sent against leased quota; prompts are charged regardless
+        assert used <= 500 + 5 * prompt_tokens
+
+    async def test_budget_check_is_served_from_the_lease(self, monkeypatch):
+        """Test only the first check touches the shared counters."""
+        manager = BudgetManager({})
+        calls = []
+        incr_many = async_cache.incr_many
+
+        async def counting(increments, ttl=None):
+            calls.append(increments)
+            return await incr_many(increments, ttl=ttl)
+
+        monkeypatch.setattr(async_cache, "incr_many", counting)
+        policy = make_orchestrator().get_policy(UseCaseType.CONVERSATION)
+        for _ in range(20):
+            assert (await manager.check_budget("u", "o", policy))["allowed"]
+            await manager.record_usage("u", "o", 100, 0.001, policy=policy)
+        assert len(calls) == 1
+
+
+@pytest.mark.unit
+class TestQuotaLeases:
+    """Test leased quota across workers, day rollover and request-size checks."""
+
+    async def test_workers_never_lease_past_the_limit(self):
+        """Test two managers sharing the cache split the org limit without exceeding it."""
+        config = {"daily_token_limit_per_org": 1000, "lease_fraction": 0.1}
+        workers = [BudgetManager(config), BudgetManager(config)]
+        org_id = uuid.uuid4().hex
+
+        async def drain(manager, user):
+            spent = 0
+            while await manager.spend(user, org_id, 30, 0.0) is None:
+                spent += 30
+            return spent
+
+        spent = await asyncio.gather(*(drain(m, uuid.uuid4().hex) for m in workers))
+        for manager in workers:
+            await manager.close()
+
+        assert 900 < sum(spent) <= 1000
+        assert all(spent)
+        used = (await workers[0]._get_daily_usage(f"org:{org_id}"))["tokens"]
+        assert used == sum(spent)
+        leased = await async_cache.get_counters(
+            [f"budget:org:{org_id}:{manager._today()}:leased_tokens"]
+        )
+        assert int(leased[0]) == used
+
+    async def test_usage_is_written_to_the_day_it_was_spent(self, monkeypatch):
+        """Test usage pending at midnight lands on the previous day's counters."""
+        manager = BudgetManager({})
+        org_id = uuid.uuid4().hex
+        monkeypatch.setattr(BudgetManager, "_today", staticmethod(lambda: "2026-01-01"))
+        await manager.record_usage("u", org_id, 40, 0.0)
+        monkeypatch.setattr(BudgetManager, "_today", staticmethod(lambda: "2026-01-02"))
+        await manager.record_usage("u", org_id, 7, 0.0)
+        await manager.flush()
+
+        yesterday, today = await async_cache.get_counters(
+            [f"budget:org:{org_id}:2026-01-01:tokens", f"budget:org:{org_id}:2026-01-02:tokens"]
+        )
+        assert (int(yesterday), int(today)) == (40, 7)
+
+    async def test_oversized_use_case_is_rejected_by_average(self):
+        """Test the per-request limit applies to the use case's average request size."""
+        manager = BudgetManager({})
+        policy = make_orchestrator().get_policy(UseCaseType.CONVERSATION)
+        policy = policy.model_copy(update={"budget": BudgetConfig(max_tokens_per_request=2000)})
+
+        await manager.record_usage("u", "o", 5000, 0.0, policy=policy)
+        check = await manager.check_budget("u", "o", policy)
+
+        assert not check["allowed"]
+        assert "per-request limit" in check["reason"]
+        for _ in range(30):
+            await manager.check_budget("u", "o", policy)
+        assert (await manager.check_budget("u", "o", policy))["allowed"]
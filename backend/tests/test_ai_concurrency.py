@@ -0,0 +1,155 @@
+"""Tests for adaptive AI provider concurrency and hedging."""
+
+import asyncio
+
+import pytest
+
+from app.integrations.ai_orchestrator import AIOrchestrator, OrchestrationContext
+from app.integrations.concurrency import AdaptiveConcurrencyLimiter
+from app.integrations.policies import UseCaseType
+from app.integrations.providers import FakeProvider, ProviderRateLimitError
+
+
+def make_orchestrator(use_case, **policy_updates):
+    """Orchestrator whose ``use_case`` policy is a private copy with overrides."""
+    orchestrator = AIOrchestrator()
+    policy = orchestrator.get_policy(use_case).model_copy(
+        update={"cache_results": False, **policy_updates}
+    )
+    orchestrator.update_policy(use_case, policy)
+    return orchestrator
+
+
+def use_providers(orchestrator, *providers):
+    """Serve the given fake providers, looked up by model name."""
+    by_model = {provider.model: provider for provider in providers}
+    orchestrator._get_provider = lambda policy: by_model[policy.model]
+
+
+@pytest.mark.unit
+class TestAdaptiveConcurrencyLimiter:
+    """Test limit adaptation and priority admission."""
+
+    async def test_interactive_lane_is_admitted_first(self):
+        """Test queued interactive requests jump ahead of batch requests."""
+        limiter = AdaptiveConcurrencyLimiter("fake", "m", initial_limit=1)
+        order = []
+
+        async def worker(lane, name):
+            async with limiter.slot(lane):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        holder = asyncio.create_task(worker("batch", "first"))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(worker("batch", f"batch{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        waiters.append(asyncio.create_task(worker("interactive", "chat")))
+        await asyncio.gather(holder, *waiters)
+
+        assert order[:2] == ["first", "chat"]
+        assert limiter.get_stats()["in_flight"] == 0
+
+    async def test_overload_cuts_limit_and_success_grows_it(self):
+        """Test 429s halve the limit once per cooldown and saturation grows it back."""
+        limiter = AdaptiveConcurrencyLimiter("fake", "m", initial_limit=8, cooldown_seconds=60)
+        provider = FakeProvider("m", latency_ms=5, capacity=2)
+
+        async def call():
+            try:
+                async with limiter.slot():
+                    await provider.generate("hi")
+            except ProviderRateLimitError:
+                pass
+
+        await asyncio.gather(*(call() for _ in range(8)))
+        assert provider.rejected == 6
+        assert limiter.limit == 4
+
+        limiter.limit = 2
+        for _ in range(10):
+            await asyncio.gather(call(), call())
+        assert limiter.limit > 2
+        assert limiter.overloads == 6
+
+    async def test_long_answers_are_not_congestion(self):
+        """Test latency is judged per output token and only sustained drift shrinks the limit."""
+        limiter = AdaptiveConcurrencyLimiter("fake", "m", initial_limit=8, cooldown_seconds=0)
+
+        def finish(seconds, tokens):
+            limiter.in_flight += 1
+            limiter.release(latency=seconds, sample=("per_token", seconds / tokens))
+
+        # Short and 50x longer answers at the same speed per token
+        for _ in range(20):
+            finish(0.5, 10)
+            finish(25.0, 500)
+        finish(2.0, 10)  # One slow call
+        assert limiter.limit == 8
+
+        for _ in range(20):
+            finish(0.5, 2)  # Per-token time drifts up 5x and stays there
+        assert limiter.limit < 8
+
+    async def test_cancelled_waiter_releases_nothing(self):
+        """Test cancelling a queued request leaves the slot count intact."""
+        limiter = AdaptiveConcurrencyLimiter("fake", "m", initial_limit=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire("batch"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        limiter.release(latency=0.01)
+        assert await asyncio.wait_for(limiter.acquire(), timeout=1) == 0.0
+        assert limiter.in_flight == 1
+
+
+@pytest.mark.unit
+class TestHedgedExecution:
+    """Test failover and hedging to the fallback provider."""
+
+    context = OrchestrationContext(user_id="u1", org_id="o1")
+
+    async def test_slow_primary_is_hedged(self):
+        """Test the fallback answers when the primary stalls past the hedge delay."""
+        orchestrator = make_orchestrator(
+            UseCaseType.EMAIL_GENERATION,
+            provider="fake",
+            model="slow",
+            fallback_provider="fake",
+            fallback_model="fast",
+            hedge_requests=True,
+        )
+        orchestrator.config["concurrency"] = {"hedge_delay_ms": 20}
+        use_providers(
+            orchestrator, FakeProvider("slow", latency_ms=5000), FakeProvider("fast", latency_ms=5)
+        )
+
+        result = await asyncio.wait_for(
+            orchestrator.execute(UseCaseType.EMAIL_GENERATION, "hello", self.context),
+            timeout=2,
+        )
+
+        assert result.provider_response["model"] == "fast"
+        stats = orchestrator.get_concurrency_stats()
+        assert stats["fake:slow"]["in_flight"] == 0
+
+    async def test_primary_error_fails_over(self):
+        """Test a rate-limited primary fails over without waiting for the hedge delay."""
+        orchestrator = make_orchestrator(
+            UseCaseType.EMAIL_GENERATION,
+            provider="fake",
+            model="full",
+            fallback_provider="fake",
+            fallback_model="spare",
+        )
+        use_providers(
+            orchestrator, FakeProvider("full", capacity=0), FakeProvider("spare", latency_ms=1)
+        )
+
+        result = await orchestrator.execute(UseCaseType.EMAIL_GENERATION, "hi", self.context)
+
+        assert result.provider_response["model"] == "spare"
+        assert orchestrator.get_concurrency_stats()["fake:full"]["overloads"] == 1
@@ -0,0 +1,177 @@
+"""Tests for WebSocket broadcast fan-out."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.core.broadcast import BroadcastHub
+from app.core.events import ConnectionManager
+from app.core.pubsub import InProcessPubSubBus, RedisPubSubBus
+from app.core.websocket import ConnectionManager as UpdatesManager
+
+
+class FakeWebSocket:
+    """WebSocket stand-in recording text frames; ``gate`` holds sends."""
+
+    def __init__(self, gate: asyncio.Event = None):
+        self.frames = []
+        self.closed_with = None
+        self.gate = gate
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.frames.append(frame)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.unit
+class TestBroadcastHub:
+    """Test queued, serialize-once fan-out."""
+
+    async def test_slow_client_does_not_stall_others(self):
+        """Test a blocked client neither blocks publish nor other clients."""
+        hub = BroadcastHub("test", max_queue=2, policy="drop_oldest")
+        gate = asyncio.Event()
+        fast, slow = FakeWebSocket(), FakeWebSocket(gate)
+        hub.join(fast, "campaign")
+        hub.join(slow, "campaign")
+
+        for i in range(5):
+            await asyncio.wait_for(hub.publish("campaign", {"n": i}), timeout=1)
+        await settle()
+
+        assert len(fast.frames) == 5
+        assert [json.loads(f)["n"] for f in fast.frames] == [0, 1, 2, 3, 4]
+        assert hub.get_stats()["dropped"] == 2
+
+        gate.set()
+        await settle()
+        # The in-flight first frame plus the two most recent
+        assert [json.loads(f)["n"] for f in slow.frames] == [0, 3, 4]
+
+    async def test_disconnect_policy_evicts_slow_consumer(self):
+        """Test a full queue closes the slow connection under the disconnect policy."""
+        hub = BroadcastHub("test", max_queue=1, policy="disconnect")
+        slow = FakeWebSocket(asyncio.Event())
+        hub.join(slow, "leads")
+
+        for i in range(3):
+            await hub.publish("leads", {"n": i})
+        await settle()
+
+        assert slow.closed_with == 1013
+        assert not hub.is_registered(slow)
+        assert hub.get_stats()["evicted"] == 1
+
+    async def test_fan_out_across_workers(self):
+        """Test hubs sharing a bus deliver each other's broadcasts once."""
+        bus = InProcessPubSubBus()
+        worker_a = ConnectionManager(BroadcastHub("events", bus=bus))
+        worker_b = ConnectionManager(BroadcastHub("events", bus=bus))
+        other = BroadcastHub("updates", bus=bus)
+        ws_a, ws_b, ws_other = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(ws_a, "campaign", user_id=1)
+        await worker_b.connect(ws_b, "campaign", user_id=2)
+        other.join(ws_other, "campaign")
+
+        await worker_a.broadcast({"type": "campaign_progress"}, channel="campaign")
+        await worker_b.broadcast_to_user({"type": "note"}, user_id=1)
+        await settle()
+
+        assert len(ws_a.frames) == 2
+        assert len(ws_b.frames) == 1
+        assert ws_other.frames == []
+        assert worker_a.user_connections == {1: {ws_a}}
+
+    async def test_empty_channels_are_pruned(self):
+        """Test a channel is dropped once its last member leaves or disconnects."""
+        manager = UpdatesManager(BroadcastHub("test"))
+        first, second = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(first, user_id=1)
+        await manager.connect(second, user_id=2)
+
+        manager.disconnect(first, user_id=1)
+        manager.hub.leave(second, "user:2")
+
+        assert set(manager.hub.channels) == {"all"}
+        manager.disconnect(second, user_id=2)
+        assert manager.hub.channels == {}
+
+    async def test_replies_go_through_the_send_queue(self):
+        """Test direct replies are queued behind broadcasts, not sent concurrently."""
+        manager = UpdatesManager(BroadcastHub("test"))
+        gate = asyncio.Event()
+        websocket = FakeWebSocket(gate)
+        await manager.connect(websocket, user_id=1)
+
+        await manager.send_personal_message({"n": 1}, user_id=1)
+        manager.send_json(websocket, {"type": "ack"})
+        manager.send_text(websocket, "Received: hi")
+        await settle()
+        assert websocket.frames == []
+
+        gate.set()
+        await settle()
+        assert [json.loads(f) for f in websocket.frames[:2]] == [{"n": 1}, {"type": "ack"}]
+        assert websocket.frames[2] == "Received: hi"
+
+
+class FlakyPubSub:
+    """Redis pubsub stand-in whose listen() fails once before delivering."""
+
+    def __init__(self, attempts, messages):
+        self.attempts = attempts
+        self.messages = messages
+
+    async def subscribe(self, channel):
+        pass
+
+    async def unsubscribe(self, channel):
+        pass
+
+    async def aclose(self):
+        pass
+
+    async def listen(self):
+        self.attempts.append(1)
+        if len(self.attempts) == 1:
+            raise ConnectionError("connection reset")
+        for message in self.messages:
+            yield {"type": "message", "data": json.dumps(message)}
+        await asyncio.Event().wait()
+
+
+@pytest.mark.unit
+class TestRedisPubSubBus:
+    """Test the cross-process listener."""
+
+    async def test_listener_resubscribes_after_a_dropped_connection(self):
+        """Test messages keep arriving after the subscription fails."""
+        attempts, received = [], []
+        bus = RedisPubSubBus("redis://unused", channel="ws:broadcast")
+        bus.RECONNECT_SECONDS = 0
+        pubsub = FlakyPubSub(attempts, [{"channel": "campaign"}])
+        bus._client = type("Client", (), {"pubsub": lambda self: pubsub})()
+
+        async def handler(message):
+            received.append(message)
+
+        bus.subscribe(handler)
+        await bus.start()
+        await settle()
+        await bus.stop()
+
+        assert len(attempts) == 2
+        assert received == [{"channel": "campaign"}]
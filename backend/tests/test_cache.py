@@ -1,71 +1,281 @@
 """Tests for caching module."""
+
+import time
+from datetime import datetime
+
 import pytest
-from app.core.cache import cache
+
+from app.core import multi_tier_cache
+from app.core.cache import async_cache, cache, get_serializer
+from app.core.multi_tier_cache import MultiTierCache, ShardedLRUCache, cached
+from app.core.pubsub import InProcessPubSubBus
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; ``advance`` moves time() and monotonic()."""
+
+    def __init__(self):
+        self.offset = 0.0
+
+    def advance(self, seconds):
+        self.offset += seconds
+
+    def time(self):
+        return time.time() + self.offset
+
+    def monotonic(self):
+        return time.monotonic() + self.offset
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable clock for the multi-tier cache."""
+    clock = FakeClock()
+    monkeypatch.setattr(multi_tier_cache, "time", clock)
+    return clock
 
 
 @pytest.mark.unit
 @pytest.mark.cache
 class TestCache:
     """Test cache functionality."""
-    
+
     def test_cache_set_and_get(self, clear_cache):
         """Test setting and getting cache values."""
         cache.set("test_key", "test_value")
         value = cache.get("test_key")
-        
+
         assert value == "test_value"
-    
+
     def test_cache_get_nonexistent_key(self, clear_cache):
         """Test getting non-existent key returns None."""
         value = cache.get("nonexistent_key")
-        
+
         assert value is None
-    
+
     def test_cache_delete(self, clear_cache):
         """Test deleting cache key."""
         cache.set("test_key", "test_value")
         cache.delete("test_key")
         value = cache.get("test_key")
-        
+
         assert value is None
-    
+
     def test_cache_ttl(self, clear_cache):
         """Test cache with TTL."""
         cache.set("test_key", "test_value", ttl=1)
         value = cache.get("test_key")
-        
+
         assert value == "test_value"
-        
+
         # After TTL expires, value should be None
-        import time
         time.sleep(2)
         value = cache.get("test_key")
         assert value is None
-    
+
     def test_cache_clear(self, clear_cache):
         """Test clearing all cache."""
         cache.set("key1", "value1")
         cache.set("key2", "value2")
-        
+
         cache.clear()
-        
+
         assert cache.get("key1") is None
         assert cache.get("key2") is None
-    
+
     def test_cache_with_dict(self, clear_cache):
         """Test caching dictionary objects."""
         data = {"name": "John", "age": 30}
         cache.set("user_data", data)
-        
+
         retrieved = cache.get("user_data")
         assert retrieved == data
         assert retrieved["name"] == "John"
-    
+
     def test_cache_with_list(self, clear_cache):
         """Test caching list objects."""
         data = [1, 2, 3, 4, 5]
         cache.set("numbers", data)
-        
+
         retrieved = cache.get("numbers")
         assert retrieved == data
         assert len(retrieved) == 5
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestShardedLRUCache:
+    """Test the sharded L1 cache."""
+
+    async def test_set_and_get(self):
+        """Test values round-trip through the shards."""
+        l1 = ShardedLRUCache(num_shards=4)
+        await l1.set("a", {"id": 1})
+
+        assert await l1.get("a") == {"id": 1}
+        assert await l1.get("missing") is None
+
+    async def test_ttl_expiry(self, clock):
+        """Test entries expire after their TTL."""
+        l1 = ShardedLRUCache(num_shards=2)
+        await l1.set("short", "value", ttl=1)
+
+        assert await l1.get("short") == "value"
+
+        clock.advance(1.1)
+        assert await l1.get("short") is None
+        assert l1.get_stats()["expirations"] == 1
+
+    async def test_byte_budget_evicts_lru(self):
+        """Test byte-size accounting evicts least recently used entries."""
+        l1 = ShardedLRUCache(num_shards=1, max_bytes=4096, max_entries=1000)
+        for i in range(20):
+            await l1.set(f"key{i}", "x" * 500)
+
+        stats = l1.get_stats()
+        assert stats["bytes"] <= 4096
+        assert stats["evictions"] > 0
+        assert await l1.get("key0") is None
+        assert await l1.get("key19") == "x" * 500
+
+    async def test_per_shard_stats(self):
+        """Test hit/miss counters are tracked per shard."""
+        l1 = ShardedLRUCache(num_shards=8)
+        await l1.set("k", 1)
+        await l1.get("k")
+        await l1.get("nope")
+
+        stats = l1.get_stats()
+        assert len(stats["shards"]) == 8
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestSingleFlight:
+    """Test request coalescing in the cached decorator."""
+
+    async def test_concurrent_misses_execute_once(self, clear_cache):
+        """Test concurrent callers on one key share a single execution."""
+        import asyncio
+
+        calls = 0
+
+        @cached(ttl=60, key_prefix="sf_test")
+        async def load(lead_id: int):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"id": lead_id}
+
+        results = await asyncio.gather(*[load(1) for _ in range(50)])
+
+        assert calls == 1
+        assert all(r == {"id": 1} for r in results)
+
+    async def test_stale_while_revalidate(self, clear_cache, clock):
+        """Test expired values are served while one refresh runs."""
+        import asyncio
+
+        mtc = MultiTierCache()
+        version = 0
+
+        async def loader():
+            nonlocal version
+            version += 1
+            return version
+
+        assert await mtc.get_or_load("swr", loader, ttl=1, stale_ttl=30) == 1
+
+        clock.advance(1.1)
+        assert await mtc.get_or_load("swr", loader, ttl=1, stale_ttl=30) == 1
+        await asyncio.sleep(0.01)
+        assert await mtc.get_or_load("swr", loader, ttl=1, stale_ttl=30) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestTagInvalidation:
+    """Test tag-indexed invalidation across tiers and processes."""
+
+    async def test_invalidate_tags_across_tiers(self, clear_cache):
+        """Test invalidating a tag removes tagged entries from L1 and L2."""
+        mtc = MultiTierCache()
+        await mtc.set("lead-a", 1, ttl=60, tags=["lead:1", "campaign:7"])
+        await mtc.set("lead-b", 2, ttl=60, tags=["lead:2", "campaign:7"])
+
+        assert await mtc.invalidate_tags("lead:1") == 1
+        assert await mtc.get("lead-a") is None
+        assert await mtc.get("lead-b") == 2
+
+        assert await mtc.invalidate_tags("campaign:7") == 1
+        assert await mtc.get("lead-b") is None
+
+    async def test_invalidation_broadcast_to_other_l1(self, clear_cache):
+        """Test peers drop their L1 copies when another process invalidates."""
+        bus = InProcessPubSubBus()
+        worker_a = MultiTierCache(bus=bus)
+        worker_b = MultiTierCache(bus=bus)
+
+        await worker_a.set("shared", "v1", ttl=60, tags=["lead:9"])
+        assert await worker_b.get("shared") == "v1"  # promoted into B's L1
+
+        await worker_a.invalidate_tags("lead:9")
+
+        assert await worker_b.l1.get("shared") is None
+        assert await worker_b.get("shared") is None
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestAsyncCacheBackend:
+    """Test the in-memory fake of the async L2 backend."""
+
+    async def test_mget_and_mset(self, clear_cache):
+        """Test batch reads and writes."""
+        await async_cache.mset({"a": 1, "b": {"x": 2}}, ttl=60)
+
+        assert await async_cache.mget(["a", "b", "c"]) == [1, {"x": 2}, None]
+
+    async def test_incr_many_is_cumulative(self, clear_cache):
+        """Test counters accumulate and read back via get_counters."""
+        await async_cache.incr_many({"tokens": 100, "cost": 0.5}, ttl=60)
+        await async_cache.incr_many({"tokens": 50, "cost": 0.25}, ttl=60)
+
+        assert await async_cache.get_counters(["tokens", "cost", "missing"]) == [150, 0.75, 0]
+
+    async def test_online_features_round_trip(self, clear_cache):
+        """Test features stored online are served by get_real_time_features."""
+        from app.core.ml_feature_store import (
+            compute_engagement_score,
+            feature_store,
+            get_real_time_features,
+        )
+
+        await feature_store.compute_and_store(
+            "engagement_score", "42", {"email_opens": 2, "replies": 1}, compute_engagement_score
+        )
+        features = await get_real_time_features(42)
+
+        assert features["engagement_score"] == 70.0
+        assert features["lead_quality_score"] is None
+
+    def test_serializers_round_trip(self):
+        """Test every available serializer round-trips plain data."""
+        value = {"id": 1, "tags": ["a", "b"], "score": 0.5}
+        for name in ("json", "orjson", "msgpack", "pickle"):
+            serializer = get_serializer(name)
+            assert serializer.loads(serializer.dumps(value)) == value
+
+    def test_json_serializers_return_json_types(self):
+        """Test JSON serializers turn datetimes into strings and tuples into lists."""
+        value = {"at": datetime(2026, 1, 15, 9, 30), "pair": (1, 2)}
+        for name in ("json", "orjson", "msgpack"):
+            serializer = get_serializer(name)
+            decoded = serializer.loads(serializer.dumps(value))
+            assert isinstance(decoded["at"], str) and decoded["pair"] == [1, 2]
+        assert get_serializer("pickle").loads(get_serializer("pickle").dumps(value)) == value
@@ -0,0 +1,143 @@
+"""Tests for the shared query embedding service."""
+
+import asyncio
+import threading
+
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+
+from app.integrations.embedding_service import (
+    EmbeddingService,
+    Mem0QueryEmbedder,
+    get_embedding_service,
+)
+from app.integrations.memory_manager import _query_embedding_service
+
+
+class RecordingEmbedder:
+    """Blocking embed function that records each provider call and its thread."""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.threads = set()
+        self.fail = fail
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        self.threads.add(threading.get_ident())
+        if self.fail:
+            raise RuntimeError("provider down")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestEmbeddingService:
+    """Test caching, micro-batching and off-loop execution."""
+
+    async def test_concurrent_queries_share_one_call(self):
+        """Test queries arriving together are embedded in one call off the event loop."""
+        embedder = RecordingEmbedder()
+        service = EmbeddingService(embedder, "m", batch_window_ms=20)
+
+        vectors = await asyncio.gather(
+            *(service.embed_query(q) for q in ["acme pricing", "globex", "acme  pricing ", "x"])
+        )
+
+        assert len(embedder.calls) == 1
+        assert sorted(embedder.calls[0]) == ["acme pricing", "globex", "x"]
+        assert vectors[0] == vectors[2]
+        assert threading.get_ident() not in embedder.threads
+
+    async def test_repeats_are_served_from_cache_until_expiry(self, monkeypatch):
+        """Test normalized repeats hit the cache and expired entries are re-embedded."""
+        embedder = RecordingEmbedder()
+        service = EmbeddingService(embedder, "m", ttl_seconds=60, batch_window_ms=0)
+        clock = [1000.0]
+        monkeypatch.setattr("app.integrations.embedding_service.time.monotonic", lambda: clock[0])
+
+        await service.embed_query("battle card: Globex")
+        await service.embed_query("battle card:\nGlobex")
+        assert service.embed_query_sync("battle card: Globex") == [19.0, 1.0]
+        assert len(embedder.calls) == 1
+        assert service.get_stats()["hits"] == 2
+
+        clock[0] += 61
+        await service.embed_query("battle card: Globex")
+        assert len(embedder.calls) == 2
+
+    async def test_cache_is_bounded_lru(self):
+        """Test the least recently used entry is evicted at capacity."""
+        embedder = RecordingEmbedder()
+        service = EmbeddingService(embedder, "m", max_entries=2, batch_window_ms=0)
+        for query in ["a", "b", "a", "c"]:
+            await service.embed_query(query)
+
+        assert service.get_stats()["entries"] == 2
+        await service.embed_query("a")
+        await service.embed_query("b")
+        assert [call[0] for call in embedder.calls] == ["a", "b", "c", "b"]
+
+    async def test_failures_reach_every_waiter_and_are_not_cached(self):
+        """Test a failed batch raises for its callers and the next call retries."""
+        embedder = RecordingEmbedder(fail=True)
+        service = EmbeddingService(embedder, "m", batch_window_ms=5)
+
+        results = await asyncio.gather(
+            service.embed_query("a"), service.embed_query("b"), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        embedder.fail = False
+        assert await service.embed_query("a") == [1.0, 1.0]
+
+
+@pytest.mark.unit
+class TestEmbeddingAdapters:
+    """Test the LlamaIndex and Mem0 adapters route queries through the service."""
+
+    async def test_llama_index_queries_are_cached(self):
+        """Test repeated retriever queries embed once while documents pass through."""
+        service = EmbeddingService.for_llama_index(MockEmbedding(embed_dim=8))
+        model = service.as_llama_index()
+
+        first = await model.aget_query_embedding("meeting prep acme")
+        again = model.get_query_embedding("meeting prep acme")
+        documents = await model.aget_text_embedding_batch(["doc one", "doc two"])
+
+        assert first == again and len(documents) == 2
+        assert service.get_stats()["misses"] == 1
+
+    def test_mem0_search_embeddings_are_cached(self):
+        """Test Mem0 search embeddings hit the cache and add embeddings don't."""
+
+        class Mem0Embedder:
+            calls = 0
+
+            def embed(self, text, memory_action=None):
+                self.calls += 1
+                return [1.0]
+
+        inner = Mem0Embedder()
+        service = EmbeddingService(lambda texts: [inner.embed(t, "search") for t in texts], "m")
+        embedder = Mem0QueryEmbedder(inner, service)
+
+        for _ in range(3):
+            embedder.embed("renewal risk", "search")
+        embedder.embed("renewal risk", "add")
+
+        assert inner.calls == 2
+
+    def test_mem0_shares_the_openai_service(self):
+        """Test a stock OpenAI Mem0 embedder shares the RAG cache and others don't."""
+        stock = {"provider": "openai", "config": {"model": "text-embedding-3-small"}}
+        resized = {
+            "provider": "openai",
+            "config": {"model": "text-embedding-3-large", "embedding_dims": 256},
+        }
+        ollama = {"provider": "ollama", "config": {"model": "nomic-embed-text"}}
+
+        assert _query_embedding_service(stock, None) is get_embedding_service()
+        shared = get_embedding_service("text-embedding-3-large")
+        assert _query_embedding_service(resized, None) is not shared
+        assert _query_embedding_service(ollama, None).model == "mem0:nomic-embed-text"
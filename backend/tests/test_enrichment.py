@@ -0,0 +1,61 @@
+"""Tests for enrichment service."""
+
+import asyncio
+
+import pytest
+
+from app.services.enrichment_service import EnrichmentService
+from app.tasks.advanced_tasks import _bulk_enrich
+
+
+@pytest.mark.unit
+class TestBulkEnrichment:
+    """Test concurrent, deduplicated bulk enrichment."""
+
+    async def test_one_company_lookup_per_domain(self, monkeypatch):
+        """Test contacts at one company share a single company lookup."""
+        service = EnrichmentService()
+        calls = []
+        original = service._lookup_company
+
+        async def counting_lookup(domain):
+            calls.append(domain)
+            return await original(domain)
+
+        monkeypatch.setattr(service, "_lookup_company", counting_lookup)
+
+        emails = [f"user{i}@acme.com" for i in range(200)] + ["User0@acme.com", "x@globex.com"]
+        results = await service.bulk_enrich(emails, concurrency=20)
+
+        assert len(results) == len(emails)
+        assert results[0] is results[200]
+        assert sorted(calls) == ["acme.com", "globex.com"]
+        assert all(r.company.domain == "acme.com" for r in results[:201])
+
+    async def test_cached_results_are_marked(self):
+        """Test repeated lookups are served from the bounded cache."""
+        service = EnrichmentService(cache_max_entries=100)
+        first = await service.enrich_email("jane.doe@acme.com")
+        second = await service.enrich_email("Jane.Doe@acme.com")
+
+        assert not first.cached
+        assert second.cached
+        assert second.contact == first.contact
+
+    def test_chunk_task_closes_its_client(self, monkeypatch):
+        """Test each task's event loop closes the HTTP client it opened."""
+        service = EnrichmentService()
+        monkeypatch.setattr("app.services.enrichment_service.enrichment_service", service)
+        clients = []
+
+        async def lookup(domain):
+            clients.append(service.client)
+            return None
+
+        monkeypatch.setattr(service, "_lookup_company", lookup)
+
+        for _ in range(2):
+            asyncio.run(_bulk_enrich(["jane@acme.com"]))
+
+        assert len(clients) == 2 and clients[0] is not clients[1]
+        assert all(client.is_closed for client in clients)
@@ -0,0 +1,206 @@
+"""Tests for event sourcing module."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+
+from app.core.event_sourcing import DomainEvent, EventStore, EventType, ReadModel, SQLEventLog
+from app.models.event_store import CheckpointRecord, EventRecord, SnapshotRecord
+
+
+def make_event(aggregate_id, event_type=EventType.LEAD_SCORED, timestamp=None, **data):
+    return DomainEvent(
+        event_id=str(uuid.uuid4()),
+        event_type=event_type,
+        aggregate_id=aggregate_id,
+        aggregate_type="Lead",
+        timestamp=timestamp or datetime(2025, 1, 1),
+        user_id=1,
+        data=data,
+    )
+
+
+@pytest.fixture
+def sql_log():
+    """Event log on a private in-memory SQLite database."""
+    db_engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        db_engine,
+        tables=[EventRecord.__table__, SnapshotRecord.__table__, CheckpointRecord.__table__],
+    )
+    yield SQLEventLog(db_engine)
+    db_engine.dispose()
+
+
+@pytest.mark.unit
+class TestEventStore:
+    """Test indexed, snapshotting event store."""
+
+    async def test_sequences_and_indexes(self):
+        """Test per-aggregate sequences and index lookups."""
+        store = EventStore()
+        await store.append_batch([make_event("a", score=1), make_event("b", score=2)])
+        await store.append(make_event("a", score=3))
+
+        events = store.get_events_by_aggregate("a", "Lead")
+        assert [e.sequence for e in events] == [1, 2]
+        assert [e.position for e in events] == [1, 3]
+        assert len(store.get_events_by_type(EventType.LEAD_SCORED, limit=2)) == 2
+
+    async def test_replay_from_snapshot_matches_full_replay(self):
+        """Test snapshot-based replay gives the same state as a full replay."""
+        store = EventStore(snapshot_interval=10)
+        start = datetime(2025, 1, 1)
+        await store.append(make_event("a", EventType.LEAD_CREATED, start, name="Acme"))
+        for i in range(1, 35):
+            await store.append(make_event("a", timestamp=start + timedelta(hours=i), score=i))
+
+        events = store.get_events_by_aggregate("a", "Lead")
+        assert len(store._snapshots[("Lead", "a")]) == 3
+
+        for up_to in (None, start + timedelta(hours=15), start + timedelta(hours=30)):
+            expected = store._apply_events(
+                [e for e in events if up_to is None or e.timestamp <= up_to], "Lead"
+            )
+            assert store.replay_events("a", "Lead", up_to=up_to) == expected
+
+        assert store.replay_events("a", "Lead", up_to=start + timedelta(hours=15))["score"] == 15
+
+    @pytest.mark.db
+    async def test_persisted_log_reloads(self, sql_log):
+        """Test events and snapshots survive a restart."""
+        store = EventStore(log=sql_log, snapshot_interval=5)
+        await store.append(make_event("a", EventType.LEAD_CREATED, name="Acme"))
+        await store.append_batch([make_event("a", score=i) for i in range(10)])
+        await store.flush()
+
+        restored = EventStore(log=sql_log, snapshot_interval=5)
+        assert await restored.load() == 11
+        assert len(restored._snapshots[("Lead", "a")]) == 2
+        assert restored.replay_events("a", "Lead") == store.replay_events("a", "Lead")
+
+        await restored.append(make_event("a", score=99))
+        assert restored.get_events_by_aggregate("a", "Lead")[-1].sequence == 12
+
+    @pytest.mark.db
+    async def test_writers_share_the_log(self, sql_log):
+        """Test two stores on one log get distinct positions and see each other's events."""
+        first, second = EventStore(log=sql_log), EventStore(log=sql_log)
+        await first.append(make_event("a", score=1))
+        await second.append_batch([make_event("a", score=2), make_event("b", score=3)])
+        await first.append(make_event("a", score=4))
+
+        assert [e.position for e in first.events] == [1, 2, 3, 4]
+        assert [e.sequence for e in first.get_events_by_aggregate("a", "Lead")] == [1, 2, 3]
+        assert first.replay_events("a", "Lead")["score"] == 4
+        assert [e.position for e in second.events] == [1, 2, 3]
+
+        reloaded = EventStore(log=sql_log)
+        assert await reloaded.load(batch_size=3) == 4
+        assert [e.data["score"] for e in reloaded.events] == [1, 2, 3, 4]
+
+    @pytest.mark.db
+    async def test_failed_write_is_not_indexed(self, sql_log, monkeypatch):
+        """Test events whose write fails never reach the in-memory indexes."""
+        store = EventStore(log=sql_log)
+        await store.append(make_event("a", score=1))
+
+        def fail(*args):
+            raise RuntimeError("database went away")
+
+        monkeypatch.setattr(sql_log, "append_batch", fail)
+        with pytest.raises(RuntimeError):
+            await store.append(make_event("a", score=2))
+        monkeypatch.undo()
+
+        assert len(store.events) == store.committed_position == 1
+        await store.append(make_event("a", score=3))
+        assert [e.sequence for e in store.get_events_by_aggregate("a", "Lead")] == [1, 2]
+
+
+@pytest.mark.unit
+class TestEventSubscriptions:
+    """Test live subscriptions and background fan-out."""
+
+    async def test_slow_handler_does_not_block_append(self):
+        """Test appends return before slow handlers finish."""
+        store = EventStore()
+        release = asyncio.Event()
+        seen = []
+
+        async def slow_handler(event):
+            await release.wait()
+            seen.append(event.position)
+
+        store.subscribe(EventType.LEAD_SCORED, slow_handler)
+        await asyncio.wait_for(store.append(make_event("a", score=1)), timeout=1)
+        await store.append(make_event("a", score=2))
+        assert seen == []
+
+        release.set()
+        await asyncio.wait_for(store.drain(), timeout=1)
+        assert seen == [1, 2]
+
+    async def test_tailing_subscription_resumes_from_checkpoint(self, sql_log):
+        """Test a named subscription tails live events and resumes after ack."""
+        store = EventStore(log=sql_log)
+        await store.append(make_event("a", score=1))
+
+        subscription = await store.subscribe_stream(name="worker", from_position=0, max_buffer=2)
+        await store.append_batch([make_event("a", score=i) for i in range(2, 5)])
+
+        first = await subscription.get(timeout=1)
+        second = await subscription.get(timeout=1)
+        assert [first.position, second.position] == [1, 2]
+        await subscription.ack()
+        await subscription.close()
+
+        restored = EventStore(log=sql_log)
+        await restored.load()
+        resumed = await restored.subscribe_stream(name="worker")
+        assert (await resumed.get(timeout=1)).position == 3
+        assert resumed.get_stats()["lag"] == 2
+        await resumed.close()
+
+
+@pytest.mark.unit
+class TestProjections:
+    """Test checkpointed read model projections."""
+
+    async def test_catch_up_tail_and_restore(self, sql_log):
+        """Test projections catch up, tail live events and restore from checkpoints."""
+        store = EventStore(log=sql_log)
+        await store.append_batch(
+            [make_event(str(i), EventType.LEAD_CREATED) for i in range(3)]
+            + [make_event("0", EventType.EMAIL_SENT, campaign_id=7)]
+        )
+
+        model = ReadModel(store)
+        await model.start()
+        assert model.get_view("lead_analytics")["total_leads"] == 3
+        assert model.get_view("campaign_performance", "campaign:7")["sent"] == 1
+
+        await store.append(make_event("1", EventType.LEAD_QUALIFIED))
+        for _ in range(100):
+            if model.get_stats()["lead_analytics"]["lag"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert model.get_view("lead_analytics")["qualified_leads"] == 1
+        await model.stop()
+
+        restored_store = EventStore(log=sql_log)
+        await restored_store.load()
+        restored = ReadModel(restored_store)
+        await restored.start()
+        assert restored.get_view("lead_analytics") == model.get_view("lead_analytics")
+        assert restored.engine.projections["lead_analytics"].applied == 0
+
+        await restored.engine.rebuild("lead_analytics")
+        assert restored.get_view("lead_analytics")["total_leads"] == 3
+        await restored.stop()
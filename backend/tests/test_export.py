@@ -0,0 +1,206 @@
+"""Tests for streaming exports."""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import boto3
+import pytest
+from botocore.stub import ANY, Stubber
+from sqlmodel import Session, select
+
+from app.core.compliance import ComplianceService
+from app.core.export import (
+    arrow_schema,
+    export_rows,
+    export_to_storage,
+    iter_export,
+    iter_query_batches,
+)
+from app.core.storage import MultipartUpload
+from app.models.schemas import Lead
+
+PART = MultipartUpload.MIN_PART_SIZE
+KEY = "exports/k"
+
+
+@pytest.fixture
+def leads(db_session):
+    with Session(db_session.get_bind()) as session:
+        for i in range(1, 26):
+            session.add(Lead(id=i, name=f"Lead {i}", email=f"l{i}@example.com", status="new"))
+        session.commit()
+        yield session
+
+
+def stub_upload(stubber, parts):
+    stubber.add_response(
+        "create_multipart_upload",
+        {"UploadId": "u1"},
+        {"Bucket": "b", "Key": KEY, "ContentType": ANY, "Metadata": {"exported_by": "1"}},
+    )
+    for number in range(1, parts + 1):
+        stubber.add_response(
+            "upload_part",
+            {"ETag": f'"e{number}"'},
+            {"Bucket": "b", "Key": KEY, "UploadId": "u1", "PartNumber": number, "Body": ANY},
+        )
+
+
+class FakeStorage:
+    """Storage front with a stubbed S3 client (no network)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def generate_file_key(self, user_id, filename):
+        return "k"
+
+    def start_multipart_upload(self, file_key, content_type, metadata=None):
+        return MultipartUpload(self.client, "b", file_key, content_type, metadata, PART)
+
+    def generate_presigned_url(self, file_key, expiration=3600):
+        return f"https://storage.example/{file_key}"
+
+
+@pytest.mark.unit
+class TestStreamingExport:
+    """Test batched reads, encoders and compression."""
+
+    def test_query_is_read_in_batches(self, leads):
+        """Test rows arrive as dicts in batches of the requested size."""
+        batches = list(iter_query_batches(leads, select(Lead).order_by(Lead.id), batch_size=10))
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+        assert batches[0][0] == {
+            "id": 1,
+            "name": "Lead 1",
+            "email": "l1@example.com",
+            "status": "new",
+        }
+
+        columns = list(iter_query_batches(leads, select(Lead.id, Lead.email), batch_size=100))
+        assert columns[0][-1] == {"id": 25, "email": "l25@example.com"}
+
+    def test_gzipped_csv_round_trips_with_progress(self, leads):
+        """Test gzip CSV output decodes to every row, with progress after each batch."""
+        sink, progress = io.BytesIO(), []
+        result = export_rows(
+            iter_query_batches(leads, select(Lead).order_by(Lead.id), batch_size=10),
+            sink,
+            "csv",
+            compress=True,
+            progress=lambda rows, size: progress.append(rows),
+        )
+
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(sink.getvalue()).decode())))
+        assert len(rows) == result.rows == 25
+        assert rows[24]["email"] == "l25@example.com"
+        assert progress == [10, 20, 25]
+        assert result.bytes_written == len(sink.getvalue())
+
+    def test_ndjson_streams_one_chunk_per_batch(self):
+        """Test the byte stream yields as batches are encoded, not at the end."""
+        batches = [[{"id": i, "at": datetime(2026, 1, 1)}] for i in range(3)]
+        chunks = list(iter_export(iter(batches), "ndjson"))
+        assert len(chunks) == 3
+        assert json.loads(chunks[2]) == {"id": 2, "at": "2026-01-01T00:00:00"}
+
+    def test_parquet_writes_a_row_group_per_batch(self):
+        """Test Parquet output is readable and keeps batches as row groups."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        batches = [[{"id": i * 10 + j, "score": j / 10} for j in range(10)] for i in range(3)]
+        data = b"".join(iter_export(batches, "parquet"))
+
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        assert parquet.metadata.num_row_groups == 3
+        assert parquet.read().column("id").to_pylist() == list(range(30))
+
+    def test_parquet_column_null_in_first_batch(self, leads):
+        """Test a column that is all NULL in the first batch still takes later values."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        batches = [[{"id": 1, "last_contacted": None}], [{"id": 2, "last_contacted": "2026-01-01"}]]
+        sink = io.BytesIO()
+        export_rows(batches, sink, "parquet")
+        table = pq.read_table(io.BytesIO(sink.getvalue()))
+        assert table.column("last_contacted").to_pylist() == [None, "2026-01-01"]
+
+        query = select(Lead).order_by(Lead.id)
+        schema = arrow_schema(query)
+        assert str(schema.field("id").type) == "int64"
+        data = b"".join(iter_export(iter_query_batches(leads, query, 10), "parquet", schema=schema))
+        assert pq.read_table(io.BytesIO(data)).schema.field("id").type == schema.field("id").type
+
+
+@pytest.mark.unit
+class TestExportUpload:
+    """Test multipart uploads of exports."""
+
+    def test_export_is_uploaded_in_parts(self):
+        """Test output is split into fixed-size parts and the upload completed."""
+        client = boto3.client("s3", region_name="us-east-1")
+        rows = [{"id": i, "blob": "x" * 1000} for i in range(12000)]
+        with Stubber(client) as stubber:
+            stub_upload(stubber, parts=3)
+            stubber.add_response(
+                "complete_multipart_upload",
+                {},
+                {"Bucket": "b", "Key": KEY, "UploadId": "u1", "MultipartUpload": ANY},
+            )
+            result = export_to_storage(
+                (rows[i : i + 1000] for i in range(0, len(rows), 1000)),
+                "leads",
+                1,
+                "ndjson",
+                storage=FakeStorage(client),
+            )
+            stubber.assert_no_pending_responses()
+
+        assert result.rows == 12000
+        assert 2 * PART < result.bytes_written < 3 * PART
+        assert result.download_url == f"https://storage.example/{KEY}"
+
+    def test_failed_export_aborts_the_upload(self):
+        """Test an error mid-export aborts the multipart upload."""
+        client = boto3.client("s3", region_name="us-east-1")
+
+        def batches():
+            yield [{"id": 1}]
+            raise RuntimeError("database went away")
+
+        with Stubber(client) as stubber:
+            stub_upload(stubber, parts=0)
+            stubber.add_response(
+                "abort_multipart_upload", {}, {"Bucket": "b", "Key": KEY, "UploadId": "u1"}
+            )
+            with pytest.raises(RuntimeError):
+                export_to_storage(batches(), "leads", 1, "csv", storage=FakeStorage(client))
+            stubber.assert_no_pending_responses()
+
+
+@pytest.mark.unit
+class TestComplianceExport:
+    """Test the GDPR export is streamed as one JSON document."""
+
+    def test_activity_logs_are_streamed(self, monkeypatch):
+        """Test the streamed document parses and lists the user's logs newest first."""
+        from app.models.audit import AuditAction, AuditLog
+
+        logs = [
+            AuditLog(
+                id=i,
+                action=AuditAction.LOGIN,
+                user_id=1 if i % 2 else 2,
+                timestamp=datetime(2026, 1, 1, 0, i),
+            )
+            for i in range(1, 8)
+        ]
+        monkeypatch.setattr("app.core.audit.audit_logs", logs)
+
+        stream = ComplianceService._stream_user_data(1, {"personal_information": {}}, 2)
+        document = json.loads(b"".join(stream))
+
+        timestamps = [log["timestamp"] for log in document["activity_logs"]]
+        assert timestamps == [datetime(2026, 1, 1, 0, i).isoformat() for i in (7, 5, 3, 1)]
+        assert document["personal_information"] == {}
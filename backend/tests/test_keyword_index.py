@@ -0,0 +1,143 @@
+"""Tests for the BM25 keyword index and hybrid result fusion."""
+
+from datetime import datetime
+
+import pytest
+
+from app.integrations.keyword_index import BM25Index, reciprocal_rank_fusion, tokenize
+from app.integrations.rag_manager import EnhancedRAGManager
+from app.integrations.rag_schemas import DocumentSource, SearchFilter
+
+COLLECTION = "artisan_kb_v1"
+
+
+def chunk_metadata(chunk_id, org_id="org1", **fields):
+    return {
+        "chunk_id": chunk_id,
+        "document_id": chunk_id.split("_chunk_")[0],
+        "org_id": org_id,
+        "source": "knowledge_base",
+        "object_type": "document",
+        "access_level": "internal",
+        "tags": [],
+        "created_at": "2026-01-15T00:00:00",
+        **fields,
+    }
+
+
+def build_index():
+    index = BM25Index()
+    rows = [
+        ("pricing_chunk_0", "Pricing for the Nimbus-X200 plan starts at 49 per seat"),
+        ("pricing_chunk_1", "Annual pricing discounts apply to every plan"),
+        ("battlecard_chunk_0", "Against Globex we win on onboarding speed and support"),
+        ("onboarding_chunk_0", "Onboarding takes two weeks with a dedicated manager"),
+    ]
+    for chunk_id, text in rows:
+        index.add(COLLECTION, chunk_id, text, chunk_metadata(chunk_id))
+    index.add(
+        COLLECTION,
+        "other_chunk_0",
+        "Nimbus-X200 pricing for another tenant",
+        chunk_metadata("other_chunk_0", org_id="org2"),
+    )
+    return index
+
+
+@pytest.mark.unit
+class TestBM25Index:
+    """Test term matching, tenant isolation and filters."""
+
+    def test_compound_terms_keep_whole_and_parts(self):
+        """Test product codes are indexed as one term and by their parts."""
+        assert tokenize("The Nimbus-X200 plan") == ["nimbus-x200", "nimbus", "x200", "plan"]
+
+    def test_exact_product_name_ranks_first(self):
+        """Test a product code query finds the chunk that names it."""
+        results = build_index().search(
+            COLLECTION, "nimbus-x200 cost", SearchFilter(org_id="org1"), 3
+        )
+        assert results[0]["metadata"]["chunk_id"] == "pricing_chunk_0"
+        assert results[0]["search_type"] == "keyword"
+
+    def test_results_are_scoped_to_org_and_filters(self):
+        """Test other tenants' chunks never match and SearchFilter fields apply."""
+        index = build_index()
+        org2 = index.search(COLLECTION, "pricing", SearchFilter(org_id="org2"), 5)
+        assert [r["metadata"]["chunk_id"] for r in org2] == ["other_chunk_0"]
+
+        filters = SearchFilter(org_id="org1", source=DocumentSource.CRM)
+        assert index.search(COLLECTION, "pricing", filters, 5) == []
+        filters = SearchFilter(org_id="org1", date_from=datetime(2026, 2, 1))
+        assert index.search(COLLECTION, "pricing", filters, 5) == []
+
+    def test_reingesting_a_document_replaces_its_chunks(self):
+        """Test removed chunks stop matching and statistics stay consistent."""
+        index = build_index()
+        assert index.remove_document(COLLECTION, "org1", "pricing") == 2
+        results = index.search(COLLECTION, "pricing", SearchFilter(org_id="org1"), 5)
+        assert results == []
+        assert len(index) == 3
+
+
+@pytest.mark.unit
+class TestHybridFusion:
+    """Test reciprocal-rank fusion in the RAG manager."""
+
+    def test_fusion_rewards_agreement(self):
+        """Test a chunk ranked by both lists beats chunks ranked by one."""
+        vector = [
+            {"content": "a", "metadata": {"chunk_id": "a"}, "score": 0.9, "search_type": "vector"},
+            {"content": "b", "metadata": {"chunk_id": "b"}, "score": 0.8, "search_type": "vector"},
+        ]
+        keyword = [
+            {"content": "b", "metadata": {"chunk_id": "b"}, "score": 7.0, "search_type": "keyword"},
+            {"content": "c", "metadata": {"chunk_id": "c"}, "score": 5.0, "search_type": "keyword"},
+        ]
+        fused = reciprocal_rank_fusion([vector, keyword])
+        assert [r["metadata"]["chunk_id"] for r in fused] == ["b", "a", "c"]
+        assert fused[0]["search_type"] == "hybrid"
+        assert fused[0]["scores"] == {"vector": 0.8, "keyword": 7.0}
+
+    async def test_hybrid_search_finds_exact_terms_vectors_miss(self):
+        """Test a keyword-only match is returned alongside vector results."""
+        manager = EnhancedRAGManager()
+        manager.keyword_index = build_index()
+        manager.keyword_index.loaded.add(COLLECTION)
+
+        async def vector_search(query, collection_name, filters, limit):
+            text = "Annual pricing discounts apply to every plan"
+            return [
+                {
+                    "content": text,
+                    "metadata": chunk_metadata("pricing_chunk_1"),
+                    "score": 0.82,
+                    "search_type": "vector",
+                }
+            ]
+
+        manager._vector_search = vector_search
+        results = await manager.hybrid_search("Nimbus-X200 pricing", SearchFilter(org_id="org1"))
+
+        chunk_ids = [r["metadata"]["chunk_id"] for r in results]
+        assert chunk_ids[:2] == ["pricing_chunk_1", "pricing_chunk_0"]
+        assert "other_chunk_0" not in chunk_ids
+
+    async def test_failed_keyword_load_backs_off(self):
+        """Test a failed keyword index load is not repeated on every search."""
+        manager = EnhancedRAGManager()
+        scans = []
+
+        def broken_scroll(collection_name):
+            scans.append(collection_name)
+            raise ConnectionError("qdrant unavailable")
+
+        manager._scroll_chunks = broken_scroll
+        filters = SearchFilter(org_id="org1")
+        assert await manager._keyword_search("pricing", COLLECTION, filters, 5) == []
+        assert await manager._keyword_search("pricing", COLLECTION, filters, 5) == []
+        assert scans == [COLLECTION]
+
+        manager._keyword_retry_at.clear()  # the backoff window has passed
+        await manager._keyword_search("pricing", COLLECTION, filters, 5)
+        assert len(scans) == 2
@@ -0,0 +1,72 @@
+"""Tests for ML lead scoring."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.ml_lead_scoring import ProductionLeadScorer, generate_synthetic_training_data
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    pytest.importorskip("xgboost")
+    random.seed(7)
+    scorer = ProductionLeadScorer()
+    scorer.train(*generate_synthetic_training_data(300))
+    return scorer
+
+
+def make_lead(**updates):
+    lead = {
+        "company_size": 250,
+        "title": "VP Sales",
+        "industry": "SaaS",
+        "target_industries": ["SaaS", "Finance"],
+        "email_opens": 4,
+        "link_clicks": 2,
+        "meeting_booked": False,
+        "last_activity_date": (datetime.utcnow() - timedelta(days=3)).isoformat(),
+        "total_emails_sent": 5,
+        "intent_score": 60,
+        "tech_stack": ["Salesforce"],
+        "target_tech_stack": ["Salesforce", "HubSpot"],
+    }
+    lead.update(updates)
+    return lead
+
+
+@pytest.mark.unit
+class TestBatchScoring:
+    """Test the vectorized batch path against per-lead scoring."""
+
+    def test_batch_matches_single_predictions(self, scorer):
+        """Test every batch result equals predict_score for the same lead."""
+        aware = datetime.now(timezone(timedelta(hours=-5))) - timedelta(days=10)
+        leads = [
+            make_lead(),
+            make_lead(company_size="500+", title="Chief Revenue Officer"),
+            make_lead(company_size="100-500", title="Manager"),
+            make_lead(last_activity_date=None, email_opens=0, link_clicks=0),
+            make_lead(last_activity_date=aware),
+            make_lead(last_activity_date="2026-01-15T09:30:00Z", company_size="500+"),
+            make_lead(meeting_booked=True, title=None, tech_stack=None),
+        ]
+
+        batch = scorer.predict_scores_batch(leads)
+
+        assert len(batch) == len(leads)
+        for lead, result in zip(leads, batch):
+            single = scorer.predict_score(lead)
+            assert result["score"] == single["score"]
+            assert result["tier"] == single["tier"]
+            assert result["probability"] == pytest.approx(single["probability"])
+            assert result["confidence"] == pytest.approx(single["confidence"])
+            assert list(result["factors"]) == list(single["factors"])
+            assert list(result["factors"].values()) == pytest.approx(
+                list(single["factors"].values())
+            )
+
+    def test_empty_batch(self, scorer):
+        """Test an empty batch returns no results."""
+        assert scorer.predict_scores_batch([]) == []
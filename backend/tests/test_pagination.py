@@ -0,0 +1,146 @@
+"""Tests for offset and keyset pagination."""
+
+import pytest
+from sqlmodel import Session, select
+
+from app.core.pagination import (
+    CursorParams,
+    PaginationParams,
+    count_items,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    paginate_cursor,
+)
+from app.models.schemas import Lead
+
+STATUSES = ["new", "contacted", "qualified"]
+
+
+@pytest.fixture
+def leads(db_session, clear_cache):
+    # SQLModel session (exec) on the test database
+    with Session(db_session.get_bind()) as session:
+        for i in range(1, 26):
+            session.add(
+                Lead(id=i, name=f"Lead {i:02d}", email=f"l{i}@example.com", status=STATUSES[i % 3])
+            )
+        session.commit()
+        yield session
+
+
+def walk(session, params, query=None):
+    """Follow next cursors from the first page, returning each page's IDs."""
+    query = query if query is not None else select(Lead)
+    pages = []
+    while True:
+        results, info = paginate_cursor(session, query, params, Lead)
+        pages.append([lead.id for lead in results])
+        if not info.next_cursor:
+            return pages, info
+        params = params.model_copy(update={"cursor": info.next_cursor})
+
+
+@pytest.mark.unit
+@pytest.mark.db
+class TestKeysetPagination:
+    """Test cursor pages, ordering ties and both directions."""
+
+    def test_pages_cover_every_row_once(self, leads):
+        """Test walking forward returns each lead exactly once in key order."""
+        pages, info = walk(leads, CursorParams(limit=10))
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert sum(pages, []) == list(range(1, 26))
+        assert not info.has_next and info.has_previous
+
+    def test_ties_on_sort_column_are_broken_by_id(self, leads):
+        """Test a non-unique sort column neither skips nor repeats rows across pages."""
+        params = CursorParams(limit=4, sort_by="status", sort_order="desc")
+        pages, _ = walk(leads, params)
+
+        rows = {lead.id: lead.status for lead in leads.exec(select(Lead)).all()}
+        expected = sorted(rows, key=lambda i: (rows[i], i), reverse=True)
+        assert sum(pages, []) == expected
+
+    def test_previous_cursor_returns_the_page_before(self, leads):
+        """Test paging back from page three returns page two in the same order."""
+        params = CursorParams(limit=5, sort_by="name")
+        first, info = paginate_cursor(leads, select(Lead), params, Lead)
+        assert info.previous_cursor is None
+        second, info = paginate_cursor(
+            leads, select(Lead), params.model_copy(update={"cursor": info.next_cursor}), Lead
+        )
+        third, info = paginate_cursor(
+            leads, select(Lead), params.model_copy(update={"cursor": info.next_cursor}), Lead
+        )
+
+        back, back_info = paginate_cursor(
+            leads, select(Lead), params.model_copy(update={"cursor": info.previous_cursor}), Lead
+        )
+        assert [lead.id for lead in back] == [lead.id for lead in second]
+        assert back_info.has_next and back_info.has_previous
+
+        start, start_info = paginate_cursor(
+            leads,
+            select(Lead),
+            params.model_copy(update={"cursor": back_info.previous_cursor}),
+            Lead,
+        )
+        assert [lead.id for lead in start] == [lead.id for lead in first]
+        assert not start_info.has_previous and start_info.previous_cursor is None
+
+    def test_filters_apply_to_every_page(self, leads):
+        """Test keyset conditions combine with the caller's WHERE clause."""
+        query = select(Lead).where(Lead.status == "new")
+        pages, info = walk(leads, CursorParams(limit=3), query)
+        assert sum(pages, []) == [i for i in range(1, 26) if i % 3 == 0]
+        assert info.total_items == 8
+
+    def test_cursors_are_opaque_and_checked(self, leads):
+        """Test cursors round-trip, and tampered or mismatched cursors are rejected."""
+        cursor = encode_cursor(["Lead 05", 5], "next", "name", "asc")
+        assert decode_cursor(cursor)["k"] == ["Lead 05", 5]
+
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+        with pytest.raises(ValueError):
+            paginate_cursor(
+                leads, select(Lead), CursorParams(cursor=cursor, sort_by="status"), Lead
+            )
+
+
+@pytest.mark.unit
+@pytest.mark.db
+class TestCountCaching:
+    """Test totals are cached unless an exact count is requested."""
+
+    def test_cached_total_is_reused_until_exact_requested(self, leads):
+        """Test later pages reuse the counted total and flag it as an estimate."""
+        query = select(Lead)
+        assert count_items(leads, query) == (25, False)
+
+        leads.add(Lead(id=26, name="Lead 26", email="l26@example.com"))
+        leads.commit()
+        assert count_items(leads, query) == (25, True)
+        assert count_items(leads, query, exact=True) == (26, False)
+
+        _, info = paginate(leads, query, PaginationParams(limit=10))
+        assert info.total_items == 26 and info.total_is_estimate
+        assert info.total_pages == 3
+
+    def test_has_next_ignores_a_stale_total(self, leads):
+        """Test has_next comes from the rows fetched, not from a cached total."""
+        query = select(Lead).order_by(Lead.id)
+        count_items(leads, query)
+        for i in range(26, 36):
+            leads.add(Lead(id=i, name=f"Lead {i}", email=f"l{i}@example.com"))
+        leads.commit()
+
+        results, info = paginate(leads, query, PaginationParams(page=3, offset=20, limit=10))
+        assert [lead.id for lead in results] == list(range(21, 31))
+        assert info.has_next and info.total_is_estimate
+        assert info.total_items == 31 and info.total_pages == 4
+
+        results, info = paginate(leads, query, PaginationParams(page=4, offset=30, limit=10))
+        assert len(results) == 5 and not info.has_next
+        assert info.total_items == 35 and not info.total_is_estimate
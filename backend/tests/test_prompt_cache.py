@@ -0,0 +1,112 @@
+"""Tests for the AI prompt/response cache."""
+
+import pytest
+
+from app.core.cache import InMemoryAsyncCache, SimpleCache
+from app.integrations.ai_orchestrator import AIOrchestrator, OrchestrationContext
+from app.integrations.policies import DEFAULT_POLICIES, UseCaseType
+from app.integrations.prompt_cache import PromptCache, prompt_digest
+from app.integrations.providers import FakeProvider
+
+VOCABULARY = ["acme", "globex", "initech", "score", "lead", "email", "saas", "retail", "urgent"]
+
+
+async def bag_of_words(text):
+    """Deterministic embedding: word counts over a tiny vocabulary."""
+    words = text.lower().replace(",", " ").split()
+    return [float(words.count(term)) for term in VOCABULARY] + [1.0]
+
+
+def make_policy(**updates):
+    return DEFAULT_POLICIES[UseCaseType.LEAD_SCORING].model_copy(
+        update={"semantic_cache": True, "semantic_cache_threshold": 0.95, **updates}
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestPromptCache:
+    """Test exact and semantic lookups."""
+
+    def test_digest_is_stable_and_covers_settings(self):
+        """Test the key is a content digest that changes with generation settings."""
+        policy = make_policy()
+        digest = prompt_digest(policy, "score acme")
+        assert digest == prompt_digest(make_policy(), "score acme")
+        assert digest != prompt_digest(make_policy(temperature=0.9), "score acme")
+        assert digest != prompt_digest(make_policy(system_prompt="other"), "score acme")
+        assert len(digest) == 64
+
+    async def test_exact_hit_is_shared_across_instances(self):
+        """Test a response cached by one worker is found by another."""
+        backend = InMemoryAsyncCache(SimpleCache())
+        policy = make_policy(semantic_cache=False)
+        writer, reader = PromptCache(backend), PromptCache(backend)
+
+        key, cached, _ = await writer.lookup(policy, "org1", "score acme")
+        assert cached is None
+        await writer.store(policy, "org1", key, {"content": "90"})
+
+        _, cached, _ = await reader.lookup(policy, "org2", "score acme")
+        assert cached == {"content": "90"}
+
+    async def test_semantic_hit_is_scoped_to_org(self):
+        """Test near-duplicate prompts hit within an org and miss outside it."""
+        cache = PromptCache(InMemoryAsyncCache(SimpleCache()), embedder=bag_of_words)
+        policy = make_policy()
+
+        key, _, vector = await cache.lookup(policy, "org1", "score lead acme saas")
+        await cache.store(policy, "org1", key, {"content": "85"}, vector=vector)
+
+        _, cached, _ = await cache.lookup(policy, "org1", "score lead, acme saas")
+        assert cached == {"content": "85"}
+        _, cached, _ = await cache.lookup(policy, "org2", "score lead, acme saas")
+        assert cached is None
+        _, cached, _ = await cache.lookup(policy, "org1", "score lead globex retail")
+        assert cached is None
+        assert cache.get_stats()["semantic_hits"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestOrchestratorCaching:
+    """Test execute() serves repeats from the cache."""
+
+    async def test_repeat_prompt_skips_provider(self):
+        """Test a repeated prompt is answered without another provider call."""
+        orchestrator = AIOrchestrator(embedder=bag_of_words)
+        orchestrator.prompt_cache.backend = InMemoryAsyncCache(SimpleCache())
+        policy = make_policy(provider="fake", model="cached", cache_results=True)
+        orchestrator.update_policy(UseCaseType.LEAD_SCORING, policy)
+        provider = FakeProvider("cached")
+        orchestrator._get_provider = lambda policy: provider
+        context = OrchestrationContext(user_id="u1", org_id="o1")
+
+        first = await orchestrator.execute(UseCaseType.LEAD_SCORING, "score lead acme", context)
+        again = await orchestrator.execute(UseCaseType.LEAD_SCORING, "score lead acme", context)
+        near = await orchestrator.execute(UseCaseType.LEAD_SCORING, "score lead, acme", context)
+
+        assert provider.calls == 1
+        assert not first.cached
+        assert again.cached and near.cached
+        assert near.content == first.content
+
+    async def test_prompt_vectors_use_the_embedding_service(self, monkeypatch):
+        """Test the default embedder goes through the shared query embedding service."""
+        models = []
+
+        class Service:
+            async def embed_query(self, text):
+                return await bag_of_words(text)
+
+        def get_service(model):
+            models.append(model)
+            return Service()
+
+        monkeypatch.setattr("app.integrations.ai_orchestrator.get_embedding_service", get_service)
+        orchestrator = AIOrchestrator()
+
+        assert await orchestrator.prompt_cache.embedder("score acme") == await bag_of_words(
+            "score acme"
+        )
+        assert models == ["text-embedding-3-small"]
@@ -0,0 +1,135 @@
+"""Tests for batched, incremental RAG ingestion."""
+
+from datetime import datetime
+
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+from qdrant_client import QdrantClient
+
+from app.integrations.rag_manager import EnhancedRAGManager
+from app.integrations.rag_schemas import (
+    DocumentSource,
+    IngestionRequest,
+    NormalizedDocument,
+    ObjectType,
+    SearchFilter,
+)
+
+PARAGRAPHS = [f"Section {i}. " + " ".join(f"term{i}x{j}" for j in range(120)) for i in range(6)]
+
+
+class CountingEmbedding(MockEmbedding):
+    """Mock embedding that records how many texts and requests it served."""
+
+    texts: int = 0
+    requests: int = 0
+
+    async def _aget_text_embeddings(self, texts):
+        self.texts += len(texts)
+        self.requests += 1
+        return await super()._aget_text_embeddings(texts)
+
+
+def make_manager(embed_batch_size=256):
+    manager = EnhancedRAGManager(embed_batch_size=embed_batch_size)
+    manager.qdrant_client = QdrantClient(":memory:")
+    manager.embed_model = CountingEmbedding(embed_dim=1536, embed_batch_size=embed_batch_size)
+    return manager
+
+
+def make_document(document_id, paragraphs=PARAGRAPHS, **updates):
+    return NormalizedDocument(
+        document_id=document_id,
+        source=DocumentSource.KNOWLEDGE_BASE,
+        object_type=ObjectType.DOCUMENT,
+        title=f"Doc {document_id}",
+        content="\n\n".join(paragraphs),
+        org_id="org1",
+        created_at=datetime(2026, 1, 15),
+        **updates,
+    )
+
+
+def ingest(manager, *documents, **options):
+    return manager.ingest_documents(
+        IngestionRequest(documents=list(documents), chunk_size=200, chunk_overlap=0, **options)
+    )
+
+
+@pytest.mark.unit
+class TestIncrementalIngestion:
+    """Test batching, content-hash dedup and version bumps."""
+
+    async def test_chunks_are_embedded_in_batches(self):
+        """Test many documents share a few embedding requests and land in Qdrant."""
+        manager = make_manager(embed_batch_size=64)
+
+        result = await ingest(manager, *(make_document(f"d{i}") for i in range(10)))
+
+        assert result.documents_processed == 10
+        assert result.chunks_created == manager.embed_model.texts
+        assert manager.embed_model.requests == -(-result.chunks_created // 64)
+        assert set(result.stage_stats) == {"chunk", "embed", "upsert"}
+        assert result.stage_stats["embed"]["items"] == result.chunks_created
+        count = manager.qdrant_client.count("artisan_kb_v1").count
+        assert count == result.chunks_created
+
+    async def test_unchanged_documents_are_skipped(self):
+        """Test re-ingesting the same content embeds nothing, even on a fresh manager."""
+        manager = make_manager()
+        await ingest(manager, make_document("d1"))
+
+        restarted = make_manager()
+        restarted.qdrant_client = manager.qdrant_client
+        result = await ingest(restarted, make_document("d1"), upsert=True)
+
+        assert result.documents_skipped == 1
+        assert result.chunks_created == 0
+        assert restarted.embed_model.texts == 0
+
+    async def test_version_bump_reembeds_only_changed_chunks(self):
+        """Test an edited document re-embeds its changed chunks and drops removed ones."""
+        manager = make_manager()
+        first = await ingest(manager, make_document("d1"))
+        manager.embed_model.texts = 0
+
+        edited = PARAGRAPHS[:2] + ["Section 2. Nimbus-X200 is now included."]
+        result = await ingest(manager, make_document("d1", paragraphs=edited, version=2))
+
+        assert 0 < result.chunks_created < first.chunks_created
+        assert result.chunks_skipped > 0
+        assert manager.embed_model.texts == result.chunks_created
+        stored = manager.qdrant_client.count("artisan_kb_v1").count
+        assert stored == result.chunks_created + result.chunks_skipped
+        hits = await manager._keyword_search(
+            "nimbus-x200", "artisan_kb_v1", SearchFilter(org_id="org1"), 5
+        )
+        assert hits and hits[0]["metadata"]["document_id"] == "d1"
+
+    async def test_same_version_is_not_replaced_without_upsert(self):
+        """Test changed content with an unchanged version needs upsert to replace it."""
+        manager = make_manager()
+        await ingest(manager, make_document("d1"))
+
+        changed = make_document("d1", paragraphs=PARAGRAPHS[:1])
+        assert (await ingest(manager, changed)).documents_skipped == 1
+        assert (await ingest(manager, changed, upsert=True)).documents_processed == 1
+
+    async def test_failed_manifest_scan_backs_off(self, monkeypatch):
+        """Test a failed scan of stored chunks is not repeated on every ingest."""
+        manager = make_manager()
+        scans = []
+
+        def broken_scroll(collection_name):
+            scans.append(collection_name)
+            raise ConnectionError("qdrant unavailable")
+
+        monkeypatch.setattr(manager, "_scroll_chunks", broken_scroll)
+
+        assert (await ingest(manager, make_document("d1"))).documents_processed == 1
+        assert (await ingest(manager, make_document("d2"))).documents_processed == 1
+        assert len(scans) == 1
+
+        manager._manifest_retry_at.clear()  # the backoff window has passed
+        await ingest(manager, make_document("d3"))
+        assert len(scans) == 2
@@ -0,0 +1,174 @@
+"""Tests for the saga orchestrator."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+
+from app.core.distributed_saga import SagaOrchestrator, SagaStatus, SagaStep, SQLSagaLog, StepStatus
+from app.models.saga_journal import SagaJournalRecord, SagaLeaseRecord
+
+
+def make_engine():
+    """Private in-memory SQLite database with the saga tables."""
+    db_engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        db_engine, tables=[SagaJournalRecord.__table__, SagaLeaseRecord.__table__]
+    )
+    return db_engine
+
+
+@pytest.fixture
+def saga_log():
+    """Saga journal on a private in-memory SQLite database."""
+    db_engine = make_engine()
+    yield SQLSagaLog(db_engine)
+    db_engine.dispose()
+
+
+class FlakyLog(SQLSagaLog):
+    """Journal that rejects terminal "completed" entries while ``broken``."""
+
+    broken = True
+
+    def append_batch(self, entries, *lease):
+        if self.broken and any(e.status == "completed" and e.kind == "status" for e in entries):
+            raise ConnectionError("journal unavailable")
+        super().append_batch(entries, *lease)
+
+
+class Recorder:
+    """Builds steps that record calls; ``block`` makes a step wait forever."""
+
+    def __init__(self, fail=None, block=None):
+        self.calls = []
+        self.fail = fail
+        self.block = block
+        self.running = 0
+        self.max_running = 0
+
+    def build(self, data):
+        def action(name):
+            async def run(ctx):
+                self.calls.append(name)
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+                try:
+                    await asyncio.sleep(0.01)
+                    if name == self.block:
+                        await asyncio.Event().wait()
+                    if name == self.fail:
+                        raise ValueError(f"{name} failed")
+                    ctx.set(name, data["order_id"])
+                    return {"done": name}
+                finally:
+                    self.running -= 1
+
+            return run
+
+        def compensation(name):
+            async def undo(ctx):
+                self.calls.append(f"undo:{name}")
+
+            return undo
+
+        return [
+            SagaStep("reserve", action("reserve"), compensation("reserve"), max_retries=1),
+            SagaStep("email", action("email"), compensation("email"), max_retries=1, group="g"),
+            SagaStep("stats", action("stats"), compensation("stats"), max_retries=1, group="g"),
+            SagaStep("activate", action("activate"), compensation("activate"), max_retries=1),
+        ]
+
+
+@pytest.mark.unit
+class TestSagaOrchestrator:
+    """Test parallel groups, journaling and resumption."""
+
+    async def test_parallel_group_and_compensation(self):
+        """Test grouped steps run together and are compensated on failure."""
+        recorder = Recorder(fail="activate")
+        orchestrator = SagaOrchestrator()
+        execution = await orchestrator.execute_saga(
+            "order", recorder.build({"order_id": 7}), {"order_id": 7}
+        )
+
+        assert recorder.max_running == 2
+        assert execution.status == SagaStatus.COMPENSATED
+        assert set(recorder.calls[-3:-1]) == {"undo:email", "undo:stats"}
+        assert recorder.calls[-1] == "undo:reserve"
+        assert orchestrator.list_active_sagas() == []
+
+    async def test_resume_after_crash(self, saga_log):
+        """Test an interrupted saga continues from its journal after restart."""
+        crashed = Recorder(block="activate")
+        orchestrator = SagaOrchestrator(log=saga_log)
+        orchestrator.register("order", crashed.build)
+        task = asyncio.create_task(
+            orchestrator.execute_saga(
+                "order", crashed.build({"order_id": 7}), {"order_id": 7}, saga_type="order"
+            )
+        )
+        while "activate" not in crashed.calls:
+            await asyncio.sleep(0.01)
+
+        # Still leased to a live worker, so another worker leaves it alone
+        restarted = Recorder()
+        recovered = SagaOrchestrator(log=saga_log)
+        recovered.register("order", restarted.build)
+        assert await recovered.resume() == 0
+
+        task.cancel()
+        await orchestrator.stop()
+        assert await recovered.resume() == 1
+        (saga_id,) = recovered.executions
+        while recovered.get_execution(saga_id).status != SagaStatus.COMPLETED:
+            await asyncio.sleep(0.01)
+
+        execution = recovered.get_execution(saga_id)
+        assert restarted.calls == ["activate"]
+        assert execution.context.get("stats") == 7
+        assert [s.status for s in execution.steps] == [StepStatus.COMPLETED] * 4
+        await recovered.flush()
+        assert await recovered.resume() == 0
+
+    async def test_journal_outage_does_not_compensate(self):
+        """Test a saga whose final status cannot be journaled is left for resume, not undone."""
+        db_engine = make_engine()
+        log = FlakyLog(db_engine)
+        recorder = Recorder()
+        orchestrator = SagaOrchestrator(log=log)
+        orchestrator.JOURNAL_RETRY_DELAY = 0
+        execution = await orchestrator.execute_saga(
+            "order", recorder.build({"order_id": 7}), {"order_id": 7}, saga_type="order"
+        )
+
+        assert execution.status == SagaStatus.COMPLETED
+        assert not any(call.startswith("undo:") for call in recorder.calls)
+        assert "journal unavailable" in execution.error
+
+        log.broken = False
+        restarted = Recorder()
+        recovered = SagaOrchestrator(log=log)
+        recovered.register("order", restarted.build)
+        assert await recovered.resume() == 1
+        while recovered.get_execution(execution.saga_id).status != SagaStatus.COMPLETED:
+            await asyncio.sleep(0.01)
+        assert restarted.calls == []
+        db_engine.dispose()
+
+    async def test_finished_executions_are_evicted(self):
+        """Test only the most recent finished sagas are retained."""
+        orchestrator = SagaOrchestrator(max_finished=2)
+        ids = []
+        for i in range(3):
+            execution = await orchestrator.execute_saga(
+                "order", Recorder().build({"order_id": i}), {"order_id": i}
+            )
+            ids.append(execution.saga_id)
+
+        assert orchestrator.get_execution(ids[0]) is None
+        assert orchestrator.get_execution(ids[2]).status == SagaStatus.COMPLETED
+        assert orchestrator.get_stats()["finished_retained"] == 2
@@ -1,56 +1,63 @@
 """Tests for security module."""
-import pytest
+
 from datetime import timedelta
+
+import pytest
+
+from app.core.rate_limiting import RateLimit, RateLimitEngine
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    RateLimitMiddleware,
     create_access_token,
     decode_access_token,
+    get_password_hash,
+    verify_password,
 )
-from app.models.user import User, UserRole
 from app.models.schemas import Permission
+from app.models.user import User, UserRole
 
 
 @pytest.mark.unit
 @pytest.mark.security
 class TestPasswordHashing:
     """Test password hashing and verification."""
-    
+
     def test_password_hashing(self):
         """Test that password hashing works correctly."""
         import os
+
         password = "mysecurepassword123"
         hashed = get_password_hash(password)
-        
+
         # In test environment with plaintext, hash == password
         # In production with bcrypt, hash != password
         is_test_env = os.getenv("ENVIRONMENT") == "test"
         if not is_test_env:
             assert hashed != password
-        
+
         assert verify_password(password, hashed)
-    
+
     def test_password_verification_fails_with_wrong_password(self):
         """Test that verification fails with wrong password."""
         password = "mysecurepassword123"
         wrong_password = "wrongpassword"
         hashed = get_password_hash(password)
-        
+
         assert not verify_password(wrong_password, hashed)
-    
+
     def test_different_hashes_for_same_password(self):
         """Test that same password generates different hashes (salt)."""
         import os
+
         password = "mysecurepassword123"
         hash1 = get_password_hash(password)
         hash2 = get_password_hash(password)
-        
+
         # In test environment with plaintext, hashes are identical
         # In production with bcrypt salt, hashes differ
         is_test_env = os.getenv("ENVIRONMENT") == "test"
         if not is_test_env:
             assert hash1 != hash2
-        
+
         assert verify_password(password, hash1)
         assert verify_password(password, hash2)
 
@@ -59,36 +66,36 @@ class TestPasswordHashing:
 @pytest.mark.security
 class TestJWTTokens:
     """Test JWT token creation and validation."""
-    
+
     def test_create_access_token(self):
         """Test access token creation."""
         data = {"sub": "test@example.com"}
         token = create_access_token(data)
-        
+
         assert isinstance(token, str)
         assert len(token) > 0
-    
+
     def test_decode_access_token(self):
         """Test access token decoding."""
         email = "test@example.com"
         data = {"sub": email}
         token = create_access_token(data)
-        
+
         decoded = decode_access_token(token)
         assert decoded["sub"] == email
-    
+
     def test_token_with_expiration(self):
         """Test token with custom expiration."""
         data = {"sub": "test@example.com"}
         token = create_access_token(data, expires_delta=timedelta(minutes=5))
-        
+
         decoded = decode_access_token(token)
         assert "exp" in decoded
-    
+
     def test_invalid_token_raises_error(self):
         """Test that invalid token raises error."""
         invalid_token = "invalid.token.here"
-        
+
         with pytest.raises(Exception):
             decode_access_token(invalid_token)
 
@@ -97,81 +104,147 @@ class TestJWTTokens:
 @pytest.mark.security
 class TestRBACPermissions:
     """Test Role-Based Access Control."""
-    
+
     def test_admin_has_all_permissions(self):
         """Test that admin role has all permissions."""
         user = User(
             email="admin@example.com",
             username="admin",
             role=UserRole.ADMIN,
-            hashed_password="hashed"
+            hashed_password="hashed",
         )
-        
+
         # Admin should have all permissions
         assert user.has_permission(Permission.CAMPAIGN_CREATE)
         assert user.has_permission(Permission.USER_DELETE)
         assert user.has_permission(Permission.SYSTEM_SETTINGS)
-    
+
     def test_manager_permissions(self):
         """Test manager role permissions."""
         user = User(
             email="manager@example.com",
             username="manager",
             role=UserRole.MANAGER,
-            hashed_password="hashed"
+            hashed_password="hashed",
         )
-        
+
         # Manager should have campaign and lead permissions
         assert user.has_permission(Permission.CAMPAIGN_CREATE)
         assert user.has_permission(Permission.LEAD_UPDATE)
-        
+
         # Manager should NOT have user management permissions
         assert not user.has_permission(Permission.USER_DELETE)
         assert not user.has_permission(Permission.SYSTEM_SETTINGS)
-    
+
     def test_user_permissions(self):
         """Test basic user permissions."""
         user = User(
-            email="user@example.com",
-            username="user",
-            role=UserRole.USER,
-            hashed_password="hashed"
+            email="user@example.com", username="user", role=UserRole.USER, hashed_password="hashed"
         )
-        
+
         # User should have read permissions only
         assert user.has_permission(Permission.CAMPAIGN_READ)
         assert user.has_permission(Permission.LEAD_READ)
-        
+
         # User should NOT have write permissions
         assert not user.has_permission(Permission.CAMPAIGN_CREATE)
         assert not user.has_permission(Permission.CAMPAIGN_DELETE)
         assert not user.has_permission(Permission.USER_DELETE)
-    
+
     def test_has_all_permissions(self):
         """Test checking multiple permissions at once."""
         admin = User(
             email="admin@example.com",
             username="admin",
             role=UserRole.ADMIN,
-            hashed_password="hashed"
+            hashed_password="hashed",
         )
-        
+
         user = User(
-            email="user@example.com",
-            username="user",
-            role=UserRole.USER,
-            hashed_password="hashed"
+            email="user@example.com", username="user", role=UserRole.USER, hashed_password="hashed"
         )
-        
+
         # Admin has all permissions
-        assert admin.has_all_permissions([
-            Permission.CAMPAIGN_CREATE,
-            Permission.USER_DELETE,
-            Permission.SYSTEM_SETTINGS
-        ])
-        
+        assert admin.has_all_permissions(
+            [Permission.CAMPAIGN_CREATE, Permission.USER_DELETE, Permission.SYSTEM_SETTINGS]
+        )
+
         # User doesn't have all these permissions
-        assert not user.has_all_permissions([
-            Permission.CAMPAIGN_CREATE,
-            Permission.USER_DELETE
-        ])
+        assert not user.has_all_permissions([Permission.CAMPAIGN_CREATE, Permission.USER_DELETE])
+
+
+@pytest.mark.unit
+@pytest.mark.security
+class TestRateLimitEngine:
+    """Test the local rate limit engine."""
+
+    async def test_sliding_window_blocks_over_limit(self):
+        """Test requests beyond the limit are rejected with retry info."""
+        engine = RateLimitEngine(algorithm="sliding_window")
+        limits = [RateLimit(3, 60)]
+
+        results = [await engine.hit("k", limits, now=1000.0) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert results[2].remaining == 0
+        assert results[3].headers()["Retry-After"] == "20"
+
+    async def test_sliding_window_weights_previous_window(self):
+        """Test the previous window's count decays across the boundary."""
+        engine = RateLimitEngine(algorithm="sliding_window")
+        limits = [RateLimit(10, 60)]
+        for _ in range(10):
+            await engine.hit("k", limits, now=0.0)
+
+        # Halfway through the next window half of the old hits still count
+        result = await engine.hit("k", limits, now=90.0)
+        assert result.allowed
+        assert result.remaining == 4
+
+    async def test_token_bucket_refills(self):
+        """Test the token bucket refills at limit/window per second."""
+        engine = RateLimitEngine(algorithm="token_bucket")
+        limits = [RateLimit(2, 10)]
+
+        assert (await engine.hit("k", limits, now=0.0)).allowed
+        assert (await engine.hit("k", limits, now=0.0)).allowed
+        assert not (await engine.hit("k", limits, now=0.0)).allowed
+        assert (await engine.hit("k", limits, now=5.0)).allowed
+
+    async def test_multiple_limits_are_all_or_nothing(self):
+        """Test a rejected check consumes nothing from the other limits."""
+        engine = RateLimitEngine()
+        limits = [RateLimit(100, 60, name="burst"), RateLimit(1, 3600, name="hour")]
+
+        assert (await engine.hit("k", limits, now=0.0)).allowed
+        blocked = await engine.hit("k", limits, now=1.0)
+
+        assert not blocked.allowed
+        assert blocked.limit == 1
+        assert (await engine.hit("k", [limits[0]], now=1.0)).remaining == 98
+
+    def test_local_state_is_bounded(self):
+        """Test the local store evicts old keys past max_keys."""
+        engine = RateLimitEngine(max_local_keys=100)
+        store = engine.local
+        for i in range(1000):
+            store.sliding_window(f"ip:{i}", [RateLimit(5, 60)], 1, 0.0)
+
+        assert len(store._state) == 100
+
+    def test_every_caller_gets_plan_limits(self):
+        """Test tokens without a tier and anonymous callers both get the default plan."""
+        from starlette.requests import Request
+
+        middleware = RateLimitMiddleware(app=None)
+
+        def request(token=None):
+            headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+            return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 1)})
+
+        legacy = create_access_token({"sub": "7", "email": "a@example.com"})
+        pro = create_access_token({"sub": "8", "email": "b@example.com", "tier": "pro"})
+
+        assert middleware._identify(request(legacy)) == ("ratelimit:user:7", "free")
+        assert middleware._identify(request(pro)) == ("ratelimit:user:8", "pro")
+        assert middleware._identify(request()) == ("ratelimit:ip:10.0.0.1", "free")
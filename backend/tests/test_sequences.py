@@ -0,0 +1,132 @@
+"""Tests for sequence scheduling."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+
+from app.models.sequence_schedule import ScheduledStepRecord
+from app.services.sequence_scheduler import SequenceScheduler, SQLSequenceScheduler
+from app.services.sequence_service import SequenceService, StepStatus
+
+
+def make_engine():
+    """Private in-memory SQLite database with the schedule table."""
+    db_engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(db_engine, tables=[ScheduledStepRecord.__table__])
+    return db_engine
+
+
+@pytest.fixture(params=["memory", "database"])
+def scheduler(request):
+    """Both scheduler backends."""
+    if request.param == "memory":
+        yield SequenceScheduler()
+        return
+    db_engine = make_engine()
+    yield SQLSequenceScheduler(db_engine)
+    db_engine.dispose()
+
+
+@pytest.mark.unit
+class TestSequenceScheduler:
+    """Test due-time ordering and lease/ack."""
+
+    def test_due_steps_in_order(self, scheduler):
+        """Test only due steps are returned, earliest first."""
+        now = datetime(2025, 1, 1)
+        scheduler.schedule("late", now - timedelta(minutes=1))
+        scheduler.schedule("early", now - timedelta(hours=1))
+        scheduler.schedule("future", now + timedelta(hours=1))
+        scheduler.schedule("moved", now - timedelta(hours=2))
+        scheduler.schedule("moved", now + timedelta(days=1))
+
+        assert [eid for eid, _ in scheduler.peek_due(10, now=now)] == ["early", "late"]
+
+    def test_lease_is_exclusive_until_expiry(self, scheduler):
+        """Test a leased step is not handed out twice, and only its holder can ack."""
+        now = datetime(2025, 1, 1)
+        scheduler.schedule("e1", now)
+
+        first = scheduler.lease(10, lease_seconds=60, now=now)
+        assert [l.enrollment_id for l in first] == ["e1"]
+        assert scheduler.lease(10, lease_seconds=60, now=now) == []
+
+        # Worker died: the step comes back after the lease expires
+        second = scheduler.lease(10, lease_seconds=60, now=now + timedelta(seconds=61))
+        assert [l.enrollment_id for l in second] == ["e1"]
+        assert not scheduler.ack("e1", first[0].token)
+        assert scheduler.ack("e1", second[0].token)
+        assert scheduler.peek_due(10, now=now + timedelta(days=1)) == []
+
+
+@pytest.mark.unit
+class TestSequenceService:
+    """Test the service drains steps through the scheduler."""
+
+    def test_lease_and_complete_advances_enrollment(self):
+        """Test completing a leased step schedules the next one."""
+        service = SequenceService(scheduler=SequenceScheduler())
+        enrollment = service.enroll_lead("seq_cold_outreach", "lead-1", "a@acme.com", "A")
+        service.enroll_lead("seq_cold_outreach", "lead-2", "b@acme.com", "B")
+
+        assert len(service.get_pending_steps(limit=1)) == 1
+        leased = service.lease_pending_steps(limit=10)
+        assert len(leased) == 2
+        assert service.lease_pending_steps(limit=10) == []
+
+        item = next(p for p in leased if p["enrollment"].id == enrollment.id)
+        advanced = service.complete_step(enrollment.id, item["lease_token"], StepStatus.SENT)
+        assert advanced.current_step == 2
+        assert service.scheduler.get_stats()["scheduled"] == 2
+
+    def test_workers_sharing_a_schedule_keep_their_own_enrollments(self):
+        """Test a worker never drops schedule rows for enrollments it does not hold."""
+        db_engine = make_engine()
+        first = SequenceService(scheduler=SQLSequenceScheduler(db_engine))
+        second = SequenceService(scheduler=SQLSequenceScheduler(db_engine))
+        enrollment = first.enroll_lead("seq_cold_outreach", "lead-1", "a@acme.com", "A")
+
+        assert second.get_pending_steps() == []
+        assert second.lease_pending_steps() == []
+        assert first.scheduler.get_stats()["scheduled"] == 1
+
+        # Rows without an owner are released, not acked
+        first.scheduler.schedule("unknown", datetime.utcnow())
+        assert second.lease_pending_steps() == []
+        assert second.scheduler.get_stats() == {"scheduled": 2, "leased": 0}
+
+        leased = first.lease_pending_steps()
+        assert [item["enrollment"].id for item in leased] == [enrollment.id]
+        db_engine.dispose()
+
+    def test_unresolvable_steps_are_cancelled(self):
+        """Test pending-step reads drop entries whose step no longer exists."""
+        service = SequenceService(scheduler=SequenceScheduler())
+        enrollment = service.enroll_lead("seq_cold_outreach", "lead-1", "a@acme.com", "A")
+        enrollment.current_step = 99
+
+        assert service.get_pending_steps() == []
+        assert service.scheduler.get_stats()["scheduled"] == 0
+
+    def test_rows_of_a_stopped_worker_are_reclaimed(self):
+        """Test rows whose owner stopped renewing are dropped by another worker."""
+        db_engine = make_engine()
+        stopped = SequenceService(scheduler=SQLSequenceScheduler(db_engine))
+        live = SequenceService(scheduler=SQLSequenceScheduler(db_engine))
+        other = SequenceService(scheduler=SQLSequenceScheduler(db_engine))
+
+        stopped.scheduler.OWNER_LEASE_SECONDS = 0
+        live.scheduler.OWNER_LEASE_SECONDS = 0
+        stopped.enroll_lead("seq_cold_outreach", "lead-1", "a@acme.com", "A")
+        kept = live.enroll_lead("seq_cold_outreach", "lead-2", "b@acme.com", "B")
+        live.scheduler.OWNER_LEASE_SECONDS = 300
+        live.scheduler.renew_owner(live.worker_id)
+
+        assert other.lease_pending_steps() == []
+        assert other.scheduler.get_stats() == {"scheduled": 1, "leased": 0}
+        assert [item["enrollment"].id for item in live.lease_pending_steps()] == [kept.id]
+        db_engine.dispose()
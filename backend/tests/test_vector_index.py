@@ -0,0 +1,225 @@
+"""Tests for the quantized vector index and lead similarity built on it."""
+
+import asyncio
+import os
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+
+from app.core.ml_advanced import LeadVectorizer, LookalikeModeling
+from app.core.vector_index import PartitionedVectorIndex, QuantizedIVFIndex
+from app.integrations.embedding_service import EmbeddingService
+from app.integrations.llamaindex_rag import LlamaIndexRAG
+
+
+def clustered_vectors(n, dim=32, clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(0, clusters, n)] + rng.normal(scale=0.3, size=(n, dim))).astype(
+        np.float32
+    )
+
+
+class WordEmbedding(MockEmbedding):
+    """Deterministic bag-of-words embedding, so similar texts get similar vectors."""
+
+    def _embed(self, text):
+        vector = np.zeros(self.embed_dim)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % self.embed_dim] += 1.0
+        return vector.tolist()
+
+    def _get_text_embedding(self, text):
+        return self._embed(text)
+
+    def _get_query_embedding(self, query):
+        return self._embed(query)
+
+
+@pytest.mark.unit
+class TestQuantizedIVFIndex:
+    """Test writes, filters, training and persistence."""
+
+    def test_insert_update_and_delete(self):
+        """Test the nearest vector is found, replaced in place and removed."""
+        index = QuantizedIVFIndex(4)
+        index.add("a", [1, 0, 0, 0], {"score": 90})
+        index.add("b", [0, 1, 0, 0], {"score": 40})
+        assert index.search([1, 0.1, 0, 0], 1)[0][0] == "a"
+
+        index.add("a", [0, 0, 1, 0])
+        assert len(index) == 2
+        assert index.search([1, 0.1, 0, 0], 1)[0][0] == "b"
+
+        assert index.remove("b") and not index.remove("b")
+        assert [item for item, _ in index.search([1, 0, 0, 0], 5)] == ["a"]
+
+    def test_filters_and_exclusions(self):
+        """Test range and categorical filters and excluded IDs."""
+        index = QuantizedIVFIndex(4)
+        index.add_many(
+            ["a", "b", "c"],
+            [[1, 0, 0, 0], [1, 0.1, 0, 0], [1, 0.2, 0, 0]],
+            [
+                {"score": 90, "industry": "SaaS"},
+                {"score": 40, "industry": "SaaS"},
+                {"score": 80, "industry": "Retail"},
+            ],
+        )
+
+        def ids(**kwargs):
+            return [item for item, _ in index.search([1, 0, 0, 0], 5, **kwargs)]
+
+        assert ids(where={"score": (70, None)}) == ["a", "c"]
+        assert ids(where={"industry": "SaaS"}, exclude=["a"]) == ["b"]
+        assert ids(where={"industry": "Fintech"}) == []
+
+    def test_trained_index_matches_brute_force(self):
+        """Test IVF search recalls most exact neighbours once lists are trained."""
+        vectors = clustered_vectors(5000)
+        index = QuantizedIVFIndex(32, min_train_size=1000)
+        index.add_many(list(range(len(vectors))), vectors)
+        assert index.get_stats()["lists"] > 16
+
+        unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        recall = 0.0
+        for query in range(0, 5000, 250):
+            exact = set(np.argsort(-(unit @ unit[query]))[:10].tolist())
+            found = {item for item, _ in index.search(vectors[query], 10)}
+            recall += len(exact & found) / 10
+        assert recall / 20 > 0.9
+
+    def test_reopens_from_disk(self, tmp_path):
+        """Test a saved index reopens with its vectors, attributes and payloads."""
+        vectors = clustered_vectors(2000)
+        index = QuantizedIVFIndex(32, path=str(tmp_path), min_train_size=500)
+        index.add_many(list(range(2000)), vectors, [{"score": i % 100} for i in range(2000)], None)
+        index.add(7, vectors[7], {"score": 99}, {"name": "Acme"})
+        index.remove(8)
+        index.save()
+
+        reopened = QuantizedIVFIndex(32, path=str(tmp_path))
+        assert len(reopened) == 1999 and reopened.get_stats()["memory_mapped"]
+        assert reopened.search(vectors[7], 1, where={"score": 99})[0][0] == 7
+        assert reopened.get_payload(7) == {"name": "Acme"}
+        assert 8 not in reopened
+
+    def test_save_skips_unchanged_index(self, tmp_path):
+        """Test saving rewrites metadata only after the index changed."""
+        index = QuantizedIVFIndex(4, path=str(tmp_path))
+        index.add("a", [1, 0, 0, 0], payload={"seen": datetime(2026, 1, 15)})
+        index.save()
+        meta = tmp_path / "meta.json"
+        os.utime(meta, (0, 0))
+
+        index.save()
+        assert meta.stat().st_mtime == 0
+
+        index.remove("a")
+        index.save()
+        assert meta.stat().st_mtime > 0
+        assert len(QuantizedIVFIndex(4, path=str(tmp_path))) == 0
+
+    async def test_saves_on_a_timer(self, tmp_path, monkeypatch):
+        """Test started indexes save changed partitions periodically and on stop."""
+        monkeypatch.setattr(PartitionedVectorIndex, "SAVE_INTERVAL_SECONDS", 0.01)
+        index = PartitionedVectorIndex(4, directory=str(tmp_path))
+        await index.start()
+        index.add("org1", "a", [1, 0, 0, 0])
+        await asyncio.sleep(0.1)
+        assert PartitionedVectorIndex(4, directory=str(tmp_path)).search("org1", [1, 0, 0, 0])
+
+        index.add("org1", "b", [0, 1, 0, 0])
+        await index.stop()
+        assert len(PartitionedVectorIndex(4, directory=str(tmp_path)).partition("org1")) == 2
+
+    def test_partitions_are_isolated(self, tmp_path):
+        """Test one org's vectors never appear in another org's results."""
+        index = PartitionedVectorIndex(4, directory=str(tmp_path))
+        index.add("org1", "a", [1, 0, 0, 0])
+        index.add("org/2", "b", [1, 0, 0, 0])
+        index.save()
+
+        assert [item for item, _ in index.search("org1", [1, 0, 0, 0])] == ["a"]
+        assert PartitionedVectorIndex(4, directory=str(tmp_path)).search("org/2", [1, 0, 0, 0])
+        assert index.search("org3", [1, 0, 0, 0]) == []
+
+
+@pytest.mark.unit
+class TestLeadSimilarity:
+    """Test lookalike modeling and similar-lead search use the vector index."""
+
+    LEADS = [
+        {"id": 1, "company": "A", "industry": "SaaS", "title": "VP Sales", "company_size": 400},
+        {"id": 2, "company": "B", "industry": "SaaS", "title": "VP Marketing", "company_size": 600},
+        {"id": 3, "company": "C", "industry": "Retail", "title": "Store Manager", "size": "20"},
+        {"id": 4, "company": "D", "industry": "SaaS", "title": "CRO", "company_size": 500},
+    ]
+
+    def test_candidate_pool_lookalikes(self):
+        """Test the closest candidates to the source leads rank first, sources excluded."""
+        results = LookalikeModeling.find_lookalikes([1], self.LEADS, top_n=2)
+        assert [lead["company"] for lead in results] == ["B", "D"]
+        assert results[0]["similarity_score"] >= results[1]["similarity_score"]
+
+    def test_indexed_lookalikes_with_filter(self):
+        """Test org-indexed lookalikes support filters and deletes."""
+        LookalikeModeling.index_leads("org-lookalike-test", self.LEADS)
+        results = LookalikeModeling.find_lookalikes(
+            [1], org_id="org-lookalike-test", where={"industry": "SaaS"}
+        )
+        assert {lead["id"] for lead in results} == {2, 4}
+
+        LookalikeModeling.remove_lead("org-lookalike-test", 2)
+        results = LookalikeModeling.find_lookalikes([1], org_id="org-lookalike-test", top_n=1)
+        assert results[0]["id"] == 4
+
+    async def test_bulk_indexing_is_saved(self, tmp_path, monkeypatch):
+        """Test lookalike and RAG lead indexes survive a restart after bulk loads."""
+        lookalike = str(tmp_path / "lookalike")
+        lead_index = PartitionedVectorIndex(LeadVectorizer.dim, lookalike)
+        monkeypatch.setattr("app.core.ml_advanced.lead_index", lead_index)
+        leads = [{**lead, "created_at": datetime(2026, 1, 15, 9, 30)} for lead in self.LEADS]
+        LookalikeModeling.index_leads("org1", leads)
+        assert PartitionedVectorIndex(LeadVectorizer.dim, lookalike).partition("org1") is None
+
+        await lead_index.stop()
+        reopened = PartitionedVectorIndex(LeadVectorizer.dim, lookalike).partition("org1")
+        assert len(reopened) == 4
+        assert reopened.get_payload(1)["created_at"] == "2026-01-15 09:30:00"
+
+        rag = LlamaIndexRAG()
+        rag.embed_model = EmbeddingService.for_llama_index(
+            WordEmbedding(embed_dim=64)
+        ).as_llama_index()
+        rag.lead_vectors = PartitionedVectorIndex(LeadVectorizer.dim, str(tmp_path / "rag"))
+        await rag.ingest_lead_database(self.LEADS)
+        reopened = PartitionedVectorIndex(LeadVectorizer.dim, str(tmp_path / "rag"))
+        assert len(reopened.partition("leads")) == 4
+
+    async def test_similar_leads_without_llm(self):
+        """Test leads are indexed once and similar-lead search never queries the LLM."""
+        rag = LlamaIndexRAG()
+        service = EmbeddingService.for_llama_index(WordEmbedding(embed_dim=64))
+        rag.embed_model = service.as_llama_index()
+
+        async def no_llm(*args, **kwargs):
+            raise AssertionError("find_similar_leads must not call the query engine")
+
+        rag.query = no_llm
+        leads = [
+            {"id": 1, "company": "Acme", "industry": "SaaS", "score": 85, "notes": "api pilot"},
+            {"id": 2, "company": "Globex", "industry": "Retail", "score": 90, "notes": "stores"},
+            {"id": 3, "company": "Initech", "industry": "SaaS", "score": 40, "notes": "api"},
+        ]
+        await rag.ingest_lead_database(leads)
+        await rag.ingest_lead_database(leads)
+
+        result = await rag.find_similar_leads("SaaS api integration", top_k=2, min_score=80)
+        assert [s["metadata"]["lead_id"] for s in result["sources"]][0] == 1
+        assert all(s["metadata"]["score"] >= 80 for s in result["sources"])
+        assert "Acme" in result["answer"]
+        assert len(rag.indices["leads"].docstore.docs) == 3
@@ -0,0 +1,277 @@
+"""Tests for queued webhook delivery."""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.core import webhooks
+from app.core.webhooks import (
+    SQLWebhookDeliveryQueue,
+    Webhook,
+    WebhookDeliveryQueue,
+    WebhookDispatcher,
+    WebhookEndpointStore,
+    WebhookEvent,
+    WebhookService,
+)
+from app.models.webhook_delivery import WebhookDeliveryRecord
+
+
+@pytest.fixture
+def db_engine():
+    db_engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    # Shape of the webhooks table defined in app.models.enhanced_models
+    with db_engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE webhooks (id INTEGER PRIMARY KEY, user_id INTEGER, name VARCHAR,"
+                " url VARCHAR, secret VARCHAR, events VARCHAR, is_active BOOLEAN,"
+                " last_triggered DATETIME, last_success DATETIME, last_failure DATETIME,"
+                " failure_count INTEGER, max_retries INTEGER NOT NULL DEFAULT 3,"
+                " timeout_seconds INTEGER NOT NULL DEFAULT 30,"
+                " batch_size INTEGER NOT NULL DEFAULT 1, max_concurrency INTEGER NOT NULL DEFAULT 2,"
+                " created_at DATETIME, updated_at DATETIME)"
+            )
+        )
+    yield db_engine
+    db_engine.dispose()
+
+
+@pytest.fixture
+def endpoints(db_engine):
+    return WebhookEndpointStore(db_engine)
+
+
+def make_webhook(webhook_id, url, **overrides):
+    values = dict(
+        id=webhook_id,
+        url=url,
+        secret="s3cret",
+        events=[WebhookEvent.LEAD_CREATED],
+        is_active=True,
+        failure_count=0,
+        max_retries=3,
+        timeout_seconds=5,
+        batch_size=1,
+        max_concurrency=2,
+    )
+    values.update(overrides)
+    return Webhook(**values)
+
+
+@pytest.mark.unit
+class TestWebhookDispatcher:
+    """Test partitioned, queued delivery."""
+
+    async def test_slow_endpoint_does_not_block_others(self, endpoints):
+        """Test a hung endpoint only delays its own partition."""
+        release = asyncio.Event()
+        received = []
+
+        async def handler(request):
+            if request.url.host == "slow.example.com":
+                await release.wait()
+            received.append((request.url.host, json.loads(request.content)))
+            return httpx.Response(200)
+
+        dispatcher = WebhookDispatcher(
+            WebhookDeliveryQueue(), endpoints, transport=httpx.MockTransport(handler)
+        )
+        slow = make_webhook(1, "https://slow.example.com/hook")
+        fast = make_webhook(2, "https://fast.example.com/hook", batch_size=10)
+
+        await dispatcher.enqueue([slow, fast], WebhookEvent.LEAD_CREATED, {"lead_id": 1})
+        await dispatcher.enqueue([fast], WebhookEvent.LEAD_CREATED, {"lead_id": 2})
+        tasks = await dispatcher.dispatch_due()
+        await asyncio.wait_for(asyncio.gather(*tasks[1:]), timeout=1)
+
+        assert len(received) == 1
+        host, body = received[0]
+        assert host == "fast.example.com"
+        assert body["event"] == "batch"
+        assert [d["data"]["lead_id"] for d in body["deliveries"]] == [1, 2]
+
+        release.set()
+        await asyncio.wait_for(tasks[0], timeout=1)
+        assert dispatcher.get_stats()["delivered"] == 3
+        assert dispatcher.get_stats()["host_clients"] == 2
+        await dispatcher.stop()
+
+    async def test_failures_back_off_then_open_circuit(self, endpoints):
+        """Test retries are scheduled by the queue and the circuit stops hammering."""
+        calls = []
+
+        async def handler(request):
+            calls.append(request.headers["X-Webhook-Delivery"])
+            return httpx.Response(503)
+
+        queue = WebhookDeliveryQueue()
+        dispatcher = WebhookDispatcher(queue, endpoints, transport=httpx.MockTransport(handler))
+        dispatcher.CIRCUIT_FAILURE_THRESHOLD = 2
+        webhook = make_webhook(1, "https://down.example.com/hook", max_retries=1)
+
+        await dispatcher.enqueue([webhook], WebhookEvent.LEAD_CREATED, {"lead_id": 1})
+        await asyncio.wait_for(dispatcher.run_once(), timeout=1)
+        assert len(calls) == 1
+        assert queue.get_stats()["pending"] == 1
+        assert queue.next_due_at() > datetime.utcnow()
+
+        # Next attempt exhausts retries and trips the breaker
+        await dispatcher.run_once(now=datetime.utcnow() + timedelta(hours=1))
+        assert len(calls) == 2
+        assert queue.get_stats()["dead_lettered"] == 1
+
+        await dispatcher.enqueue([webhook], WebhookEvent.LEAD_CREATED, {"lead_id": 2})
+        await dispatcher.run_once()
+        assert len(calls) == 2
+        assert queue.next_due_at() > datetime.utcnow() + timedelta(seconds=30)
+        assert dispatcher.get_stats()["open_circuits"] == 1
+        await dispatcher.stop()
+
+    async def test_trigger_webhook_only_queues(self, monkeypatch, endpoints):
+        """Test triggering returns without contacting the endpoint."""
+        queue = WebhookDeliveryQueue()
+        monkeypatch.setattr(webhooks, "webhook_dispatcher", WebhookDispatcher(queue, endpoints))
+        webhook = make_webhook(99, "https://unreachable.invalid/hook")
+        assert await WebhookService.trigger_webhook(
+            webhook, WebhookEvent.LEAD_CREATED, {"lead_id": 1}
+        )
+        assert not await WebhookService.trigger_webhook(
+            webhook, WebhookEvent.EMAIL_OPENED, {"lead_id": 1}
+        )
+        assert queue.get_stats()["pending"] == 1
+
+    async def test_endpoints_are_read_from_and_written_to_the_table(self, db_engine, endpoints):
+        """Test a fresh dispatcher loads endpoints, sees edits and persists failures."""
+        with db_engine.begin() as connection:
+            connection.execute(
+                text(
+                    "INSERT INTO webhooks (id, user_id, name, url, secret, events, is_active,"
+                    " failure_count) VALUES (1, 1, 'crm', 'https://crm.example.com/hook', 'old',"
+                    " 'lead.created,lead.updated', 1, 0)"
+                )
+            )
+        signatures = []
+
+        async def handler(request):
+            signatures.append(request.headers["X-Webhook-Signature"])
+            return httpx.Response(200 if len(signatures) == 1 else 500)
+
+        queue = WebhookDeliveryQueue()
+        queue.enqueue_many([(1, "lead.created", {"event": "lead.created", "n": 1})])
+        dispatcher = WebhookDispatcher(queue, endpoints, transport=httpx.MockTransport(handler))
+        dispatcher.DISABLE_AFTER_FAILURES = 1
+        await dispatcher.run_once()
+        assert queue.get_stats()["delivered"] == 1
+        assert endpoints.load(1).events == ["lead.created", "lead.updated"]
+
+        # Secret rotation is picked up once the cached configuration expires
+        with db_engine.begin() as connection:
+            connection.execute(text("UPDATE webhooks SET secret = 'new' WHERE id = 1"))
+        dispatcher.ENDPOINT_TTL = 0
+        queue.enqueue_many([(1, "lead.created", {"event": "lead.created", "n": 2})])
+        await dispatcher.run_once()
+        assert signatures == [
+            WebhookService.generate_signature({"event": "lead.created", "n": 1}, "old"),
+            WebhookService.generate_signature({"event": "lead.created", "n": 2}, "new"),
+        ]
+
+        with db_engine.connect() as connection:
+            stored = connection.execute(
+                text("SELECT failure_count, is_active, last_failure FROM webhooks")
+            ).one()
+        assert stored.failure_count == 1 and not stored.is_active
+        assert stored.last_failure is not None
+
+    def test_delivery_settings_are_read_per_endpoint(self, db_engine, endpoints):
+        """Test batching and concurrency are configured on the webhooks row."""
+        with db_engine.begin() as connection:
+            connection.execute(
+                text(
+                    "INSERT INTO webhooks (id, user_id, name, url, secret, events, is_active,"
+                    " failure_count, batch_size, max_concurrency) VALUES (1, 1, 'crm',"
+                    " 'https://crm.example.com/hook', 's', 'lead.created', 1, 0, 25, 8)"
+                )
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO webhooks (id, user_id, name, url, secret, events, is_active,"
+                    " failure_count) VALUES (2, 1, 'erp', 'https://erp.example.com/hook', 's',"
+                    " 'lead.created', 1, 0)"
+                )
+            )
+
+        crm, erp = endpoints.load(1), endpoints.load(2)
+        assert (crm.batch_size, crm.max_concurrency) == (25, 8)
+        assert (erp.batch_size, erp.max_concurrency, erp.max_retries) == (1, 2, 3)
+
+    async def test_trigger_event_reuses_the_reflected_table(
+        self, monkeypatch, db_engine, endpoints
+    ):
+        """Test triggering events does not reflect the webhooks table again."""
+        with db_engine.begin() as connection:
+            connection.execute(
+                text(
+                    "INSERT INTO webhooks (id, user_id, name, url, secret, events, is_active,"
+                    " failure_count) VALUES (1, 1, 'crm', 'https://crm.example.com/hook', 's',"
+                    " 'lead.created', 1, 0)"
+                )
+            )
+        queue = WebhookDeliveryQueue()
+        monkeypatch.setattr(webhooks, "webhook_dispatcher", WebhookDispatcher(queue, endpoints))
+        table = endpoints.table
+
+        with Session(db_engine) as session:
+            for _ in range(2):
+                await WebhookService.trigger_event(session, WebhookEvent.LEAD_CREATED, {})
+
+        assert queue.get_stats()["pending"] == 2
+        assert WebhookEndpointStore(db_engine).table is table
+
+    async def test_unreadable_endpoint_keeps_its_deliveries(self, endpoints):
+        """Test a failing endpoint lookup postpones deliveries instead of dropping them."""
+        queue = WebhookDeliveryQueue()
+        queue.enqueue_many([(1, "lead.created", {})])
+        dispatcher = WebhookDispatcher(queue, WebhookEndpointStore(create_engine("sqlite://")))
+        await dispatcher.run_once()
+        assert queue.get_stats()["pending"] == 1
+        assert queue.get_stats()["dead_lettered"] == 0
+        assert queue.next_due_at() > datetime.utcnow()
+
+        dispatcher.endpoints = endpoints
+        await dispatcher.run_once(now=datetime.utcnow() + timedelta(minutes=5))
+        assert queue.get_stats()["dead_lettered"] == 1
+
+
+@pytest.mark.db
+class TestSQLWebhookDeliveryQueue:
+    """Test the durable delivery queue."""
+
+    def test_lease_retry_and_ack(self):
+        """Test deliveries survive in the table through lease, retry and ack."""
+        db_engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        SQLModel.metadata.create_all(db_engine, tables=[WebhookDeliveryRecord.__table__])
+        queue = SQLWebhookDeliveryQueue(db_engine)
+        queue.enqueue_many([(1, "lead.created", {"n": i}) for i in range(3)] + [(2, "x", {})])
+        assert sorted(queue.due_partitions()) == [1, 2]
+
+        leased = queue.lease(1, limit=2)
+        assert [d.payload["n"] for d in leased] == [0, 1]
+        assert queue.lease(1, limit=5)[0].payload["n"] == 2
+
+        queue.retry(leased[0], datetime.utcnow() - timedelta(seconds=1), "HTTP 500")
+        queue.ack([leased[1]])
+        retried = queue.lease(1, limit=5)
+        assert [(d.payload["n"], d.attempts) for d in retried] == [(0, 1)]
+        assert queue.get_stats() == {"pending": 3, "delivered": 1, "dead_lettered": 0}
+        db_engine.dispose()